@@ -0,0 +1,170 @@
+"""
+Synthetic layouts for the benchmarks, scaled by their number of directed edges.
+
+All generators are deterministic for a given number of edges, so results of different commits are comparable.
+"""
+import json
+import math
+import random
+from pathlib import Path
+
+import networkx as nx
+import numpy as np
+from openpyxl import Workbook
+
+from generalized_path_finding.model.data_provider import NetworkxDataProvider
+from generalized_path_finding.model.networkx_data import NetworkxData
+from generalized_path_finding.nodes import GeoCoords
+
+MFN_FLOORS = 4
+"""The number of floors of generated MFN files."""
+
+MFN_ELEVATORS = 4
+"""The number of elevators connecting all floors of generated MFN files."""
+
+ROAD_SPEEDS_MPS = (30 / 3.6, 50 / 3.6, 100 / 3.6)
+"""The speeds of the roads of generated road networks."""
+
+METERS_PER_DEGREE = 111_320.0
+
+ORIGIN = GeoCoords(49.0, 8.4)
+"""The south-west corner of generated road networks, near Karlsruhe."""
+
+
+def grid_side(edges: int, grids: int = 1) -> int:
+    """The side length of each of grids square grids with bidirectional edges that have about edges edges together."""
+    # a grid with side s has 4 s (s - 1) directed edges
+    return max(2, round(math.sqrt(edges / grids / 4)) + 1)
+
+
+def write_lif_grid(path: str | Path, edges: int) -> Path:
+    """
+    Write a LIF file with a single layout, which is a grid with unit spacing for a single vehicle type "robot".
+
+    The file is written incrementally, so large layouts do not have to fit into memory as JSON.
+    """
+    side = grid_side(edges)
+    path = Path(path)
+    with open(path, "w") as f:
+        f.write('{"metaInformation": {"projectIdentification": "benchmark", "exportTimestamp": "2025-01-01 00:00:00", '
+                '"lifVersion": "1.0.0", "creator": "benchmarks"}, "layouts": [{"layoutId": "grid", "nodes": [')
+        f.write(",".join(json.dumps({
+            "nodeId": f"N_{i}_{j}",
+            "mapId": "grid",
+            "nodePosition": {"x": float(i), "y": float(j)},
+            "vehicleTypeNodeProperties": [{"vehicleTypeId": "robot"}],
+        }) for i in range(side) for j in range(side)))
+        f.write('], "edges": [')
+        f.write(",".join(json.dumps({
+            "edgeId": f"E-{i}_{j}-{k}_{l}",
+            "startNodeId": f"N_{i}_{j}",
+            "endNodeId": f"N_{k}_{l}",
+            "vehicleTypeEdgeProperties": [{"vehicleTypeId": "robot", "rotationAllowed": True, "maxSpeed": 1.0}],
+        }) for i, j, k, l in _grid_edges(side)))
+        f.write('], "stations": []}]}')
+    return path
+
+
+def write_mfn_floors(path: str | Path, edges: int) -> Path:
+    """
+    Write an MFN Excel file with MFN_FLOORS floors, each a grid with unit spacing, which are connected by
+    MFN_ELEVATORS elevators between all adjacent floors. All paths and connections are usable by the fleet "Roboter".
+    """
+    side = grid_side(edges, MFN_FLOORS)
+    rng = random.Random(0)
+    elevators = [(rng.randrange(side), rng.randrange(side)) for _ in range(MFN_ELEVATORS)]
+
+    wb = Workbook(write_only=True)
+    nodes, paths, connections = (wb.create_sheet(name) for name in
+                                 ("NetworkNodes", "NetworkPaths", "NetworkConnections"))
+    # the first three rows are headers
+    for sheet in (nodes, paths, connections):
+        for _ in range(3):
+            sheet.append(["header"])
+
+    for floor in range(MFN_FLOORS):
+        for i in range(side):
+            for j in range(side):
+                nodes.append([f"{i}_{j}-F{floor}", float(i), float(j), 3.0 * floor, i, j, f"F{floor}"])
+        for i, j, k, l in _grid_edges(side):
+            paths.append([f"P{floor}_{i}_{j}_{k}_{l}", f"{i}_{j}-F{floor}", f"{k}_{l}-F{floor}", f"F{floor}",
+                          None, None, 1, 1.0, None, None, None, None, "Roboter"])
+    for floor in range(MFN_FLOORS - 1):
+        for idx, (i, j) in enumerate(elevators):
+            for a, b in ((floor, floor + 1), (floor + 1, floor)):
+                connections.append([f"C{idx}_{a}_{b}", f"{i}_{j}-F{a}", f"{i}_{j}-F{b}", 20, None, f"F{a}", f"F{b}",
+                                    None, None, "Roboter", None, None])
+    wb.save(path)
+    return Path(path)
+
+
+def write_road_network(path: str | Path, edges: int) -> Path:
+    """
+    Write an OSM-like road network to a .npz file, for SyntheticRoadDataProvider.
+
+    It is a grid with 100 m spacing near Karlsruhe, whose nodes are moved randomly by up to 30 m, whose roads have
+    random speeds of ROAD_SPEEDS_MPS, and which misses a tenth of its roads in either direction, like one-way streets.
+    """
+    side = grid_side(edges)
+    rng = np.random.default_rng(0)
+    i, j = np.meshgrid(np.arange(side), np.arange(side), indexing="ij")
+    x = i.ravel() * 100.0 + rng.uniform(-30, 30, side * side)
+    y = j.ravel() * 100.0 + rng.uniform(-30, 30, side * side)
+    lat = ORIGIN.lat + y / METERS_PER_DEGREE
+    lon = ORIGIN.lon + x / (METERS_PER_DEGREE * math.cos(math.radians(ORIGIN.lat)))
+
+    grid_edges = np.array(list(_grid_edges(side)), dtype=np.int64).reshape(-1, 4)
+    tails = grid_edges[:, 0] * side + grid_edges[:, 1]
+    heads = grid_edges[:, 2] * side + grid_edges[:, 3]
+    keep = rng.random(len(tails)) >= 0.1
+    tails, heads = tails[keep], heads[keep]
+    speeds = rng.choice(ROAD_SPEEDS_MPS, len(tails))
+    seconds = np.hypot(x[tails] - x[heads], y[tails] - y[heads]) / speeds
+
+    path = Path(path)
+    with open(path, "wb") as f:
+        np.savez(f, lat=lat, lon=lon, tails=tails, heads=heads, seconds=seconds)
+    return path
+
+
+class SyntheticRoadDataProvider(NetworkxDataProvider[GeoCoords]):
+    def __init__(self, path: str | Path):
+        """
+        A DataProvider for road networks written by write_road_network, with GeoCoords as nodes and travel times in
+        seconds as weights, like OsmDataProvider.
+
+        :param path: the path to the .npz file of the road network.
+        """
+        self.path = path
+        self.time_cost = True
+
+        self._graph = None
+
+    def get_networkx_data(self) -> NetworkxData[GeoCoords]:
+        if self._graph is None:
+            arrays = np.load(self.path)
+            nodes = [GeoCoords(lat, lon) for lat, lon in zip(arrays["lat"].tolist(), arrays["lon"].tolist())]
+            self._graph = nx.MultiDiGraph()
+            self._graph.add_nodes_from(nodes)
+            self._graph.add_edges_from(
+                (nodes[tail], nodes[head], f"R{idx}", {"weight": weight}) for idx, (tail, head, weight) in
+                enumerate(zip(arrays["tails"].tolist(), arrays["heads"].tolist(), arrays["seconds"].tolist())))
+
+        max_speed = max(ROAD_SPEEDS_MPS)
+        meters_per_degree_lon = METERS_PER_DEGREE * math.cos(math.radians(ORIGIN.lat))
+
+        # the inverse of the projection of write_road_network, so it is exact
+        def heuristic(a: GeoCoords, b: GeoCoords) -> float:
+            dx, dy = (a.lon - b.lon) * meters_per_degree_lon, (a.lat - b.lat) * METERS_PER_DEGREE
+            return math.hypot(dx, dy) / max_speed
+
+        return NetworkxData(self._graph, heuristic)
+
+
+def _grid_edges(side: int):
+    """The edges (i, j, k, l) from node (i, j) to node (k, l) of a grid with bidirectional edges."""
+    for i in range(side):
+        for j in range(side):
+            for k, l in ((i + 1, j), (i - 1, j), (i, j + 1), (i, j - 1)):
+                if 0 <= k < side and 0 <= l < side:
+                    yield i, j, k, l
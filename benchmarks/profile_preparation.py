@@ -0,0 +1,99 @@
+"""
+Profiles the preparation of a layout file, i.e. the stages from reading it to building a ContractionHierarchy, and
+writes the spans of the stages to a speedscope file, which https://www.speedscope.app shows as flame graph:
+
+python -m benchmarks.profile_preparation layout.json --ch --output layout.speedscope.json
+
+The format is taken from the file extension, see FORMATS. Caches are written to a fresh temporary directory unless
+--cache-dir is given, so by default the preparation is profiled cold. .pbf files are copied there first, because their
+caches are written next to them.
+"""
+import argparse
+import shutil
+import sys
+import tempfile
+from dataclasses import replace
+from pathlib import Path
+
+from benchmarks.run_benchmarks import Dataset, make_data_provider
+from generalized_path_finding.model.profiling import Profiler, Span, span
+
+FORMATS = {
+    ".json": "lif",
+    ".xlsx": "mfn",
+    ".npz": "osm",
+    ".pbf": "pbf",
+}
+"""The formats of make_data_provider, by file extension."""
+
+
+def profile_preparation(path: str | Path, ch: bool = False, memory: bool = False,
+                        cache_dir: str | Path | None = None) -> Profiler:
+    """
+    Prepare the NetworkX graph of a layout file and optionally its ContractionHierarchy, recording the spans of all
+    stages.
+
+    :param ch: whether to build the ContractionHierarchy as well, or for .pbf files the .graph and .ch files.
+    :param memory: whether to trace the memory allocated in each stage, see Profiler.
+    :param cache_dir: the directory for cache files. Defaults to a temporary directory.
+    """
+    path = Path(path)
+    if path.suffix not in FORMATS:
+        raise ValueError(f"unknown format of {path}, expected one of {', '.join(FORMATS)}")
+    dataset = Dataset(FORMATS[path.suffix], 0, str(path))
+
+    profiler = Profiler(memory)
+    with tempfile.TemporaryDirectory() as temporary_dir:
+        cache_dir = Path(cache_dir if cache_dir is not None else temporary_dir)
+        if dataset.format == "pbf":
+            # OsmDataProvider caches the .graph and .ch files next to the .pbf file. An existing copy is kept, so its
+            # caches can be reused to profile warm preparations.
+            copy = cache_dir / path.name
+            if not copy.exists():
+                shutil.copy(path, copy)
+            dataset = replace(dataset, path=str(copy))
+        with profiler:
+            _prepare(dataset, path, ch, cache_dir)
+    return profiler
+
+
+def _prepare(dataset: Dataset, path: Path, ch: bool, cache_dir: Path):
+    data_provider = make_data_provider(dataset)
+    if dataset.format == "pbf" and ch:
+        with span("get_osm_ch_data"):
+            data_provider.get_osm_ch_data()
+        return
+    with span("get_networkx_data"):
+        data = data_provider.get_networkx_data()
+    if ch:
+        with span("to_ch_data"):
+            data.to_ch_data(original_file=path, cache_dir=cache_dir)
+
+
+def format_spans(spans: list[Span]) -> str:
+    """The spans as a table indented by their nesting, in the order they started."""
+    lines = []
+    for s in sorted(spans, key=lambda s: (s.thread, s.start)):
+        memory = f"{s.memory_bytes / 2 ** 20:10.1f} MiB" if s.memory_bytes is not None else ""
+        lines.append(f"{"  " * s.depth + s.name:<50}{s.seconds:10.3f} s{memory}")
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="the layout file to prepare")
+    parser.add_argument("--ch", action="store_true", help="build the ContractionHierarchy as well")
+    parser.add_argument("--memory", action="store_true", help="trace the memory allocated in each stage (slow)")
+    parser.add_argument("--cache-dir", help="directory for cache files, e.g. to profile warm preparations")
+    parser.add_argument("--output", help="the speedscope file to write, defaults to <path>.speedscope.json")
+    args = parser.parse_args(argv)
+
+    profiler = profile_preparation(args.path, args.ch, args.memory, args.cache_dir)
+    output = args.output if args.output is not None else f"{args.path}.speedscope.json"
+    profiler.write_speedscope(output, Path(args.path).name)
+    print(format_spans(profiler.spans), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,363 @@
+"""
+Benchmarks every combination of DataProvider and PathFinder on synthetic layouts of several scales, and writes the
+results as JSON for comparison between commits:
+
+python -m benchmarks.run_benchmarks --edges 1000 10000 100000 --output results.json
+python -m benchmarks.run_benchmarks --output new.json --compare results.json
+
+Each combination is measured in a fresh process, so its peak RSS is its own and caches of previous combinations do not
+distort it. ContractionHierarchies are built in a fresh temporary directory, and .pbf files are copied to it before
+preparing their .graph and .ch files, so preprocessing is always measured cold.
+"""
+import argparse
+import json
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict, replace
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Callable
+
+import networkx as nx
+import numpy as np
+
+from benchmarks.generators import write_lif_grid, write_mfn_floors, write_road_network, SyntheticRoadDataProvider
+from generalized_path_finding.model.networkx_data import NetworkxData
+from generalized_path_finding.model.path import Path as GraphPath
+from generalized_path_finding.model.pathfinder import PathFinder
+
+FORMATS = {
+    "lif": (".json", write_lif_grid),
+    "mfn": (".xlsx", write_mfn_floors),
+    "osm": (".npz", write_road_network),
+}
+"""The generators of the synthetic formats, with the file extension of their files."""
+
+ALGORITHMS = ["AStar", "Dijkstra", "NxRoutingKit", "RoutingKit", "OsmRoutingKit"]
+"""
+The algorithms to measure. Dijkstra is NetworkX's Dijkstra, the baseline for AStar, which is expected to be faster even
+with the 0-heuristic of the LIF and MFN formats.
+"""
+
+DEFAULT_EDGES = [1_000, 10_000, 100_000]
+"""The default scales. Larger scales up to 10M edges work, but take long and much memory for NetworkX graphs."""
+
+PERCENTILES = [50, 90, 99]
+
+METRICS = {
+    "load_seconds": -1,
+    "preprocessing_seconds": -1,
+    "latency_p50_seconds": -1,
+    "latency_p99_seconds": -1,
+    "throughput_qps": 1,
+    "peak_rss_bytes": -1,
+}
+"""The metrics compared between runs, with 1 if larger is better and -1 if smaller is better."""
+
+
+@dataclass(frozen=True)
+class Dataset:
+    format: str
+    """One of FORMATS, or "pbf" for an OpenStreetMap extract."""
+
+    edges: int
+    """The number of edges the generator was asked for. Not meaningful for "pbf"."""
+
+    path: str
+
+
+@dataclass
+class Result:
+    format: str
+    edges: int
+    algorithm: str
+    status: str
+    """ok, skipped if the algorithm does not support the format, or error."""
+
+    nodes: int | None = None
+    graph_edges: int | None = None
+    load_seconds: float | None = None
+    """The time to create the DataProvider and get the NetworkX graph from it, if the algorithm takes one."""
+
+    preprocessing_seconds: float | None = None
+    """
+    The time to create the PathFinder, including building and hashing ContractionHierarchies, or preparing the .graph
+    and .ch files for OsmRoutingKit.
+    """
+
+    latency_p50_seconds: float | None = None
+    latency_p90_seconds: float | None = None
+    latency_p99_seconds: float | None = None
+    latency_max_seconds: float | None = None
+    throughput_qps: float | None = None
+    """The queries per second when answering all queries in one call of find_shortest_paths, after running them once."""
+
+    peak_rss_bytes: int | None = None
+    """The peak resident set size of the process measuring the combination, or None if unknown, e.g. on Windows."""
+
+    error: str | None = None
+
+
+def make_data_provider(dataset: Dataset):
+    match dataset.format:
+        case "lif":
+            from generalized_path_finding.formats.lif import LifDataProvider
+            return LifDataProvider(dataset.path)
+        case "mfn":
+            from generalized_path_finding.formats.mfn_excel import MfnDataProvider
+            return MfnDataProvider(dataset.path, fleet="Roboter")
+        case "osm":
+            return SyntheticRoadDataProvider(dataset.path)
+        case "pbf":
+            from generalized_path_finding.formats.osm import OsmDataProvider
+            return OsmDataProvider(dataset.path)
+    raise ValueError(f"unknown format {dataset.format}")
+
+
+def supports(dataset: Dataset, algorithm: str) -> bool:
+    # OsmRoutingKit needs the .graph and .ch files prepared from a .pbf file, the others take any NetworkX graph
+    return dataset.format == "pbf" if algorithm == "OsmRoutingKit" else True
+
+
+def sample_queries(dataset: Dataset, count: int) -> list[tuple[Any, Any]]:
+    """Random pairs of nodes of the graph, the same for all algorithms."""
+    nodes = list(make_data_provider(dataset).get_networkx_data().graph.nodes)
+    rng = np.random.default_rng(0)
+    return [(nodes[a], nodes[b]) for a, b in rng.integers(len(nodes), size=(count, 2)).tolist()]
+
+
+def measure(dataset: Dataset, algorithm: str, queries: list[tuple[Any, Any]]) -> Result:
+    """Measure one combination. Meant to be run in a fresh process, see run_benchmarks."""
+    result = Result(dataset.format, dataset.edges, algorithm, "ok")
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            if dataset.format == "pbf":
+                # OsmDataProvider caches the .graph and .ch files next to the .pbf file
+                dataset = replace(dataset, path=shutil.copy(dataset.path, cache_dir))
+
+            start = time.perf_counter()
+            data_provider = make_data_provider(dataset)
+            data = None if algorithm == "OsmRoutingKit" else data_provider.get_networkx_data()
+            result.load_seconds = time.perf_counter() - start
+            if data is not None:
+                result.nodes, result.graph_edges = data.graph.number_of_nodes(), data.graph.number_of_edges()
+
+            start = time.perf_counter()
+            if algorithm == "OsmRoutingKit":
+                data = data_provider.get_osm_ch_data()
+            path_finder, translate = _create_path_finder(algorithm, data, cache_dir)
+            result.preprocessing_seconds = time.perf_counter() - start
+
+            queries = [(translate(source), translate(destination)) for source, destination in queries]
+            latencies = []
+            for source, destination in queries:
+                start = time.perf_counter()
+                path_finder.find_shortest_path(source, destination)
+                latencies.append(time.perf_counter() - start)
+            if latencies:
+                (result.latency_p50_seconds, result.latency_p90_seconds,
+                 result.latency_p99_seconds) = np.percentile(latencies, PERCENTILES).tolist()
+                result.latency_max_seconds = max(latencies)
+
+            start = time.perf_counter()
+            path_finder.find_shortest_paths(queries)
+            elapsed = time.perf_counter() - start
+            result.throughput_qps = len(queries) / elapsed if elapsed > 0 else None
+    except Exception:
+        result.status = "error"
+        result.error = traceback.format_exc()
+    result.peak_rss_bytes = _peak_rss_bytes()
+    return result
+
+
+def _create_path_finder(algorithm: str, data, cache_dir: str) -> tuple[Any, Callable[[Any], Any]]:
+    """:return: the PathFinder and a function translating the nodes of the graph to its nodes."""
+    from generalized_path_finding.algorithms import AStar, NxRoutingKit, RoutingKit, OsmRoutingKit
+    match algorithm:
+        case "AStar":
+            return AStar(data), lambda node: node
+        case "Dijkstra":
+            return _Dijkstra(data), lambda node: node
+        case "NxRoutingKit":
+            return NxRoutingKit(data, cache_dir=cache_dir), lambda node: node
+        case "RoutingKit":
+            ch_data, mapping = data.to_ch_data(cache_dir=cache_dir)
+            return RoutingKit(ch_data), mapping.__getitem__
+        case "OsmRoutingKit":
+            return OsmRoutingKit(data), lambda node: node
+    raise ValueError(f"unknown algorithm {algorithm}")
+
+
+class _Dijkstra(PathFinder):
+    """NetworkX's Dijkstra, as AStar but without heuristic."""
+
+    def __init__(self, data: NetworkxData):
+        self.data = data
+
+    def find_shortest_path(self, source, destination) -> GraphPath | None:
+        try:
+            nodes = nx.dijkstra_path(self.data.graph, source, destination, weight=self.data.weight_function())
+        except nx.NetworkXNoPath:
+            return None
+        return self.data.path_from_node_list(nodes)
+
+
+def _peak_rss_bytes() -> int | None:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_benchmarks(
+        formats: list[str],
+        edges: list[int],
+        algorithms: list[str],
+        queries: int = 200,
+        work_dir: str | Path | None = None,
+        pbf: str | Path | None = None,
+        isolate: bool = True,
+        progress: Callable[[Result], None] | None = None,
+) -> dict[str, Any]:
+    """
+    Measure all supported combinations of datasets and algorithms.
+
+    :param formats: the synthetic formats to generate, see FORMATS.
+    :param edges: the scales to generate each format at, in directed edges.
+    :param algorithms: the algorithms to measure, see ALGORITHMS.
+    :param queries: the number of random queries per combination.
+    :param work_dir: the directory to write the generated files to. They are reused by later runs. Defaults to the
+        temporary directory of the operating system.
+    :param pbf: an OpenStreetMap extract to measure additionally, the only dataset OsmRoutingKit supports.
+    :param isolate: whether to measure each combination in a fresh process. Without it, peak RSS is that of all
+        combinations so far.
+    :param progress: called with the result of each combination.
+    :return: the JSON-serializable results, with metadata of the machine and commit.
+    """
+    work_dir = Path(work_dir if work_dir is not None else Path(tempfile.gettempdir()) / "gpf_benchmarks")
+    work_dir.mkdir(parents=True, exist_ok=True)
+
+    datasets = []
+    for format_ in formats:
+        extension, generate = FORMATS[format_]
+        for scale in edges:
+            path = work_dir / f"{format_}_{scale}{extension}"
+            if not path.exists():
+                generate(path, scale)
+            datasets.append(Dataset(format_, scale, str(path)))
+    if pbf is not None:
+        datasets.append(Dataset("pbf", 0, str(pbf)))
+
+    results = []
+    for dataset in datasets:
+        supported = [algorithm for algorithm in algorithms if supports(dataset, algorithm)]
+        results += [Result(dataset.format, dataset.edges, algorithm, "skipped") for algorithm in algorithms
+                    if algorithm not in supported]
+        if not supported:
+            continue
+        sample = _run(isolate, sample_queries, dataset, queries)
+        for algorithm in supported:
+            result = _run(isolate, measure, dataset, algorithm, sample)
+            results.append(result)
+            if progress is not None:
+                progress(result)
+
+    return {
+        "metadata": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "queries": queries,
+        },
+        "results": [asdict(result) for result in results],
+    }
+
+
+def _run(isolate: bool, function, *args):
+    if not isolate:
+        return function(*args)
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+        return executor.submit(function, *args).result()
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=Path(__file__).parent).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict[str, Any], baseline: dict[str, Any], threshold: float = 0.2) -> list[str]:
+    """
+    :return: a description of each metric of METRICS that is worse than in the baseline by more than the threshold,
+        relative to the baseline.
+    """
+    baseline_results = {(r["format"], r["edges"], r["algorithm"]): r for r in baseline["results"]}
+    regressions = []
+    for result in results["results"]:
+        key = (result["format"], result["edges"], result["algorithm"])
+        before = baseline_results.get(key)
+        if before is None:
+            continue
+        if before["status"] == "ok" and result["status"] != "ok":
+            regressions.append(f"{key}: status {result['status']}, was ok")
+            continue
+        for metric, direction in METRICS.items():
+            new, old = result.get(metric), before.get(metric)
+            if new is None or old is None or old == 0:
+                continue
+            change = (new - old) / old * direction
+            if change < -threshold:
+                regressions.append(f"{key}: {metric} {new:.6g}, was {old:.6g} ({-change:+.0%} worse)")
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--formats", nargs="+", choices=list(FORMATS), default=list(FORMATS))
+    parser.add_argument("--edges", nargs="+", type=int, default=DEFAULT_EDGES)
+    parser.add_argument("--algorithms", nargs="+", choices=ALGORITHMS, default=ALGORITHMS)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--work-dir", help="directory for the generated files, reused by later runs")
+    parser.add_argument("--pbf", help="an OpenStreetMap extract to measure as well, e.g. for OsmRoutingKit")
+    parser.add_argument("--output", help="the JSON file to write the results to, defaults to stdout")
+    parser.add_argument("--compare", help="a JSON file of previous results, exits with 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="the relative change counted as regression")
+    parser.add_argument("--in-process", action="store_true", help="do not isolate combinations in processes")
+    args = parser.parse_args(argv)
+
+    def progress(result: Result):
+        summary = f"{result.throughput_qps:.1f} queries/s" if result.throughput_qps is not None else result.status
+        print(f"{result.format} {result.edges} {result.algorithm}: {summary}", file=sys.stderr)
+
+    results = run_benchmarks(args.formats, args.edges, args.algorithms, args.queries, args.work_dir, args.pbf,
+                             not args.in_process, progress)
+    if args.output is None:
+        json.dump(results, sys.stdout, indent=2)
+    else:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare is not None:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for regression in regressions:
+            print(regression, file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
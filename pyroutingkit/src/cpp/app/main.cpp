@@ -3,6 +3,7 @@
 #include <execution>
 #include <iostream>
 #include <numeric>
+#include <string>
 #include <pyroutingkit/GraphPreparator.h>
 #include <pyroutingkit/OsmGraphLoader.h>
 #include <pyroutingkit/RoutingGraph.h>
@@ -12,22 +13,20 @@
 using namespace fzi::routing;
 
 int main(int argc, char* argv[]) {
-    //GraphPreparator preparator("C:/temp/germany-latest.osm.pbf");
-    //preparator.prepareCarGraph("C:/temp/germany-latest-car.graph", "C:/temp/germany-latest-car.ch");
-
-    // RoutingService service("C:/temp/karlsruhe-bike.graph", "C:/temp/karlsruhe-bike.ch");
-    // auto origin = PointLatLon(49.02076098503358, 8.445475014267148);
-    // auto destination = PointLatLon(49.020286807240204, 8.448186789607776);
-    // auto route = service.route(origin, destination);
-    // std::cout << route.duration << std::endl;
-    // std::cout << route.distance << std::endl;
-    // std::cout << route.toWkt() << std::endl;
-
-    RoutingService service("C:/temp/germany-latest-car.graph", "C:/temp/germany-latest-car.ch", 1000);
-    auto origin = PointLatLon(49.01173507183336, 8.424533607221871);
-    auto destination = PointLatLon(52.51060956643967, 13.38994576319864);
-
-    auto numCalls = 10000;
+    if (argc != 3 && argc != 4 && argc != 8) {
+        std::cerr << "usage: " << argv[0] << " <graph file> <ch file> [number of calls] "
+                  << "[origin lat] [origin lon] [destination lat] [destination lon]" << std::endl;
+        return 1;
+    }
+
+    RoutingService service(argv[1], argv[2], 1000);
+    // defaults to a route from Karlsruhe to Berlin, which needs an extract of Germany
+    auto origin = argc == 8 ? PointLatLon(std::stod(argv[4]), std::stod(argv[5]))
+                            : PointLatLon(49.01173507183336, 8.424533607221871);
+    auto destination = argc == 8 ? PointLatLon(std::stod(argv[6]), std::stod(argv[7]))
+                                 : PointLatLon(52.51060956643967, 13.38994576319864);
+
+    auto numCalls = argc >= 4 ? std::stoi(argv[3]) : 10000;
 
     auto start = std::chrono::high_resolution_clock::now();
     auto route = service.route(origin, destination);
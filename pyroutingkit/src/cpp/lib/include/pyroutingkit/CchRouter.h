@@ -0,0 +1,70 @@
+#pragma once
+#include <memory>
+#include <mutex>
+#include <utility>
+#include <vector>
+#include <routingkit/customizable_contraction_hierarchy.h>
+
+namespace fzi::routing {
+    /**
+     * Shortest path queries on a CustomizableContractionHierarchy, whose arc weights can be changed without
+     * contracting the graph again.
+     *
+     * Weight changes are applied to a copy of the current metric, which then replaces it. Queries running meanwhile
+     * keep using the previous metric, so queries and weight changes may run concurrently.
+     */
+    class CchRouter {
+    public:
+        /** Arc weights and the metric customized with them. Never changed once it is published. */
+        struct Metric {
+            std::vector<unsigned> weights;
+            RoutingKit::CustomizableContractionHierarchyMetric metric;
+        };
+
+        CchRouter(const std::vector<unsigned>& order, const std::vector<unsigned>& tail,
+                  const std::vector<unsigned>& head, const std::vector<unsigned>& weights);
+
+        /**
+         * Compute a nested dissection order using inertial flow, which only depends on the topology of the graph. If
+         * no coordinates are given, coordinates are derived from hop distances to landmark nodes.
+         */
+        static std::vector<unsigned> computeOrder(unsigned nodeCount, const std::vector<unsigned>& tail,
+                                                  const std::vector<unsigned>& head,
+                                                  const std::vector<float>& latitude,
+                                                  const std::vector<float>& longitude);
+
+        /** Replace all weights and customize the metric from scratch. @return the new metric. */
+        std::shared_ptr<const Metric> customize(const std::vector<unsigned>& weights);
+        /**
+         * Replace the weights of some arcs and only update the parts of the metric depending on them.
+         * @return the new metric.
+         */
+        std::shared_ptr<const Metric> updateWeights(const std::vector<unsigned>& arcs,
+                                                    const std::vector<unsigned>& weights);
+        /**
+         * @param metric the metric to search, e.g. one returned by updateWeights. Defaults to the current one.
+         * @return the arcs of the shortest path and its weight, which is RoutingKit::inf_weight if there is none.
+         */
+        std::pair<std::vector<unsigned>, unsigned> query(unsigned source, unsigned target,
+                                                         std::shared_ptr<const Metric> metric = nullptr) const;
+        /**
+         * @return the number of nodes a query settles in both directions: the nodes on the paths from source and
+         * target to the root of the elimination tree.
+         */
+        unsigned searchSpaceSize(unsigned source, unsigned target) const;
+
+        unsigned nodeCount() const;
+        unsigned arcCount() const;
+        /** @return the current metric. */
+        std::shared_ptr<const Metric> getMetric() const;
+
+    private:
+        RoutingKit::CustomizableContractionHierarchy cch;
+        std::shared_ptr<const Metric> currentMetric;
+        mutable std::mutex currentMetricMutex;
+        // serializes weight changes, so concurrent changes are not lost
+        std::mutex customizationMutex;
+
+        void setMetric(std::shared_ptr<const Metric> metric);
+    };
+}
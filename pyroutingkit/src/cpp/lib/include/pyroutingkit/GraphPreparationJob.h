@@ -0,0 +1,17 @@
+#pragma once
+#include <pyroutingkit/RoutingMode.h>
+#include <string>
+
+namespace fzi::routing {
+class GraphPreparationJob {
+public:
+    GraphPreparationJob(const std::string& outputGraphFilePath, const std::string& outputChFilePath,
+                        RoutingMode routingMode, unsigned speed);
+
+    std::string outputGraphFilePath;
+    std::string outputChFilePath;
+    RoutingMode routingMode;
+    // in kph, only used for bikes and pedestrians
+    unsigned speed;
+};
+} // namespace fzi::routing
@@ -1,20 +1,39 @@
 #pragma once
+#include <functional>
 #include <string>
+#include <vector>
+#include <pyroutingkit/GraphPreparationJob.h>
+#include <pyroutingkit/PointLatLon.h>
+#include <pyroutingkit/RoutingGraph.h>
 #include <pyroutingkit/RoutingMode.h>
 
 namespace fzi::routing {
+// Called with the stage of the preparation ("pbf decode", "scc filter" or "ch build") and the output .ch file path of
+// the job it belongs to. It may be called from several threads at once.
+using ProgressCallback = std::function<void(const std::string& stage, const std::string& outputChFilePath)>;
+
 class GraphPreparator {
 public:
-    GraphPreparator(const std::string& pbfFilePath);
+    GraphPreparator(const std::string& pbfFilePath, const std::vector<PointLatLon>& clipPolygon = {});
     void prepareCarGraph(const std::string& outputGraphFilePath, const std::string& outputChFilePath) const;
     void prepareBikeGraph(const std::string& outputGraphFilePath, const std::string& outputChFilePath, unsigned speed) const;
     void preparePedestrianGraph(const std::string& outputGraphFilePath, const std::string& outputChFilePath,
                                 unsigned speed) const;
     void prepareGraph(const std::string& outputGraphFilePath, const std::string& outputChFilePath,
                       const RoutingMode routingMode, unsigned bikeSpeed, unsigned pedestrianSpeed) const;
+    // Prepares the graphs of all jobs from a single decode of the .pbf file. The contraction hierarchies are built
+    // concurrently.
+    void prepareGraphs(const std::vector<GraphPreparationJob>& jobs) const;
+    void setProgressCallback(const ProgressCallback& progressCallback);
 
 private:
     std::string pbfFilePath;
+    std::vector<PointLatLon> clipPolygon;
+    ProgressCallback progressCallback;
+
+    void storeGraphAndCh(const RoutingGraph& graph, const std::string& outputGraphFilePath,
+                         const std::string& outputChFilePath) const;
+    void reportProgress(const std::string& stage, const std::string& outputChFilePath) const;
 };
 
 } // namespace fzi::routing
\ No newline at end of file
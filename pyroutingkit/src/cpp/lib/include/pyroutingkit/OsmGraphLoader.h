@@ -1,28 +1,44 @@
 #pragma once
+#include "pyroutingkit/PointLatLon.h"
 #include "pyroutingkit/RoutingGraph.h"
 #include "pyroutingkit/RoutingMode.h"
 #include <routingkit/id_mapper.h>
 #include <routingkit/osm_graph_builder.h>
 #include <routingkit/osm_simple.h>
 #include <string>
+#include <vector>
 
 namespace fzi::routing {
 class OsmGraphLoader {
 public:
-    OsmGraphLoader(const std::string& pbfFilePath, unsigned bikeSpeed, unsigned pedestrianSpeed);
+    OsmGraphLoader(const std::string& pbfFilePath, unsigned bikeSpeed, unsigned pedestrianSpeed,
+                   const std::vector<PointLatLon>& clipPolygon = {});
     RoutingGraph loadGraph(const RoutingMode routingMode);
+    // Same as loadGraph, but the graph still has to be passed to filterGraph.
+    RoutingGraph loadUnfilteredGraph(const RoutingMode routingMode);
+    // Loads one graph per routing mode, scanning the .pbf file only as often as loadGraph does for a single one. The
+    // graphs are the same as those of loadGraph, but still have to be passed to filterGraph. speeds[i] is the speed in
+    // kph of routingModes[i], unless it is CAR.
+    std::vector<RoutingGraph> loadUnfilteredGraphs(const std::vector<RoutingMode>& routingModes,
+                                                   const std::vector<unsigned>& speeds);
+    // Clips the graph to the clip polygon and keeps only its largest strongly connected component.
+    RoutingGraph filterGraph(RoutingGraph& graph) const;
 
 private:
     std::string pbfFilePath;
     unsigned bikeSpeed;
     unsigned pedestrianSpeed;
+    std::vector<PointLatLon> clipPolygon;
 
     void determineArcAttributes(RoutingGraph& graph, const RoutingKit::OSMRoutingGraph& osmGraph,
                                 const std::vector<unsigned>& waySpeed, const RoutingKit::IDMapper& wayMapping);
     void determineNodeAttributes(RoutingGraph& graph, const RoutingKit::IDMapper& nodeMapping);
     RoutingGraph initializeRoutingGraphFromOsmGraph(const RoutingKit::OSMRoutingGraph& osmGraph);
     RoutingKit::OSMRoutingIDMapping loadOsmMapping(const RoutingMode routingMode) const;
+    // determines the ways used by any of the routing modes and their nodes
+    void scanRoutingWays(const std::vector<RoutingMode>& routingModes, RoutingKit::BitVector& isModellingNode,
+                         RoutingKit::BitVector& isRoutingWay) const;
     RoutingKit::OSMRoutingGraph loadOsmRoutingGraph(const RoutingKit::OSMRoutingIDMapping& osmMapping,
                                                     std::vector<unsigned>& way_speed, const RoutingMode routingMode);
 };
-} // namespace fzi::routing
\ No newline at end of file
+} // namespace fzi::routing
@@ -0,0 +1,34 @@
+#pragma once
+#include <routingkit/bit_vector.h>
+#include <routingkit/id_mapper.h>
+#include <routingkit/osm_graph_builder.h>
+#include <vector>
+
+namespace fzi::routing {
+// Builds the OSMRoutingGraph of a single routing mode way by way, in the same way as
+// RoutingKit::load_osm_routing_graph_from_pbf does. This allows building the graphs of several routing modes from a
+// single scan of a .pbf file. Nodes are identified by their local id among the modelling nodes of all routing modes.
+class OsmModeGraphBuilder {
+public:
+    OsmModeGraphBuilder(const RoutingKit::BitVector& isRoutingNode, const std::vector<float>& latitude,
+                        const std::vector<float>& longitude);
+
+    void addWay(const std::vector<unsigned>& modellingNodes, unsigned routingWayId,
+                RoutingKit::OSMWayDirectionCategory direction);
+    RoutingKit::OSMRoutingGraph build();
+    // maps the routing nodes of the graph to modelling nodes
+    const RoutingKit::IDMapper& getRoutingNodeMapping() const;
+
+private:
+    RoutingKit::IDMapper routingNodeMapping;
+    // latitude and longitude of the modelling nodes
+    const std::vector<float>& latitude;
+    const std::vector<float>& longitude;
+    std::vector<unsigned> tail;
+    RoutingKit::OSMRoutingGraph graph;
+
+    void addArc(unsigned tail, unsigned head, unsigned distance, unsigned routingWayId, bool isAntiparallelToWay,
+                const std::vector<float>& modellingNodeLatitude, const std::vector<float>& modellingNodeLongitude);
+    void sortArcsByTail();
+};
+} // namespace fzi::routing
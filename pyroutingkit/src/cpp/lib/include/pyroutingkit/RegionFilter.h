@@ -0,0 +1,21 @@
+#pragma once
+#include <pyroutingkit/PointLatLon.h>
+#include <pyroutingkit/RoutingGraph.h>
+#include <vector>
+
+namespace fzi::routing {
+class RegionFilter {
+public:
+    RegionFilter(RoutingGraph& graph, const std::vector<PointLatLon>& polygon);
+
+    RoutingGraph filterRegion() const;
+
+private:
+    RoutingGraph& graph;
+    const std::vector<PointLatLon>& polygon;
+
+    bool isInside(double latitude, double longitude) const;
+    std::vector<bool> determineNodesInside() const;
+    std::vector<unsigned> determineNewNodeIndices(const std::vector<bool>& isNodeInside) const;
+};
+} // namespace fzi::routing
@@ -1,4 +1,5 @@
 #pragma once
+#include <atomic>
 #include <string>
 #include <routingkit/geo_position_to_node.h>
 #include "pyroutingkit/Route.h"
@@ -19,7 +20,12 @@ namespace fzi::routing {
         RoutingKit::GeoPositionToNode nodeIndex;
         RoutingKit::ContractionHierarchy ch;
         unsigned matchingRadius;
+        // identifies the RoutingService the thread local query was last used with, since a new RoutingService may
+        // reuse the address of a deleted one
+        uint64_t instanceId;
+        static std::atomic<uint64_t> nextInstanceId;
         static thread_local RoutingKit::ContractionHierarchyQuery chQuery;
+        static thread_local uint64_t chQueryInstanceId;
 
         void initializeChQuery() const;
         void runChQuery(const PointLatLon& origin, const PointLatLon& destination) const;
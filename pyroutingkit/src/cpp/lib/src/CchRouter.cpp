@@ -0,0 +1,199 @@
+#include "pyroutingkit/CchRouter.h"
+#include <routingkit/constants.h>
+#include <routingkit/nested_dissection.h>
+#include <algorithm>
+#include <stdexcept>
+#include <string>
+
+namespace fzi::routing {
+/**
+ * Breadth-first search on the undirected graph, only visiting nodes of the component of start.
+ * Sets the hop distance of each node of the component and leaves all others unchanged. The visited nodes are stored
+ * in component. Before, the distances of the nodes in component are reset, so the vectors can be reused.
+ */
+static void computeHopDistances(const std::vector<std::vector<unsigned>>& neighbors, unsigned start,
+                                std::vector<unsigned>& distances, std::vector<unsigned>& component) {
+    for (auto node : component) {
+        distances[node] = RoutingKit::invalid_id;
+    }
+    component.clear();
+    distances[start] = 0;
+    component.push_back(start);
+    for (size_t i = 0; i < component.size(); ++i) {
+        auto node = component[i];
+        for (auto neighbor : neighbors[node]) {
+            if (distances[neighbor] == RoutingKit::invalid_id) {
+                distances[neighbor] = distances[node] + 1;
+                component.push_back(neighbor);
+            }
+        }
+    }
+}
+
+/**
+ * Compute coordinates for graphs without geometry, for which inertial flow finds balanced separators, too. In each
+ * component, the first axis is the difference of the hop distances to two far apart landmarks a and b. The second axis
+ * is perpendicular to it: the hop distance to the landmark c, which is as far as possible from the middle between a and
+ * b while being equally far from both.
+ */
+static void computePseudoCoordinates(unsigned nodeCount, const std::vector<unsigned>& tail,
+                                     const std::vector<unsigned>& head, std::vector<float>& x, std::vector<float>& y) {
+    std::vector<std::vector<unsigned>> neighbors(nodeCount);
+    for (size_t arc = 0; arc < tail.size(); ++arc) {
+        neighbors[tail[arc]].push_back(head[arc]);
+        neighbors[head[arc]].push_back(tail[arc]);
+    }
+    x.assign(nodeCount, 0.0f);
+    y.assign(nodeCount, 0.0f);
+    std::vector<bool> isDone(nodeCount, false);
+    std::vector<unsigned> distancesA(nodeCount, RoutingKit::invalid_id);
+    std::vector<unsigned> distancesB(nodeCount, RoutingKit::invalid_id);
+    std::vector<unsigned> distances(nodeCount, RoutingKit::invalid_id);
+    std::vector<unsigned> component;
+    auto imbalance = [&](unsigned node) {
+        return distancesA[node] > distancesB[node] ? distancesA[node] - distancesB[node]
+                                                   : distancesB[node] - distancesA[node];
+    };
+    for (unsigned start = 0; start < nodeCount; ++start) {
+        if (isDone[start]) {
+            continue;
+        }
+        computeHopDistances(neighbors, start, distances, component);
+        // in breadth-first order, the last node is the farthest one
+        auto a = component.back();
+        computeHopDistances(neighbors, a, distancesA, component);
+        auto b = component.back();
+        computeHopDistances(neighbors, b, distancesB, component);
+
+        // the middle is on a shortest path from a to b and equally far from both
+        auto middle = *std::min_element(component.begin(), component.end(), [&](unsigned u, unsigned v) {
+            auto uPathLength = distancesA[u] + distancesB[u], vPathLength = distancesA[v] + distancesB[v];
+            return uPathLength != vPathLength ? uPathLength < vPathLength : imbalance(u) < imbalance(v);
+        });
+        computeHopDistances(neighbors, middle, distances, component);
+        auto c = *std::min_element(component.begin(), component.end(), [&](unsigned u, unsigned v) {
+            return imbalance(u) != imbalance(v) ? imbalance(u) < imbalance(v) : distances[u] > distances[v];
+        });
+        computeHopDistances(neighbors, c, distances, component);
+
+        for (auto node : component) {
+            x[node] = static_cast<float>(distancesA[node]) - static_cast<float>(distancesB[node]);
+            y[node] = static_cast<float>(distances[node]);
+            isDone[node] = true;
+        }
+    }
+}
+
+CchRouter::CchRouter(const std::vector<unsigned>& order, const std::vector<unsigned>& tail,
+                     const std::vector<unsigned>& head, const std::vector<unsigned>& weights)
+    : cch(order, tail, head) {
+    customize(weights);
+}
+
+std::vector<unsigned> CchRouter::computeOrder(unsigned nodeCount, const std::vector<unsigned>& tail,
+                                              const std::vector<unsigned>& head, const std::vector<float>& latitude,
+                                              const std::vector<float>& longitude) {
+    if (!latitude.empty() || !longitude.empty()) {
+        if (latitude.size() != nodeCount || longitude.size() != nodeCount) {
+            throw std::invalid_argument("Expected " + std::to_string(nodeCount) + " coordinates, but got "
+                                        + std::to_string(latitude.size()) + " latitudes and "
+                                        + std::to_string(longitude.size()) + " longitudes");
+        }
+        return RoutingKit::compute_nested_node_dissection_order_using_inertial_flow(nodeCount, tail, head, latitude,
+                                                                                    longitude);
+    }
+    std::vector<float> x, y;
+    computePseudoCoordinates(nodeCount, tail, head, x, y);
+    return RoutingKit::compute_nested_node_dissection_order_using_inertial_flow(nodeCount, tail, head, y, x);
+}
+
+std::shared_ptr<const CchRouter::Metric> CchRouter::customize(const std::vector<unsigned>& weights) {
+    if (weights.size() != arcCount()) {
+        throw std::invalid_argument("Expected " + std::to_string(arcCount()) + " weights, but got "
+                                    + std::to_string(weights.size()));
+    }
+    std::lock_guard<std::mutex> customizationLock(customizationMutex);
+    auto metric = std::make_shared<Metric>();
+    metric->weights = weights;
+    metric->metric.reset(cch, metric->weights).customize();
+    setMetric(metric);
+    return metric;
+}
+
+std::shared_ptr<const CchRouter::Metric> CchRouter::updateWeights(const std::vector<unsigned>& arcs,
+                                                                  const std::vector<unsigned>& weights) {
+    if (arcs.size() != weights.size()) {
+        throw std::invalid_argument("Expected as many weights as arcs, but got " + std::to_string(weights.size())
+                                    + " weights for " + std::to_string(arcs.size()) + " arcs");
+    }
+    for (auto arc : arcs) {
+        if (arc >= arcCount()) {
+            throw std::out_of_range("Arc " + std::to_string(arc) + " is not in [0, " + std::to_string(arcCount())
+                                    + ")");
+        }
+    }
+    std::lock_guard<std::mutex> customizationLock(customizationMutex);
+    auto metric = std::make_shared<Metric>(*getMetric());
+    // the copied metric still points to the weights of the previous one
+    metric->metric.reset(metric->weights);
+    RoutingKit::CustomizableContractionHierarchyPartialCustomization partialCustomization(cch);
+    for (size_t i = 0; i < arcs.size(); ++i) {
+        metric->weights[arcs[i]] = weights[i];
+        partialCustomization.update_arc(arcs[i]);
+    }
+    partialCustomization.customize(metric->metric);
+    setMetric(metric);
+    return metric;
+}
+
+std::pair<std::vector<unsigned>, unsigned> CchRouter::query(unsigned source, unsigned target,
+                                                            std::shared_ptr<const Metric> metric) const {
+    if (source >= nodeCount() || target >= nodeCount()) {
+        throw std::out_of_range("Node " + std::to_string(source >= nodeCount() ? source : target) + " is not in [0, "
+                                + std::to_string(nodeCount()) + ")");
+    }
+    // keeps the metric alive, even if it is replaced during the query
+    if (metric == nullptr) {
+        metric = getMetric();
+    }
+    RoutingKit::CustomizableContractionHierarchyQuery cchQuery(metric->metric);
+    cchQuery.reset().add_source(source).add_target(target).run();
+    auto distance = cchQuery.get_distance();
+    if (distance == RoutingKit::inf_weight) {
+        return {{}, distance};
+    }
+    return {cchQuery.get_arc_path(), distance};
+}
+
+unsigned CchRouter::searchSpaceSize(unsigned source, unsigned target) const {
+    if (source >= nodeCount() || target >= nodeCount()) {
+        throw std::out_of_range("Node " + std::to_string(source >= nodeCount() ? source : target) + " is not in [0, "
+                                + std::to_string(nodeCount()) + ")");
+    }
+    unsigned size = 0;
+    for (auto node : {cch.rank[source], cch.rank[target]}) {
+        for (; node != RoutingKit::invalid_id; node = cch.elimination_tree_parent[node]) {
+            ++size;
+        }
+    }
+    return size;
+}
+
+unsigned CchRouter::nodeCount() const {
+    return cch.node_count();
+}
+
+unsigned CchRouter::arcCount() const {
+    return cch.input_arc_count();
+}
+
+std::shared_ptr<const CchRouter::Metric> CchRouter::getMetric() const {
+    std::lock_guard<std::mutex> lock(currentMetricMutex);
+    return currentMetric;
+}
+
+void CchRouter::setMetric(std::shared_ptr<const Metric> metric) {
+    std::lock_guard<std::mutex> lock(currentMetricMutex);
+    currentMetric = std::move(metric);
+}
+} // namespace fzi::routing
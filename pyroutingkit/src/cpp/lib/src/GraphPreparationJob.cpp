@@ -0,0 +1,11 @@
+#include "pyroutingkit/GraphPreparationJob.h"
+
+namespace fzi::routing {
+GraphPreparationJob::GraphPreparationJob(const std::string& outputGraphFilePath, const std::string& outputChFilePath,
+                                         RoutingMode routingMode, unsigned speed)
+    : outputGraphFilePath(outputGraphFilePath)
+    , outputChFilePath(outputChFilePath)
+    , routingMode(routingMode)
+    , speed(speed) {
+}
+} // namespace fzi::routing
@@ -1,11 +1,13 @@
 #include "pyroutingkit/GraphPreparator.h"
 #include "pyroutingkit/OsmGraphLoader.h"
+#include <future>
 #include <routingkit/contraction_hierarchy.h>
 
 namespace fzi::routing {
 
-GraphPreparator::GraphPreparator(const std::string& pbfFilePath)
-    : pbfFilePath(pbfFilePath) {
+GraphPreparator::GraphPreparator(const std::string& pbfFilePath, const std::vector<PointLatLon>& clipPolygon)
+    : pbfFilePath(pbfFilePath)
+    , clipPolygon(clipPolygon) {
 }
 
 void GraphPreparator::prepareCarGraph(const std::string& outputGraphFilePath,
@@ -25,10 +27,63 @@ void GraphPreparator::preparePedestrianGraph(const std::string& outputGraphFileP
 
 void GraphPreparator::prepareGraph(const std::string& outputGraphFilePath, const std::string& outputChFilePath, const RoutingMode routingMode,
                                    unsigned bikeSpeed, unsigned pedestrianSpeed) const {
-    OsmGraphLoader loader(pbfFilePath, bikeSpeed, pedestrianSpeed);
-    auto graph = loader.loadGraph(routingMode);
+    OsmGraphLoader loader(pbfFilePath, bikeSpeed, pedestrianSpeed, clipPolygon);
+    reportProgress("pbf decode", outputChFilePath);
+    auto unfilteredGraph = loader.loadUnfilteredGraph(routingMode);
+    reportProgress("scc filter", outputChFilePath);
+    auto graph = loader.filterGraph(unfilteredGraph);
+    unfilteredGraph = RoutingGraph();
+    storeGraphAndCh(graph, outputGraphFilePath, outputChFilePath);
+}
+
+void GraphPreparator::prepareGraphs(const std::vector<GraphPreparationJob>& jobs) const {
+    std::vector<RoutingMode> routingModes;
+    std::vector<unsigned> speeds;
+    for (const auto& job : jobs) {
+        routingModes.push_back(job.routingMode);
+        speeds.push_back(job.speed);
+    }
+
+    OsmGraphLoader loader(pbfFilePath, 15, 4, clipPolygon);
+    for (const auto& job : jobs) {
+        reportProgress("pbf decode", job.outputChFilePath);
+    }
+    auto graphs = loader.loadUnfilteredGraphs(routingModes, speeds);
+
+    std::vector<std::future<void>> futures;
+    for (size_t jobIndex = 0; jobIndex < jobs.size(); ++jobIndex) {
+        futures.push_back(std::async(std::launch::async, [&, jobIndex]() {
+            reportProgress("scc filter", jobs[jobIndex].outputChFilePath);
+            auto graph = loader.filterGraph(graphs[jobIndex]);
+            // free the unfiltered graph early, all of them together may be large
+            graphs[jobIndex] = RoutingGraph();
+            storeGraphAndCh(graph, jobs[jobIndex].outputGraphFilePath, jobs[jobIndex].outputChFilePath);
+        }));
+    }
+    // wait for all jobs before rethrowing the first exception, since they reference local variables
+    for (auto& future : futures) {
+        future.wait();
+    }
+    for (auto& future : futures) {
+        future.get();
+    }
+}
+
+void GraphPreparator::setProgressCallback(const ProgressCallback& progressCallback) {
+    this->progressCallback = progressCallback;
+}
+
+void GraphPreparator::storeGraphAndCh(const RoutingGraph& graph, const std::string& outputGraphFilePath,
+                                      const std::string& outputChFilePath) const {
     graph.store(outputGraphFilePath.c_str());
+    reportProgress("ch build", outputChFilePath);
     auto ch = RoutingKit::ContractionHierarchy::build(graph.nodeCount(), graph.tail, graph.head, graph.travelTime);
     ch.save_file(outputChFilePath);
 }
+
+void GraphPreparator::reportProgress(const std::string& stage, const std::string& outputChFilePath) const {
+    if (progressCallback) {
+        progressCallback(stage, outputChFilePath);
+    }
+}
 } // namespace fzi::routing
\ No newline at end of file
@@ -1,17 +1,85 @@
 #include "pyroutingkit/OsmGraphLoader.h"
 #include <pyroutingkit/LargestComponentFilter.h>
+#include <pyroutingkit/OsmModeGraphBuilder.h>
+#include <pyroutingkit/RegionFilter.h>
+#include <routingkit/osm_decoder.h>
 #include <routingkit/osm_profile.h>
 #include <stdexcept>
 
 namespace fzi::routing {
 
-OsmGraphLoader::OsmGraphLoader(const std::string& pbfFilePath, unsigned bikeSpeed, unsigned pedestrianSpeed)
+bool strEq(const char*l, const char*r){
+	return !strcmp(l, r);
+}
+
+bool isParkingAisle(const RoutingKit::TagMap& tags) {
+    const char* service = tags["service"];
+    if (service != nullptr && strEq(service, "parking_aisle")) {
+        return true;
+    }
+    return false;
+}
+
+bool isWayUsedBy(const RoutingMode routingMode, uint64_t osmWayId, const RoutingKit::TagMap& tags) {
+    if (routingMode == RoutingMode::CAR) {
+        return is_osm_way_used_by_cars(osmWayId, tags, nullptr) && !isParkingAisle(tags);
+    } else if (routingMode == RoutingMode::BIKE) {
+        return is_osm_way_used_by_bicycles(osmWayId, tags, nullptr) && !isParkingAisle(tags);
+    } else if (routingMode == RoutingMode::PEDESTRIAN) {
+        return is_osm_way_used_by_pedestrians(osmWayId, tags, nullptr) && !isParkingAisle(tags);
+    }
+    throw std::runtime_error("Invalid routing mode!");
+}
+
+RoutingKit::OSMWayDirectionCategory getWayDirection(const RoutingMode routingMode, uint64_t osmWayId,
+                                                    const RoutingKit::TagMap& tags) {
+    if (routingMode == RoutingMode::CAR) {
+        return get_osm_car_direction_category(osmWayId, tags, nullptr);
+    } else if (routingMode == RoutingMode::BIKE) {
+        return get_osm_bicycle_direction_category(osmWayId, tags, nullptr);
+    } else if (routingMode == RoutingMode::PEDESTRIAN) {
+        return RoutingKit::OSMWayDirectionCategory::open_in_both;
+    }
+    throw std::runtime_error("Invalid routing mode!");
+}
+
+unsigned getWaySpeed(const RoutingMode routingMode, uint64_t osmWayId, const RoutingKit::TagMap& tags,
+                     unsigned speed) {
+    if (routingMode == RoutingMode::CAR) {
+        return get_osm_way_speed(osmWayId, tags, nullptr);
+    }
+    return speed;
+}
+
+// Marks the nodes of a way as modelling nodes, and as routing nodes if they are seen for the second time or are the
+// first or last node of the way, in the same way as RoutingKit::load_osm_id_mapping_from_pbf does.
+void addWayNodes(const std::vector<unsigned>& modellingNodes, RoutingKit::BitVector& isSeen,
+                 RoutingKit::BitVector& isRoutingNode) {
+    for (auto modellingNode : modellingNodes) {
+        if (isSeen.is_set(modellingNode)) {
+            isRoutingNode.set(modellingNode);
+        } else {
+            isSeen.set(modellingNode);
+        }
+    }
+    isRoutingNode.set(modellingNodes.front());
+    isRoutingNode.set(modellingNodes.back());
+}
+
+OsmGraphLoader::OsmGraphLoader(const std::string& pbfFilePath, unsigned bikeSpeed, unsigned pedestrianSpeed,
+                               const std::vector<PointLatLon>& clipPolygon)
     : pbfFilePath(pbfFilePath)
     , bikeSpeed(bikeSpeed)
-    , pedestrianSpeed(pedestrianSpeed) {
+    , pedestrianSpeed(pedestrianSpeed)
+    , clipPolygon(clipPolygon) {
 }
 
 RoutingGraph OsmGraphLoader::loadGraph(const RoutingMode routingMode) {
+    auto graph = loadUnfilteredGraph(routingMode);
+    return filterGraph(graph);
+}
+
+RoutingGraph OsmGraphLoader::loadUnfilteredGraph(const RoutingMode routingMode) {
     auto osmMapping = loadOsmMapping(routingMode);
     unsigned routingWayCount = osmMapping.is_routing_way.population_count();
     RoutingKit::IDMapper nodeMapping(osmMapping.is_routing_node);
@@ -21,6 +89,98 @@ RoutingGraph OsmGraphLoader::loadGraph(const RoutingMode routingMode) {
     auto graph = initializeRoutingGraphFromOsmGraph(osmGraph);
     determineArcAttributes(graph, osmGraph, waySpeed, wayMapping);
     determineNodeAttributes(graph, nodeMapping);
+    return graph;
+}
+
+std::vector<RoutingGraph> OsmGraphLoader::loadUnfilteredGraphs(const std::vector<RoutingMode>& routingModes,
+                                                               const std::vector<unsigned>& speeds) {
+    if (routingModes.size() != speeds.size()) {
+        throw std::invalid_argument("There must be one speed per routing mode!");
+    }
+    auto modeCount = routingModes.size();
+
+    RoutingKit::BitVector isModellingNode;
+    RoutingKit::BitVector isRoutingWay;
+    scanRoutingWays(routingModes, isModellingNode, isRoutingWay);
+    RoutingKit::IDMapper modellingNodeMapping(isModellingNode);
+    RoutingKit::IDMapper wayMapping(isRoutingWay);
+    auto modellingNodeCount = modellingNodeMapping.local_id_count();
+    auto routingWayCount = wayMapping.local_id_count();
+
+    // The routing nodes of a routing mode are only known after all of its ways have been scanned. Therefore, the
+    // ways are kept and the arcs are created afterwards.
+    std::vector<float> latitude(modellingNodeCount);
+    std::vector<float> longitude(modellingNodeCount);
+    std::vector<std::vector<unsigned>> wayModellingNodes;
+    std::vector<unsigned> wayRoutingWayId;
+    std::vector<std::vector<RoutingKit::OSMWayDirectionCategory>> wayDirection(modeCount);
+    std::vector<std::vector<unsigned>> waySpeed(modeCount, std::vector<unsigned>(routingWayCount));
+    std::vector<RoutingKit::BitVector> isSeen(modeCount, RoutingKit::BitVector(modellingNodeCount, false));
+    std::vector<RoutingKit::BitVector> isRoutingNode(modeCount, RoutingKit::BitVector(modellingNodeCount, false));
+
+    RoutingKit::ordered_read_osm_pbf(
+        pbfFilePath,
+        [&](uint64_t osmNodeId, double nodeLatitude, double nodeLongitude, const RoutingKit::TagMap& tags) {
+            unsigned modellingNode = modellingNodeMapping.to_local(osmNodeId, RoutingKit::invalid_id);
+            if (modellingNode != RoutingKit::invalid_id) {
+                latitude[modellingNode] = nodeLatitude;
+                longitude[modellingNode] = nodeLongitude;
+            }
+        },
+        [&](uint64_t osmWayId, const std::vector<uint64_t>& osmNodeIds, const RoutingKit::TagMap& wayTags) {
+            unsigned routingWayId = wayMapping.to_local(osmWayId, RoutingKit::invalid_id);
+            if (routingWayId == RoutingKit::invalid_id) {
+                return;
+            }
+            std::vector<unsigned> modellingNodes;
+            modellingNodes.reserve(osmNodeIds.size());
+            for (auto osmNodeId : osmNodeIds) {
+                modellingNodes.push_back(modellingNodeMapping.to_local(osmNodeId));
+            }
+            for (size_t modeIndex = 0; modeIndex < modeCount; ++modeIndex) {
+                auto routingMode = routingModes[modeIndex];
+                auto direction = RoutingKit::OSMWayDirectionCategory::closed;
+                if (isWayUsedBy(routingMode, osmWayId, wayTags)) {
+                    addWayNodes(modellingNodes, isSeen[modeIndex], isRoutingNode[modeIndex]);
+                    waySpeed[modeIndex][routingWayId] = getWaySpeed(routingMode, osmWayId, wayTags, speeds[modeIndex]);
+                    direction = getWayDirection(routingMode, osmWayId, wayTags);
+                }
+                wayDirection[modeIndex].push_back(direction);
+            }
+            wayModellingNodes.push_back(std::move(modellingNodes));
+            wayRoutingWayId.push_back(routingWayId);
+        },
+        nullptr, nullptr);
+    isSeen.clear();
+
+    std::vector<RoutingGraph> graphs;
+    graphs.reserve(modeCount);
+    for (size_t modeIndex = 0; modeIndex < modeCount; ++modeIndex) {
+        OsmModeGraphBuilder builder(isRoutingNode[modeIndex], latitude, longitude);
+        for (size_t wayIndex = 0; wayIndex < wayModellingNodes.size(); ++wayIndex) {
+            auto direction = wayDirection[modeIndex][wayIndex];
+            if (direction != RoutingKit::OSMWayDirectionCategory::closed) {
+                builder.addWay(wayModellingNodes[wayIndex], wayRoutingWayId[wayIndex], direction);
+            }
+        }
+        auto osmGraph = builder.build();
+        auto graph = initializeRoutingGraphFromOsmGraph(osmGraph);
+        determineArcAttributes(graph, osmGraph, waySpeed[modeIndex], wayMapping);
+        for (unsigned nodeIndex = 0; nodeIndex < graph.nodeCount(); ++nodeIndex) {
+            auto modellingNode = builder.getRoutingNodeMapping().to_global(nodeIndex);
+            graph.osmNodeId.push_back(modellingNodeMapping.to_global(modellingNode));
+        }
+        graphs.push_back(std::move(graph));
+    }
+    return graphs;
+}
+
+RoutingGraph OsmGraphLoader::filterGraph(RoutingGraph& graph) const {
+    if (!clipPolygon.empty()) {
+        // clip before the SCC filter, such that the largest component within the region is kept
+        RegionFilter regionFilter(graph, clipPolygon);
+        graph = regionFilter.filterRegion();
+    }
     LargestComponentFilter sccFilter(graph);
     return sccFilter.filterLargestComponent();
 }
@@ -71,17 +231,9 @@ RoutingKit::OSMRoutingGraph OsmGraphLoader::loadOsmRoutingGraph(const RoutingKit
                                                                 const RoutingMode routingMode) {
     std::function<RoutingKit::OSMWayDirectionCategory(uint64_t, unsigned, const RoutingKit::TagMap&)> wayCallback =
         [&](uint64_t osmWayId, unsigned routingWayId, const RoutingKit::TagMap& wayTags) {
-            if (routingMode == RoutingMode::CAR) {
-                waySpeed[routingWayId] = get_osm_way_speed(osmWayId, wayTags, nullptr);
-                return get_osm_car_direction_category(osmWayId, wayTags, nullptr);
-            } else if (routingMode == RoutingMode::BIKE) {
-                waySpeed[routingWayId] = bikeSpeed;
-                return get_osm_bicycle_direction_category(osmWayId, wayTags, nullptr);
-            } else if (routingMode == RoutingMode::PEDESTRIAN) {
-                waySpeed[routingWayId] = pedestrianSpeed;
-                return RoutingKit::OSMWayDirectionCategory::open_in_both;
-            }
-            throw std::runtime_error("Invalid routing mode!");
+            auto speed = routingMode == RoutingMode::BIKE ? bikeSpeed : pedestrianSpeed;
+            waySpeed[routingWayId] = getWaySpeed(routingMode, osmWayId, wayTags, speed);
+            return getWayDirection(routingMode, osmWayId, wayTags);
         };
 
     return RoutingKit::load_osm_routing_graph_from_pbf(
@@ -93,32 +245,36 @@ RoutingKit::OSMRoutingGraph OsmGraphLoader::loadOsmRoutingGraph(const RoutingKit
         nullptr, false, RoutingKit::OSMRoadGeometry::uncompressed);
 }
 
-bool strEq(const char*l, const char*r){
-	return !strcmp(l, r);
-}
-
-bool isParkingAisle(const RoutingKit::TagMap& tags) {
-    const char* service = tags["service"];
-    if (service != nullptr && strEq(service, "parking_aisle")) {
-        return true;
-    }
-    return false;
-}
-
 RoutingKit::OSMRoutingIDMapping OsmGraphLoader::loadOsmMapping(const RoutingMode routingMode) const {
     std::function<bool(uint64_t, const RoutingKit::TagMap&)> isWayUsed = [&](uint64_t osmWayId,
                                                                              const RoutingKit::TagMap& tags) {
-        if (routingMode == RoutingMode::CAR) {
-            return is_osm_way_used_by_cars(osmWayId, tags, nullptr) && !isParkingAisle(tags);
-        } else if (routingMode == RoutingMode::BIKE) {
-            return is_osm_way_used_by_bicycles(osmWayId, tags, nullptr) && !isParkingAisle(tags);
-        } else if (routingMode == RoutingMode::PEDESTRIAN) {
-            return is_osm_way_used_by_pedestrians(osmWayId, tags, nullptr) && !isParkingAisle(tags);
-        }
-        throw std::runtime_error("Invalid routing mode!");
+        return isWayUsedBy(routingMode, osmWayId, tags);
     };
 
     return RoutingKit::load_osm_id_mapping_from_pbf(pbfFilePath, nullptr, isWayUsed, nullptr, false);
 }
 
-} // namespace fzi::routing
\ No newline at end of file
+void OsmGraphLoader::scanRoutingWays(const std::vector<RoutingMode>& routingModes,
+                                     RoutingKit::BitVector& isModellingNode, RoutingKit::BitVector& isRoutingWay) const {
+    RoutingKit::unordered_read_osm_pbf(
+        pbfFilePath, nullptr,
+        [&](uint64_t osmWayId, const std::vector<uint64_t>& osmNodeIds, const RoutingKit::TagMap& tags) {
+            if (osmNodeIds.size() < 2) {
+                return;
+            }
+            for (auto routingMode : routingModes) {
+                if (isWayUsedBy(routingMode, osmWayId, tags)) {
+                    isRoutingWay.make_large_enough_for(osmWayId);
+                    isRoutingWay.set(osmWayId);
+                    for (auto osmNodeId : osmNodeIds) {
+                        isModellingNode.make_large_enough_for(osmNodeId);
+                        isModellingNode.set(osmNodeId);
+                    }
+                    return;
+                }
+            }
+        },
+        nullptr, nullptr);
+}
+
+} // namespace fzi::routing
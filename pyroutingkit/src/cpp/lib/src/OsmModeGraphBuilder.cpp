@@ -0,0 +1,122 @@
+#include <algorithm>
+#include <pyroutingkit/OsmModeGraphBuilder.h>
+#include <routingkit/geo_dist.h>
+#include <routingkit/graph_util.h>
+#include <routingkit/inverse_vector.h>
+#include <routingkit/permutation.h>
+
+namespace fzi::routing {
+
+OsmModeGraphBuilder::OsmModeGraphBuilder(const RoutingKit::BitVector& isRoutingNode,
+                                         const std::vector<float>& latitude, const std::vector<float>& longitude)
+    : routingNodeMapping(isRoutingNode)
+    , latitude(latitude)
+    , longitude(longitude) {
+}
+
+void OsmModeGraphBuilder::addWay(const std::vector<unsigned>& modellingNodes, unsigned routingWayId,
+                                 RoutingKit::OSMWayDirectionCategory direction) {
+    std::vector<float> modellingNodeLatitude;
+    std::vector<float> modellingNodeLongitude;
+    unsigned previousModellingNode = modellingNodes[0];
+    unsigned lastRoutingNode = routingNodeMapping.to_local(modellingNodes[0]);
+    double distanceSinceLastRoutingNode = 0;
+
+    for (unsigned i = 1; i < modellingNodes.size(); ++i) {
+        unsigned currentModellingNode = modellingNodes[i];
+        distanceSinceLastRoutingNode +=
+            RoutingKit::geo_dist(latitude[currentModellingNode], longitude[currentModellingNode],
+                                 latitude[previousModellingNode], longitude[previousModellingNode]);
+        previousModellingNode = currentModellingNode;
+
+        unsigned currentRoutingNode = routingNodeMapping.to_local(currentModellingNode, RoutingKit::invalid_id);
+        if (currentRoutingNode == RoutingKit::invalid_id) {
+            modellingNodeLatitude.push_back(latitude[currentModellingNode]);
+            modellingNodeLongitude.push_back(longitude[currentModellingNode]);
+            continue;
+        }
+
+        if (direction != RoutingKit::OSMWayDirectionCategory::only_open_backwards) {
+            addArc(lastRoutingNode, currentRoutingNode, distanceSinceLastRoutingNode, routingWayId, false,
+                   modellingNodeLatitude, modellingNodeLongitude);
+        }
+        if (direction != RoutingKit::OSMWayDirectionCategory::only_open_forwards) {
+            std::reverse(modellingNodeLatitude.begin(), modellingNodeLatitude.end());
+            std::reverse(modellingNodeLongitude.begin(), modellingNodeLongitude.end());
+            addArc(currentRoutingNode, lastRoutingNode, distanceSinceLastRoutingNode, routingWayId, true,
+                   modellingNodeLatitude, modellingNodeLongitude);
+        }
+
+        distanceSinceLastRoutingNode = 0;
+        modellingNodeLatitude.clear();
+        modellingNodeLongitude.clear();
+        lastRoutingNode = currentRoutingNode;
+    }
+}
+
+RoutingKit::OSMRoutingGraph OsmModeGraphBuilder::build() {
+    sortArcsByTail();
+    for (unsigned routingNode = 0; routingNode < routingNodeMapping.local_id_count(); ++routingNode) {
+        auto modellingNode = routingNodeMapping.to_global(routingNode);
+        graph.latitude.push_back(latitude[modellingNode]);
+        graph.longitude.push_back(longitude[modellingNode]);
+    }
+    return std::move(graph);
+}
+
+const RoutingKit::IDMapper& OsmModeGraphBuilder::getRoutingNodeMapping() const {
+    return routingNodeMapping;
+}
+
+void OsmModeGraphBuilder::addArc(unsigned tail, unsigned head, unsigned distance, unsigned routingWayId,
+                                 bool isAntiparallelToWay, const std::vector<float>& modellingNodeLatitude,
+                                 const std::vector<float>& modellingNodeLongitude) {
+    this->tail.push_back(tail);
+    graph.head.push_back(head);
+    graph.geo_distance.push_back(distance);
+    graph.way.push_back(routingWayId);
+    graph.is_arc_antiparallel_to_way.push_back(isAntiparallelToWay);
+    graph.first_modelling_node.push_back(graph.modelling_node_latitude.size());
+    graph.modelling_node_latitude.insert(graph.modelling_node_latitude.end(), modellingNodeLatitude.begin(),
+                                         modellingNodeLatitude.end());
+    graph.modelling_node_longitude.insert(graph.modelling_node_longitude.end(), modellingNodeLongitude.begin(),
+                                          modellingNodeLongitude.end());
+}
+
+void OsmModeGraphBuilder::sortArcsByTail() {
+    unsigned nodeCount = routingNodeMapping.local_id_count();
+    auto permutation =
+        RoutingKit::compute_inverse_sort_permutation_first_by_tail_then_by_head_and_apply_sort_to_tail(nodeCount, tail,
+                                                                                                       graph.head);
+    graph.head = RoutingKit::apply_inverse_permutation(permutation, std::move(graph.head));
+    graph.geo_distance = RoutingKit::apply_inverse_permutation(permutation, std::move(graph.geo_distance));
+    graph.way = RoutingKit::apply_inverse_permutation(permutation, std::move(graph.way));
+    graph.is_arc_antiparallel_to_way =
+        RoutingKit::apply_inverse_permutation(permutation, std::move(graph.is_arc_antiparallel_to_way));
+    graph.first_out = RoutingKit::invert_vector(tail, nodeCount);
+
+    graph.first_modelling_node.push_back(graph.modelling_node_latitude.size());
+    std::vector<unsigned> firstModellingNode;
+    std::vector<float> modellingNodeLatitude;
+    std::vector<float> modellingNodeLongitude;
+    firstModellingNode.reserve(graph.first_modelling_node.size());
+    modellingNodeLatitude.reserve(graph.modelling_node_latitude.size());
+    modellingNodeLongitude.reserve(graph.modelling_node_longitude.size());
+
+    for (auto oldArc : RoutingKit::invert_permutation(permutation)) {
+        firstModellingNode.push_back(modellingNodeLatitude.size());
+        auto first = graph.first_modelling_node[oldArc];
+        auto last = graph.first_modelling_node[oldArc + 1];
+        modellingNodeLatitude.insert(modellingNodeLatitude.end(), graph.modelling_node_latitude.begin() + first,
+                                     graph.modelling_node_latitude.begin() + last);
+        modellingNodeLongitude.insert(modellingNodeLongitude.end(), graph.modelling_node_longitude.begin() + first,
+                                      graph.modelling_node_longitude.begin() + last);
+    }
+    firstModellingNode.push_back(modellingNodeLatitude.size());
+
+    graph.first_modelling_node = std::move(firstModellingNode);
+    graph.modelling_node_latitude = std::move(modellingNodeLatitude);
+    graph.modelling_node_longitude = std::move(modellingNodeLongitude);
+}
+
+} // namespace fzi::routing
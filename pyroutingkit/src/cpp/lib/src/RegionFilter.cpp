@@ -0,0 +1,79 @@
+#include <pyroutingkit/RegionFilter.h>
+#include <routingkit/constants.h>
+#include <routingkit/inverse_vector.h>
+
+namespace fzi::routing {
+
+RegionFilter::RegionFilter(RoutingGraph& graph, const std::vector<PointLatLon>& polygon)
+    : graph(graph)
+    , polygon(polygon) {
+}
+
+RoutingGraph RegionFilter::filterRegion() const {
+    auto isNodeInside = determineNodesInside();
+    auto newNodeIndices = determineNewNodeIndices(isNodeInside);
+    RoutingGraph clippedGraph;
+
+    for (auto nodeIndex = 0; nodeIndex < graph.nodeCount(); ++nodeIndex) {
+        if (isNodeInside[nodeIndex]) {
+            clippedGraph.latitude.push_back(graph.latitude[nodeIndex]);
+            clippedGraph.longitude.push_back(graph.longitude[nodeIndex]);
+            clippedGraph.osmNodeId.push_back(graph.osmNodeId[nodeIndex]);
+        }
+    }
+
+    // arcs stay sorted by tail, because the new node indices preserve the order of the old ones
+    for (auto arcIndex = 0; arcIndex < graph.arcCount(); ++arcIndex) {
+        auto tail = graph.tail[arcIndex];
+        auto head = graph.head[arcIndex];
+        if (isNodeInside[tail] && isNodeInside[head]) {
+            clippedGraph.tail.push_back(newNodeIndices[tail]);
+            clippedGraph.head.push_back(newNodeIndices[head]);
+            clippedGraph.travelTime.push_back(graph.travelTime[arcIndex]);
+            clippedGraph.geoDistance.push_back(graph.geoDistance[arcIndex]);
+            clippedGraph.geometry.push_back(std::move(graph.geometry[arcIndex]));
+            clippedGraph.osmWayId.push_back(graph.osmWayId[arcIndex]);
+        }
+    }
+
+    clippedGraph.firstOut = RoutingKit::invert_vector(clippedGraph.tail, clippedGraph.nodeCount());
+    return clippedGraph;
+}
+
+bool RegionFilter::isInside(double latitude, double longitude) const {
+    // even-odd rule: count the polygon edges crossed by a ray from the point in direction of increasing longitude
+    bool inside = false;
+    for (size_t i = 0, j = polygon.size() - 1; i < polygon.size(); j = i++) {
+        const auto& a = polygon[i];
+        const auto& b = polygon[j];
+        if ((a.latitude > latitude) != (b.latitude > latitude)) {
+            auto crossingLongitude =
+                a.longitude + (latitude - a.latitude) * (b.longitude - a.longitude) / (b.latitude - a.latitude);
+            if (longitude < crossingLongitude) {
+                inside = !inside;
+            }
+        }
+    }
+    return inside;
+}
+
+std::vector<bool> RegionFilter::determineNodesInside() const {
+    std::vector<bool> isNodeInside(graph.nodeCount());
+    for (auto nodeIndex = 0; nodeIndex < graph.nodeCount(); ++nodeIndex) {
+        isNodeInside[nodeIndex] = isInside(graph.latitude[nodeIndex], graph.longitude[nodeIndex]);
+    }
+    return isNodeInside;
+}
+
+std::vector<unsigned> RegionFilter::determineNewNodeIndices(const std::vector<bool>& isNodeInside) const {
+    std::vector<unsigned> newNodeIndices(graph.nodeCount(), RoutingKit::invalid_id);
+    unsigned newNodeIndex = 0;
+    for (auto nodeIndex = 0; nodeIndex < graph.nodeCount(); ++nodeIndex) {
+        if (isNodeInside[nodeIndex]) {
+            newNodeIndices[nodeIndex] = newNodeIndex++;
+        }
+    }
+    return newNodeIndices;
+}
+
+} // namespace fzi::routing
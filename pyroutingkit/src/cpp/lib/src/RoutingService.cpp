@@ -3,13 +3,16 @@
 #include <stdexcept>
 
 namespace fzi::routing {
+std::atomic<uint64_t> RoutingService::nextInstanceId = 0;
 thread_local RoutingKit::ContractionHierarchyQuery RoutingService::chQuery = RoutingKit::ContractionHierarchyQuery();
+thread_local uint64_t RoutingService::chQueryInstanceId = 0;
 
 RoutingService::RoutingService(const std::string& graphFilePath, const std::string& chFilePath, unsigned matchingRadius)
     : graph(RoutingGraph::load(graphFilePath.c_str()))
     , nodeIndex(graph.latitude, graph.longitude)
     , ch(RoutingKit::ContractionHierarchy::load_file(chFilePath))
-    , matchingRadius(matchingRadius) {
+    , matchingRadius(matchingRadius)
+    , instanceId(++nextInstanceId) {
 }
 
 double RoutingService::duration(const PointLatLon& origin, const PointLatLon& destination) const {
@@ -51,8 +54,9 @@ Route RoutingService::route(const PointLatLon& origin, const PointLatLon& destin
 }
 
 void RoutingService::initializeChQuery() const {
-    if (!(chQuery.ch == &ch)) {
+    if (chQueryInstanceId != instanceId) {
         chQuery.reset(ch);
+        chQueryInstanceId = instanceId;
     }
 }
 
@@ -1,13 +1,21 @@
+#include <chrono>
 #include <iostream>
 #include <memory>
+#include <stdexcept>
+#include <string>
+#include <tuple>
+#include <pybind11/functional.h>
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
+#include <pyroutingkit/CchRouter.h>
+#include <pyroutingkit/GraphPreparationJob.h>
 #include <pyroutingkit/GraphPreparator.h>
 #include <pyroutingkit/PointLatLon.h>
 #include <pyroutingkit/Route.h>
 #include <pyroutingkit/RouteArc.h>
 #include <pyroutingkit/RoutingService.h>
 #include <routingkit/contraction_hierarchy.h>
+#include <routingkit/customizable_contraction_hierarchy.h>
 
 namespace py = pybind11;
 
@@ -39,6 +47,37 @@ static void buildContractionHierarchy(
     ch.save_file(ch_output_file);
 }
 
+/**
+ * Build a ContractionHierarchy from a list of edges using a given contraction order and save it to a file.
+ * Much faster than buildContractionHierarchy, since the order is already known: the weights are applied to a
+ * CustomizableContractionHierarchy, from which the ContractionHierarchy is derived by a perfect witness search.
+ */
+static void buildContractionHierarchyGivenOrder(
+    size_t node_count,
+    const std::vector<std::tuple<unsigned, unsigned, unsigned>>& edges,
+    const std::vector<unsigned>& order,
+    const std::string& ch_output_file
+){
+    if (order.size() != node_count) {
+        throw std::invalid_argument("Expected an order of " + std::to_string(node_count) + " nodes, but got "
+                                    + std::to_string(order.size()));
+    }
+    std::vector<unsigned> tail, head, weight;
+    tail.reserve(edges.size());
+    head.reserve(edges.size());
+    weight.reserve(edges.size());
+    for(const auto& e : edges){
+        tail.push_back(std::get<0>(e));
+        head.push_back(std::get<1>(e));
+        weight.push_back(std::get<2>(e));
+    }
+
+    RoutingKit::CustomizableContractionHierarchy cch(order, tail, head);
+    RoutingKit::CustomizableContractionHierarchyMetric metric(cch, weight);
+    auto ch = metric.build_contraction_hierarchy_using_perfect_witness_search();
+    ch.save_file(ch_output_file);
+}
+
 /**
  * Load a ContractionHierarchy from a file and return a shared_ptr to it.
  * The returned object can be reused for multiple queries.
@@ -72,6 +111,90 @@ static py::tuple queryContractionHierarchyPath(
     return py::make_tuple(arc_indices, total_distance);
 }
 
+/**
+ * Query the shortest paths between pairs of source and target node IDs, reusing one query object.
+ * Does not touch Python objects, so it runs without the GIL.
+ */
+static std::vector<std::pair<std::vector<unsigned>, unsigned>> queryContractionHierarchyPaths(
+    const std::shared_ptr<RoutingKit::ContractionHierarchy>& ch,
+    const std::vector<unsigned>& sources,
+    const std::vector<unsigned>& targets
+) {
+    if (sources.size() != targets.size()) {
+        throw std::invalid_argument("Expected as many sources as targets, but got " + std::to_string(sources.size())
+                                    + " sources and " + std::to_string(targets.size()) + " targets");
+    }
+    RoutingKit::ContractionHierarchyQuery ch_query(*ch);
+    std::vector<std::pair<std::vector<unsigned>, unsigned>> paths;
+    paths.reserve(sources.size());
+    for (size_t i = 0; i < sources.size(); ++i) {
+        ch_query.reset().add_source(sources[i]).add_target(targets[i]).run();
+        paths.emplace_back(ch_query.get_arc_path(), ch_query.get_distance());
+    }
+    return paths;
+}
+
+/**
+ * The number of nodes settled by the last run of a query in both directions, i.e. pushed to a queue and popped from it.
+ * Scans all nodes, so it is only meant for statistics.
+ */
+static unsigned countSettledNodes(const RoutingKit::ContractionHierarchyQuery& ch_query) {
+    unsigned settled = 0;
+    for (unsigned node = 0; node < ch_query.ch->node_count(); ++node) {
+        settled += ch_query.was_forward_pushed.is_set(node) && !ch_query.forward_queue.contains_id(node);
+        settled += ch_query.was_backward_pushed.is_set(node) && !ch_query.backward_queue.contains_id(node);
+    }
+    return settled;
+}
+
+/**
+ * Like queryContractionHierarchyPaths, but also counts the nodes settled by each query, see countSettledNodes.
+ * Also returns the seconds spent counting, so they can be told apart from the time of the searches.
+ */
+static std::pair<std::vector<std::tuple<std::vector<unsigned>, unsigned, unsigned>>, double>
+queryContractionHierarchyPathsWithStats(
+    const std::shared_ptr<RoutingKit::ContractionHierarchy>& ch,
+    const std::vector<unsigned>& sources,
+    const std::vector<unsigned>& targets
+) {
+    if (sources.size() != targets.size()) {
+        throw std::invalid_argument("Expected as many sources as targets, but got " + std::to_string(sources.size())
+                                    + " sources and " + std::to_string(targets.size()) + " targets");
+    }
+    RoutingKit::ContractionHierarchyQuery ch_query(*ch);
+    std::vector<std::tuple<std::vector<unsigned>, unsigned, unsigned>> paths;
+    paths.reserve(sources.size());
+    std::chrono::steady_clock::duration counting{0};
+    for (size_t i = 0; i < sources.size(); ++i) {
+        ch_query.reset().add_source(sources[i]).add_target(targets[i]).run();
+        auto counting_start = std::chrono::steady_clock::now();
+        unsigned settled = countSettledNodes(ch_query);
+        counting += std::chrono::steady_clock::now() - counting_start;
+        paths.emplace_back(ch_query.get_arc_path(), ch_query.get_distance(), settled);
+    }
+    return {std::move(paths), std::chrono::duration<double>(counting).count()};
+}
+
+/**
+ * Compute the distances from each source to all targets, with one search per source to the pinned targets.
+ * Does not touch Python objects, so it runs without the GIL.
+ */
+static std::vector<std::vector<unsigned>> queryContractionHierarchyDistances(
+    const std::shared_ptr<RoutingKit::ContractionHierarchy>& ch,
+    const std::vector<unsigned>& sources,
+    std::vector<unsigned> targets
+) {
+    RoutingKit::ContractionHierarchyQuery ch_query(*ch);
+    ch_query.reset().pin_targets(targets);
+    std::vector<std::vector<unsigned>> distances;
+    distances.reserve(sources.size());
+    for (unsigned source : sources) {
+        distances.push_back(ch_query.reset_source().add_source(source).run_to_pinned_targets()
+                                .get_distances_to_targets());
+    }
+    return distances;
+}
+
 
 PYBIND11_MODULE(_py_routingkit, m) {
     m.doc() = R"pbdoc(
@@ -90,12 +213,22 @@ PYBIND11_MODULE(_py_routingkit, m) {
             route
            GraphPreparator
             prepareGraph
+            prepareGraphs
+           GraphPreparationJob
+           CchRouter
+            customize
+            updateWeights
+            query
            ContractionHierarchy
             load_contraction_hierarchy
             query_contraction_hierarchy_path
+            query_contraction_hierarchy_paths
+            query_contraction_hierarchy_distances
     )pbdoc";
 
-    py::class_<RoutingKit::ContractionHierarchy, std::shared_ptr<RoutingKit::ContractionHierarchy>>(m, "ContractionHierarchy");
+    py::class_<RoutingKit::ContractionHierarchy, std::shared_ptr<RoutingKit::ContractionHierarchy>>(m, "ContractionHierarchy")
+        .def_readonly("order", &RoutingKit::ContractionHierarchy::order,
+            "The nodes in the order they were contracted.");
 
     py::class_<fzi::routing::DurationAndDistance>(m, "DurationAndDistance")
         .def(py::init<double, double>())
@@ -125,7 +258,8 @@ PYBIND11_MODULE(_py_routingkit, m) {
 
     py::class_<fzi::routing::RoutingService>(m, "RoutingService")
         .def(py::init<const std::string&, const std::string&, unsigned>(),
-            py::arg("graphFilePath"), py::arg("chFilePath"), py::arg("matchingRadius"))
+            py::arg("graphFilePath"), py::arg("chFilePath"), py::arg("matchingRadius"),
+            py::call_guard<py::gil_scoped_release>())
         .def("duration", &fzi::routing::RoutingService::duration)
         .def("durationAndDistance", &fzi::routing::RoutingService::durationAndDistance)
         .def("route", &fzi::routing::RoutingService::route);
@@ -136,20 +270,162 @@ PYBIND11_MODULE(_py_routingkit, m) {
         .value("PEDESTRIAN", RoutingMode::PEDESTRIAN)
         .export_values();
 
+    py::class_<fzi::routing::GraphPreparationJob>(m, "GraphPreparationJob")
+        .def(py::init<const std::string&, const std::string&, RoutingMode, unsigned>(),
+            py::arg("outputGraphFilePath"),
+            py::arg("outputChFilePath"),
+            py::arg("routingMode") = RoutingMode::CAR,
+            py::arg("speed") = 15
+        )
+        .def_readwrite("outputGraphFilePath", &fzi::routing::GraphPreparationJob::outputGraphFilePath)
+        .def_readwrite("outputChFilePath", &fzi::routing::GraphPreparationJob::outputChFilePath)
+        .def_readwrite("routingMode", &fzi::routing::GraphPreparationJob::routingMode)
+        .def_readwrite("speed", &fzi::routing::GraphPreparationJob::speed);
+
     py::class_<fzi::routing::GraphPreparator>(m, "GraphPreparator")
-        .def(py::init<const std::string&>())
-        .def("prepareCarGraph", &fzi::routing::GraphPreparator::prepareCarGraph)
-        .def("prepareBikeGraph", &fzi::routing::GraphPreparator::prepareBikeGraph)
-        .def("preparePedestrianGraph", &fzi::routing::GraphPreparator::preparePedestrianGraph)
+        .def(py::init<const std::string&, const std::vector<fzi::routing::PointLatLon>&>(),
+            py::arg("pbfFilePath"),
+            py::arg("clipPolygon") = std::vector<fzi::routing::PointLatLon>()
+        )
+        .def("prepareCarGraph", &fzi::routing::GraphPreparator::prepareCarGraph,
+            py::call_guard<py::gil_scoped_release>())
+        .def("prepareBikeGraph", &fzi::routing::GraphPreparator::prepareBikeGraph,
+            py::call_guard<py::gil_scoped_release>())
+        .def("preparePedestrianGraph", &fzi::routing::GraphPreparator::preparePedestrianGraph,
+            py::call_guard<py::gil_scoped_release>())
         .def("prepareGraph",
             &fzi::routing::GraphPreparator::prepareGraph,
             py::arg("outputGraphFilePath"),
             py::arg("outputChFilePath"),
             py::arg("routingMode") = RoutingMode::CAR,
             py::arg("bikeSpeed") = 15,
-            py::arg("pedestrianSpeed") = 4
+            py::arg("pedestrianSpeed") = 4,
+            py::call_guard<py::gil_scoped_release>()
+        )
+        .def("prepareGraphs",
+            &fzi::routing::GraphPreparator::prepareGraphs,
+            py::arg("jobs"),
+            py::call_guard<py::gil_scoped_release>(),
+            R"pbdoc(
+                Prepare the graphs and contraction hierarchies of several jobs, decoding the .pbf file only once.
+                The contraction hierarchies are built concurrently.
+
+                :param jobs: A list of GraphPreparationJob, one per output .graph and .ch file.
+            )pbdoc"
+        )
+        .def("setProgressCallback",
+            &fzi::routing::GraphPreparator::setProgressCallback,
+            py::arg("progressCallback"),
+            R"pbdoc(
+                Set a function that is called whenever a preparation enters a new stage. It is called with the stage
+                ("pbf decode", "scc filter" or "ch build") and the output .ch file path of the job. The preparation
+                releases the GIL, so the function may be called from other threads.
+
+                :param progressCallback: A function taking the stage and the output .ch file path.
+            )pbdoc"
         );
 
+    // pybind11 does not support holders of const types, but no binding changes a metric
+    py::class_<fzi::routing::CchRouter::Metric, std::shared_ptr<fzi::routing::CchRouter::Metric>>(m, "CchMetric",
+        R"pbdoc(
+            The arc weights of a CchRouter at one point in time, customized for queries. Immutable.
+        )pbdoc");
+
+    py::class_<fzi::routing::CchRouter>(m, "CchRouter")
+        .def(py::init<const std::vector<unsigned>&, const std::vector<unsigned>&, const std::vector<unsigned>&,
+                      const std::vector<unsigned>&>(),
+            py::arg("order"), py::arg("tail"), py::arg("head"), py::arg("weights"),
+            py::call_guard<py::gil_scoped_release>(),
+            R"pbdoc(
+                Build a CustomizableContractionHierarchy of the arcs (tail[i], head[i]) and customize it with weights.
+
+                :param order: A contraction order of the nodes, see computeOrder.
+                :param tail: The tail node of each arc.
+                :param head: The head node of each arc.
+                :param weights: The weight of each arc.
+            )pbdoc"
+        )
+        .def_static("computeOrder", &fzi::routing::CchRouter::computeOrder,
+            py::arg("nodeCount"), py::arg("tail"), py::arg("head"),
+            py::arg("latitude") = std::vector<float>(), py::arg("longitude") = std::vector<float>(),
+            py::call_guard<py::gil_scoped_release>(),
+            R"pbdoc(
+                Compute a nested dissection order using inertial flow, which only depends on the topology of the graph,
+                so it can be reused for all weights. If no coordinates are given, coordinates are derived from hop
+                distances to landmark nodes, which works well for road and factory networks.
+
+                :param nodeCount: Number of nodes in the graph.
+                :param tail: The tail node of each arc.
+                :param head: The head node of each arc.
+                :param latitude: Optional y coordinate of each node.
+                :param longitude: Optional x coordinate of each node.
+            )pbdoc"
+        )
+        .def("customize",
+            [](fzi::routing::CchRouter& router, const std::vector<unsigned>& weights) {
+                return std::const_pointer_cast<fzi::routing::CchRouter::Metric>(router.customize(weights));
+            },
+            py::arg("weights"),
+            py::call_guard<py::gil_scoped_release>(),
+            R"pbdoc(
+                Replace the weights of all arcs. Returns the new CchMetric.
+
+                :param weights: The weight of each arc.
+            )pbdoc"
+        )
+        .def("updateWeights",
+            [](fzi::routing::CchRouter& router, const std::vector<unsigned>& arcs,
+               const std::vector<unsigned>& weights) {
+                return std::const_pointer_cast<fzi::routing::CchRouter::Metric>(router.updateWeights(arcs, weights));
+            },
+            py::arg("arcs"), py::arg("weights"),
+            py::call_guard<py::gil_scoped_release>(),
+            R"pbdoc(
+                Replace the weights of some arcs. Faster than customize if only few weights change. Returns the new
+                CchMetric.
+
+                :param arcs: The indices of the arcs.
+                :param weights: The new weight of each of the arcs.
+            )pbdoc"
+        )
+        .def("query",
+            [](const fzi::routing::CchRouter& router, unsigned source, unsigned target,
+               std::shared_ptr<fzi::routing::CchRouter::Metric> metric) {
+                return router.query(source, target, metric);
+            },
+            py::arg("source"), py::arg("target"), py::arg("metric") = py::none(),
+            py::call_guard<py::gil_scoped_release>(),
+            R"pbdoc(
+                Run a shortest-path query. Returns a 2-tuple of the arc indices of the path and its total weight.
+                If there is no path, the weight is 2147483647.
+
+                :param source: Source node index.
+                :param target: Target node index.
+                :param metric: The CchMetric of this CchRouter to search, e.g. one returned by updateWeights.
+                Defaults to the current one.
+            )pbdoc"
+        )
+        .def("getMetric",
+            [](const fzi::routing::CchRouter& router) {
+                return std::const_pointer_cast<fzi::routing::CchRouter::Metric>(router.getMetric());
+            },
+            R"pbdoc(
+                The current CchMetric, i.e. the one returned by the last customize or updateWeights.
+            )pbdoc"
+        )
+        .def("searchSpaceSize", &fzi::routing::CchRouter::searchSpaceSize,
+            py::arg("source"), py::arg("target"),
+            R"pbdoc(
+                The number of nodes a query from source to target settles in both directions, i.e. the nodes on the
+                paths from source and target to the root of the elimination tree. Cheap compared to the query.
+
+                :param source: Source node index.
+                :param target: Target node index.
+            )pbdoc"
+        )
+        .def("nodeCount", &fzi::routing::CchRouter::nodeCount)
+        .def("arcCount", &fzi::routing::CchRouter::arcCount);
+
     m.def(
         "build_contraction_hierarchy",
         &buildContractionHierarchy,
@@ -166,6 +442,26 @@ PYBIND11_MODULE(_py_routingkit, m) {
         )pbdoc"
     );
 
+    m.def(
+        "build_contraction_hierarchy_given_order",
+        &buildContractionHierarchyGivenOrder,
+        py::arg("node_count"),
+        py::arg("edges"),
+        py::arg("order"),
+        py::arg("ch_output_file"),
+        py::call_guard<py::gil_scoped_release>(),
+        R"pbdoc(
+            Build a ContractionHierarchy from a list of (tail, head, weight) edges using a known contraction order,
+            e.g. the order of a ContractionHierarchy of the same graph with different weights, and save it to a
+            specified file. This is much faster than build_contraction_hierarchy.
+
+            :param node_count: Number of nodes in the graph.
+            :param edges: A list of (tail, head, weight) tuples describing each arc.
+            :param order: The nodes in the order to contract them.
+            :param ch_output_file: Path where the resulting .ch file is saved.
+        )pbdoc"
+    );
+
     m.def(
         "load_contraction_hierarchy",
         &loadContractionHierarchy,
@@ -198,4 +494,56 @@ PYBIND11_MODULE(_py_routingkit, m) {
         )pbdoc"
     );
 
+    m.def(
+        "query_contraction_hierarchy_paths",
+        &queryContractionHierarchyPaths,
+        py::arg("ch"),
+        py::arg("sources"),
+        py::arg("targets"),
+        py::call_guard<py::gil_scoped_release>(),
+        R"pbdoc(
+            Run a shortest-path query for each pair of sources[i] and targets[i] on a loaded ContractionHierarchy,
+            without holding the GIL. Returns a list of 2-tuples like query_contraction_hierarchy_path.
+
+            :param ch: A shared_ptr to a loaded ContractionHierarchy object.
+            :param sources: Source node indices.
+            :param targets: Target node indices, as many as sources.
+        )pbdoc"
+    );
+
+    m.def(
+        "query_contraction_hierarchy_paths_with_stats",
+        &queryContractionHierarchyPathsWithStats,
+        py::arg("ch"),
+        py::arg("sources"),
+        py::arg("targets"),
+        py::call_guard<py::gil_scoped_release>(),
+        R"pbdoc(
+            Like query_contraction_hierarchy_paths, but returns 3-tuples of the arcs, the total weight and the number
+            of nodes settled by the query in both directions, and the seconds spent counting them. Counting scans all
+            nodes after each query, so it is only meant for statistics.
+
+            :param ch: A shared_ptr to a loaded ContractionHierarchy object.
+            :param sources: Source node indices.
+            :param targets: Target node indices, as many as sources.
+        )pbdoc"
+    );
+
+    m.def(
+        "query_contraction_hierarchy_distances",
+        &queryContractionHierarchyDistances,
+        py::arg("ch"),
+        py::arg("sources"),
+        py::arg("targets"),
+        py::call_guard<py::gil_scoped_release>(),
+        R"pbdoc(
+            Compute the distances from each source to each target on a loaded ContractionHierarchy, without holding
+            the GIL. Returns a list per source of the distance to each target, 2147483647 if there is no path.
+
+            :param ch: A shared_ptr to a loaded ContractionHierarchy object.
+            :param sources: Source node indices.
+            :param targets: Target node indices.
+        )pbdoc"
+    );
+
 }
\ No newline at end of file
@@ -1,9 +1,14 @@
 from __future__ import annotations
 
 from ._py_routingkit import (__doc__, DurationAndDistance, PointLatLon, Route, RouteArc, RoutingService,
-                             GraphPreparator, RoutingMode, ContractionHierarchy, build_contraction_hierarchy,
-                             load_contraction_hierarchy, query_contraction_hierarchy_path)
+                             GraphPreparator, GraphPreparationJob, RoutingMode, CchMetric, CchRouter,
+                             ContractionHierarchy, build_contraction_hierarchy, build_contraction_hierarchy_given_order,
+                             load_contraction_hierarchy, query_contraction_hierarchy_path,
+                             query_contraction_hierarchy_paths, query_contraction_hierarchy_paths_with_stats,
+                             query_contraction_hierarchy_distances)
 
 __all__ = ["__doc__", "DurationAndDistance", "PointLatLon", "Route", "RouteArc", "RoutingService", "GraphPreparator",
-           "RoutingMode", "ContractionHierarchy", "build_contraction_hierarchy", "load_contraction_hierarchy",
-           "query_contraction_hierarchy_path"]
+           "GraphPreparationJob", "RoutingMode", "CchMetric", "CchRouter", "ContractionHierarchy",
+           "build_contraction_hierarchy", "build_contraction_hierarchy_given_order", "load_contraction_hierarchy",
+           "query_contraction_hierarchy_path", "query_contraction_hierarchy_paths",
+           "query_contraction_hierarchy_paths_with_stats", "query_contraction_hierarchy_distances"]
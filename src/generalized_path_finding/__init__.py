@@ -11,5 +11,6 @@ from .model import Path, PathFinder
 from .formats import LifDataProvider, MfnDataProvider, OsmDataProvider
 from .algorithms import AStar, RoutingKit, NxRoutingKit, OsmRoutingKit
 from .helper import create_path_finder, Algorithm
+from .routing_server import RoutingServer, RoutingServerOptions
 
 end_all()
@@ -5,4 +5,12 @@ from .a_star import AStar
 from .osm_routing_kit import OsmRoutingKit
 from .routing_kit import RoutingKit
 from .nx_routing_kit import NxRoutingKit
+from .cch_routing_kit import CchRoutingKit
+from .station_path_finder import StationPathFinder
+from .multi_floor_path_finder import MultiFloorPathFinder
+from .time_dependent_a_star import TimeDependentAStar
+from .load_aware_path_finder import LoadAwarePathFinder
+from .caching_path_finder import CachingPathFinder, PathCacheOptions, PathCacheStats
+from .rotation_aware_a_star import RotationAwareAStar
+from .rotation_aware_routing_kit import RotationAwareRoutingKit
 end_all()
@@ -1,38 +1,103 @@
+from collections.abc import Callable
+
 import networkx as nx
 from auto_all import public
 
+from generalized_path_finding.model.graph_overlay import GraphOverlay
 from generalized_path_finding.model.networkx_data import NetworkxData
-from generalized_path_finding.model.path import Path, shortest_path_from_node_list
+from generalized_path_finding.model.path import Path
 from generalized_path_finding.model.pathfinder import PathFinder
-
-WEIGHT_KEY = "weight"
+from generalized_path_finding.model.query_stats import QueryStats
 
 
 @public
 class AStar[V](PathFinder):
-    def __init__(self, data: NetworkxData[V]):
+    def __init__(self, data: NetworkxData[V], overlay: GraphOverlay[V] | None = None):
         """
         A PathFinder to find shortest paths using the A* algorithm implement by NetworkX in a graph and using a
         heuristic using anything as node label.
 
         NetworkX's implementation of A* is more efficient than its dijkstra algorithm. That's why AStar also accepts
         inputs without meaningful heuristic and then runs A* with a 0-heuristic, which is equivalent to, but faster
-        than Dijkstra. (see test_compare_to_dijkstra)
+        than Dijkstra. (see the Dijkstra algorithm of benchmarks/run_benchmarks.py)
+
+        Edges without the weight attribute of data are ignored, unlike in NetworkX's own algorithms, which give
+        them a weight of 1.
 
         :param data: the graph and heuristic in the NetworkX intermediate format.
+        :param overlay: blocked nodes and edges and weight multipliers to apply to the graph. It may be changed while
+        the AStar is in use, instead of changing the graph.
         """
 
         self.data = data
+        self.overlay = overlay
+
+    @property
+    def data_version(self) -> int:
+        return 0 if self.overlay is None else self.overlay.version
 
     def find_shortest_path(self, source: V, destination: V) -> Path[V] | None:
+        stats = None if self.observer is None else QueryStats(type(self).__name__)
         if source not in self.data.graph:
             raise ValueError(f"source={source} not in graph")
         if destination not in self.data.graph:
             raise ValueError(f"destination={destination} not in graph")
+        if stats is not None:
+            stats.lap("validation")
+
+        if self.overlay is None or self.overlay.is_empty:
+            path = self._search(source, destination, self.data.weight_function(), self.data.path_from_node_list,
+                                stats)
+        else:
+            # the overlay may change during the search, so search a snapshot to not mix two versions in one path
+            path = self._find_shortest_path_with_overlay(source, destination, self.overlay.snapshot(), stats)
+
+        if stats is not None:
+            self.observer.on_query(source, destination, path, stats)
+        return path
+
+    def _find_shortest_path_with_overlay(self, source: V, destination: V, overlay: GraphOverlay[V],
+                                         stats: QueryStats | None) -> Path[V] | None:
+        if overlay.is_node_blocked(source) or overlay.is_node_blocked(destination):
+            return None
+        return self._search(source, destination, overlay.weight_function(self.data),
+                            lambda nodes: overlay.path_from_node_list(nodes, self.data), stats)
 
+    def _search(self, source: V, destination: V, weight: Callable, to_path: Callable[[list[V]], Path[V]],
+                stats: QueryStats | None) -> Path[V] | None:
+        heuristic = self.data.heuristic
+        if stats is not None:
+            weight, heuristic = _counting(weight, heuristic, stats)
         try:
-            nodes = nx.astar_path(self.data.graph, source, destination, heuristic=self.data.heuristic,
-                                  weight=WEIGHT_KEY)
+            nodes = nx.astar_path(self.data.graph, source, destination, heuristic=heuristic, weight=weight)
         except nx.NetworkXNoPath:
-            return None
-        return shortest_path_from_node_list(nodes, self.data.graph, WEIGHT_KEY)
+            nodes = None
+        if stats is not None:
+            stats.lap("search")
+        path = None if nodes is None else to_path(nodes)
+        if stats is not None:
+            stats.lap("conversion")
+        return path
+
+
+def _counting(weight: Callable, heuristic: Callable, stats: QueryStats) -> tuple[Callable, Callable]:
+    """Wrap the weight function and heuristic of a search to count its work in stats."""
+    stats.nodes_settled = stats.nodes_settled or 0
+    stats.edges_relaxed = stats.edges_relaxed or 0
+    stats.heuristic_calls = stats.heuristic_calls or 0
+    scanned = [None]
+
+    def counting_weight(u, v, attributes):
+        # NetworkX scans all edges of a settled node in a row and settles each node at most once, so this counts the
+        # settled nodes with outgoing edges
+        if scanned[0] != u:
+            scanned[0] = u
+            stats.nodes_settled += 1
+        stats.edges_relaxed += 1
+        return weight(u, v, attributes)
+
+    def counting_heuristic(u, v):
+        stats.heuristic_calls += 1
+        return heuristic(u, v)
+
+    return counting_weight, counting_heuristic
@@ -0,0 +1,197 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from typing import Any
+
+from auto_all import public
+
+from generalized_path_finding.model.path import Path
+from generalized_path_finding.model.pathfinder import PathFinder
+
+
+@public
+@dataclass(frozen=True)
+class PathCacheOptions:
+    """Options of a CachingPathFinder."""
+
+    max_size: int = 1024
+    """The maximum number of cached paths. If exceeded, the least recently used path is evicted."""
+    ttl: float | None = None
+    """The number of seconds after which a cached path expires, or None if paths only expire by invalidation."""
+    reuse_subpaths: bool = False
+    """
+    Whether to answer queries from prefixes of cached paths, as each prefix of a shortest path is a shortest path
+    itself. Requires an edge cost function.
+    """
+
+
+@public
+@dataclass(frozen=True)
+class PathCacheStats:
+    hits: int
+    """The number of queries answered from the cache, including subpath hits."""
+    subpath_hits: int
+    """The number of queries answered from a prefix of a cached path."""
+    misses: int
+    """The number of queries passed on to the wrapped PathFinder."""
+    evictions: int
+    """The number of paths evicted because max_size was exceeded."""
+    size: int
+    """The number of currently cached paths."""
+
+
+@dataclass
+class _Entry[V]:
+    path: Path[V, Any] | None
+    created: float
+    # the (source, node) keys of the prefixes registered for reuse_subpaths
+    prefix_keys: list[tuple[V, V]]
+
+
+def _copy[V](path: Path[V, Any] | None) -> Path[V, Any] | None:
+    return None if path is None else Path(list(path.nodes), list(path.edges), path.cost)
+
+
+@public
+class CachingPathFinder[V](PathFinder[V]):
+    def __init__(
+            self,
+            path_finder: PathFinder[V],
+            options: PathCacheOptions = PathCacheOptions(),
+            edge_cost: Callable[[V, V, Any], float] | None = None,
+    ):
+        """
+        A PathFinder wrapping another one and caching the paths it found, keyed by (source, destination), to answer
+        repeated queries without searching again. All methods may be called from several threads.
+
+        The cache is cleared automatically whenever the data_version of the wrapped PathFinder changes, e.g. after
+        CchRoutingKit.update_weights, OsmRoutingKit.update_data or changes to the GraphOverlay of an AStar. If the
+        graph the wrapped PathFinder uses is changed in place instead, call invalidate.
+
+        Cached paths are copied when returned, so callers may modify them.
+
+        :param path_finder: the PathFinder to find the paths missing in the cache.
+        :param options: the size, expiry and subpath reuse of the cache.
+        :param edge_cost: a function returning the cost of the edge of a path from u to v, which is needed to compute
+        the cost of prefixes if options.reuse_subpaths is set. The edge is an element of Path.edges.
+        """
+        if options.max_size < 1:
+            raise ValueError(f"max_size={options.max_size} must be at least 1")
+        if options.reuse_subpaths and edge_cost is None:
+            raise ValueError("reuse_subpaths requires edge_cost to compute the cost of prefixes")
+
+        self.path_finder = path_finder
+        self.options = options
+        self.edge_cost = edge_cost
+
+        self._entries: OrderedDict[tuple[V, V], _Entry[V]] = OrderedDict()
+        # (source, node) -> (source, destination) of a cached path from source to destination through node
+        self._prefixes: dict[tuple[V, V], tuple[V, V]] = {}
+        self._data_version = path_finder.data_version
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._subpath_hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def data_version(self) -> Hashable:
+        return self.path_finder.data_version
+
+    @property
+    def stats(self) -> PathCacheStats:
+        with self._lock:
+            return PathCacheStats(self._hits, self._subpath_hits, self._misses, self._evictions, len(self._entries))
+
+    def invalidate(self):
+        """Remove all cached paths, e.g. after the graph used by the wrapped PathFinder was changed in place."""
+        with self._lock:
+            self._entries.clear()
+            self._prefixes.clear()
+
+    def find_shortest_path(self, source: V, destination: V) -> Path[V, Any] | None:
+        key = (source, destination)
+        with self._lock:
+            self._check_data_version()
+            found, path = self._lookup(key)
+        if found:
+            return _copy(path)
+
+        data_version = self.path_finder.data_version
+        path = self.path_finder.find_shortest_path(source, destination)
+        with self._lock:
+            self._check_data_version()
+            # the path may be outdated if the data changed during the search, so don't cache it
+            if data_version == self._data_version:
+                self._store(key, _copy(path))
+        return path
+
+    def _check_data_version(self):
+        data_version = self.path_finder.data_version
+        if data_version != self._data_version:
+            self._entries.clear()
+            self._prefixes.clear()
+            self._data_version = data_version
+
+    def _lookup(self, key: tuple[V, V]) -> tuple[bool, Path[V, Any] | None]:
+        entry = self._entries.get(key)
+        if entry is not None and self._is_expired(entry):
+            self._remove(key)
+            entry = None
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return True, entry.path
+
+        if self.options.reuse_subpaths:
+            path = self._lookup_prefix(key)
+            if path is not None:
+                self._hits += 1
+                self._subpath_hits += 1
+                return True, path
+
+        self._misses += 1
+        return False, None
+
+    def _lookup_prefix(self, key: tuple[V, V]) -> Path[V, Any] | None:
+        cached_key = self._prefixes.get(key)
+        if cached_key is None:
+            return None
+        entry = self._entries[cached_key]
+        if self._is_expired(entry):
+            self._remove(cached_key)
+            return None
+        self._entries.move_to_end(cached_key)
+
+        path = entry.path
+        length = path.nodes.index(key[1])
+        edges = path.edges[:length]
+        cost = sum(self.edge_cost(u, v, edge) for u, v, edge in zip(path.nodes, path.nodes[1:], edges))
+        return Path(path.nodes[:length + 1], edges, cost)
+
+    def _store(self, key: tuple[V, V], path: Path[V, Any] | None):
+        if key in self._entries:
+            self._remove(key)
+        prefix_keys = []
+        if self.options.reuse_subpaths and path is not None:
+            source = key[0]
+            for node in path.nodes[1:-1]:
+                prefix_key = (source, node)
+                self._prefixes[prefix_key] = key
+                prefix_keys.append(prefix_key)
+        self._entries[key] = _Entry(path, time.monotonic(), prefix_keys)
+
+        while len(self._entries) > self.options.max_size:
+            self._remove(next(iter(self._entries)))
+            self._evictions += 1
+
+    def _remove(self, key: tuple[V, V]):
+        entry = self._entries.pop(key)
+        for prefix_key in entry.prefix_keys:
+            if self._prefixes.get(prefix_key) == key:
+                del self._prefixes[prefix_key]
+
+    def _is_expired(self, entry: _Entry[V]) -> bool:
+        return self.options.ttl is not None and time.monotonic() - entry.created > self.options.ttl
@@ -0,0 +1,155 @@
+import math
+import pathlib
+import threading
+from typing import Any, Callable
+
+from auto_all import public
+from pyroutingkit import CchRouter
+
+from generalized_path_finding.algorithms.routing_kit import INF_WEIGHT
+from generalized_path_finding.model import PathFinder, Path, QueryStats
+from generalized_path_finding.model.contraction_order import contraction_order, topology_hash
+from generalized_path_finding.model.networkx_data import NetworkxData, DEFAULT_SCALING_FACTOR, cache_file_path
+
+
+@public
+class CchRoutingKit[V](PathFinder[V]):
+    def __init__(
+            self,
+            nx_data: NetworkxData[V],
+            scaling_factor: int = DEFAULT_SCALING_FACTOR,
+            original_file: str | pathlib.Path | None = None,
+            cache_dir: str | pathlib.Path | None = None,
+            coordinates: Callable[[V], tuple[float, float]] | None = None,
+    ):
+        """
+        A PathFinder to find shortest paths using the RoutingKit CustomizableContractionHierarchy algorithm on the
+        NetworkX intermediate format.
+
+        Unlike NxRoutingKit, changed edge weights do not require building a new ContractionHierarchy, but are applied
+        with update_weights within milliseconds. Only the contraction order depends on the graph, and only on its
+        topology. It is cached in a .cch_order file.
+
+        Edges with infinite weight are treated as closed.
+
+        :param nx_data: the graph and heuristic (not used) in the NetworkX intermediate format.
+        :param scaling_factor: the precision of the edge weights in the NetworkX intermediate format. Defaults to 1e6.
+        :param original_file: the original file used to create the NetworkX intermediate format. Used to name cache files.
+        :param cache_dir: the directory to use for caching. Defaults to the operating systems temporary directory.
+        :param coordinates: a function returning the (x, y) position of a node. If given, it is used to compute a
+        contraction order with smaller separators, which speeds up customization and queries on large graphs.
+        """
+
+        self.nx_data = nx_data
+        self.scaling_factor = scaling_factor
+
+        self.mapping = {node: idx for idx, node in enumerate(nx_data.graph.nodes)}
+        self.inverse_mapping = list(self.mapping.keys())
+        # parallel edges are merged into one arc with the weight of the cheapest edge
+        self.arcs = sorted({(self.mapping[u], self.mapping[v]) for u, v, attributes in nx_data.graph.edges(data=True)
+                            if nx_data.edge_weight(attributes) is not None})
+        self._arc_index = {arc: idx for idx, arc in enumerate(self.arcs)}
+        self._weights, arc_keys = self._arc_weights_and_keys(nx_data)
+
+        tail = [u for u, _ in self.arcs]
+        head = [v for _, v in self.arcs]
+        order = self._load_order(tail, head, original_file, cache_dir, coordinates)
+        self.router = CchRouter(order, tail, head, self._weights)
+        # replaced as a whole, so a query never combines the edge keys of one weight update with the metric of another
+        self._metric_and_arc_keys = (self.router.getMetric(), arc_keys)
+        self._update_lock = threading.Lock()
+        self._data_version = 0
+
+    @property
+    def data_version(self) -> int:
+        return self._data_version
+
+    def update_weights(self, nx_data: NetworkxData[V] | None = None):
+        """
+        Apply changed edge weights, e.g. changed speed limits or congestion penalties. Queries running meanwhile keep
+        using the previous weights. Concurrent updates are applied one after another.
+
+        :param nx_data: the NetworkX intermediate format with the new weights. It must have the same nodes and
+        edges as the current one. Defaults to the current one, after its weight attributes were changed in place.
+        """
+        if nx_data is None:
+            nx_data = self.nx_data
+        elif set(nx_data.graph.nodes) != self.mapping.keys():
+            raise ValueError("The nodes of the graph changed. Create a new CchRoutingKit instead.")
+
+        with self._update_lock:
+            weights, arc_keys = self._arc_weights_and_keys(nx_data)
+            changed_arcs = [arc for arc, (old, new) in enumerate(zip(self._weights, weights)) if old != new]
+            metric = self._metric_and_arc_keys[0]
+            if changed_arcs:
+                metric = self.router.updateWeights(changed_arcs, [weights[arc] for arc in changed_arcs])
+            self.nx_data = nx_data
+            self._weights = weights
+            self._metric_and_arc_keys = (metric, arc_keys)
+            self._data_version += 1
+
+    def find_shortest_path(self, source: V, destination: V) -> Path[V, Any] | None:
+        stats = None if self.observer is None else QueryStats(type(self).__name__)
+        if source not in self.mapping:
+            raise ValueError(f"Invalid node index: source={source} not in {self.mapping.keys()}")
+        if destination not in self.mapping:
+            raise ValueError(f"Invalid node index: destination={destination} not in {self.mapping.keys()}")
+        if stats is not None:
+            stats.lap("validation")
+
+        metric, arc_keys = self._metric_and_arc_keys
+        arcs, cost = self.router.query(self.mapping[source], self.mapping[destination], metric)
+        if stats is not None:
+            stats.lap("search")
+            stats.nodes_settled = self.router.searchSpaceSize(self.mapping[source], self.mapping[destination])
+
+        path = None  # no path between source and destination
+        if cost != INF_WEIGHT:
+            path = Path(
+                nodes=[source] + [self.inverse_mapping[self.arcs[arc][1]] for arc in arcs],
+                edges=[arc_keys[arc] for arc in arcs],
+                cost=cost / self.scaling_factor,
+            )
+
+        if stats is not None:
+            stats.lap("conversion")
+            self.observer.on_query(source, destination, path, stats)
+        return path
+
+    def _arc_weights_and_keys(self, nx_data: NetworkxData[V]) -> tuple[list[int], list[Any]]:
+        cheapest: dict[tuple[int, int], tuple[float, Any]] = {}
+        for u, v, key, attributes in nx_data.graph.edges(keys=True, data=True):
+            weight = nx_data.edge_weight(attributes)
+            if weight is None:
+                continue
+            arc = (self.mapping[u], self.mapping[v])
+            if arc not in cheapest or weight < cheapest[arc][0]:
+                cheapest[arc] = (weight, key)
+        if cheapest.keys() != self._arc_index.keys():
+            raise ValueError("The edges of the graph changed. Create a new CchRoutingKit instead.")
+
+        weights = [self._routing_kit_weight(cheapest[arc][0]) for arc in self.arcs]
+        arc_keys = [cheapest[arc][1] for arc in self.arcs]
+        return weights, arc_keys
+
+    def _routing_kit_weight(self, weight: float) -> int:
+        if math.isinf(weight):
+            return INF_WEIGHT
+        return min(round(weight * self.scaling_factor), INF_WEIGHT)
+
+    def _load_order(
+            self,
+            tail: list[int],
+            head: list[int],
+            original_file: str | pathlib.Path | None,
+            cache_dir: str | pathlib.Path | None,
+            coordinates: Callable[[V], tuple[float, float]] | None,
+    ) -> list[int]:
+        # the order only depends on the topology, and on whether it was computed using coordinates
+        order_hash = topology_hash(len(self.mapping), tail, head, coordinates is not None)
+        order_file = cache_file_path(original_file, cache_dir, f"{order_hash}.cch_order")
+        if coordinates is not None:
+            positions = [coordinates(node) for node in self.inverse_mapping]
+            return contraction_order(len(self.mapping), tail, head, order_file,
+                                     ([x for x, _ in positions], [y for _, y in positions]))
+        return contraction_order(len(self.mapping), tail, head, order_file)
@@ -0,0 +1,60 @@
+import threading
+from typing import Callable
+
+from auto_all import public
+
+from generalized_path_finding.algorithms.a_star import AStar
+from generalized_path_finding.formats.lif.lif_data_provider import LifDataProvider, LifVehicleTypeDataProvider
+from generalized_path_finding.formats.lif.load_state import LoadState
+from generalized_path_finding.model.networkx_data import NetworkxData
+from generalized_path_finding.model.path import Path
+from generalized_path_finding.model.pathfinder import PathFinder
+
+
+@public
+class LoadAwarePathFinder(PathFinder[str]):
+    def __init__(
+            self,
+            data_provider: LifDataProvider | LifVehicleTypeDataProvider,
+            path_finder_class: Callable[[NetworkxData[str]], PathFinder[str]] = AStar,
+            load_state: LoadState = LoadState(),
+    ):
+        """
+        A PathFinder for LIF layouts, which only uses the edges a vehicle may use in its LoadState, according to the
+        LoadRestrictions of the edges.
+
+        There is one PathFinder per LoadState, created on first use, but all of them share the graph of the
+        data_provider and check the precomputed load permissions bitset of each edge. Backends using a
+        ContractionHierarchy cache one per LoadState.
+
+        :param data_provider: the LIF layout, seen by one vehicle type.
+        :param path_finder_class: creates the PathFinder of a LoadState, e.g. AStar, NxRoutingKit or CchRoutingKit.
+        :param load_state: the LoadState used by find_shortest_path if none is given.
+        """
+        self.data_provider = data_provider
+        self.path_finder_class = path_finder_class
+        self.load_state = load_state
+
+        self._path_finders: dict[int, PathFinder[str]] = {}
+        self._lock = threading.Lock()
+
+    def path_finder(self, load_state: LoadState) -> PathFinder[str]:
+        """The PathFinder used for the given LoadState. LoadStates using the same edges share one."""
+        mask = self.data_provider.get_load_permissions().mask(load_state)
+        with self._lock:
+            if mask not in self._path_finders:
+                self._path_finders[mask] = self.path_finder_class(self.data_provider.get_networkx_data(load_state))
+            return self._path_finders[mask]
+
+    def find_shortest_path(
+            self,
+            source: str,
+            destination: str,
+            load_state: LoadState | None = None,
+    ) -> Path[str] | None:
+        """
+        :param load_state: the LoadState of the vehicle. Defaults to the load_state given on creation.
+        """
+        if load_state is None:
+            load_state = self.load_state
+        return self.path_finder(load_state).find_shortest_path(source, destination)
@@ -0,0 +1,173 @@
+import heapq
+import math
+from collections import defaultdict
+from collections.abc import Hashable, Iterable
+
+from auto_all import public
+
+from generalized_path_finding.model.networkx_data import NetworkxData
+from generalized_path_finding.model.path import Path
+from generalized_path_finding.model.pathfinder import PathFinder
+from generalized_path_finding.model.query_stats import QueryStats
+
+
+def _dijkstra[V](
+        adjacency: dict[V, list[tuple[V, float]]],
+        source: V,
+        targets: Iterable[V],
+        bound: float = math.inf,
+) -> tuple[dict[V, float], dict[V, V]]:
+    """
+    Dijkstra's algorithm, stopping once all targets are settled or the distance exceeds bound.
+
+    :return: the distances of the settled nodes and the predecessor of each reached node but the source.
+    """
+    remaining = set(targets)
+    dist = {}
+    tentative = {source: 0.0}
+    pred = {}
+    heap = [(0.0, 0, source)]
+    counter = 1  # breaks ties, as nodes may not be comparable
+    while heap and remaining:
+        d, _, u = heapq.heappop(heap)
+        if u in dist:
+            continue
+        if d > bound:
+            break
+        dist[u] = d
+        remaining.discard(u)
+        for v, w in adjacency.get(u, ()):
+            if v not in dist and d + w < tentative.get(v, math.inf):
+                tentative[v] = d + w
+                pred[v] = u
+                heapq.heappush(heap, (d + w, counter, v))
+                counter += 1
+    return dist, pred
+
+
+def _unwind[V](pred: dict[V, V], start: V, end: V) -> list[V]:
+    """:return: the nodes from end to start, following the predecessors from end."""
+    nodes = [end]
+    while nodes[-1] != start:
+        nodes.append(pred[nodes[-1]])
+    return nodes
+
+
+@public
+class MultiFloorPathFinder[V](PathFinder[V]):
+    def __init__(self, data: NetworkxData[V], floors: dict[V, Hashable]):
+        """
+        A PathFinder for networks partitioned into floors, which are only connected by a few edges, e.g. the elevators
+        of an MFN file:
+
+        data_provider = MfnDataProvider("layout.xlsx", fleet="Roboter")
+        path_finder = MultiFloorPathFinder(data_provider.get_networkx_data(), data_provider.get_floors())
+
+        The exits (tails of edges to other floors) and entries (heads of edges from other floors) of all floors form
+        a small overlay graph. It has the edges between floors and, for each floor, a precomputed shortcut from each
+        entry to each exit the entry reaches on the floor. A query searches the floor of the source up to its exits,
+        the floor of the destination backwards up to its entries, and the overlay graph in between, so the other
+        floors are never searched. Shortcuts are unpacked to the nodes they were computed from.
+
+        :param data: the graph to find paths in.
+        :param floors: the floor of each node. Nodes without a floor form a floor of their own.
+        """
+        self.data = data
+        self.floors = floors
+
+        self._local: dict[V, list[tuple[V, float]]] = defaultdict(list)
+        """The edges of each node to nodes on the same floor."""
+        self._local_reversed: dict[V, list[tuple[V, float]]] = defaultdict(list)
+        """The reversed edges of each node to nodes on the same floor."""
+        self._exits: dict[Hashable, set[V]] = defaultdict(set)
+        self._entries: dict[Hashable, set[V]] = defaultdict(set)
+        self._overlay: dict[V, list[tuple[V, float, list[V]]]] = defaultdict(list)
+        """The overlay edges of each entry and exit, with the nodes they pass after their tail."""
+
+        weights: dict[tuple[V, V], float] = {}
+        for u, v, attributes in data.graph.edges(data=True):
+            w = data.edge_weight(attributes)
+            if w is not None and w < weights.get((u, v), math.inf):
+                weights[u, v] = w
+        for (u, v), w in weights.items():
+            if floors.get(u) == floors.get(v):
+                self._local[u].append((v, w))
+                self._local_reversed[v].append((u, w))
+            else:
+                self._exits[floors.get(u)].add(u)
+                self._entries[floors.get(v)].add(v)
+                self._overlay[u].append((v, w, [v]))
+
+        for floor, entries in self._entries.items():
+            exits = self._exits[floor]
+            for entry in entries:
+                dist, pred = _dijkstra(self._local, entry, exits)
+                for exit_ in exits & dist.keys() - {entry}:
+                    self._overlay[entry].append((exit_, dist[exit_], _unwind(pred, entry, exit_)[-2::-1]))
+
+    def find_shortest_path(self, source: V, destination: V) -> Path[V] | None:
+        stats = None if self.observer is None else QueryStats(type(self).__name__)
+        if source not in self.data.graph:
+            raise ValueError(f"source={source} not in graph")
+        if destination not in self.data.graph:
+            raise ValueError(f"destination={destination} not in graph")
+        if stats is not None:
+            stats.lap("validation")
+
+        source_floor, destination_floor = self.floors.get(source), self.floors.get(destination)
+        same_floor = source_floor == destination_floor
+        exits = self._exits.get(source_floor, set())
+        entries = self._entries.get(destination_floor, set())
+
+        # local search on the floor of the source
+        forward, forward_pred = _dijkstra(self._local, source, exits | {destination} if same_floor else exits)
+        best = forward.get(destination, math.inf)
+        # local search backwards on the floor of the destination, bounded by the path on the same floor if any
+        backward, backward_pred = _dijkstra(self._local_reversed, destination, entries, best)
+        entries = {entry for entry in entries if entry in backward}
+
+        # search of the overlay graph between the exits of the source floor and entries of the destination floor
+        best_entry = None
+        dist = {}
+        tentative = {exit_: forward[exit_] for exit_ in exits if exit_ in forward}
+        pred: dict[V, tuple[V, list[V]]] = {}
+        heap = [(d, idx, exit_) for idx, (exit_, d) in enumerate(tentative.items())]
+        heapq.heapify(heap)
+        counter = len(heap)
+        while heap:
+            d, _, u = heapq.heappop(heap)
+            if d >= best:
+                break
+            if u in dist:
+                continue
+            dist[u] = d
+            if u in entries and d + backward[u] < best:
+                best, best_entry = d + backward[u], u
+            for v, w, nodes in self._overlay.get(u, ()):
+                if v not in dist and d + w < tentative.get(v, math.inf):
+                    tentative[v] = d + w
+                    pred[v] = (u, nodes)
+                    heapq.heappush(heap, (d + w, counter, v))
+                    counter += 1
+
+        if stats is not None:
+            stats.lap("search")
+            stats.nodes_settled = len(forward) + len(backward) + len(dist)
+
+        path = None
+        if best_entry is None and best < math.inf:
+            path = self.data.path_from_node_list(_unwind(forward_pred, source, destination)[::-1])
+        elif best_entry is not None:
+            # unpack the overlay path from its end, then prepend the path on the floor of the source
+            segments = [_unwind(backward_pred, destination, best_entry)[1:]]
+            node = best_entry
+            while node in pred:
+                node, nodes = pred[node]
+                segments.append(nodes)
+            segments.append(_unwind(forward_pred, source, node)[::-1])
+            path = self.data.path_from_node_list([node for segment in reversed(segments) for node in segment])
+
+        if stats is not None:
+            stats.lap("unpack")
+            self.observer.on_query(source, destination, path, stats)
+        return path
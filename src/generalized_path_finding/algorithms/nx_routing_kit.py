@@ -3,7 +3,7 @@ import pathlib
 from auto_all import public
 
 from generalized_path_finding.algorithms import RoutingKit
-from generalized_path_finding.model import PathFinder, Path
+from generalized_path_finding.model import PathFinder, Path, QueryStats
 from generalized_path_finding.model.networkx_data import NetworkxData, DEFAULT_SCALING_FACTOR
 
 
@@ -37,19 +37,61 @@ class NxRoutingKit[V](PathFinder[V]):
         self.routing_kit = RoutingKit(self.ch_data)
 
     def find_shortest_path(self, source: V, destination: V) -> Path[int, tuple[int, int, int]] | None:
-        if source not in self.mapping:
-            raise ValueError(f"Invalid node index: source={source} not in {self.mapping.keys()}")
-        if destination not in self.mapping:
-            raise ValueError(f"Invalid node index: destination={destination} not in {self.mapping.keys()}")
+        stats = None if self.observer is None else QueryStats(type(self).__name__)
+        source_index, destination_index = self._index(source, "source"), self._index(destination, "destination")
+        if stats is not None:
+            stats.lap("validation")
 
-        path = self.routing_kit.find_shortest_path(self.mapping[source], self.mapping[destination])
+        # the mapping only contains valid node indices, so RoutingKit does not need to validate them again
+        path = self._to_graph_path(self.routing_kit._query(source_index, destination_index, stats))
+
+        if stats is not None:
+            stats.lap("conversion")
+            self.observer.on_query(source, destination, path, stats)
+        return path
+
+    def find_shortest_paths(self, queries: list[tuple[V, V]]) -> list[Path[V] | None]:
+        """
+        Answers all queries in one call of RoutingKit, which releases the GIL. Each query is reported to the observer
+        with an equal share of the time of the batch.
+        """
+        stats = None if self.observer is None else QueryStats(type(self).__name__)
+        indices = [(self._index(source, "source"), self._index(destination, "destination"))
+                   for source, destination in queries]
+        if stats is not None:
+            stats.lap("validation")
+
+        paths, nodes_settled = self.routing_kit._query_batch([source for source, _ in indices],
+                                                             [destination for _, destination in indices], stats)
+        paths = [self._to_graph_path(path) for path in paths]
+
+        if stats is not None:
+            stats.lap("conversion")
+            for (source, destination), path, settled in zip(queries, paths, nodes_settled):
+                self.observer.on_query(source, destination, path, stats.per_query(len(queries), settled))
+        return paths
+
+    def distance_matrix(self, sources: list[V], destinations: list[V]) -> list[list[float | None]]:
+        """Searches once per source, in one call of RoutingKit which releases the GIL."""
+        distances = self.routing_kit.distance_matrix([self._index(source, "source") for source in sources],
+                                                     [self._index(destination, "destination")
+                                                      for destination in destinations])
+        return [[None if cost is None else cost / self.scaling_factor for cost in row] for row in distances]
+
+    def _index(self, node: V, name: str) -> int:
+        if node not in self.mapping:
+            raise ValueError(f"Invalid node index: {name}={node} not in {self.mapping.keys()}")
+        return self.mapping[node]
+
+    def _to_graph_path(self, path: Path[int, tuple[int, int, int]] | None) -> Path[V] | None:
         if path is None: return None
         path.cost /= self.scaling_factor
         path.nodes = [self.inverse_mapping[node] for node in path.nodes]
         path.edges = [
             next(key for key, attr
                  in self.nx_data.graph[self.inverse_mapping[s]][self.inverse_mapping[t]].items()
-                 if round(attr["weight"] * self.scaling_factor) == w)
+                 if (weight := self.nx_data.edge_weight(attr)) is not None
+                 and round(weight * self.scaling_factor) == w)
             for s, t, w in path.edges
         ]
         return path
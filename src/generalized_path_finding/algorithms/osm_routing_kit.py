@@ -6,6 +6,7 @@ from pyroutingkit import PointLatLon, RoutingService, Route, RouteArc
 from generalized_path_finding.model.osm_ch_data import OsmChData
 from generalized_path_finding.model.path import Path
 from generalized_path_finding.model.pathfinder import PathFinder
+from generalized_path_finding.model.query_stats import QueryStats
 from generalized_path_finding.nodes import GeoCoords
 
 """
@@ -79,11 +80,39 @@ class OsmRoutingKit(PathFinder[GeoCoords]):
 
         self.graph_file = data.graph_file
         self.ch_file = data.ch_file
+        self._routing_service = RoutingService(self.graph_file, self.ch_file, MATCHING_RADIUS)
+        self._data_version = 0
+
+    @property
+    def data_version(self) -> int:
+        return self._data_version
+
+    def update_data(self, data: OsmChData):
+        """
+        Switch to newly prepared data. Queries keep using the previous data until the new data is loaded, e.g.:
+
+        future = data_provider.prepare_osm_async()
+        future.add_done_callback(lambda f: path_finder.update_data(f.result()))
+
+        :param data: the new graph and heuristic in the OSM intermediate format.
+        """
+        routing_service = RoutingService(data.graph_file, data.ch_file, MATCHING_RADIUS)
+        self.graph_file = data.graph_file
+        self.ch_file = data.ch_file
+        self._routing_service = routing_service
+        self._data_version += 1
 
     def find_shortest_path(self, source: GeoCoords, destination: GeoCoords) -> Path[GeoCoords, OsmArc]:
-        routing_service = RoutingService(self.graph_file, self.ch_file, MATCHING_RADIUS)
-        route = routing_service.route(geo_location_to_point_lat_lon(source), geo_location_to_point_lat_lon(destination))
-        return self._route_to_path(route)
+        stats = None if self.observer is None else QueryStats(type(self).__name__)
+        route = self._routing_service.route(geo_location_to_point_lat_lon(source), geo_location_to_point_lat_lon(destination))
+        if stats is None:
+            return self._route_to_path(route)
+
+        stats.lap("search")
+        path = self._route_to_path(route)
+        stats.lap("conversion")
+        self.observer.on_query(source, destination, path, stats)
+        return path
 
     def _route_to_path(self, route: Route) -> Path[GeoCoords, OsmArc]:
         geometry_nodes = [p for arc in route.arcs for p in arc.geometry[:-1]] + route.arcs[-1].geometry[-1:]
@@ -0,0 +1,76 @@
+import heapq
+import itertools
+from collections.abc import Hashable
+
+from auto_all import public
+
+from generalized_path_finding.formats.lif.rotation import HeadingState, RotationModel
+from generalized_path_finding.model.path import Path
+from generalized_path_finding.model.pathfinder import PathFinder
+
+
+@public
+class RotationAwareAStar(PathFinder[str]):
+    def __init__(self, model: RotationModel):
+        """
+        A PathFinder for LIF layouts, which finds shortest paths of vehicles that have to rotate to follow the
+        orientations of the edges, using the A* algorithm on the states of a RotationModel.
+
+        The states are generated while searching, so only the part of the state graph explored by a query is built.
+        To use a ContractionHierarchy instead, see RotationAwareRoutingKit.
+
+        :param model: the states and transitions of the vehicle.
+        """
+        self.model = model
+
+    def find_shortest_path(
+            self,
+            source: str,
+            destination: str,
+            start_heading: float | None = None,
+    ) -> Path[str, Hashable] | None:
+        """
+        :param start_heading: the orientation of the vehicle at the source in radians, or None if it may start with any
+        heading.
+        """
+        graph = self.model.data.graph
+        if source not in graph:
+            raise ValueError(f"source={source} not in graph")
+        if destination not in graph:
+            raise ValueError(f"destination={destination} not in graph")
+
+        heuristic = self.model.data.heuristic
+        start = self.model.start_state(source, start_heading)
+        costs = {start: 0.0}
+        predecessors: dict[HeadingState, tuple[HeadingState, Hashable]] = {}
+        # the counter breaks ties, as states are not comparable
+        counter = itertools.count()
+        queue = [(heuristic(source, destination), next(counter), 0.0, start)]
+        while queue:
+            _, _, cost, state = heapq.heappop(queue)
+            if cost > costs[state]:
+                continue
+            if state.node_id == destination:
+                return _path(state, cost, predecessors)
+            for successor, key, edge_cost in self.model.successors(state):
+                successor_cost = cost + edge_cost
+                if successor_cost < costs.get(successor, float("infinity")):
+                    costs[successor] = successor_cost
+                    predecessors[successor] = (state, key)
+                    heapq.heappush(queue, (successor_cost + heuristic(successor.node_id, destination), next(counter),
+                                           successor_cost, successor))
+        return None
+
+
+def _path(
+        state: HeadingState,
+        cost: float,
+        predecessors: dict[HeadingState, tuple[HeadingState, Hashable]],
+) -> Path[str, Hashable]:
+    nodes = [state.node_id]
+    edges = []
+    while state in predecessors:
+        state, key = predecessors[state]
+        nodes.append(state.node_id)
+        edges.append(key)
+    return Path(nodes[::-1], edges[::-1], cost)
@@ -0,0 +1,49 @@
+import pathlib
+from collections.abc import Hashable
+
+from auto_all import public
+
+from generalized_path_finding.algorithms.nx_routing_kit import NxRoutingKit
+from generalized_path_finding.formats.lif.rotation import HeadingState, RotationModel
+from generalized_path_finding.model.networkx_data import DEFAULT_SCALING_FACTOR
+from generalized_path_finding.model.path import Path
+from generalized_path_finding.model.pathfinder import PathFinder
+
+
+@public
+class RotationAwareRoutingKit(PathFinder[str]):
+    def __init__(
+            self,
+            model: RotationModel,
+            scaling_factor: int = DEFAULT_SCALING_FACTOR,
+            original_file: str | pathlib.Path | None = None,
+            cache_dir: str | pathlib.Path | None = None,
+    ):
+        """
+        A PathFinder for LIF layouts, which finds shortest paths of vehicles that have to rotate to follow the
+        orientations of the edges, using the RoutingKit ContractionHierarchy algorithm on the fully expanded states of
+        a RotationModel, see RotationModel.expanded_data.
+
+        Building the ContractionHierarchy takes longer than for the layout itself, as there is one node per reachable
+        heading of each node, but queries are much faster than with RotationAwareAStar afterwards.
+
+        :param model: the states and transitions of the vehicle.
+        :param scaling_factor: the precision of the edge weights. Defaults to 1e6.
+        :param original_file: the LIF file of the layout. Used to name cache files.
+        :param cache_dir: the directory to use for caching. Defaults to the operating systems temporary directory.
+        """
+        self.model = model
+        self.routing_kit = NxRoutingKit(model.expanded_data(), scaling_factor, original_file, cache_dir)
+
+    def find_shortest_path(self, source: str, destination: str) -> Path[str, Hashable] | None:
+        if source not in self.model.data.graph:
+            raise ValueError(f"source={source} not in graph")
+        if destination not in self.model.data.graph:
+            raise ValueError(f"destination={destination} not in graph")
+
+        path = self.routing_kit.find_shortest_path(HeadingState(source, None),
+                                                   HeadingState(destination, None, terminal=True))
+        if path is None:
+            return None
+        # drop the edge to the terminal state
+        return Path([state.node_id for state in path.nodes[:-1]], path.edges[:-1], path.cost)
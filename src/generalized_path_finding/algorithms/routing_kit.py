@@ -1,11 +1,14 @@
 from typing import Tuple
 
 from auto_all import public
-from pyroutingkit import load_contraction_hierarchy, query_contraction_hierarchy_path
+from pyroutingkit import load_contraction_hierarchy, query_contraction_hierarchy_path, \
+    query_contraction_hierarchy_paths, query_contraction_hierarchy_paths_with_stats, \
+    query_contraction_hierarchy_distances
 
 from generalized_path_finding.model.ch_data import ChData
 from generalized_path_finding.model.path import Path
 from generalized_path_finding.model.pathfinder import PathFinder
+from generalized_path_finding.model.query_stats import QueryStats
 
 INF_WEIGHT = 2147483647
 """Used by RoutingKit to indicate that there is no path between two nodes."""
@@ -29,20 +32,91 @@ class RoutingKit(PathFinder[int]):
 
     # RoutingKit only uses integers as weights
     def find_shortest_path(self, source: int, target: int) -> Path[int, Tuple[int, int, int]] | None:
-        if not source in range(self.data.number_of_nodes):
-            raise ValueError(f"Invalid node index: source={source} not in [0, {self.data.number_of_nodes})")
-        if not target in range(self.data.number_of_nodes):
-            raise ValueError(f"Invalid node index: target={target} not in [0, {self.data.number_of_nodes})")
+        stats = None if self.observer is None else QueryStats(type(self).__name__)
+        self._validate(source, "source")
+        self._validate(target, "target")
+        if stats is not None:
+            stats.lap("validation")
 
-        arcs, cost = query_contraction_hierarchy_path(self.ch_ptr, source, target)
+        path = self._query(source, target, stats)
 
+        if stats is not None:
+            self.observer.on_query(source, target, path, stats)
+        return path
+
+    def find_shortest_paths(self, queries: list[tuple[int, int]]) -> list[Path[int, Tuple[int, int, int]] | None]:
+        """
+        Answers all queries in one call, which releases the GIL. Each query is reported to the observer with an equal
+        share of the time of the batch.
+        """
+        stats = None if self.observer is None else QueryStats(type(self).__name__)
+        for source, target in queries:
+            self._validate(source, "source")
+            self._validate(target, "target")
+        if stats is not None:
+            stats.lap("validation")
+
+        paths, nodes_settled = self._query_batch([source for source, _ in queries],
+                                                 [target for _, target in queries], stats)
+
+        if stats is not None:
+            for (source, target), path, settled in zip(queries, paths, nodes_settled):
+                self.observer.on_query(source, target, path, stats.per_query(len(queries), settled))
+        return paths
+
+    def distance_matrix(self, sources: list[int], destinations: list[int]) -> list[list[float | None]]:
+        """Searches once per source, in one call which releases the GIL."""
+        for source in sources:
+            self._validate(source, "source")
+        for destination in destinations:
+            self._validate(destination, "destination")
+        distances = query_contraction_hierarchy_distances(self.ch_ptr, sources, destinations)
+        return [[None if cost == INF_WEIGHT else cost for cost in row] for row in distances]
+
+    def _validate(self, node: int, name: str):
+        if not node in range(self.data.number_of_nodes):
+            raise ValueError(f"Invalid node index: {name}={node} not in [0, {self.data.number_of_nodes})")
+
+    def _query(self, source: int, target: int, stats: QueryStats | None) -> Path[int, Tuple[int, int, int]] | None:
+        """find_shortest_path without validation of the nodes, which must be in range."""
+        if stats is None:
+            return self._path(source, *query_contraction_hierarchy_path(self.ch_ptr, source, target))
+        [(arcs, cost, nodes_settled)], counting_seconds = \
+            query_contraction_hierarchy_paths_with_stats(self.ch_ptr, [source], [target])
+        stats.lap("search")
+        stats.move(counting_seconds, "search", "counting")
+        stats.nodes_settled = nodes_settled
+        path = self._path(source, arcs, cost)
+        stats.lap("unpack")
+        return path
+
+    def _query_batch(self, sources: list[int], targets: list[int], stats: QueryStats | None) \
+            -> tuple[list[Path[int, Tuple[int, int, int]] | None], list[int | None]]:
+        """
+        find_shortest_paths without validation of the nodes, which must be in range.
+
+        :return: the paths and the number of nodes settled by each query, which is only counted with stats.
+        """
+        if stats is None:
+            results = query_contraction_hierarchy_paths(self.ch_ptr, sources, targets)
+            return [self._path(source, arcs, cost) for source, (arcs, cost) in zip(sources, results)], \
+                [None] * len(results)
+        results, counting_seconds = query_contraction_hierarchy_paths_with_stats(self.ch_ptr, sources, targets)
+        stats.lap("search")
+        stats.move(counting_seconds, "search", "counting")
+        paths = [self._path(source, arcs, cost) for source, (arcs, cost, _) in zip(sources, results)]
+        stats.lap("unpack")
+        return paths, [settled for _, _, settled in results]
+
+    def _path(self, source: int, arcs: list[int], cost: int) -> Path[int, Tuple[int, int, int]] | None:
         if cost == INF_WEIGHT:
             return None  # no path between source and destination
+        if not arcs:
+            return Path([source], [], 0)  # source == destination
 
         # sanity check
         assert sum(self.data.edge_list[arc][2] for arc in arcs) == cost
 
         edges = [self.data.edge_list[arc] for arc in arcs]
         nodes = [self.data.edge_list[arc][0] for arc in arcs] + [self.data.edge_list[arcs[-1]][1]]
-
         return Path(nodes, edges, cost)
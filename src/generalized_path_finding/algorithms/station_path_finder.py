@@ -0,0 +1,33 @@
+from auto_all import public
+
+from generalized_path_finding.formats.lif.station_matrix import StationMatrix
+from generalized_path_finding.model.networkx_data import NetworkxData
+from generalized_path_finding.model.path import Path
+from generalized_path_finding.model.pathfinder import PathFinder
+
+
+@public
+class StationPathFinder(PathFinder[str]):
+    def __init__(self, station_matrix: StationMatrix, data: NetworkxData[str]):
+        """
+        A PathFinder to find shortest paths between LIF stations, identified by their station IDs, by looking them up in
+        a precomputed StationMatrix. The cost is found in O(1) and the path is reconstructed in O(path length).
+
+        Paths start and end at the cheapest pair of interaction nodes of the stations, e.g.:
+
+        data_provider = LifDataProvider("layout.json")
+        path_finder = StationPathFinder(data_provider.get_station_matrix(), data_provider.get_networkx_data())
+
+        :param station_matrix: the precomputed costs and shortest path trees between the stations.
+        :param data: the graph the StationMatrix was computed on, to choose the edges of paths.
+        """
+        self.station_matrix = station_matrix
+        self.data = data
+
+    def find_shortest_path(self, source: str, destination: str) -> Path[str] | None:
+        nodes = self.station_matrix.node_path(source, destination)
+        if nodes is None:
+            return None
+        path = self.data.path_from_node_list(nodes)
+        path.cost = self.station_matrix.cost(source, destination)
+        return path
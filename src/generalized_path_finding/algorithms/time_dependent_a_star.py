@@ -0,0 +1,114 @@
+import heapq
+import math
+from collections import defaultdict
+from collections.abc import Hashable
+
+from auto_all import public
+
+from generalized_path_finding.model.networkx_data import NetworkxData
+from generalized_path_finding.model.path import Path
+from generalized_path_finding.model.pathfinder import PathFinder
+from generalized_path_finding.model.query_stats import QueryStats
+from generalized_path_finding.model.time_profile import TimeProfile
+
+
+@public
+class TimeDependentAStar[V](PathFinder[V]):
+    def __init__(self, data: NetworkxData[V], wait_profiles: dict[Hashable, TimeProfile], departure: float = 0.0):
+        """
+        A PathFinder using the A* algorithm on a graph whose weights are travel times in seconds, where some edges
+        additionally take a wait time depending on when they are entered, e.g. the elevators of an MFN file:
+
+        data_provider = MfnDataProvider("layout.xlsx", fleet="Roboter", time_cost=True, fleet_max_speed=1.2)
+        path_finder = TimeDependentAStar(data_provider.get_networkx_data(), {"Elevator1": TimeProfile(...)})
+        path = path_finder.find_shortest_path("1-E0", "1-E1", departure=8 * 3600)
+
+        The cost of a path is the time from departure to arrival. As the wait profiles are FIFO and non-negative, the
+        heuristic of the data stays a lower bound and the search is exact.
+
+        The edges and their profiles are collected once, so a query does not touch the graph's attribute dicts, and
+        parallel edges without a profile are reduced to the cheapest one.
+
+        :param data: the graph with travel times and a heuristic in seconds.
+        :param wait_profiles: the wait profile of edges, by edge key, e.g. the names of MFN connections. The wait is
+            added to the weight of the edge.
+        :param departure: the departure time used by find_shortest_path if none is given, in seconds since the start
+            of the period of the profiles.
+        """
+        self.data = data
+        self.wait_profiles = wait_profiles
+        self.departure = departure
+
+        self._adjacency: dict[V, list[tuple[V, Hashable, float, TimeProfile | None]]] = defaultdict(list)
+        cheapest: dict[tuple[V, V], tuple[Hashable, float]] = {}
+        for u, v, key, attributes in data.graph.edges(keys=True, data=True):
+            w = data.edge_weight(attributes)
+            if w is None:
+                continue
+            if key in wait_profiles:
+                self._adjacency[u].append((v, key, w, wait_profiles[key]))
+            elif w < cheapest.get((u, v), (None, math.inf))[1]:
+                cheapest[u, v] = (key, w)
+        for (u, v), (key, w) in cheapest.items():
+            self._adjacency[u].append((v, key, w, None))
+
+    def find_shortest_path(self, source: V, destination: V, departure: float | None = None) -> Path[V] | None:
+        """
+        :param departure: the departure time at the source, in seconds since the start of the period of the profiles.
+            Defaults to the departure given on creation.
+        """
+        stats = None if self.observer is None else QueryStats(type(self).__name__)
+        if source not in self.data.graph:
+            raise ValueError(f"source={source} not in graph")
+        if destination not in self.data.graph:
+            raise ValueError(f"destination={destination} not in graph")
+        if departure is None:
+            departure = self.departure
+        if stats is not None:
+            stats.lap("validation")
+
+        heuristic = self.data.heuristic
+        duration = {source: 0.0}
+        pred: dict[V, tuple[V, Hashable]] = {}
+        settled = set()
+        heap = [(heuristic(source, destination), 0, source)]
+        counter = 1  # breaks ties, as nodes may not be comparable
+        while heap:
+            _, _, u = heapq.heappop(heap)
+            if u in settled:
+                continue
+            if u == destination:
+                break
+            settled.add(u)
+            d = duration[u]
+            for v, key, w, profile in self._adjacency.get(u, ()):
+                if v in settled:
+                    continue
+                arrival = d + w if profile is None else d + w + profile(departure + d)
+                if arrival < duration.get(v, math.inf):
+                    duration[v] = arrival
+                    pred[v] = (u, key)
+                    heapq.heappush(heap, (arrival + heuristic(v, destination), counter, v))
+                    counter += 1
+        else:
+            pred = None
+
+        path = None
+        if stats is not None:
+            stats.lap("search")
+        if pred is not None:
+            nodes, edges = [destination], []
+            while nodes[-1] != source:
+                u, key = pred[nodes[-1]]
+                nodes.append(u)
+                edges.append(key)
+            path = Path(nodes[::-1], edges[::-1], duration[destination])
+
+        if stats is not None:
+            stats.lap("unpack")
+            # counted afterwards, so queries without observer do not pay for it
+            stats.nodes_settled = len(settled)
+            stats.edges_relaxed = sum(len(self._adjacency.get(u, ())) for u in settled)
+            stats.heuristic_calls = counter
+            self.observer.on_query(source, destination, path, stats)
+        return path
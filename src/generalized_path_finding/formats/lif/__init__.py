@@ -21,6 +21,10 @@ from .trajectory import *
 
 start_all()
 from .lif import LIF
-from .lif_data_provider import LifDataProvider
+from .lif_reader import LifReadOptions, read_lif
+from .lif_data_provider import LifDataProvider, LifFleetDataProvider, LifVehicleTypeDataProvider
+from .station_matrix import StationMatrix
+from .load_state import LoadState, LoadPermissions
+from .rotation import HeadingState, RotationModel
 
 end_all()
@@ -1,6 +1,9 @@
 import re
 from abc import ABC
+from collections.abc import Callable
+from dataclasses import dataclass
 from enum import Enum
+from functools import cache
 from types import UnionType
 from typing import Type
 from typing import TypeVar, get_type_hints
@@ -22,10 +25,12 @@ CAMEL_CASE_WORD_SPLIT = re.compile(
 )
 
 
+@cache
 def _camel_to_snake(camel_string: str) -> str:
     return re.sub(CAMEL_CASE_WORD_SPLIT, '_', camel_string).lower()
 
 
+@cache
 def _snake_to_camel(snake_str: str) -> str:
     if snake_str.startswith('_'): raise ValueError('snake_str must not start with "_"')
     uppercase_camel_string = "".join(x.capitalize() for x in snake_str.lower().split("_"))
@@ -52,6 +57,62 @@ def non_optional_type(tp):
     return tp
 
 
+@dataclass(frozen=True)
+class _Field:
+    name: str
+    optional: bool
+    # converts the value of the camel dict to the value of the attribute, or None if it is used as is
+    deserialize: Callable | None
+
+
+def _deserializer(typ) -> Callable | None:
+    if get_origin(typ) is list and issubclass(list_typ := get_args(typ)[0], CamelSerial):
+        return lambda items: [list_typ.from_camel_dict(item) for item in items]
+    elif isinstance(typ, type) and issubclass(typ, Enum):
+        return lambda name: typ[name]
+    elif isinstance(typ, type) and issubclass(typ, CamelSerial):
+        return typ.from_camel_dict
+    elif typ is float:  # accept int as float
+        return float
+    elif get_origin(typ) is list and get_args(typ)[0] is float:
+        return lambda items: list(map(float, items))
+    return None
+
+
+@cache
+def _fields(cls: type) -> dict[str, _Field]:
+    """
+    The fields of a CamelSerial class by their camel case key, with their deserializers. Inspecting the type hints is
+    much slower than deserializing, so it is done once per class.
+    """
+    return {
+        _snake_to_camel(prop): _Field(prop, is_optional_type(typ), _deserializer(non_optional_type(typ)))
+        for prop, typ in get_type_hints(cls).items()
+    }
+
+
+@cache
+def _fields_by_name(cls: type) -> dict[str, _Field]:
+    return {field.name: field for field in _fields(cls).values()}
+
+
+@cache
+def _serialized_keys(cls: type) -> list[tuple[str, str]]:
+    """The snake case attributes of a CamelSerial class with their camel case keys."""
+    return [(prop, _snake_to_camel(prop)) for prop in cls.__annotations__]
+
+
+def _serialize_child(obj):
+    if isinstance(obj, CamelSerial):
+        return obj.to_camel_dict()
+    elif isinstance(obj, list):
+        return list(map(_serialize_child, obj))
+    elif isinstance(obj, Enum):
+        return obj.value
+    else:
+        return obj
+
+
 @public
 class CamelSerial(ABC):
     """
@@ -89,26 +150,22 @@ class CamelSerial(ABC):
         """
         if not cls._pre_deserialization_check(camel_dict):
             raise ValueError("Pre deserialization check failed")
-        snake_dict = {_camel_to_snake(k): v for k, v in camel_dict.items()}
-        for prop, typ in get_type_hints(cls).items():
-            if is_optional_type(typ):
-                if prop in snake_dict:
-                    typ = non_optional_type(typ)
-                else:
-                    continue  # no value for optional value given -> let the constructor handle it
-            elif not is_optional_type(typ) and prop not in snake_dict:
-                raise ValueError(f"mandatory field {prop} missing in {cls.__name__}")
-
-            if get_origin(typ) is list and issubclass(list_typ := get_args(typ)[0], CamelSerial):
-                snake_dict[prop] = [list_typ.from_camel_dict(item) for item in snake_dict[prop]]
-            elif isinstance(typ, type) and issubclass(typ, Enum):
-                snake_dict[prop] = typ[snake_dict[prop]]
-            elif isinstance(typ, type) and issubclass(typ, CamelSerial):
-                snake_dict[prop] = typ.from_camel_dict(snake_dict[prop])
-            elif typ is float:  # accept int as float
-                snake_dict[prop] = float(snake_dict[prop])
-            elif get_origin(typ) is list and get_args(typ)[0] is float:
-                snake_dict[prop] = list(map(float, snake_dict[prop]))
+        fields = _fields(cls)
+        fields_by_name = _fields_by_name(cls)
+        snake_dict = {}
+        for key, value in camel_dict.items():
+            field = fields.get(key)
+            if field is None:
+                # keys not spelled like the camel case of the attribute, e.g. with a differently cased acronym
+                field = fields_by_name.get(_camel_to_snake(key))
+            if field is None:  # unknown key, rejected by the constructor
+                snake_dict[_camel_to_snake(key)] = value
+            else:
+                snake_dict[field.name] = value if field.deserialize is None else field.deserialize(value)
+
+        for field in fields.values():
+            if not field.optional and field.name not in snake_dict:
+                raise ValueError(f"mandatory field {field.name} missing in {cls.__name__}")
 
         # noinspection PyArgumentList
         return cls(**snake_dict)
@@ -127,14 +184,4 @@ class CamelSerial(ABC):
         :return: Dictionary that holds all non-null attributes of the class using camel case keys.
         """
 
-        def serialize_child(obj):
-            if isinstance(obj, CamelSerial):
-                return obj.to_camel_dict()
-            elif isinstance(obj, list):
-                return list(map(serialize_child, obj))
-            elif isinstance(obj, Enum):
-                return obj.value
-            else:
-                return obj
-
-        return {_snake_to_camel(k): serialize_child(self.__dict__[k]) for k in self.__annotations__}
+        return {camel_key: _serialize_child(self.__dict__[prop]) for prop, camel_key in _serialized_keys(type(self))}
@@ -1,6 +1,7 @@
-import json
+import hashlib
 import math
 import warnings
+from dataclasses import replace
 from enum import Enum
 from pathlib import Path
 from typing import Callable
@@ -9,10 +10,17 @@ import networkx as nx
 from auto_all import public
 
 from generalized_path_finding.model.data_provider import NetworkxDataProvider
-from generalized_path_finding.model.networkx_data import NetworkxData
+from generalized_path_finding.model.networkx_data import NetworkxData, cache_file_path
+from generalized_path_finding.model.prepared_layout import PreparedLayout, prepared_layout_hash
+from generalized_path_finding.model.profiling import span
 from .edge import Edge
 from .lif import LIF
+from .lif_reader import LifReadOptions, read_lif
+from .load_state import LoadState, LoadPermissions, LOAD_PERMISSIONS_KEY
 from .node import NodePosition, Node
+from .station import Station
+from .station_matrix import StationMatrix
+from .trajectory import trajectory_lengths
 
 
 @public
@@ -65,7 +73,22 @@ def manhattan_distance(a: NodePosition, b: NodePosition) -> float:
     return abs(a.x - b.x) + abs(a.y - b.y)
 
 
-def _edge_cost(edge: Edge, vehicle_type_id, distance_type, nodes, time_cost, vehicle_max_speed):
+def _trajectory_lengths(edges: list[Edge], distance_type: DistanceType) -> dict[int, float]:
+    """
+    Measure the trajectories of all edges at once, which is much faster than one at a time.
+
+    :return: the length of each trajectory by its id, if the distance_type uses them.
+    """
+    if distance_type != DistanceType.TrajectoryOrEuclidean:
+        return {}
+    trajectories = [props.trajectory
+                    for edge in edges
+                    for props in edge.vehicle_type_edge_properties
+                    if props.trajectory is not None]
+    return {id(trajectory): length for trajectory, length in zip(trajectories, trajectory_lengths(trajectories))}
+
+
+def _edge_cost(edge: Edge, vehicle_type_id, distance_type, nodes, time_cost, vehicle_max_speed, lengths):
     edge_props = edge.get_properties_for_vehicle_type(vehicle_type_id)
     if edge_props is None \
             or nodes[edge.start_node_id].get_properties_for_vehicle_type(vehicle_type_id) is None \
@@ -85,7 +108,7 @@ def _edge_cost(edge: Edge, vehicle_type_id, distance_type, nodes, time_cost, veh
             )
         case DistanceType.TrajectoryOrEuclidean:
             if edge_props.trajectory is not None:
-                cost = edge_props.trajectory.approximate_length()
+                cost = lengths[id(edge_props.trajectory)]
             else:
                 cost = euclidean_distance(
                     nodes[edge.start_node_id].node_position,
@@ -102,34 +125,42 @@ def _edge_cost(edge: Edge, vehicle_type_id, distance_type, nodes, time_cost, veh
     return cost
 
 
+def _load_permissions(edge: Edge, vehicle_type_id: str, load_permissions: LoadPermissions) -> int:
+    return load_permissions.edge_permissions(edge.get_properties_for_vehicle_type(vehicle_type_id).load_restriction)
+
+
 def _lif_to_graph(
         lif: LIF,
         vehicle_type_id: str,
         distance_type: DistanceType,
         time_cost: bool = False,
         vehicle_max_speed: float = float("infinity"),
+        load_permissions: LoadPermissions = LoadPermissions([]),
 ) -> nx.MultiDiGraph:
     """
     Convert a LIF object to a NetworkX Graph.
+
+    Each edge gets a bitset of the LoadStates it may be used in, see LoadPermissions.
     """
 
     # nodes are created regardless of vehicle_type, but edges using filtered out nodes will not be added
-    nodes: dict[str, Node] = {}
-    for layout in lif.layouts:
-        for node in layout.nodes:
-            nodes[node.node_id] = node
+    nodes = _lif_nodes(lif)
 
     # It would be a bad idea to support stations as graph nodes, query source or target, because they might make
     # paths traversing stations seem shorter than they are.
     # Example: A--5--[B--1--C]--5--D    (A-D are nodes, numbers are edges weights, B and C form the station S together)
     # query(A, S) == 5 and query(S, D) == 5 makes us think that query(A, D) <= 10 whereas query(A, D) == 11 is the case
 
+    lif_edges = [edge for layout in lif.layouts for edge in layout.edges]
+    lengths = _trajectory_lengths(lif_edges, distance_type)
+
     edges = []
-    for layout in lif.layouts:
-        for edge in layout.edges:
-            cost = _edge_cost(edge, vehicle_type_id, distance_type, nodes, time_cost, vehicle_max_speed)
-            if cost is not None:
-                edges.append((edge.start_node_id, edge.end_node_id, edge.edge_id, {"lif_edge": edge, "weight": cost}))
+    for edge in lif_edges:
+        cost = _edge_cost(edge, vehicle_type_id, distance_type, nodes, time_cost, vehicle_max_speed, lengths)
+        if cost is not None:
+            permissions = _load_permissions(edge, vehicle_type_id, load_permissions)
+            edges.append((edge.start_node_id, edge.end_node_id, edge.edge_id,
+                          {"lif_edge": edge, "weight": cost, LOAD_PERMISSIONS_KEY: permissions}))
 
     if len(edges) == 0:
         warnings.warn(f"Generating empty graph because no edges are supporting vehicle type {vehicle_type_id}")
@@ -141,14 +172,98 @@ def _lif_to_graph(
     return graph
 
 
+def _lif_nodes(lif: LIF) -> dict[str, Node]:
+    return {node.node_id: node for layout in lif.layouts for node in layout.nodes}
+
+
+def _lif_to_fleet_graph(
+        lif: LIF,
+        vehicle_type_ids: list[str],
+        distance_type: DistanceType,
+        time_cost: bool = False,
+        vehicle_max_speed: float = float("infinity"),
+        load_permissions: LoadPermissions = LoadPermissions([]),
+) -> tuple[nx.MultiDiGraph, dict[str, str]]:
+    """
+    Convert a LIF object to one NetworkX Graph for several vehicle types.
+
+    Each edge has one weight attribute and one load permissions attribute per vehicle type that may use it. Vehicle
+    types that may use the same edges with the same weights and load permissions share them.
+
+    :return: the graph and the suffix of the attribute keys of each vehicle type.
+    """
+
+    nodes = _lif_nodes(lif)
+    lif_edges = [edge for layout in lif.layouts for edge in layout.edges]
+    lengths = _trajectory_lengths(lif_edges, distance_type)
+
+    key_suffixes: dict[str, str] = {}
+    # (weight, load permissions) of each edge -> key suffix of the vehicle types using them
+    columns: dict[tuple[tuple[float, int] | None, ...], str] = {}
+    for vehicle_type_id in vehicle_type_ids:
+        costs = [_edge_cost(edge, vehicle_type_id, distance_type, nodes, time_cost, vehicle_max_speed, lengths)
+                 for edge in lif_edges]
+        if all(cost is None for cost in costs):
+            warnings.warn(f"Generating empty graph because no edges are supporting vehicle type {vehicle_type_id}")
+        column = tuple((cost, _load_permissions(edge, vehicle_type_id, load_permissions)) if cost is not None else None
+                       for edge, cost in zip(lif_edges, costs))
+        key_suffixes[vehicle_type_id] = columns.setdefault(column, vehicle_type_id)
+
+    edges = []
+    for idx, edge in enumerate(lif_edges):
+        attributes = {"lif_edge": edge}
+        for column, key_suffix in columns.items():
+            if column[idx] is not None:
+                attributes[f"weight:{key_suffix}"], attributes[f"{LOAD_PERMISSIONS_KEY}:{key_suffix}"] = column[idx]
+        if len(attributes) > 1:
+            edges.append((edge.start_node_id, edge.end_node_id, edge.edge_id, attributes))
+
+    graph = nx.MultiDiGraph(edges)
+    for node_id, node in nodes.items():
+        graph.add_node(node_id, lif_node=node)
+
+    return graph, key_suffixes
+
+
+def _lif_heuristic(
+        positions: dict[str, tuple[float, float]],
+        distance_type: DistanceType,
+        time_cost: bool,
+        vehicle_max_speed: float,
+) -> Callable[[str, str], float]:
+    if distance_type == DistanceType.Euclidean or distance_type == DistanceType.TrajectoryOrEuclidean:
+        def heuristic(a: str, b: str) -> float:
+            (ax, ay), (bx, by) = positions[a], positions[b]
+            return math.hypot(ax - bx, ay - by) / (vehicle_max_speed if time_cost else 1.0)
+    else:  # if distance_type == DistanceType.Manhattan:
+        def heuristic(a: str, b: str) -> float:
+            (ax, ay), (bx, by) = positions[a], positions[b]
+            return (abs(ax - bx) + abs(ay - by)) / (vehicle_max_speed if time_cost else 1.0)
+
+    return heuristic
+
+
+def _lif_positions(lif: LIF) -> dict[str, tuple[float, float]]:
+    return {node_id: (node.node_position.x, node.node_position.y) for node_id, node in _lif_nodes(lif).items()}
+
+
+def _vehicle_type_ids(lif: LIF) -> set[str]:
+    return set(props.vehicle_type_id
+               for layout in lif.layouts
+               for edge in layout.edges
+               for props in edge.vehicle_type_edge_properties)
+
+
 @public
 class LifDataProvider(NetworkxDataProvider[str]):
     """
     Extracts data from a LIF (Layout Interchange Format) file.
 
     All layouts are converted. All nodes and edges are converted.
-    All node and edge properties are put into the graph.
-    This ignores stations, actions, orientation of nodes and restrictions on rotation on edges or on nodes.
+    All node and edge properties of the vehicle type are put into the graph, except for actions, which are not read
+    from the file, like trajectories if they are not used, see read_lif.
+    This ignores orientation of nodes and restrictions on rotation on edges or on nodes. Stations are only
+    used by get_station_matrix. Load restrictions are only used if a LoadState is given.
     """
 
     def __init__(
@@ -158,6 +273,9 @@ class LifDataProvider(NetworkxDataProvider[str]):
             vehicle_type_id: str = None,  # use only one if none is given (check if there is only one)
             time_cost: bool = False,
             vehicle_max_speed: float = float("infinity"),
+            trajectories: bool | None = None,
+            snapshot: bool = False,
+            cache_dir: str | Path | None = None,
     ):
         """
         A DataProvider fed by a LIF file on disk.
@@ -168,35 +286,131 @@ class LifDataProvider(NetworkxDataProvider[str]):
             can be omitted if all edges only name the same, single vehicle type ID.
         :param time_cost: whether to use time instead of distance as cost
         :param vehicle_max_speed: the maximum speed of the vehicle (only relevant if time_cost is ``True``)
+        :param trajectories: whether to read the trajectories of edges. Defaults to whether distance_type uses them.
+            Set to True if they are used otherwise, e.g. by a RotationModel.
+        :param snapshot: whether to cache the graph in a PreparedLayout, which is restored in a fraction of the time
+            needed to parse the LIF file, and is prepared again when the LIF file changes. The graph restored from it
+            has no lif_node and lif_edge attributes, so it cannot be used by a RotationModel.
+        :param cache_dir: the directory to cache the PreparedLayout in. Defaults to the directory of the LIF file.
         """
 
         self.path = path
+        self.snapshot = snapshot
+        self.cache_dir = cache_dir
 
         self.vehicle_type_id = vehicle_type_id
         self.distance_type = distance_type
         self.time_cost = time_cost
         self.vehicle_max_speed = vehicle_max_speed
+        self.trajectories = distance_type == DistanceType.TrajectoryOrEuclidean if trajectories is None else trajectories
 
         # not checking infinite speed limit here, because it's checked more granularly in _edge_cost
 
         # lazy properties
         self._lif = None
+        self._load_permissions = None
         self._graph = None
+        self._positions = None
         self._heuristic = None
+        self._stations = None
+        self._number_of_nodes = None
 
-    def get_networkx_data(self) -> NetworkxData[str]:
-        return NetworkxData(self._get_graph(), self._get_heuristic())
+    def get_networkx_data(self, load_state: LoadState | None = None) -> NetworkxData[str]:
+        """
+        :param load_state: if given, only the edges the vehicle may use in this LoadState are used. All NetworkxData
+        share the same graph, so switching between LoadStates is free.
+        """
+        data = NetworkxData(self._get_graph(), self._get_heuristic())
+        if load_state is None:
+            return data
+        return replace(data, permission_key=LOAD_PERMISSIONS_KEY,
+                       permission_mask=self.get_load_permissions().mask(load_state))
+
+    def get_load_permissions(self) -> LoadPermissions:
+        self._get_graph()
+        return self._load_permissions
+
+    def cache_key(self) -> tuple[str, str] | None:
+        return str(self.path), repr((type(self).__name__, self.vehicle_type_id, self.distance_type.value,
+                                     self.trajectories, self.time_cost, self.vehicle_max_speed))
+
+    def number_of_nodes(self) -> int:
+        """
+        The graph contains all nodes of the LIF file, so unless the graph is built or restored from a snapshot, only
+        the nodes are read to count them.
+        """
+        if self._graph is not None or self.snapshot:
+            return self._get_graph().number_of_nodes()
+        if self._number_of_nodes is None:
+            lif = read_lif(self.path, LifReadOptions(actions=False, edges=False, stations=False))
+            self._number_of_nodes = len(_lif_nodes(lif))
+        return self._number_of_nodes
+
+    def get_stations(self) -> list[Station]:
+        """The stations of all layouts."""
+        if self._stations is None:
+            # stations are not needed for the graph, so they are read separately
+            lif = read_lif(self.path, LifReadOptions(nodes=False, edges=False))
+            self._stations = [station for layout in lif.layouts for station in layout.stations or []]
+        return self._stations
+
+    def get_station_matrix(self, cache_dir: str | Path | None = None) -> StationMatrix:
+        """
+        The costs and shortest paths between all pairs of stations, for use with StationPathFinder.
+
+        The StationMatrix is computed once and cached in memory-mapped files, which are recomputed when the LIF file
+        changes.
+
+        :param cache_dir: the directory to cache the StationMatrix in. Defaults to the directory of the LIF file.
+        """
+        data = self.get_networkx_data()
+        # the graph depends on these parameters besides the LIF file
+        parameters = repr((self.vehicle_type_id, self.distance_type.value, self.time_cost, self.vehicle_max_speed))
+        parameters_hash = hashlib.sha256(parameters.encode()).hexdigest()[:8]
+        base_path = cache_file_path(self.path, cache_dir, f"{parameters_hash}.stations")
+        return StationMatrix.cached(base_path, self.path, data, self.get_stations())
 
     def _get_graph(self) -> nx.MultiDiGraph:
         if self._graph is not None: return self._graph
 
-        with open(self.path) as file:
-            self._lif = LIF.from_camel_dict(json.load(file))
+        if not self.snapshot:
+            self._build_graph()
+            return self._graph
+
+        # the graph depends on these parameters besides the LIF file
+        parameters_hash = prepared_layout_hash(type(self).__name__, self.vehicle_type_id, self.distance_type.value,
+                                               self.time_cost, self.vehicle_max_speed)
+        layout = PreparedLayout.cached(cache_file_path(self.path, self.cache_dir, f"{parameters_hash}.layout"),
+                                       self.path, self._prepare_layout)
+        self.vehicle_type_id = layout.metadata["vehicle_type_id"]
+        self._load_permissions = LoadPermissions(layout.metadata["load_set_names"])
+        self._positions = layout.positions()
+        self._graph = layout.to_graph()
+        return self._graph
+
+    def _build_graph(self):
+        # reads, deserializes and filters by vehicle type in one pass
+        with span("read LIF", path=str(self.path)):
+            self._lif = read_lif(self.path, LifReadOptions(
+                vehicle_type_ids=None if self.vehicle_type_id is None else frozenset([self.vehicle_type_id]),
+                trajectories=self.trajectories,
+                actions=False,
+                stations=False,
+            ))
 
         self._impute_vehicle_type_id()
-        self._graph = _lif_to_graph(self._lif, self.vehicle_type_id, self.distance_type, self.time_cost,
-                                    self.vehicle_max_speed)
-        return self._graph
+        self._load_permissions = LoadPermissions.of(self._lif)
+        self._positions = _lif_positions(self._lif)
+        with span("build graph"):
+            self._graph = _lif_to_graph(self._lif, self.vehicle_type_id, self.distance_type, self.time_cost,
+                                        self.vehicle_max_speed, self._load_permissions)
+
+    def _prepare_layout(self) -> PreparedLayout:
+        self._build_graph()
+        return PreparedLayout.of(self._graph, self._positions, ["weight"], [LOAD_PERMISSIONS_KEY], {
+            "vehicle_type_id": self.vehicle_type_id,
+            "load_set_names": self._load_permissions.load_set_names,
+        })
 
     def _impute_vehicle_type_id(self):
         """
@@ -207,10 +421,7 @@ class LifDataProvider(NetworkxDataProvider[str]):
         """
 
         if self.vehicle_type_id is None:
-            vehicle_type_ids = set(props.vehicle_type_id
-                                   for layout in self._lif.layouts
-                                   for edge in layout.edges
-                                   for props in edge.vehicle_type_edge_properties)
+            vehicle_type_ids = _vehicle_type_ids(self._lif)
             if len(vehicle_type_ids) == 1:
                 self.vehicle_type_id = vehicle_type_ids.pop()
             else:
@@ -220,24 +431,189 @@ class LifDataProvider(NetworkxDataProvider[str]):
     def _get_heuristic(self) -> Callable[[str, str], float]:
         if self._heuristic is not None: return self._heuristic
         self._get_graph()
+        self._heuristic = _lif_heuristic(self._positions, self.distance_type, self.time_cost, self.vehicle_max_speed)
+        return self._heuristic
 
-        if self.distance_type == DistanceType.Euclidean or self.distance_type == DistanceType.TrajectoryOrEuclidean:
-            def heuristic(a: str, b: str) -> float:
-                return euclidean_distance(
-                    self._graph.nodes[a]["lif_node"].node_position,
-                    self._graph.nodes[b]["lif_node"].node_position
-                ) / (self.vehicle_max_speed if self.time_cost else 1.0)
 
-            self._heuristic = heuristic
-        else:  # if self.distance_type == DistanceType.Manhattan:
-            def heuristic(a: str, b: str) -> float:
-                return manhattan_distance(
-                    self._graph.nodes[a]["lif_node"].node_position,
-                    self._graph.nodes[b]["lif_node"].node_position
-                ) / (self.vehicle_max_speed if self.time_cost else 1.0)
+@public
+class LifFleetDataProvider:
+    def __init__(
+            self,
+            path: str | Path,
+            distance_type: DistanceType = DistanceType.Euclidean,
+            vehicle_type_ids: list[str] | None = None,
+            time_cost: bool = False,
+            vehicle_max_speed: float = float("infinity"),
+            trajectories: bool | None = None,
+            snapshot: bool = False,
+            cache_dir: str | Path | None = None,
+    ):
+        """
+        Extracts data for several vehicle types from a LIF file, like one LifDataProvider per vehicle type, but parsing
+        the file and building the graph only once.
 
-            self._heuristic = heuristic
+        All vehicle types share one graph, in which each edge has a weight attribute and a load permissions attribute
+        per vehicle type that may use it, see NetworkxData.weight_key. The DataProviders of the vehicle types are views
+        of that graph. Vehicle types that may use the same edges with the same weights and load restrictions get the
+        same NetworkxData, and ContractionHierarchies built for one of them are cached for all of them.
 
-        # other cases are impossible, because get_graph will through before coming here
+        :param path: path to the LIF file
+        :param distance_type: the DistanceType to use as cost of arcs
+        :param vehicle_type_ids: the vehicle type IDs to extract the graph for. Defaults to all vehicle types named by
+            the edges.
+        :param time_cost: whether to use time instead of distance as cost
+        :param vehicle_max_speed: the maximum speed of the vehicles (only relevant if time_cost is ``True``)
+        :param trajectories: whether to read the trajectories of edges. Defaults to whether distance_type uses them.
+        :param snapshot: whether to cache the graph in a PreparedLayout, see LifDataProvider.
+        :param cache_dir: the directory to cache the PreparedLayout in. Defaults to the directory of the LIF file.
+        """
 
+        self.path = path
+        self.snapshot = snapshot
+        self.cache_dir = cache_dir
+        self.distance_type = distance_type
+        self.time_cost = time_cost
+        self.vehicle_max_speed = vehicle_max_speed
+        self.trajectories = distance_type == DistanceType.TrajectoryOrEuclidean if trajectories is None else trajectories
+        self._vehicle_type_ids = vehicle_type_ids
+
+        # lazy properties
+        self._lif = None
+        self._load_permissions = None
+        self._graph = None
+        self._key_suffixes = None
+        self._positions = None
+        self._heuristic = None
+        self._networkx_data: dict[str, NetworkxData[str]] = {}
+
+    @property
+    def vehicle_type_ids(self) -> list[str]:
+        self._get_graph()
+        return list(self._key_suffixes)
+
+    def for_vehicle_type(self, vehicle_type_id: str) -> "LifVehicleTypeDataProvider":
+        """
+        :return: a DataProvider for the given vehicle type, which can be used like a LifDataProvider.
+        """
+        self._get_graph()
+        if vehicle_type_id not in self._key_suffixes:
+            raise ValueError(f"Unknown vehicle type {vehicle_type_id}, expected one of {self.vehicle_type_ids}")
+        return LifVehicleTypeDataProvider(self, vehicle_type_id)
+
+    def get_networkx_data(self, vehicle_type_id: str, load_state: LoadState | None = None) -> NetworkxData[str]:
+        """
+        :param vehicle_type_id: the vehicle type to get the view of the graph for.
+        :param load_state: if given, only the edges the vehicle may use in this LoadState are used.
+        """
+        graph = self._get_graph()
+        key_suffix = self._key_suffixes[vehicle_type_id]
+        if key_suffix not in self._networkx_data:
+            self._networkx_data[key_suffix] = NetworkxData(graph, self._get_heuristic(), f"weight:{key_suffix}")
+        data = self._networkx_data[key_suffix]
+        if load_state is None:
+            return data
+        return replace(data, permission_key=f"{LOAD_PERMISSIONS_KEY}:{key_suffix}",
+                       permission_mask=self.get_load_permissions().mask(load_state))
+
+    def get_load_permissions(self) -> LoadPermissions:
+        self._get_graph()
+        return self._load_permissions
+
+    def number_of_nodes(self) -> int:
+        """The number of nodes of the graph shared by all vehicle types, without computing their heuristic."""
+        return self._get_graph().number_of_nodes()
+
+    def _get_graph(self) -> nx.MultiDiGraph:
+        if self._graph is not None: return self._graph
+
+        if not self.snapshot:
+            self._build_graph()
+            return self._graph
+
+        # the graph depends on these parameters besides the LIF file
+        parameters_hash = prepared_layout_hash(type(self).__name__, self._vehicle_type_ids, self.distance_type.value,
+                                               self.time_cost, self.vehicle_max_speed)
+        layout = PreparedLayout.cached(cache_file_path(self.path, self.cache_dir, f"{parameters_hash}.layout"),
+                                       self.path, self._prepare_layout)
+        self._vehicle_type_ids = layout.metadata["vehicle_type_ids"]
+        self._key_suffixes = layout.metadata["key_suffixes"]
+        self._load_permissions = LoadPermissions(layout.metadata["load_set_names"])
+        self._positions = layout.positions()
+        self._graph = layout.to_graph()
+        return self._graph
+
+    def _build_graph(self):
+        with span("read LIF", path=str(self.path)):
+            self._lif = read_lif(self.path, LifReadOptions(
+                vehicle_type_ids=None if self._vehicle_type_ids is None else frozenset(self._vehicle_type_ids),
+                trajectories=self.trajectories,
+                actions=False,
+                stations=False,
+            ))
+        if self._vehicle_type_ids is None:
+            self._vehicle_type_ids = sorted(_vehicle_type_ids(self._lif))
+        self._load_permissions = LoadPermissions.of(self._lif)
+        self._positions = _lif_positions(self._lif)
+        with span("build graph"):
+            self._graph, self._key_suffixes = _lif_to_fleet_graph(self._lif, self._vehicle_type_ids,
+                                                                  self.distance_type, self.time_cost,
+                                                                  self.vehicle_max_speed, self._load_permissions)
+
+    def _prepare_layout(self) -> PreparedLayout:
+        self._build_graph()
+        key_suffixes = list(dict.fromkeys(self._key_suffixes.values()))
+        return PreparedLayout.of(
+            self._graph,
+            self._positions,
+            [f"weight:{key_suffix}" for key_suffix in key_suffixes],
+            [f"{LOAD_PERMISSIONS_KEY}:{key_suffix}" for key_suffix in key_suffixes],
+            {
+                "vehicle_type_ids": self._vehicle_type_ids,
+                "key_suffixes": self._key_suffixes,
+                "load_set_names": self._load_permissions.load_set_names,
+            },
+        )
+
+    def _get_heuristic(self) -> Callable[[str, str], float]:
+        if self._heuristic is None:
+            self._get_graph()
+            self._heuristic = _lif_heuristic(self._positions, self.distance_type, self.time_cost,
+                                             self.vehicle_max_speed)
         return self._heuristic
+
+
+@public
+class LifVehicleTypeDataProvider(NetworkxDataProvider[str]):
+    def __init__(self, fleet: LifFleetDataProvider, vehicle_type_id: str):
+        """
+        The view of a LifFleetDataProvider for a single vehicle type, see LifFleetDataProvider.for_vehicle_type.
+        """
+        self.fleet = fleet
+        self.vehicle_type_id = vehicle_type_id
+
+    @property
+    def time_cost(self) -> bool:
+        return self.fleet.time_cost
+
+    @property
+    def trajectories(self) -> bool:
+        return self.fleet.trajectories
+
+    @property
+    def snapshot(self) -> bool:
+        return self.fleet.snapshot
+
+    def get_networkx_data(self, load_state: LoadState | None = None) -> NetworkxData[str]:
+        return self.fleet.get_networkx_data(self.vehicle_type_id, load_state)
+
+    def cache_key(self) -> tuple[str, str] | None:
+        # the vehicle types extracted together do not change the graph of this one
+        return str(self.fleet.path), repr((type(self).__name__, self.vehicle_type_id, self.fleet.distance_type.value,
+                                           self.fleet.trajectories, self.fleet.time_cost,
+                                           self.fleet.vehicle_max_speed))
+
+    def get_load_permissions(self) -> LoadPermissions:
+        return self.fleet.get_load_permissions()
+
+    def number_of_nodes(self) -> int:
+        return self.fleet.number_of_nodes()
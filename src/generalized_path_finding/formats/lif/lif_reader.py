@@ -0,0 +1,263 @@
+import json
+import re
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, TextIO
+
+from auto_all import public
+
+from .edge import Edge
+from .layout import Layout
+from .lif import LIF
+from .node import Node
+from .station import Station
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+"""The number of characters read from a LIF file at once by read_lif."""
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# a string, a bracket or a run of other characters of a JSON value, to skip values without decoding them
+_SKIPPED_TOKEN = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]{}]|[^"\[\]{}]+')
+_DECODER = json.JSONDecoder()
+
+
+@public
+@dataclass(frozen=True)
+class LifReadOptions:
+    """
+    The parts of a LIF file to read with read_lif. The parts not read are left out of the LIF, as if they were missing
+    in the file, e.g. the trajectory of an edge is None if trajectories is False. They are skipped in the file without
+    being decoded. Edge properties of other vehicle types are decoded before they are dropped, though, as the
+    vehicle type id may follow the other values of the properties.
+    """
+
+    vehicle_type_ids: frozenset[str] | None = None
+    """
+    The vehicle types to read the edge properties of, or None for all of them. Edges without properties for any of
+    them are left out. Nodes are always read, as graphs contain all nodes.
+    """
+
+    trajectories: bool = True
+    """Whether to read the trajectories of edges."""
+
+    actions: bool = True
+    """Whether to read the actions of nodes and edges."""
+
+    nodes: bool = True
+    edges: bool = True
+    stations: bool = True
+
+
+class _JsonReader:
+    def __init__(self, file: TextIO, chunk_size: int):
+        """
+        Reads a JSON document incrementally, so only the values read at once are held in memory, not the whole
+        document. Containers are entered with object_keys and array_items, everything else is read with value.
+        """
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+
+    def value(self) -> Any:
+        """Read the next value. Values larger than the buffer are read by growing it."""
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # a number at the end of the buffer may continue in the next chunk
+            if end < len(self.buffer) or not self._fill():
+                self.pos = end
+                return value
+
+    def skip(self):
+        """
+        Skip the next value without decoding it, so no Python objects are created for it. Only its brackets and
+        strings are scanned, the value is not validated otherwise.
+        """
+        if self.peek() not in "[{":
+            self.value()
+            return
+        depth = 0
+        while True:
+            match = _SKIPPED_TOKEN.match(self.buffer, self.pos)
+            # the buffer ends, or a string continues in the next chunk
+            if match is None:
+                if not self._fill():
+                    raise ValueError("Unexpected end of LIF file")
+                continue
+            self.pos = match.end()
+            token = match.group()
+            if token in "[{":
+                depth += 1
+            elif token in "]}":
+                depth -= 1
+                if depth == 0:
+                    return
+
+    def object_keys(self) -> Iterator[str]:
+        """Enter an object and yield its keys. The value of each key must be read before the next key is yielded."""
+        self._expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self._expect(":")
+            yield key
+            if self._next_separator("}"):
+                return
+
+    def array_items(self) -> Iterator[None]:
+        """Enter an array and yield once per item. Each item must be read before the next one is yielded."""
+        self._expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield
+            if self._next_separator("]"):
+                return
+
+    def _next_separator(self, closing: str) -> bool:
+        char = self.peek()
+        self.pos += 1
+        if char == closing:
+            return True
+        if char != ",":
+            raise ValueError(f"Expected ',' or '{closing}' in LIF file, got '{char}'")
+        return False
+
+    def _expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"Expected '{char}' in LIF file, got '{self.buffer[self.pos]}'")
+        self.pos += 1
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character without reading it."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of LIF file")
+
+    def _fill(self) -> bool:
+        """Drop the part of the buffer already read and read at least one more chunk. False if at the end of file."""
+        chunk = self.file.read(max(self.chunk_size, len(self.buffer) - self.pos))
+        if not chunk:
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+
+def _read_object(reader: _JsonReader, skipped_keys: frozenset[str]) -> dict:
+    """Read an object, skipping the values of skipped_keys without decoding them."""
+    result = {}
+    for key in reader.object_keys():
+        if key in skipped_keys:
+            reader.skip()
+        else:
+            result[key] = reader.value()
+    return result
+
+
+def _read_with_properties(reader: _JsonReader, properties_key: str, skipped_keys: frozenset[str]) -> dict:
+    """Read a node or an edge, skipping skipped_keys in each of the vehicle type properties under properties_key."""
+    if not skipped_keys:
+        return reader.value()
+    result = {}
+    for key in reader.object_keys():
+        if key == properties_key and reader.peek() == "[":
+            result[key] = []
+            for _ in reader.array_items():
+                result[key].append(_read_object(reader, skipped_keys))
+        else:
+            result[key] = reader.value()
+    return result
+
+
+def _read_node(reader: _JsonReader, options: LifReadOptions) -> Node:
+    skipped_keys = frozenset() if options.actions else frozenset(["actions"])
+    return Node.from_camel_dict(_read_with_properties(reader, "vehicleTypeNodeProperties", skipped_keys))
+
+
+def _read_edge(reader: _JsonReader, options: LifReadOptions) -> Edge | None:
+    """:return: the edge, or None if it has no properties for the vehicle types read."""
+    skipped_keys = frozenset(([] if options.actions else ["actions"]) + ([] if options.trajectories else ["trajectory"]))
+    edge = _read_with_properties(reader, "vehicleTypeEdgeProperties", skipped_keys)
+    properties = edge.get("vehicleTypeEdgeProperties")
+    if properties is not None and options.vehicle_type_ids is not None:
+        properties = [props for props in properties if props.get("vehicleTypeId") in options.vehicle_type_ids]
+        if not properties:
+            return None
+        edge["vehicleTypeEdgeProperties"] = properties
+    return Edge.from_camel_dict(edge)
+
+
+def _read_layout(reader: _JsonReader, options: LifReadOptions) -> Layout:
+    layout = {}
+    nodes, edges, stations = [], [], None
+    for key in reader.object_keys():
+        if key == "nodes":
+            if not options.nodes:
+                reader.skip()
+                continue
+            for _ in reader.array_items():
+                nodes.append(_read_node(reader, options))
+        elif key == "edges":
+            if not options.edges:
+                reader.skip()
+                continue
+            for _ in reader.array_items():
+                if (edge := _read_edge(reader, options)) is not None:
+                    edges.append(edge)
+        elif key == "stations" and reader.peek() == "[":
+            if not options.stations:
+                reader.skip()
+                continue
+            stations = []
+            for _ in reader.array_items():
+                stations.append(Station.from_camel_dict(reader.value()))
+        else:
+            layout[key] = reader.value()
+
+    # the lists are checked and converted already
+    layout |= {"nodes": [], "edges": []}
+    result = Layout.from_camel_dict(layout)
+    result.nodes, result.edges, result.stations = nodes, edges, stations
+    return result
+
+
+@public
+def read_lif(path: str | Path, options: LifReadOptions = LifReadOptions(), chunk_size: int = DEFAULT_CHUNK_SIZE) -> LIF:
+    """
+    Read a LIF file incrementally, one node, edge or station at a time, instead of loading the whole JSON document
+    first. Only the parts selected by options are kept, so the peak memory is about the size of the LIF returned,
+    rather than several times the size of the file.
+
+    :param path: path to the LIF file
+    :param options: the parts of the file to read.
+    :param chunk_size: the number of characters to read from the file at once.
+    """
+    with open(path) as file:
+        reader = _JsonReader(file, chunk_size)
+        lif = {}
+        layouts = []
+        for key in reader.object_keys():
+            if key == "layouts":
+                for _ in reader.array_items():
+                    layouts.append(_read_layout(reader, options))
+            else:
+                lif[key] = reader.value()
+
+    lif["layouts"] = []
+    result = LIF.from_camel_dict(lif)
+    result.layouts = layouts
+    return result
@@ -0,0 +1,81 @@
+from dataclasses import dataclass
+
+from auto_all import public
+
+from .edge import LoadRestriction
+from .lif import LIF
+
+LOAD_PERMISSIONS_KEY = "load_permissions"
+"""The key of the edge attribute holding the LoadPermissions bitset of an edge."""
+
+_UNLOADED_BIT = 1
+# loaded with a load set that is not named by any LoadRestriction, or with an unknown load set
+_LOADED_BIT = 2
+_FIRST_LOAD_SET_BIT = 4
+
+
+@public
+@dataclass(frozen=True)
+class LoadState:
+    """
+    Whether a vehicle is loaded, and with which load set, to choose the edges it may use by their LoadRestriction.
+    """
+
+    loaded: bool = False
+
+    load_set_name: str | None = None
+    """
+    The name of the load set the vehicle transports, as in the LoadRestriction of edges. If None, the vehicle may only
+    use edges that allow all load sets.
+    """
+
+    def __post_init__(self):
+        if not self.loaded and self.load_set_name is not None:
+            raise ValueError(f"An unloaded vehicle cannot transport load set {self.load_set_name}")
+
+
+@public
+class LoadPermissions:
+    def __init__(self, load_set_names: list[str]):
+        """
+        Maps LoadRestrictions of edges and LoadStates of vehicles to bitsets, so the edges a vehicle may use can be
+        checked with a single bitwise and, see NetworkxData.permission_key.
+
+        There is one bit for unloaded vehicles, one for vehicles with a load set not named by any LoadRestriction and
+        one for each named load set.
+
+        :param load_set_names: the names of the load sets named by the LoadRestrictions.
+        """
+        self.load_set_names = load_set_names
+        self._load_set_bits = {name: _FIRST_LOAD_SET_BIT << idx for idx, name in enumerate(load_set_names)}
+        self._all_loaded_bits = (_FIRST_LOAD_SET_BIT << len(load_set_names)) - _LOADED_BIT
+
+    @staticmethod
+    def of(lif: LIF) -> "LoadPermissions":
+        """LoadPermissions for all load sets named by the LoadRestrictions in a LIF."""
+        load_set_names = dict.fromkeys(name
+                                       for layout in lif.layouts
+                                       for edge in layout.edges
+                                       for props in edge.vehicle_type_edge_properties
+                                       if props.load_restriction is not None
+                                       for name in props.load_restriction.load_set_names or [])
+        return LoadPermissions(list(load_set_names))
+
+    def edge_permissions(self, load_restriction: LoadRestriction | None) -> int:
+        """The bitset of the LoadStates in which an edge with the given LoadRestriction may be used."""
+        if load_restriction is None:
+            return _UNLOADED_BIT | self._all_loaded_bits
+        permissions = _UNLOADED_BIT if load_restriction.unloaded else 0
+        if load_restriction.loaded:
+            if load_restriction.load_set_names:
+                for name in load_restriction.load_set_names:
+                    permissions |= self._load_set_bits[name]
+            else:
+                permissions |= self._all_loaded_bits
+        return permissions
+
+    def mask(self, load_state: LoadState) -> int:
+        """The bit of a LoadState, see NetworkxData.permission_mask."""
+        if not load_state.loaded:
+            return _UNLOADED_BIT
+        return self._load_set_bits.get(load_state.load_set_name, _LOADED_BIT)
@@ -0,0 +1,226 @@
+import math
+from collections.abc import Hashable
+from dataclasses import dataclass
+
+import networkx as nx
+from auto_all import public
+
+from generalized_path_finding.model.networkx_data import NetworkxData
+from .edge import Edge, OrientationType, RotationAllowed
+from .lif_data_provider import LifDataProvider, LifVehicleTypeDataProvider
+from .load_state import LoadState
+from .trajectory import Trajectory
+
+HEADING_DECIMALS = 6
+"""Headings are rounded to this many decimals of a radian, so equal headings of different edges are the same state."""
+
+
+@public
+@dataclass(frozen=True)
+class HeadingState:
+    """
+    A node together with the heading of the vehicle on it, the state of the rotation-aware search.
+    """
+
+    node_id: str
+
+    heading: float | None
+    """
+    The orientation of the vehicle in radians in reference to the global x-axis, in (-Pi ... Pi]. None if it is not
+    known, e.g. at the start of a path, in which case the vehicle may take any heading.
+    """
+
+    rotation: RotationAllowed = RotationAllowed.BOTH
+    """The directions in which the vehicle may rotate on the node, restricted by the edge it arrived on."""
+
+    terminal: bool = False
+    """
+    Marks the single state of a node that all other states of the node lead to at no cost. Used as query target in
+    the fully expanded graph, where a path may arrive at a node with any heading.
+    """
+
+
+@dataclass(frozen=True)
+class _EdgeRotation:
+    key: Hashable
+    end_node_id: str
+    weight: float
+    start_heading: float
+    end_heading: float
+    rotation_on_edge: bool
+    start_rotation: RotationAllowed
+    end_rotation: RotationAllowed
+    rotation_speed: float
+
+
+def _normalize(angle: float) -> float:
+    angle = math.remainder(angle, 2 * math.pi)
+    return round(math.pi if angle == -math.pi else angle, HEADING_DECIMALS)
+
+
+def _intersect(a: RotationAllowed, b: RotationAllowed) -> RotationAllowed:
+    if a == RotationAllowed.BOTH:
+        return b
+    if b == RotationAllowed.BOTH or a == b:
+        return a
+    return RotationAllowed.NONE
+
+
+def _rotation_angle(start: float, end: float, allowed: RotationAllowed) -> float | None:
+    """
+    :return: the angle to rotate by to get from start to end heading in the allowed directions, or None if impossible.
+    """
+    counter_clockwise = (end - start) % (2 * math.pi)
+    clockwise = (start - end) % (2 * math.pi)
+    if min(counter_clockwise, clockwise) < 10 ** -HEADING_DECIMALS:
+        return 0.0
+    match allowed:
+        case RotationAllowed.BOTH:
+            return min(counter_clockwise, clockwise)
+        case RotationAllowed.CCW:
+            return counter_clockwise
+        case RotationAllowed.CW:
+            return clockwise
+    return None
+
+
+@public
+class RotationModel:
+    def __init__(
+            self,
+            data_provider: LifDataProvider | LifVehicleTypeDataProvider,
+            load_state: LoadState | None = None,
+            vehicle_max_rotation_speed: float = float("infinity"),
+    ):
+        """
+        The states and transitions of a vehicle that has to rotate to follow the orientations of LIF edges.
+
+        A state is a node together with the heading of the vehicle, see HeadingState. The heading on an edge is given
+        by vehicle_orientation and orientation_type of the edge, and is forwards if not given. Tangential orientations
+        follow the trajectory of the edge, or the line between its nodes if it has none. Between edges, the vehicle
+        rotates on the node, in the directions allowed by rotation_at_end_node_allowed of the edge it arrives on and
+        rotation_at_start_node_allowed of the edge it leaves on. On edges with rotation_allowed, it may rotate
+        while driving instead.
+
+        If the data_provider uses time cost, rotating adds the angle divided by max_rotation_speed of the edge (or
+        vehicle_max_rotation_speed) to the cost. Otherwise, rotation restrictions are respected, but rotating is free.
+
+        The transitions of a node are computed when it is first expanded, so a search only holds the states it
+        explores. expanded_data builds and caches the whole state graph instead, e.g. for a ContractionHierarchy.
+
+        :param data_provider: the LIF layout, seen by one vehicle type. It must read the trajectories of the edges,
+        e.g. LifDataProvider(path, trajectories=True), which it does by default only for
+        DistanceType.TrajectoryOrEuclidean, and must not use a snapshot.
+        :param load_state: if given, only the edges the vehicle may use in this LoadState are used.
+        :param vehicle_max_rotation_speed: the maximum rotation speed of the vehicle in radians per second, used if
+        an edge does not limit it.
+        """
+        if not data_provider.trajectories:
+            # otherwise, the headings of curved edges would silently be those of straight lines
+            raise ValueError("RotationModel needs the trajectories of the edges. Set trajectories=True in the "
+                             "LifDataProvider.")
+        if data_provider.snapshot:
+            # the graph of a snapshot has no lif_node and lif_edge attributes
+            raise ValueError("RotationModel needs the LIF nodes and edges of the graph, which a snapshot does not "
+                             "keep. Set snapshot=False in the LifDataProvider.")
+        self.data = data_provider.get_networkx_data(load_state)
+        self.vehicle_type_id = data_provider.vehicle_type_id
+        self.rotation_cost = data_provider.time_cost
+        self.vehicle_max_rotation_speed = vehicle_max_rotation_speed
+
+        self._edge_rotations: dict[str, list[_EdgeRotation]] = {}
+        self._expanded_data: NetworkxData[HeadingState] | None = None
+
+    def start_state(self, node_id: str, heading: float | None = None) -> HeadingState:
+        """
+        The state of a vehicle standing on a node, which may rotate in both directions.
+
+        :param heading: the orientation of the vehicle in radians, or None if it may start with any heading.
+        """
+        return HeadingState(node_id, None if heading is None else _normalize(heading))
+
+    def successors(self, state: HeadingState) -> list[tuple[HeadingState, Hashable, float]]:
+        """
+        :return: the states reachable from state via one edge, with the key and the cost of the edge including the
+        rotation.
+        """
+        successors = []
+        for edge in self._get_edge_rotations(state.node_id):
+            if edge.rotation_on_edge or state.heading is None:
+                angle = 0.0 if state.heading is None else _rotation_angle(state.heading, edge.end_heading,
+                                                                          RotationAllowed.BOTH)
+            else:
+                angle = _rotation_angle(state.heading, edge.start_heading,
+                                        _intersect(state.rotation, edge.start_rotation))
+                if angle is None:
+                    continue
+            cost = edge.weight + (angle / edge.rotation_speed if self.rotation_cost else 0.0)
+            successors.append((HeadingState(edge.end_node_id, edge.end_heading, edge.end_rotation), edge.key, cost))
+        return successors
+
+    def expanded_data(self) -> NetworkxData[HeadingState]:
+        """
+        The graph of all states reachable from any node, built once and cached. Paths between nodes are paths from
+        HeadingState(source, None) to HeadingState(destination, None, terminal=True).
+        """
+        if self._expanded_data is not None:
+            return self._expanded_data
+
+        graph = nx.MultiDiGraph()
+        stack = [HeadingState(node_id, None) for node_id in self.data.graph.nodes]
+        visited = set(stack)
+        while stack:
+            state = stack.pop()
+            graph.add_edge(state, HeadingState(state.node_id, None, terminal=True), weight=0.0)
+            for successor, key, cost in self.successors(state):
+                graph.add_edge(state, successor, key=key, weight=cost)
+                if successor not in visited:
+                    visited.add(successor)
+                    stack.append(successor)
+
+        heuristic = self.data.heuristic
+        self._expanded_data = NetworkxData(graph, lambda a, b: heuristic(a.node_id, b.node_id))
+        return self._expanded_data
+
+    def _get_edge_rotations(self, node_id: str) -> list[_EdgeRotation]:
+        if node_id not in self._edge_rotations:
+            self._edge_rotations[node_id] = [
+                self._edge_rotation(key, v, attributes["lif_edge"], weight)
+                for _, v, key, attributes in self.data.graph.out_edges(node_id, keys=True, data=True)
+                if (weight := self.data.edge_weight(attributes)) is not None
+            ]
+        return self._edge_rotations[node_id]
+
+    def _edge_rotation(self, key: Hashable, end_node_id: str, edge: Edge, weight: float) -> _EdgeRotation:
+        properties = edge.get_properties_for_vehicle_type(self.vehicle_type_id)
+        orientation = properties.vehicle_orientation or 0.0
+        if properties.orientation_type == OrientationType.GLOBAL:
+            start_heading = end_heading = orientation
+        else:
+            start_heading, end_heading = self._edge_directions(edge, properties.trajectory)
+            start_heading += orientation
+            end_heading += orientation
+
+        return _EdgeRotation(
+            key=key,
+            end_node_id=end_node_id,
+            weight=weight,
+            start_heading=_normalize(start_heading),
+            end_heading=_normalize(end_heading),
+            rotation_on_edge=properties.rotation_allowed,
+            start_rotation=properties.rotation_at_start_node_allowed or RotationAllowed.BOTH,
+            end_rotation=properties.rotation_at_end_node_allowed or RotationAllowed.BOTH,
+            rotation_speed=properties.max_rotation_speed or self.vehicle_max_rotation_speed,
+        )
+
+    def _edge_directions(self, edge: Edge, trajectory: Trajectory | None) -> tuple[float, float]:
+        """The directions of an edge at its start and end, following its trajectory if it has one."""
+        if trajectory is not None:
+            try:
+                return trajectory.start_direction(), trajectory.end_direction()
+            except ValueError:
+                pass  # all control points are the same, so the trajectory has no direction
+        start = self.data.graph.nodes[edge.start_node_id]["lif_node"].node_position
+        end = self.data.graph.nodes[edge.end_node_id]["lif_node"].node_position
+        direction = math.atan2(end.y - start.y, end.x - start.x)
+        return direction, direction
@@ -0,0 +1,161 @@
+import json
+from dataclasses import dataclass
+from pathlib import Path
+
+import networkx as nx
+import numpy as np
+from auto_all import public
+
+from generalized_path_finding.model.artifact_cache import Artifact, DEFAULT_ARTIFACT_CACHE
+from generalized_path_finding.model.networkx_data import NetworkxData
+from .station import Station
+
+NO_PREDECESSOR = -1
+"""Marks the sources of the shortest path trees and the nodes not reachable from them in StationMatrix.predecessors."""
+
+
+@public
+@dataclass
+class StationMatrix:
+    """
+    The costs of the shortest paths between all pairs of stations, and the shortest path trees to reconstruct them.
+
+    Between two stations, the path between the cheapest pair of their interaction nodes is used. The arrays are
+    usually memory-mapped from .npy files, see StationMatrix.load.
+    """
+
+    station_ids: list[str]
+    """The IDs of the stations, in the order of the rows and columns of the arrays."""
+
+    node_ids: list[str]
+    """The IDs of all nodes of the graph, in the order used by predecessors and target_nodes."""
+
+    costs: np.ndarray
+    """costs[i, j] is the cost of the shortest path from station i to station j, or inf if there is none."""
+
+    trees: np.ndarray
+    """trees[i, j] is the row of predecessors holding the shortest path tree from station i to station j."""
+
+    target_nodes: np.ndarray
+    """target_nodes[i, j] is the index of the interaction node of station j the path from station i ends at."""
+
+    predecessors: np.ndarray
+    """
+    predecessors[tree, node] is the index of the node preceding node in the shortest path tree, i.e. the next hop
+    towards the source, or NO_PREDECESSOR.
+    """
+
+    def __post_init__(self):
+        self._station_index = {station_id: idx for idx, station_id in enumerate(self.station_ids)}
+
+    def station_index(self, station_id: str) -> int:
+        index = self._station_index.get(station_id)
+        if index is None:
+            raise ValueError(f"Unknown station: {station_id}")
+        return index
+
+    def cost(self, source: str, destination: str) -> float:
+        """The cost of the shortest path between two stations in O(1), or inf if there is none."""
+        return float(self.costs[self.station_index(source), self.station_index(destination)])
+
+    def node_path(self, source: str, destination: str) -> list[str] | None:
+        """
+        The nodes of the shortest path between two stations in O(path length), or None if there is none.
+
+        It starts and ends at interaction nodes of the stations.
+        """
+        i, j = self.station_index(source), self.station_index(destination)
+        if np.isinf(self.costs[i, j]):
+            return None
+        predecessors = self.predecessors[self.trees[i, j]]
+        node = int(self.target_nodes[i, j])
+        nodes = [node]
+        while (node := int(predecessors[node])) != NO_PREDECESSOR:
+            nodes.append(node)
+        return [self.node_ids[node] for node in reversed(nodes)]
+
+    @staticmethod
+    def compute(data: NetworkxData[str], stations: list[Station]) -> "StationMatrix":
+        """
+        Compute the StationMatrix with one run of Dijkstra's algorithm per interaction node.
+
+        :param data: the graph containing all interaction nodes.
+        :param stations: the stations to compute the matrix of.
+        """
+        graph = data.graph
+        node_ids = list(graph.nodes)
+        node_index = {node: idx for idx, node in enumerate(node_ids)}
+        for station in stations:
+            for node in station.interaction_node_ids:
+                if node not in node_index:
+                    raise ValueError(f"Interaction node {node} of station {station.station_id} is not in the graph")
+
+        sources = list(dict.fromkeys(node for station in stations for node in station.interaction_node_ids))
+        source_index = {node: idx for idx, node in enumerate(sources)}
+        distances = np.full((len(sources), len(node_ids)), np.inf)
+        predecessors = np.full((len(sources), len(node_ids)), NO_PREDECESSOR, dtype=np.int32)
+        weight = data.weight_function()
+        for tree, source in enumerate(sources):
+            tree_predecessors, tree_distances = nx.dijkstra_predecessor_and_distance(graph, source, weight=weight)
+            for node, distance in tree_distances.items():
+                distances[tree, node_index[node]] = distance
+            for node, node_predecessors in tree_predecessors.items():
+                # zero-weight cycles through the source give it predecessors, which node_path would loop on forever
+                if node_predecessors and node != source:
+                    predecessors[tree, node_index[node]] = node_index[node_predecessors[0]]
+
+        costs = np.full((len(stations), len(stations)), np.inf)
+        trees = np.zeros((len(stations), len(stations)), dtype=np.int32)
+        target_nodes = np.zeros((len(stations), len(stations)), dtype=np.int32)
+        for i, source_station in enumerate(stations):
+            rows = [source_index[node] for node in source_station.interaction_node_ids]
+            for j, destination_station in enumerate(stations):
+                columns = [node_index[node] for node in destination_station.interaction_node_ids]
+                candidates = distances[np.ix_(rows, columns)]
+                row, column = np.unravel_index(np.argmin(candidates), candidates.shape)
+                costs[i, j] = candidates[row, column]
+                trees[i, j] = rows[row]
+                target_nodes[i, j] = columns[column]
+
+        return StationMatrix([station.station_id for station in stations], node_ids, costs, trees, target_nodes,
+                             predecessors)
+
+    def save(self, paths: list[str]):
+        """
+        Write the StationMatrix to a .json file with the IDs, followed by one .npy file per array, see artifact_paths.
+        """
+        ids_path, *array_paths = paths
+        with open(ids_path, "w") as f:
+            json.dump({"station_ids": self.station_ids, "node_ids": self.node_ids}, f)
+        for path, array in zip(array_paths, (self.costs, self.trees, self.target_nodes, self.predecessors)):
+            with open(path, "wb") as f:
+                np.save(f, array)
+
+    @staticmethod
+    def load(paths: list[str] | tuple[str, ...]) -> "StationMatrix":
+        """Load a StationMatrix written by save, memory-mapping the arrays, so only the rows used are read."""
+        ids_path, *array_paths = paths
+        with open(ids_path) as f:
+            ids = json.load(f)
+        arrays = [np.load(path, mmap_mode="r") for path in array_paths]
+        return StationMatrix(ids["station_ids"], ids["node_ids"], *arrays)
+
+    @staticmethod
+    def artifact_paths(base_path: str | Path) -> list[str]:
+        """The paths of the files of a StationMatrix cached next to base_path."""
+        return [f"{base_path}.json"] + [f"{base_path}.{name}.npy"
+                                        for name in ("costs", "trees", "target_nodes", "predecessors")]
+
+    @staticmethod
+    def cached(
+            base_path: str | Path,
+            source: str | Path,
+            data: NetworkxData[str],
+            stations: list[Station],
+    ) -> "StationMatrix":
+        """
+        Load the StationMatrix cached next to base_path, after computing it if it is missing or source changed.
+        """
+        artifact = Artifact.of(*StationMatrix.artifact_paths(base_path), source=source)
+        DEFAULT_ARTIFACT_CACHE.get(artifact, lambda paths: StationMatrix.compute(data, stations).save(paths))
+        return StationMatrix.load(artifact.paths)
@@ -1,12 +1,27 @@
 import math
+import warnings
 from dataclasses import dataclass
 
-import geomdl
+import numpy as np
 from auto_all import public
-from geomdl import BSpline
 
 from .camelserial import CamelSerial
 
+LENGTH_TOLERANCE = 1e-4
+"""The default bound of the relative error of trajectory lengths, see trajectory_lengths."""
+
+INITIAL_SEGMENTS_PER_SPAN = 4
+"""The number of line segments per knot span a NURBS is first approximated by, see trajectory_lengths."""
+
+MAX_SEGMENTS_PER_SPAN = 1 << 12
+"""The number of line segments per knot span at which the approximation of the length of a NURBS stops."""
+
+LENGTH_CACHE_SIZE = 100_000
+"""The number of trajectory lengths remembered by trajectory_lengths, the oldest are forgotten first."""
+
+# (tolerance, content of trajectory) -> length, in insertion order
+_lengths: dict[tuple, float] = {}
+
 
 @public
 @dataclass
@@ -69,33 +84,144 @@ class Trajectory(CamelSerial):
     Range: [1.0 ... integer.max]
     """
 
-    def approximate_length(self, num_samples: int = 10):
+    def approximate_length(self, num_samples: int | None = None, *, tolerance: float = LENGTH_TOLERANCE) -> float:
         """
         Calculate the approximate length of this trajectory.
 
-        If `degree` is 1, the calculation is exact.
-        Otherwise, `geomdl` is used to sample the NURBS curve and approximate the length.
+        If `degree` is 1, the calculation is exact. Otherwise, the NURBS is sampled until the length converges, see
+        trajectory_lengths, which computes the lengths of many trajectories much faster than calling this on each.
+
+        :param num_samples: deprecated and ignored, the number of samples is chosen to meet tolerance instead.
+        :param tolerance: the bound of the relative error of the length. Only applies when `degree` is greater than 1.
+        """
+        if num_samples is not None:
+            warnings.warn("Trajectory.approximate_length(num_samples) is deprecated and ignored, use tolerance instead",
+                          DeprecationWarning, stacklevel=2)
+        return trajectory_lengths([self], tolerance)[0]
+
+    def _length_key(self) -> tuple:
+        return (self.degree, tuple(self.knot_vector),
+                tuple((p.x, p.y, p.weight if p.weight is not None else 1.0) for p in self.control_points))
+
+    def start_direction(self) -> float:
+        """
+        The direction of the trajectory at its start, as an angle in radians in reference to the global x-axis.
 
-        :param num_samples: Number of samples to take.
-        More samples increases the accuracy of the calculation.
-        Only applies when `degree` is greater than 1.
+        The knot vector is assumed to be clamped, as it is with knots in [0.0 ... 1.0], so the curve is tangential to
+        the line from the first to the next distinct control point.
         """
+        return _direction(self.control_points)
 
-        if self.degree == 1:
-            # trajectory is polyline
-            dist = 0.0
-            # length is Euclidean distance between each pair of consecutive control points
-            for i in range(len(self.control_points) - 1):
-                dist += math.sqrt(
-                    (self.control_points[i].x - self.control_points[i + 1].x) ** 2 +
-                    (self.control_points[i].y - self.control_points[i + 1].y) ** 2
-                )
-            return dist
+    def end_direction(self) -> float:
+        """Like start_direction, but at the end of the trajectory."""
+        return _direction(self.control_points[::-1]) + math.pi
+
+
+@public
+def trajectory_lengths(trajectories: list[Trajectory], tolerance: float = LENGTH_TOLERANCE) -> list[float]:
+    """
+    Calculate the approximate lengths of several trajectories at once.
+
+    Trajectories of the same degree and number of control points are evaluated together with de Boor's algorithm. Each
+    NURBS is approximated by the same number of line segments per knot span, which is doubled until the estimated error
+    of the length is at most tolerance relative to the length. Polylines (degree 1) are measured exactly. Lengths are
+    remembered by the content of the trajectories, so measuring them again, e.g. when reloading a layout, is free.
+
+    :param trajectories: the trajectories to measure.
+    :param tolerance: the bound of the relative error of the lengths.
+    :return: the lengths, in the order of trajectories.
+    """
+    keys = [(tolerance, trajectory._length_key()) for trajectory in trajectories]
+    lengths = {key: _lengths[key] for key in keys if key in _lengths}
+
+    # curves of the same shape are evaluated together
+    groups: dict[tuple[int, int], list[tuple]] = {}
+    for key in dict.fromkeys(key for key in keys if key not in lengths):
+        degree, _, control_points = key[1]
+        groups.setdefault((degree, len(control_points)), []).append(key)
+
+    for (degree, _), group in groups.items():
+        control_points = np.array([control_points for _, (_, _, control_points) in group], dtype=np.float64)
+        if degree == 1:
+            # trajectory is polyline, the weights only change its speed
+            group_lengths = _polyline_lengths(control_points[:, :, :2])
         else:
-            curve = BSpline.Curve()
-            curve.degree = self.degree
-            curve.ctrlpts = [[p.x, p.y] for p in self.control_points]
-            curve.knotvector = self.knot_vector
-            curve.sample_size = num_samples
-            curve.evaluate()
-            return geomdl.operations.length_curve(curve)
+            knot_vectors = np.array([knot_vector for _, (_, knot_vector, _) in group], dtype=np.float64)
+            group_lengths = _nurbs_lengths(degree, knot_vectors, control_points, tolerance)
+        for key, length in zip(group, group_lengths.tolist()):
+            lengths[key] = length
+            if len(_lengths) >= LENGTH_CACHE_SIZE:
+                _lengths.pop(next(iter(_lengths)), None)
+            _lengths[key] = length
+
+    return [lengths[key] for key in keys]
+
+
+def _polyline_lengths(points: np.ndarray) -> np.ndarray:
+    """
+    :param points: points[curve, i] is the i-th (x, y) point of the polyline of a curve.
+    :return: the length of the polyline of each curve.
+    """
+    segments = np.diff(points, axis=1)
+    return np.hypot(segments[..., 0], segments[..., 1]).sum(axis=1)
+
+
+def _nurbs_lengths(degree: int, knot_vectors: np.ndarray, control_points: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Approximate the lengths of NURBS of the same degree and number of control points, see trajectory_lengths.
+
+    :param knot_vectors: knot_vectors[curve] is the knot vector of a curve.
+    :param control_points: control_points[curve, i] is the (x, y, weight) of the i-th control point of a curve.
+    """
+    # homogeneous coordinates, so de Boor's algorithm evaluates the rational curve
+    weights = control_points[:, :, 2:]
+    homogeneous = np.concatenate([control_points[:, :, :2] * weights, weights], axis=2)
+
+    lengths = np.empty(len(control_points))
+    active = np.arange(len(control_points))
+    segments = INITIAL_SEGMENTS_PER_SPAN
+    previous = _polyline_lengths(_nurbs_points(degree, knot_vectors, homogeneous, segments + 1))
+    while active.size > 0:
+        segments *= 2
+        current = _polyline_lengths(_nurbs_points(degree, knot_vectors[active], homogeneous[active], segments + 1))
+        # the error of the polylines shrinks quadratically with the number of segments, so doubling them removes about
+        # three quarters of it, which allows to estimate and remove the remaining error (Richardson extrapolation)
+        error = (current - previous) / 3
+        converged = (np.abs(error) <= tolerance * current) | (segments >= MAX_SEGMENTS_PER_SPAN)
+        lengths[active[converged]] = current[converged] + error[converged]
+        active, previous = active[~converged], current[~converged]
+    return lengths
+
+
+def _nurbs_points(degree: int, knot_vectors: np.ndarray, homogeneous: np.ndarray, samples_per_span: int) -> np.ndarray:
+    """
+    Evaluate NURBS of the same degree and number of control points with de Boor's algorithm, at equidistant parameters
+    in each knot span, so short spans are sampled as densely as long ones.
+
+    :param homogeneous: homogeneous[curve, i] is the (weight * x, weight * y, weight) of the i-th control point.
+    :return: points[curve, sample], the (x, y) of each sample, in the order of the parameters.
+    """
+    p = degree
+    n = homogeneous.shape[1]
+    span = np.repeat(np.arange(p, n), samples_per_span)
+    start, end = knot_vectors[:, span], knot_vectors[:, span + 1]
+    u = start + (end - start) * np.tile(np.linspace(0.0, 1.0, samples_per_span), n - p)
+
+    d = homogeneous[:, span[:, None] - p + np.arange(p + 1)]
+    for r in range(1, p + 1):
+        for j in range(p, r - 1, -1):
+            left = knot_vectors[:, span - p + j]
+            denominator = knot_vectors[:, span + 1 + j - r] - left
+            alpha = np.divide(u - left, denominator, out=np.zeros_like(u), where=denominator != 0)[..., None]
+            d[:, :, j] = (1.0 - alpha) * d[:, :, j - 1] + alpha * d[:, :, j]
+
+    points = d[:, :, p]
+    return points[..., :2] / points[..., 2:]
+
+
+def _direction(control_points: list[ControlPoint]) -> float:
+    first = control_points[0]
+    for point in control_points[1:]:
+        if point.x != first.x or point.y != first.y:
+            return math.atan2(point.y - first.y, point.x - first.x)
+    raise ValueError("The direction of a trajectory whose control points are all the same is undefined")
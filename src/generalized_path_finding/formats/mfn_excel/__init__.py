@@ -2,6 +2,7 @@ from auto_all import start_all, end_all
 
 start_all()
 from .mfn import MFN
-from .mfn_data_provider import MfnDataProvider
+from .fleet_list import FleetTable
+from .mfn_data_provider import MfnDataProvider, MfnFleetDataProvider
 
 end_all()
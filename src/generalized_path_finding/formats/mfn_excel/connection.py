@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from auto_all import public
 
@@ -65,6 +65,11 @@ class Connection:
     orientation: str | None
     comment: str | None
 
+    fleet_mask: int = field(default=0, init=False, compare=False, repr=False)
+    """
+    The bitmask of fleets in the FleetTable of the MFN this Connection was read by, see FleetTable.mask.
+    """
+
     def __post_init__(self):
         self.fleet_list = parse_fleets_list(self.fleets)
 
@@ -1,3 +1,11 @@
+from functools import cache
+
+from auto_all import public
+
+MAX_FLEETS = 63
+"""The maximum number of fleets of a FleetTable, so that the bitmasks fit into the int64 arrays of the edges."""
+
+
 def parse_fleets_list(lst: str) -> list[str]:
     """
     Parses a pipe ("|") seperated list of fleet identifiers into a list of lowercase fleet identifiers.
@@ -7,7 +15,60 @@ def parse_fleets_list(lst: str) -> list[str]:
     :param lst: pipe-seperated list of fleet identifiers as string
     :return: list of lowercase fleet identifiers
     """
+    return list(_parse_fleets(lst))
 
+
+@cache
+def _parse_fleets(lst: str) -> tuple[str, ...]:
+    # networks name the same few fleet lists on thousands of paths, so each is only parsed once
     if lst.strip() == '':
-        return []
-    return [fl.strip().lower() for fl in lst.split("|")]
+        return ()
+    return tuple(fl.strip().lower() for fl in lst.split("|"))
+
+
+@public
+class FleetTable:
+    def __init__(self, fleets: list[str] | None = None):
+        """
+        Interns fleet identifiers to bits, so a fleet list is a bitmask and checking whether it contains a fleet is a
+        single bitwise and.
+
+        :param fleets: lowercase fleet identifiers to intern in this order, e.g. the fleets of another FleetTable.
+        """
+        self.fleets: list[str] = []
+        """The lowercase fleet identifiers, in the order of their bits."""
+
+        self._bits: dict[str, int] = {}
+        # pipe-separated list -> bitmask
+        self._masks: dict[str, int] = {}
+        if fleets:
+            self.mask("|".join(fleets))
+
+    def mask(self, lst: str) -> int:
+        """
+        The bitmask of a pipe-separated list of fleet identifiers, see parse_fleets_list. Fleets not seen before get a
+        new bit.
+
+        :raises ValueError: if there would be more than MAX_FLEETS fleets.
+        """
+        mask = self._masks.get(lst)
+        if mask is None:
+            mask = 0
+            for fleet in _parse_fleets(lst):
+                if fleet not in self._bits:
+                    if len(self.fleets) == MAX_FLEETS:
+                        raise ValueError(f"Only {MAX_FLEETS} fleets are supported, so the fleet {fleet!r} of the fleet "
+                                         f"list {lst!r} is one too many")
+                    self._bits[fleet] = 1 << len(self.fleets)
+                    self.fleets.append(fleet)
+                mask |= self._bits[fleet]
+            self._masks[lst] = mask
+        return mask
+
+    def fleet_mask(self, fleet: str) -> int:
+        """The bit of a fleet identifier, or 0 if no fleet list contains it."""
+        return self._bits.get(fleet.strip().lower(), 0)
+
+    def fleet_list(self, mask: int) -> list[str]:
+        """The lowercase fleet identifiers of a bitmask."""
+        return [fleet for fleet, bit in self._bits.items() if mask & bit]
@@ -1,40 +1,97 @@
-import math
+import json
 import pathlib
+from typing import Any
 
+import numpy as np
 from openpyxl import load_workbook
 
+from generalized_path_finding.model.artifact_cache import Artifact, DEFAULT_ARTIFACT_CACHE
+from generalized_path_finding.model.networkx_data import cache_file_path
 from .connection import Connection
+from .fleet_list import FleetTable
 from .node import Node
 from .path import Path
 
+PARSED_MFN_VERSION = 1
+"""The version of the format of parsed MFN files cached by MFN. Cached files of other versions are not used."""
+
+SHEETS = {"NetworkNodes": 7, "NetworkPaths": 13, "NetworkConnections": 12}
+"""The sheets of an MFN file and the number of their columns that are read."""
+
+Columns = dict[str, list[list[Any]]]
+"""The values of the columns of each sheet of an MFN file, see SHEETS."""
+
+
+def _correct_integers(column: list[Any]) -> list[Any]:
+    """
+    Round the floats of a column that are integers, up to a relative tolerance of 1e-9.
+
+    Reading excel sometimes moves integers a little (for some reason), this corrects it.
+    """
+    floats = [idx for idx, value in enumerate(column) if isinstance(value, float)]
+    if not floats:
+        return column
+    values = np.array([column[idx] for idx in floats])
+    rounded = np.round(values)
+    # like math.isclose(rounded, value, rel_tol=1e-9)
+    integers = np.abs(rounded - values) <= 1e-9 * np.maximum(np.abs(rounded), np.abs(values))
+    column = list(column)
+    for idx, value in zip(np.array(floats)[integers].tolist(), rounded[integers].tolist()):
+        column[idx] = int(value)
+    return column
+
+
+def _read_columns(path: str | pathlib.Path) -> Columns:
+    """Read the columns of all sheets of an MFN file in one pass each."""
+    wb = load_workbook(path, read_only=True)
+
+    for sheet in SHEETS:
+        if sheet not in wb.sheetnames:
+            raise ValueError(f"MFN file needs a sheet called '{sheet}'")
+
+    columns = {}
+    for sheet, number_of_columns in SHEETS.items():
+        rows = wb[sheet].iter_rows(min_row=4, max_col=number_of_columns, values_only=True)
+        # an empty sheet has no rows to transpose
+        columns[sheet] = [list(column) for column in zip(*rows)] or [[] for _ in range(number_of_columns)]
+    wb.close()
+
+    columns["NetworkNodes"] = [_correct_integers(column) for column in columns["NetworkNodes"]]
+    return columns
+
 
 class MFN:
-    def __init__(self, path: str | pathlib.Path):
+    def __init__(self, path: str | pathlib.Path, cache: bool = False, cache_dir: str | pathlib.Path | None = None):
         """
         Internal representation of a Multi Floor Network Excel Schema file.
 
+        The sheets are read column by column, and the fleet lists of paths and connections are interned in a
+        FleetTable, so each distinct fleet list is only parsed once.
+
         :param path: the path to the Excel file in MFN format
+        :param cache: whether to cache the parsed file in a .json file, which is read instead of the Excel file until
+            the Excel file changes.
+        :param cache_dir: the directory to cache the parsed file in. Defaults to the directory of the Excel file.
         """
 
         self.path = path
 
-        self.nodes = []
-        self.paths = []
-        self.connections = []
-
-        wb = load_workbook(path, read_only=True)
-
-        for sheet in ["NetworkNodes", "NetworkPaths", "NetworkConnections"]:
-            if sheet not in wb.sheetnames:
-                raise ValueError(f"MFN file needs a sheet called '{sheet}'")
+        if cache:
+            cache_file = cache_file_path(path, cache_dir, f"v{PARSED_MFN_VERSION}.mfn.json")
 
-        for row in wb["NetworkNodes"].iter_rows(min_row=4, values_only=True):
-            # reading excel sometimes moves integers a little (for some reason), correct this
-            self.nodes.append(Node(*[round(x) if isinstance(x, float) and math.isclose(round(x), x, rel_tol=1e-9) else x
-                                     for x in row[:7]]))
+            def build(paths: list[str]):
+                with open(paths[0], "w") as f:
+                    json.dump(_read_columns(path), f)
 
-        for row in wb["NetworkPaths"].iter_rows(min_row=4, values_only=True):
-            self.paths.append(Path(*row))
+            DEFAULT_ARTIFACT_CACHE.get(Artifact.of(cache_file, source=path), build)
+            with open(cache_file) as f:
+                columns = json.load(f)
+        else:
+            columns = _read_columns(path)
 
-        for row in wb["NetworkConnections"].iter_rows(min_row=4, values_only=True):
-            self.connections.append(Connection(*row))
+        self.fleet_table = FleetTable()
+        self.nodes = [Node(*row) for row in zip(*columns["NetworkNodes"])]
+        self.paths = [Path(*row) for row in zip(*columns["NetworkPaths"])]
+        self.connections = [Connection(*row) for row in zip(*columns["NetworkConnections"])]
+        for edge in self.paths + self.connections:
+            edge.fleet_mask = self.fleet_table.mask(edge.fleets)
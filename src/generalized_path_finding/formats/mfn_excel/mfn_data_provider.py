@@ -1,16 +1,32 @@
 import math
 import pathlib
 import warnings
-from typing import Callable
+from typing import Any, Callable
 
 import networkx as nx
+import numpy as np
 
 from generalized_path_finding.model.data_provider import NetworkxDataProvider
-from generalized_path_finding.model.networkx_data import NetworkxData
+from generalized_path_finding.model.networkx_data import NetworkxData, cache_file_path
+from generalized_path_finding.model.prepared_layout import PreparedLayout, prepared_layout_hash
+from generalized_path_finding.model.profiling import span
 from .connection import Connection
+from .fleet_list import FleetTable
 from .mfn import MFN
 from .path import Path
 
+FLEET_MASK_KEY = "fleet_mask"
+"""The key of the edge attribute holding the bitmask of the fleets that may use the edge, see FleetTable."""
+
+_SNAPSHOT_VERSION = 2
+"""The version of the data MfnDataProvider stores in a PreparedLayout, part of its name."""
+
+_PRIORITY_INDEX_KEY = "priority_index"
+"""
+The key of the edge attribute of paths in a PreparedLayout, holding the index of their priority in the priorities of the
+metadata. The priority factor is applied when restoring the graph, so it is not part of the PreparedLayout.
+"""
+
 
 def fallback(a, b):
     return a if a is not None else b
@@ -20,21 +36,25 @@ def euclidean_distance(a, b) -> float:
     return math.hypot(a.x_meter - b.x_meter, a.y_meter - b.y_meter)
 
 
-def _mfn_to_graph(
+def _mfn_edges(
         mfn: MFN,
-        fleet_id: str,
         time_cost: bool = False,
         fleet_max_speed: float = float("infinity"),
         priority_factor: Callable[[int], float] = lambda prio: 1,
-) -> nx.MultiDiGraph:
+) -> list[tuple[str, str, str, dict[str, Any]]]:
+    """
+    Convert the paths and connections of all fleets to edges, as taken by MultiDiGraph.add_edges_from.
+
+    Each edge has the bitmask of the fleets that may use it, see FLEET_MASK_KEY. Paths whose cost is unknown, because
+    time cost is used without a speed limit, have no weight.
+    """
     nodes = {node.name: node for node in mfn.nodes}
 
-    def path_cost(path: Path) -> float:
+    def path_cost(path: Path) -> float | None:
         dist = euclidean_distance(nodes[path.origin_node_name], nodes[path.destination_node_name])
         if time_cost:
             if fleet_max_speed == float("infinity") and path.speed_limit_mps is None:
-                raise ValueError(f"Using time cost, but there is no speed limit on path {path.name}. Use "
-                                 f"fleet_max_speed parameter or explicitly specify infinite speed_limit in MFN file.")
+                return None  # only an error if the path is used, see MfnDataProvider._get_graph
             speed = (min(path.speed_limit_mps, fleet_max_speed)
                      if path.speed_limit_mps is not None else fleet_max_speed)
             return dist / speed * priority_factor(path.prio)
@@ -48,26 +68,26 @@ def _mfn_to_graph(
         else:
             return dist  # this is 0 most of the time, because elevators are vertical
 
-    edges = [
-                (path.origin_node_name, path.destination_node_name, path.name, {
-                    "mfn_edge": path,
-                    "weight": path_cost(path)
-                }) for path in mfn.paths if path.supports_fleet(fleet_id)
-            ] + [
-                (con.origin_node_name, con.destination_node_name, con.name, {
-                    "mfn_connection": con,
-                    "weight": connection_cost(con)
-                }) for con in mfn.connections if con.supports_fleet(fleet_id)
-            ]
+    edges = []
+    for path in mfn.paths:
+        if path.fleet_mask:
+            attributes = {"mfn_edge": path, FLEET_MASK_KEY: path.fleet_mask}
+            if (cost := path_cost(path)) is not None:
+                attributes["weight"] = cost
+            edges.append((path.origin_node_name, path.destination_node_name, path.name, attributes))
+    for con in mfn.connections:
+        if con.fleet_mask:
+            edges.append((con.origin_node_name, con.destination_node_name, con.name, {
+                "mfn_connection": con,
+                FLEET_MASK_KEY: con.fleet_mask,
+                "weight": connection_cost(con),
+            }))
 
-    if len(edges) == 0:
-        warnings.warn(f"Generating empty graph because no paths or connections are supporting fleet {fleet_id}")
+    return edges
 
-    graph = nx.MultiDiGraph(edges)
-    for node_id, node in nodes.items():
-        graph.add_node(node_id, mfn_node=node)
 
-    return graph
+def _mfn_positions(mfn: MFN) -> dict[str, tuple[float, float]]:
+    return {node.name: (node.x_meter, node.y_meter) for node in mfn.nodes}
 
 
 class MfnDataProvider(NetworkxDataProvider[str]):
@@ -79,59 +99,187 @@ class MfnDataProvider(NetworkxDataProvider[str]):
     To identify nodes, names are used, not indices (origin_id, dest_id).
 
     Weights are given in meters or seconds and assume Euclidean distance between nodes.
+
+    The paths and connections of all fleets are converted once. The graph of a fleet, or of several fleets, is selected
+    from them by the bitmasks of their fleets, see get_networkx_data and for_fleet.
     """
 
     def __init__(
             self,
             path: str | pathlib.Path,
-            fleet: str = None,
+            fleet: str | list[str] | None = None,
             time_cost: bool = False,
             fleet_max_speed: float = float("infinity"),
             priority_factor: Callable[[int | None], float] = lambda prio: 1,
+            snapshot: bool = False,
+            cache_dir: str | pathlib.Path | None = None,
     ):
         """
         A DataProvider fed by an MFN Excel file on disk.
 
         :param path: path to the MFN Excel file
-        :param fleet: the fleet type name from whose view to look at the layout,
-            can be omitted if all paths and connections only name the same set of fleets.
+        :param fleet: the fleet type name from whose view to look at the layout, or several fleet type names to use
+            the paths and connections of any of them. Can be omitted if all paths and connections only name the same
+            set of fleets.
         :param time_cost: whether to use time instead of distance as cost
         :param fleet_max_speed: the maximum speed of vehicles of the given fleet
             (only relevant if time_cost is ``True``)
         :param priority_factor: function taking a priority and returning a value by which to scale the cost of a path
             that has that priority. Because prio is an optional field, this function must also map None.
             Defaults to `lambda prio: 1`, ignoring priority.
+        :param snapshot: whether to cache the edges of all fleets in a PreparedLayout, which is restored in a fraction
+            of the time needed to read the Excel file, and is prepared again when the Excel file changes. The graphs
+            restored from it have no mfn_node, mfn_edge and mfn_connection attributes. The parsed Excel file is cached
+            as well, see MFN, so preparing a PreparedLayout for other parameters does not read it again.
+        :param cache_dir: the directory to cache the PreparedLayout and the parsed Excel file in. Defaults to the
+            directory of the Excel file.
         """
         self.path = path
+        self.snapshot = snapshot
+        self.cache_dir = cache_dir
 
         self.fleet = fleet
         self.time_cost = time_cost
         self.vehicle_max_speed = fleet_max_speed
         self.priority_factor = priority_factor
 
-        # not checking infinite speed limit here, because it's checked more granularly in _mfn_to_graph._path_cost
+        # not checking infinite speed limit here, because it's checked more granularly in _get_graph
 
         # lazy properties
         self._mfn = None
-        self._graph = None
+        self._fleet_table = None
+        self._node_attributes = None
+        self._edges = None
+        self._fleet_masks = None
+        self._graphs: dict[int, nx.MultiDiGraph] = {}
+        self._positions = None
+        self._floors = None
         self._heuristic = None
         self._min_priority_factor = None
+        self._priority_factors = None
 
-    def get_networkx_data(self) -> NetworkxData[str]:
-        return NetworkxData(self._get_graph(), self._get_heuristic())
+    def get_networkx_data(self, fleet: str | list[str] | None = None) -> NetworkxData[str]:
+        """
+        :param fleet: the fleet, or several fleets, whose paths and connections to use. Defaults to the fleet of this
+        MfnDataProvider. The graphs of all fleets are selected from the same edges, so the file is only read once.
+        """
+        return NetworkxData(self._get_graph(fleet), self._get_heuristic())
+
+    def for_fleet(self, fleet: str | list[str]) -> "MfnFleetDataProvider":
+        """
+        :return: a DataProvider for the given fleet or fleets, sharing the converted file with this MfnDataProvider.
+        """
+        return MfnFleetDataProvider(self, fleet)
+
+    def number_of_nodes(self) -> int:
+        """All graphs contain all nodes, so they are counted without selecting the graph of a fleet."""
+        self._load()
+        return len(self._node_attributes)
+
+    def get_floors(self) -> dict[str, str]:
+        """
+        :return: the network, usually the floor, of each node, e.g. for a MultiFloorPathFinder.
+        """
+        self._load()
+        return self._floors
 
-    def _get_graph(self) -> nx.MultiDiGraph:
-        if self._graph is not None: return self._graph
+    def cache_key(self, fleet: str | list[str] | None = None) -> tuple[str, str] | None:
+        """
+        Reads the file, since priority_factor is only represented by its values for the priorities in it.
 
-        self._mfn = MFN(self.path)
+        :param fleet: see get_networkx_data.
+        """
+        self._load()
+        priority_factors = {prio: float(factor) for prio, factor in self._priority_factors.items()}
+        return str(self.path), repr((type(self).__name__, self.fleet if fleet is None else fleet, self.time_cost,
+                                     self.vehicle_max_speed, priority_factors))
+
+    def _get_graph(self, fleet: str | list[str] | None = None) -> nx.MultiDiGraph:
+        self._load()
+        if fleet is None:
+            fleet = self.fleet
+        mask = 0
+        for name in [fleet] if isinstance(fleet, str) else fleet:
+            mask |= self._fleet_table.fleet_mask(name)
+
+        if mask in self._graphs: return self._graphs[mask]
+
+        selected = np.flatnonzero(self._fleet_masks & mask).tolist()
+        if len(selected) == 0:
+            warnings.warn(f"Generating empty graph because no paths or connections are supporting fleet {fleet}")
+        for idx in selected:
+            _, _, name, attributes = self._edges[idx]
+            if "weight" not in attributes:
+                raise ValueError(f"Using time cost, but there is no speed limit on path {name}. Use "
+                                 f"fleet_max_speed parameter or explicitly specify infinite speed_limit in MFN file.")
 
+        with span("build graph", fleets=fleet):
+            graph = nx.MultiDiGraph()
+            graph.add_nodes_from(self._node_attributes.items())
+            graph.add_edges_from(self._edges[idx] for idx in selected)
+        self._graphs[mask] = graph
+        return graph
+
+    def _load(self):
+        if self._edges is not None: return
+
+        if not self.snapshot:
+            with span("read MFN", path=str(self.path)):
+                self._mfn = MFN(self.path)
+            self._fleet_table = self._mfn.fleet_table
+            self._node_attributes = {node.name: {"mfn_node": node} for node in self._mfn.nodes}
+            self._positions = _mfn_positions(self._mfn)
+            self._floors = {node.name: node.network for node in self._mfn.nodes}
+            with span("weight edges"):
+                self._edges = _mfn_edges(self._mfn, self.time_cost, self.vehicle_max_speed, self.priority_factor)
+            # can handle prio=None as well
+            self._priority_factors = {prio: self.priority_factor(prio)
+                                      for prio in dict.fromkeys(path.prio for path in self._mfn.paths)}
+            self._min_priority_factor = min(self._priority_factors.values())
+        else:
+            # the edges depend on these parameters besides the Excel file, the priority factor is applied below
+            parameters_hash = prepared_layout_hash(type(self).__name__, _SNAPSHOT_VERSION, self.time_cost,
+                                                   self.vehicle_max_speed)
+            layout = PreparedLayout.cached(cache_file_path(self.path, self.cache_dir, f"{parameters_hash}.layout"),
+                                           self.path, self._prepare_layout)
+            priority_factors = [self.priority_factor(prio) for prio in layout.metadata["priorities"]]
+            self._fleet_table = FleetTable(layout.metadata["fleets"])
+            self._node_attributes = {node: {} for node in layout.node_ids}
+            self._positions = layout.positions()
+            self._floors = dict(zip(layout.node_ids, layout.metadata["networks"]))
+            self._edges = layout.edges()
+            for _, _, _, attributes in self._edges:
+                priority_index = attributes.pop(_PRIORITY_INDEX_KEY, None)
+                if priority_index is not None and "weight" in attributes:
+                    attributes["weight"] *= priority_factors[priority_index]
+            self._priority_factors = dict(zip(layout.metadata["priorities"], priority_factors))
+            self._min_priority_factor = min(priority_factors)
+
+        self._fleet_masks = np.array([attributes[FLEET_MASK_KEY] for _, _, _, attributes in self._edges],
+                                     dtype=np.int64)
         self._impute_fleet()
-        self._graph = _mfn_to_graph(self._mfn, self.fleet, self.time_cost,
-                                    self.vehicle_max_speed, self.priority_factor)
 
-        # can handle prio=None as well
-        self._min_priority_factor = min(self.priority_factor(path.prio) for path in self._mfn.paths)
-        return self._graph
+    def _prepare_layout(self) -> PreparedLayout:
+        with span("read MFN", path=str(self.path)):
+            mfn = MFN(self.path, cache=True, cache_dir=self.cache_dir)
+
+        with span("weight edges"):
+            edges = _mfn_edges(mfn, self.time_cost, self.vehicle_max_speed)
+        priorities = list(dict.fromkeys(path.prio for path in mfn.paths))
+        priority_index = {prio: idx for idx, prio in enumerate(priorities)}
+        for _, _, _, attributes in edges:
+            if "mfn_edge" in attributes:
+                attributes[_PRIORITY_INDEX_KEY] = priority_index[attributes["mfn_edge"].prio]
+
+        floors = {node.name: node.network for node in mfn.nodes}
+        graph = nx.MultiDiGraph()
+        graph.add_nodes_from(floors)
+        graph.add_edges_from(edges)
+        return PreparedLayout.of(graph, _mfn_positions(mfn), ["weight"], [FLEET_MASK_KEY, _PRIORITY_INDEX_KEY], {
+            "fleets": mfn.fleet_table.fleets,
+            "priorities": priorities,
+            "networks": [floors.get(node) for node in graph.nodes],
+        })
 
     def _impute_fleet(self):
         """
@@ -143,26 +291,49 @@ class MfnDataProvider(NetworkxDataProvider[str]):
         """
 
         if self.fleet is None:
-            vehicle_type_ids = (
-                    set(frozenset(path.fleet_list) for path in self._mfn.paths) |
-                    set(frozenset(con.fleet_list) for con in self._mfn.connections)
-            )
+            fleet_masks = set(self._fleet_masks.tolist())
 
-            if len(vehicle_type_ids) == 1:
-                self.fleet = next(iter((vehicle_type_ids.pop())))
+            if len(fleet_masks) == 1:
+                self.fleet = self._fleet_table.fleet_list(fleet_masks.pop())[0]
             else:
                 raise RuntimeError("There is more than one fleet-list in the MFN Excel file. Specify the vehicle "
                                    "type using `MfnDataProvider(vehicle_type_id=...)`")
 
     def _get_heuristic(self) -> Callable[[str, str], float]:
         if self._heuristic is not None: return self._heuristic
-        self._get_graph()
+        self._load()
+
+        positions = self._positions
 
         def heuristic(a: str, b: str) -> float:
-            return euclidean_distance(
-                self._graph.nodes[a]["mfn_node"],
-                self._graph.nodes[b]["mfn_node"]
-            ) / (self.vehicle_max_speed if self.time_cost else 1.0) * self._min_priority_factor
+            (ax, ay), (bx, by) = positions[a], positions[b]
+            return math.hypot(ax - bx, ay - by) / (self.vehicle_max_speed if self.time_cost else 1.0) \
+                * self._min_priority_factor
 
         self._heuristic = heuristic
         return self._heuristic
+
+
+class MfnFleetDataProvider(NetworkxDataProvider[str]):
+    def __init__(self, provider: MfnDataProvider, fleet: str | list[str]):
+        """
+        The view of an MfnDataProvider for a fleet or several fleets, see MfnDataProvider.for_fleet.
+        """
+        self.provider = provider
+        self.fleet = fleet
+
+    @property
+    def time_cost(self) -> bool:
+        return self.provider.time_cost
+
+    def get_networkx_data(self) -> NetworkxData[str]:
+        return self.provider.get_networkx_data(self.fleet)
+
+    def cache_key(self) -> tuple[str, str] | None:
+        return self.provider.cache_key(self.fleet)
+
+    def number_of_nodes(self) -> int:
+        return self.provider.number_of_nodes()
+
+    def get_floors(self) -> dict[str, str]:
+        return self.provider.get_floors()
@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any
 
 from auto_all import public
@@ -80,6 +80,11 @@ class Path:
     A pipe ("|") separated list of identifiers of the types of vehicles that can travers this Path.
     """
 
+    fleet_mask: int = field(default=0, init=False, compare=False, repr=False)
+    """
+    The bitmask of fleets in the FleetTable of the MFN this Path was read by, see FleetTable.mask.
+    """
+
     def __post_init__(self):
         self.fleet_list = parse_fleets_list(self.fleets)
 
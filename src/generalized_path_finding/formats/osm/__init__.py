@@ -1,6 +1,6 @@
 from auto_all import start_all, end_all
 
 start_all()
-from .osm_data_provider import OsmDataProvider
+from .osm_data_provider import OsmDataProvider, PreparationStage, prepare_osm_data_providers
 
 end_all()
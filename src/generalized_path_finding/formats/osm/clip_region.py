@@ -0,0 +1,71 @@
+import hashlib
+from dataclasses import dataclass
+
+from auto_all import public
+from shapely.geometry import Polygon
+
+from generalized_path_finding.nodes import GeoCoords
+
+
+@public
+@dataclass(frozen=True)
+class BoundingBox:
+    """
+    An axis-aligned rectangle on earth, given by its minimum and maximum latitude and longitude in degrees.
+    """
+
+    min_lat: float
+    min_lon: float
+    max_lat: float
+    max_lon: float
+
+    def __post_init__(self):
+        if self.min_lat >= self.max_lat or self.min_lon >= self.max_lon:
+            raise ValueError(f"empty bounding box {self}")
+
+    def to_polygon(self) -> list[GeoCoords]:
+        """
+        :return: the corners of the bounding box in counter-clockwise order.
+        """
+        return [
+            GeoCoords(self.min_lat, self.min_lon),
+            GeoCoords(self.min_lat, self.max_lon),
+            GeoCoords(self.max_lat, self.max_lon),
+            GeoCoords(self.max_lat, self.min_lon),
+        ]
+
+
+ClipRegion = BoundingBox | list[GeoCoords]
+"""
+A region to restrict an OSM extract to. Either a BoundingBox or a polygon given by its vertices (without repeating the
+first vertex at the end).
+"""
+
+
+def clip_polygon(region: ClipRegion) -> list[GeoCoords]:
+    if isinstance(region, BoundingBox):
+        return region.to_polygon()
+    if len(region) < 3:
+        raise ValueError(f"a clip polygon needs at least 3 vertices, got {len(region)}")
+    return region
+
+
+def clip_region_to_pyrosm(region: ClipRegion) -> list[float] | Polygon:
+    """
+    Convert a ClipRegion to the format pyrosm expects for its ``bounding_box`` parameter.
+    """
+    if isinstance(region, BoundingBox):
+        return [region.min_lon, region.min_lat, region.max_lon, region.max_lat]  # [minx, miny, maxx, maxy]
+    return Polygon([(p.lon, p.lat) for p in clip_polygon(region)])
+
+
+def clip_region_spec(region: ClipRegion | None) -> str:
+    """
+    Create a short string identifying the region, to be used in file names of cached files.
+    """
+    if region is None:
+        return ""
+    if isinstance(region, BoundingBox):
+        return f"_bbox{region.min_lat}_{region.min_lon}_{region.max_lat}_{region.max_lon}"
+    vertices = ";".join(f"{p.lat},{p.lon}" for p in clip_polygon(region))
+    return f"_poly{hashlib.sha1(vertices.encode()).hexdigest()[:8]}"
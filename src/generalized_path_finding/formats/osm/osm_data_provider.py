@@ -1,27 +1,31 @@
-import os
+import contextvars
 import pathlib
+import threading
+from collections.abc import Callable, Iterable
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
 from enum import Enum
 
 import geopandas
 import networkx as nx
 import pandas as pd
 from pyrosm import OSM
-from pyroutingkit import GraphPreparator, RoutingMode
+from pyroutingkit import GraphPreparator, GraphPreparationJob, RoutingMode, PointLatLon
 
+from generalized_path_finding.formats.osm.clip_region import ClipRegion, clip_polygon, clip_region_to_pyrosm, \
+    clip_region_spec
 from generalized_path_finding.formats.osm.routing_kit_filters import OSMWayDirectionCategory, is_osm_way_used_by_cars, \
     is_osm_way_used_by_bicycles, is_osm_way_used_by_pedestrians, get_osm_way_speed, get_osm_car_direction_category, \
     get_osm_bicycle_direction_category
 from generalized_path_finding.model import NetworkxDataProvider, NetworkxData
+from generalized_path_finding.model.artifact_cache import Artifact, DEFAULT_ARTIFACT_CACHE
 from generalized_path_finding.model.data_provider import OsmChDataProvider
 from generalized_path_finding.model.osm_ch_data import OsmChData
+from generalized_path_finding.model.profiling import span
 from generalized_path_finding.nodes import GeoCoords
 
 KPH_PER_MPS = 3.6
 
-
-def is_file_more_recent(test_file, reference_file) -> bool:
-    assert os.path.isfile(reference_file)
-    return os.path.isfile(test_file) and os.path.getmtime(test_file) > os.path.getmtime(reference_file)
+_preparation_executor = ThreadPoolExecutor(thread_name_prefix="osm-preparation")
 
 
 class TransportMode(Enum):
@@ -50,6 +54,16 @@ class TransportMode(Enum):
         raise ValueError(f"Unknown transport mode: {self}")
 
 
+class PreparationStage(Enum):
+    """
+    The stages of preparing .graph and .ch files from a .pbf file, in this order.
+    """
+
+    PBF_DECODE = "pbf decode"
+    SCC_FILTER = "scc filter"
+    CH_BUILD = "ch build"
+
+
 class OsmDataProvider(OsmChDataProvider, NetworkxDataProvider):
 
     def __init__(
@@ -57,7 +71,8 @@ class OsmDataProvider(OsmChDataProvider, NetworkxDataProvider):
             pbf_file: str | pathlib.Path,
             transport_mode: TransportMode = TransportMode.CAR,
             time_cost: bool = True,
-            max_speed: float = None
+            max_speed: float = None,
+            clip_region: ClipRegion | None = None,
     ):
         """
         A DataProvider to prepare and provide OSM data in the Contraction Hierarchy and .graph file format from a
@@ -65,12 +80,14 @@ class OsmDataProvider(OsmChDataProvider, NetworkxDataProvider):
 
         :param pbf_file: the path of the .pbf file to use as input. The .graph and .ch files will be created in the
         same directory and with the same name, but with different extensions. If they already exist, they will be
-        used, provided that they are more recent than the .pbf file.
+        used, provided that the .pbf file did not change since they were prepared.
         :param transport_mode: the transport mode to use for routing. Defaults to car routing.
         :param time_cost: whether to use time instead of distance as cost. Defaults to True. RoutingKit only supports time cost.
         :param max_speed: the maximum speed of the transport mode in meters per second.
         For cars, the max speed on each arc is always assumed. For bikes the default is 15 km/h. For pedestrians the
         default is 4 km/h. The bike and pedestrian speeds can be overridden by specifying a different value.
+        :param clip_region: a BoundingBox or polygon to restrict the extract to. Only roads with both ends inside the
+        region are used. Defaults to the whole extract.
         """
 
         self.pbf_file = str(pbf_file)
@@ -86,39 +103,138 @@ class OsmDataProvider(OsmChDataProvider, NetworkxDataProvider):
                     self.max_speed = 15 / KPH_PER_MPS
                 case TransportMode.PEDESTRIAN:
                     self.max_speed = 4 / KPH_PER_MPS
+        self.clip_region = clip_region
 
         self._graph_file = None
         self._ch_file = None
+        self._preparation: Future[OsmChData] | None = None
+        """The running preparation, if any."""
+        self._prepared: OsmChData | None = None
+        """The data of the last completed preparation."""
+        self._progress: list[Callable[[PreparationStage], None]] = []
+        """The progress callbacks of the running preparation."""
+        self._preparation_lock = threading.Lock()
         self._graph = None
         self._heuristic = None
 
     def get_osm_ch_data(self) -> OsmChData:
+        """
+        While a preparation started by prepare_osm_async runs, the previously prepared data is returned, or the
+        existing .graph and .ch files if they were prepared from the current .pbf file. Their checksums are not
+        validated then, so the query is not delayed by hashing them. Only if there are neither, the preparation is
+        waited for.
+        """
         if not self.time_cost:
             raise ValueError("OsmChData is only compatible with time cost. Set time_cost=True in OsmDataProvider.")
             # FEATURE: see OsmRoutingKit
 
-        if self._graph_file is None or self._ch_file is None:
-            self._prepare_osm(self.pbf_file)
+        with self._preparation_lock:
+            preparation, prepared = self._preparation, self._prepared
+        if prepared is not None:
+            return prepared
+        if preparation is not None:
+            self._set_osm_file_names(self.pbf_file)
+            if DEFAULT_ARTIFACT_CACHE.is_valid(self._osm_artifact(), checksums=False):
+                return OsmChData(self._graph_file, self._ch_file)
+            return preparation.result()
+
+        prepared = self._prepare_osm_data(None)
+        with self._preparation_lock:
+            self._prepared = prepared
+        return prepared
+
+    def prepare_osm_async(
+            self,
+            progress: Callable[[PreparationStage], None] | None = None,
+            executor: Executor | None = None,
+    ) -> Future[OsmChData]:
+        """
+        Prepare the .graph and .ch files in the background, e.g. initially instead of blocking the first call of
+        get_osm_ch_data, or after the .pbf file changed.
+
+        Meanwhile, get_osm_ch_data keeps returning the previously prepared data, see there. Existing .graph and .ch
+        files are only replaced once the new ones are complete (see ArtifactCache), so e.g. an OsmRoutingKit can keep
+        using them until it is updated with the result. If the preparation fails, the next call prepares again.
+
+        :param progress: called with each stage the preparation enters. It is called from the preparing thread. If a
+        preparation is still running, it is added to the callbacks of that preparation and called with the stages
+        entered from then on.
+        :param executor: the executor to run the preparation in. Defaults to a thread pool shared by all
+        OsmDataProviders. Ignored if a preparation is still running.
+        :return: a Future of the prepared data. Use asyncio.wrap_future to await it in asyncio code. If a preparation
+        is still running, its Future is returned.
+        """
+        if not self.time_cost:
+            raise ValueError("OsmChData is only compatible with time cost. Set time_cost=True in OsmDataProvider.")
 
+        with self._preparation_lock:
+            # a done preparation may not have been cleared by its callback yet
+            if self._preparation is None or self._preparation.done():
+                progress_callbacks = self._progress = []
+                if progress is not None:
+                    progress_callbacks.append(progress)
+
+                def report_progress(stage: PreparationStage):
+                    with self._preparation_lock:
+                        callbacks = list(progress_callbacks)
+                    for callback in callbacks:
+                        callback(stage)
+
+                executor = executor if executor is not None else _preparation_executor
+                # in a copy of the context, so the spans of the preparation go to the active Profiler, if any
+                self._preparation = executor.submit(contextvars.copy_context().run, self._prepare_osm_data,
+                                                    report_progress)
+                self._preparation.add_done_callback(self._preparation_done)
+            elif progress is not None:
+                self._progress.append(progress)
+            return self._preparation
+
+    def _preparation_done(self, preparation: Future[OsmChData]):
+        with self._preparation_lock:
+            if not preparation.cancelled() and preparation.exception() is None:
+                self._prepared = preparation.result()
+            self._preparation = None
+
+    def _prepare_osm_data(self, progress: Callable[[PreparationStage], None] | None) -> OsmChData:
+        self._prepare_osm(self.pbf_file, progress)
         return OsmChData(self._graph_file, self._ch_file)
 
-    def _prepare_osm(self, pbf_file: str):
+    def _prepare_osm(self, pbf_file: str, progress: Callable[[PreparationStage], None] | None = None):
+        self._set_osm_file_names(pbf_file)
+
+        def build(paths: list[str]):
+            with span("convert .pbf to .graph and .ch", path=self.pbf_file):
+                preparator = GraphPreparator(self.pbf_file, self._routing_kit_clip_polygon())
+                if progress is not None:
+                    preparator.setProgressCallback(lambda stage, _ch_file: progress(PreparationStage(stage)))
+                graph_file, ch_file = paths
+                preparator.prepareGraph(graph_file, ch_file, self.transport_mode.to_routing_kit(),
+                                        self._routing_kit_speed(), self._routing_kit_speed())
+
+        DEFAULT_ARTIFACT_CACHE.get(self._osm_artifact(), build)
+
+    def _set_osm_file_names(self, pbf_file: str):
         if self.transport_mode != TransportMode.CAR:
             speed_spec = f"_{self.max_speed}mps"
         else:
             speed_spec = ""
-        spec = f"{self.transport_mode.name}{speed_spec}"
+        spec = f"{self.transport_mode.name}{speed_spec}{clip_region_spec(self.clip_region)}"
         self._graph_file = f"{pbf_file}_{spec}.graph"
         self._ch_file = f"{pbf_file}_{spec}.ch"
 
-        if is_file_more_recent(self._graph_file, self.pbf_file) and is_file_more_recent(self._ch_file,
-                                                                                        self._graph_file):
-            print(".graph and .ch already up-to-date")
-        else:
-            print("converting .pbf to .graph and .ch")
-            preparator = GraphPreparator(self.pbf_file)
-            preparator.prepareGraph(self._graph_file, self._ch_file, self.transport_mode.to_routing_kit(),
-                                    round(self.max_speed * 3.6), round(self.max_speed * 3.6))
+    def _osm_artifact(self) -> Artifact:
+        return Artifact.of(self._graph_file, self._ch_file, source=self.pbf_file)
+
+    def _routing_kit_clip_polygon(self) -> list[PointLatLon]:
+        if self.clip_region is None:
+            return []
+        return [PointLatLon(p.lat, p.lon) for p in clip_polygon(self.clip_region)]
+
+    def _routing_kit_speed(self) -> int:
+        return round(self.max_speed * KPH_PER_MPS)
+
+    def _graph_preparation_job(self, graph_file: str, ch_file: str) -> GraphPreparationJob:
+        return GraphPreparationJob(graph_file, ch_file, self.transport_mode.to_routing_kit(), self._routing_kit_speed())
 
     def get_networkx_data(self) -> NetworkxData[GeoCoords]:
         if self._graph is None or self._heuristic is None:
@@ -126,6 +242,10 @@ class OsmDataProvider(OsmChDataProvider, NetworkxDataProvider):
 
         return NetworkxData(self._graph, self._heuristic)
 
+    def cache_key(self) -> tuple[str, str] | None:
+        return self.pbf_file, repr((type(self).__name__, self.transport_mode.name, self.time_cost, self.max_speed,
+                                    clip_region_spec(self.clip_region)))
+
     def _graph_from_osm(self, osm: OSM):
         # This attempts to totally mimic the behavior of RoutingKit's load_osm_routing_graph_from_pbf
         # https://github.com/RoutingKit/RoutingKit/blob/6e897bcf47e24ec6cf7294e9cf826adf8e055e7c/src/osm_graph_builder.cpp#L116
@@ -134,42 +254,44 @@ class OsmDataProvider(OsmChDataProvider, NetworkxDataProvider):
         # Edge filtering seems to almost work. For Andorra, I have 97321 edges (forward + backward), while
         # RoutingKit has 94026 edges (forward + backward, modelling nodes are routing nodes).
 
-        nodes, edges = osm.get_network(nodes=True, network_type="all")
-        way_filter = {
-            TransportMode.CAR: is_osm_way_used_by_cars,
-            TransportMode.BIKE: is_osm_way_used_by_bicycles,
-            TransportMode.PEDESTRIAN: is_osm_way_used_by_pedestrians,
-        }[self.transport_mode]
-        edges = edges[edges.apply(way_filter, axis=1)]
-
-        direction_getter = {
-            TransportMode.CAR: get_osm_car_direction_category,
-            TransportMode.BIKE: get_osm_bicycle_direction_category,
-            TransportMode.PEDESTRIAN: lambda _id, _tags: OSMWayDirectionCategory.OPEN_IN_BOTH
-        }[self.transport_mode]
-
-        if self.transport_mode in [TransportMode.CAR, TransportMode.BIKE]:
-            directed_edges = []
-            no_edges = []
-
-            for idx, row in edges.iterrows():
-                direction = direction_getter(row.id, row)
-
-                match direction:
-                    case OSMWayDirectionCategory.CLOSED:
-                        no_edges.append((row.u, row.v, row.id))
-                        no_edges.append((row.v, row.u, row.id))
-                    case OSMWayDirectionCategory.ONLY_OPEN_FORWARDS:
-                        directed_edges.append({**row})
-                        no_edges.append((row.v, row.u, row.id))
-                    case OSMWayDirectionCategory.ONLY_OPEN_BACKWARDS:
-                        no_edges.append((row.u, row.v, row.id))
-                        directed_edges.append({**row, 'u': row.v, 'v': row.u})
-                    case OSMWayDirectionCategory.OPEN_IN_BOTH:
-                        directed_edges.append({**row})
-                        directed_edges.append({**row, 'u': row.v, 'v': row.u})
-
-            edges = pd.concat([edges[0:0], geopandas.GeoDataFrame(directed_edges)])
+        with span("read OSM network"):
+            nodes, edges = osm.get_network(nodes=True, network_type="all")
+        with span("filter ways"):
+            way_filter = {
+                TransportMode.CAR: is_osm_way_used_by_cars,
+                TransportMode.BIKE: is_osm_way_used_by_bicycles,
+                TransportMode.PEDESTRIAN: is_osm_way_used_by_pedestrians,
+            }[self.transport_mode]
+            edges = edges[edges.apply(way_filter, axis=1)]
+
+            direction_getter = {
+                TransportMode.CAR: get_osm_car_direction_category,
+                TransportMode.BIKE: get_osm_bicycle_direction_category,
+                TransportMode.PEDESTRIAN: lambda _id, _tags: OSMWayDirectionCategory.OPEN_IN_BOTH
+            }[self.transport_mode]
+
+            if self.transport_mode in [TransportMode.CAR, TransportMode.BIKE]:
+                directed_edges = []
+                no_edges = []
+
+                for idx, row in edges.iterrows():
+                    direction = direction_getter(row.id, row)
+
+                    match direction:
+                        case OSMWayDirectionCategory.CLOSED:
+                            no_edges.append((row.u, row.v, row.id))
+                            no_edges.append((row.v, row.u, row.id))
+                        case OSMWayDirectionCategory.ONLY_OPEN_FORWARDS:
+                            directed_edges.append({**row})
+                            no_edges.append((row.v, row.u, row.id))
+                        case OSMWayDirectionCategory.ONLY_OPEN_BACKWARDS:
+                            no_edges.append((row.u, row.v, row.id))
+                            directed_edges.append({**row, 'u': row.v, 'v': row.u})
+                        case OSMWayDirectionCategory.OPEN_IN_BOTH:
+                            directed_edges.append({**row})
+                            directed_edges.append({**row, 'u': row.v, 'v': row.u})
+
+                edges = pd.concat([edges[0:0], geopandas.GeoDataFrame(directed_edges)])
 
         # OSM.to_graph seems to have a bug: it ignores the direction and treats all edges as bidirectional contrary to
         # documentation. (Though I cannot find the bug in their source code either.)
@@ -180,19 +302,21 @@ class OsmDataProvider(OsmChDataProvider, NetworkxDataProvider):
         # print(f"edges before ({len(edges_before)}) =")
         # for e in edges_before: print(e)
 
-        graph = OSM.to_graph(nodes, edges, graph_type="networkx")
+        with span("build graph"):
+            graph = OSM.to_graph(nodes, edges, graph_type="networkx")
 
-        # debug output:
-        # edges2 = [(d["osmid"], u, v, d["oneway"]) for u, v, d in graph.edges(data=True) if d["osmid"] == 25769024]
-        # print(f"edges in between ({len(edges2)}) = ")
-        # for e in edges2: print(e)
+            # debug output:
+            # edges2 = [(d["osmid"], u, v, d["oneway"])
+            #           for u, v, d in graph.edges(data=True) if d["osmid"] == 25769024]
+            # print(f"edges in between ({len(edges2)}) = ")
+            # for e in edges2: print(e)
 
-        if self.transport_mode == TransportMode.CAR:
-            for u, v, osm_way_id in no_edges:
-                u_v_edges = graph.get_edge_data(u, v)
-                if u_v_edges is None: continue
-                key = next(key for key, data in u_v_edges.items() if data["osmid"] == osm_way_id)
-                graph.remove_edge(u, v, key)
+            if self.transport_mode == TransportMode.CAR:
+                for u, v, osm_way_id in no_edges:
+                    u_v_edges = graph.get_edge_data(u, v)
+                    if u_v_edges is None: continue
+                    key = next(key for key, data in u_v_edges.items() if data["osmid"] == osm_way_id)
+                    graph.remove_edge(u, v, key)
 
         # debug output:
         # edges3 = [(d["osmid"], u, v, d["oneway"]) for u, v, d in graph.edges(data=True) if d["osmid"] == 25769024]
@@ -202,40 +326,88 @@ class OsmDataProvider(OsmChDataProvider, NetworkxDataProvider):
         return graph
 
     def _prepare_nx_data(self):
-        osm = OSM(self.pbf_file)
-        # FEATURE: Flamegraph to see how slow this is
+        with span("open .pbf", path=self.pbf_file):
+            if self.clip_region is not None:
+                osm = OSM(self.pbf_file, bounding_box=clip_region_to_pyrosm(self.clip_region))
+            else:
+                osm = OSM(self.pbf_file)
         graph = self._graph_from_osm(osm)
         # y = latitude, x = longitude
 
-        # convert graph such that GeoCoords are node keys instead of osm node ids
-        new_graph = nx.MultiDiGraph()
-        node_mapping = {}
-
-        for node_id, data in graph.nodes(data=True):
-            coords = GeoCoords(data['y'], data['x'])  # y=lat, x=lon
-            node_mapping[node_id] = coords
-            new_graph.add_node(coords, osm_id=node_id, **data)
-
-        for u, v, key, data in graph.edges(data=True, keys=True):
-            data["osm_id"] = data["key"]
-            new_graph.add_edge(node_mapping[u], node_mapping[v], **data)
-
-        graph = new_graph
-
-        # add weights to graph
-        for e in graph.edges:
-            edge = graph.edges[e]
-            edge["weight"] = edge["length"]
-            if self.time_cost:
-                # FEATURE: impute speed limit based on "highway" attribute (see RoutingKit comment "getting speed")
-                speed = get_osm_way_speed(edge["osm_id"], edge) / 3.6  # in m/s
-                if self.max_speed is None and speed == float("inf"):
-                    raise ValueError(f"Using time cost, but there is no speed limit on edge {e}. Use "
-                                     f"vehicle_max_speed parameter or explicitly specify infinite maxSpeed in LIF file.")
-                edge["weight"] /= speed
+        with span("relabel nodes"):
+            # convert graph such that GeoCoords are node keys instead of osm node ids
+            new_graph = nx.MultiDiGraph()
+            node_mapping = {}
+
+            for node_id, data in graph.nodes(data=True):
+                coords = GeoCoords(data['y'], data['x'])  # y=lat, x=lon
+                node_mapping[node_id] = coords
+                new_graph.add_node(coords, osm_id=node_id, **data)
+
+            for u, v, key, data in graph.edges(data=True, keys=True):
+                data["osm_id"] = data["key"]
+                new_graph.add_edge(node_mapping[u], node_mapping[v], **data)
+
+            graph = new_graph
+
+        with span("weight edges"):
+            for e in graph.edges:
+                edge = graph.edges[e]
+                edge["weight"] = edge["length"]
+                if self.time_cost:
+                    # FEATURE: impute speed limit based on "highway" attribute (see RoutingKit comment "getting speed")
+                    speed = get_osm_way_speed(edge["osm_id"], edge) / 3.6  # in m/s
+                    if self.max_speed is None and speed == float("inf"):
+                        raise ValueError(f"Using time cost, but there is no speed limit on edge {e}. Use "
+                                         f"vehicle_max_speed parameter or explicitly specify infinite maxSpeed in LIF "
+                                         f"file.")
+                    edge["weight"] /= speed
 
         def heuristic(a: GeoCoords, b: GeoCoords) -> float:
             return a.distance_to(b) / (self.max_speed if self.time_cost else 1.0)
 
         self._graph = graph
         self._heuristic = heuristic
+
+
+def prepare_osm_data_providers(
+        data_providers: Iterable[OsmDataProvider],
+        progress: Callable[[OsmDataProvider, PreparationStage], None] | None = None,
+):
+    """
+    Prepare the .graph and .ch files of several OsmDataProviders at once, e.g. for different transport modes.
+
+    Instead of decoding the .pbf file once per OsmDataProvider, each .pbf file is decoded only once and the contraction
+    hierarchies of all transport modes are built concurrently. Files that are already up-to-date are not prepared
+    again. Afterwards, get_osm_ch_data can be called on the OsmDataProviders without further preparation.
+
+    :param data_providers: the OsmDataProviders to prepare. They may use different .pbf files and clip regions.
+    :param progress: called with an OsmDataProvider and each stage its preparation enters. It may be called from
+    several threads concurrently.
+    """
+    # providers with the same input share one decode of the .pbf file, providers with the same output one job
+    data_providers_by_input: dict[tuple[str, str], dict[Artifact, OsmDataProvider]] = {}
+    for data_provider in data_providers:
+        if not data_provider.time_cost:
+            raise ValueError("OsmChData is only compatible with time cost. Set time_cost=True in OsmDataProvider.")
+        data_provider._set_osm_file_names(data_provider.pbf_file)
+        key = (data_provider.pbf_file, clip_region_spec(data_provider.clip_region))
+        data_providers_by_input.setdefault(key, {})[data_provider._osm_artifact()] = data_provider
+
+    for (pbf_file, _), data_provider_by_artifact in data_providers_by_input.items():
+        def build(temporary_paths: dict[Artifact, list[str]]):
+            with span("convert .pbf to .graph and .ch", path=pbf_file, transport_modes=len(temporary_paths)):
+                any_data_provider = next(iter(data_provider_by_artifact.values()))
+                preparator = GraphPreparator(pbf_file, any_data_provider._routing_kit_clip_polygon())
+                jobs = []
+                data_provider_by_ch_file = {}
+                for artifact, (graph_file, ch_file) in temporary_paths.items():
+                    data_provider = data_provider_by_artifact[artifact]
+                    jobs.append(data_provider._graph_preparation_job(graph_file, ch_file))
+                    data_provider_by_ch_file[ch_file] = data_provider
+                if progress is not None:
+                    preparator.setProgressCallback(
+                        lambda stage, ch_file: progress(data_provider_by_ch_file[ch_file], PreparationStage(stage)))
+                preparator.prepareGraphs(jobs)
+
+        DEFAULT_ARTIFACT_CACHE.get_all(data_provider_by_artifact.keys(), build)
@@ -1,15 +1,23 @@
+import hashlib
+import json
+import random
+import time
 from dataclasses import dataclass
 from enum import Enum
-from typing import Type, Tuple, List
+from pathlib import Path
+from typing import Type, Tuple, List, Any, Callable
 
 from auto_all import public
 
 from generalized_path_finding.algorithms import AStar, OsmRoutingKit, NxRoutingKit
-from generalized_path_finding.algorithms import RoutingKit
+from generalized_path_finding.algorithms import RoutingKit, CachingPathFinder, PathCacheOptions
 from generalized_path_finding.model import OsmChData, NetworkxData, ChData
+from generalized_path_finding.model.artifact_cache import Artifact, DEFAULT_ARTIFACT_CACHE
+from generalized_path_finding.model.networkx_data import cache_file_path
 from generalized_path_finding.model.data_provider import NetworkxDataProvider, ChDataProvider, DataProvider, \
     OsmChDataProvider
 from generalized_path_finding.model.pathfinder import PathFinder
+from generalized_path_finding.model.query_stats import QueryObserver
 
 
 @public
@@ -35,6 +43,67 @@ class ChooseBySize():
         raise Exception(f"no algorithm found for {number_of_nodes} nodes")
 
 
+@public
+@dataclass
+class ChooseByBenchmark:
+    """
+    Chooses the algorithm for a NetworkxDataProvider with Algorithm.AUTO by measuring the mean time of a sample of
+    random queries with each candidate, instead of by the number of nodes, see create_path_finder.
+
+    The measurement is cached next to the file of the DataProvider per the options which define its graph, e.g. the
+    vehicle type, see NetworkxDataProvider.cache_key, and repeated when the file changes. ContractionHierarchies built
+    for the measurement are cached as usual, so the chosen PathFinder reuses them.
+    """
+
+    candidates: List[Type[PathFinder]]
+    """The algorithms to choose from. They must take NetworkxData."""
+
+    sample_size: int = 20
+    """The number of random queries to measure each candidate with."""
+
+    cache_dir: str | Path | None = None
+    """The directory to cache measurements in. Defaults to the directory of the file of the DataProvider."""
+
+    def select(self, data_provider: NetworkxDataProvider) -> Type[PathFinder]:
+        cache_key = data_provider.cache_key()
+        if cache_key is None:
+            seconds = self.measure(data_provider)
+        else:
+            path, graph_options = cache_key
+            options = repr((graph_options, [c.__name__ for c in self.candidates], self.sample_size))
+            cache_file = cache_file_path(path, self.cache_dir,
+                                         f"{hashlib.sha256(options.encode()).hexdigest()[:8]}.benchmark.json")
+
+            def build(paths: list[str]):
+                with open(paths[0], "w") as f:
+                    json.dump(self.measure(data_provider), f)
+
+            DEFAULT_ARTIFACT_CACHE.get(Artifact.of(cache_file, source=path), build)
+            with open(cache_file) as f:
+                seconds = json.load(f)
+
+        fastest = min(seconds, key=seconds.get)
+        return next(candidate for candidate in self.candidates if candidate.__name__ == fastest)
+
+    def measure(self, data_provider: NetworkxDataProvider) -> dict[str, float]:
+        """
+        :return: the mean time of the same random queries with each candidate in seconds, by name of the candidate.
+        """
+        data = data_provider.get_networkx_data()
+        nodes = list(data.graph.nodes)
+        rng = random.Random(0)
+        queries = [(rng.choice(nodes), rng.choice(nodes)) for _ in range(self.sample_size)] if nodes else []
+
+        seconds = {}
+        for candidate in self.candidates:
+            path_finder = candidate(data)
+            start = time.perf_counter()
+            for source, destination in queries:
+                path_finder.find_shortest_path(source, destination)
+            seconds[candidate.__name__] = (time.perf_counter() - start) / max(len(queries), 1)
+        return seconds
+
+
 InternalDataFormat = NetworkxData | OsmChData | ChData
 DATA_FORMAT_PROVIDER = {
     OsmChData: OsmChDataProvider,
@@ -77,11 +146,14 @@ This is used to determine which data provider to use for a given algorithm.
 """
 
 
-def _choose_algorithm_class(data_provider: DataProvider, algorithm: Algorithm):
+def _choose_algorithm_class(data_provider: DataProvider, algorithm: Algorithm,
+                            cost_model: ChooseByBenchmark | None = None):
     prefs = DECISION_TREE[algorithm]
     for dp_type in prefs:
         if isinstance(data_provider, dp_type):
             algo = prefs[dp_type]
+            if isinstance(algo, ChooseBySize) and cost_model is not None:
+                return cost_model.select(data_provider)
             if isinstance(algo, ChooseBySize):
                 return algo.select(data_provider.number_of_nodes())
             else:
@@ -89,9 +161,28 @@ def _choose_algorithm_class(data_provider: DataProvider, algorithm: Algorithm):
     raise Exception(f"algorithm {algorithm} not compatible with data provider {data_provider}")
 
 
+def _edge_cost_function(path_finder: PathFinder, data: InternalDataFormat) -> Callable[[Any, Any, Any], float] | None:
+    """
+    :return: a function returning the cost of an edge of the paths found by path_finder, or None if the edges of its
+    paths have no cost, e.g. the arcs of OsmRoutingKit, which may cover several nodes of a path.
+    """
+    if isinstance(data, NetworkxData):
+        overlay = path_finder.overlay if isinstance(path_finder, AStar) else None
+
+        def edge_cost(u, v, key):
+            weight = data.edge_weight(data.graph.edges[u, v, key])
+            return weight if overlay is None else overlay.edge_weight(u, v, key, weight)
+
+        return edge_cost
+    if isinstance(data, ChData):
+        return lambda u, v, edge: edge[2]
+    return None
+
+
 @public
-def create_path_finder[V](data_provider: DataProvider[V], algorithm: Algorithm = Algorithm.AUTO, *args, **kwargs) -> \
-        PathFinder[V]:
+def create_path_finder[V](data_provider: DataProvider[V], algorithm: Algorithm = Algorithm.AUTO, *args,
+                          cache: PathCacheOptions | None = None, cost_model: ChooseByBenchmark | None = None,
+                          observer: QueryObserver | None = None, **kwargs) -> PathFinder[V]:
     """
     Establishes a connection between a specified data provider and type of algorithm, selecting the
     appropriate data from the provider and the appropiate implementation of the algorithm based on compatibility.
@@ -101,11 +192,16 @@ def create_path_finder[V](data_provider: DataProvider[V], algorithm: Algorithm =
     :param data_provider: The source of the data, supporting at least one internal data format.
     :param algorithm: The type of algorithm to be initialized using the data provider.
     :param args: Additional arguments passed to the algorithm class during initialization.
+    :param cache: If given, the PathFinder is wrapped in a CachingPathFinder with these options.
+    :param cost_model: If given, Algorithm.AUTO chooses the algorithm for NetworkxDataProviders by measuring it instead
+        of by the number of nodes.
+    :param observer: If given, receives the QueryStats of each query of the PathFinder. With a cache, only queries
+        that miss it are searched and reported.
     :param kwargs: Additional keyword arguments passed to the algorithm class during initialization.
     :return: A PathFinder initialized with the data provided by the data provider.
     """
 
-    algo_class = _choose_algorithm_class(data_provider, algorithm)
+    algo_class = _choose_algorithm_class(data_provider, algorithm, cost_model)
     for data_format in PREFERRED_DATA_FORMATS_PER_ALGORITHM[algo_class]:
         dp_type = DATA_FORMAT_PROVIDER[data_format]
         if isinstance(data_provider, dp_type):
@@ -116,4 +212,10 @@ def create_path_finder[V](data_provider: DataProvider[V], algorithm: Algorithm =
                        f"been caught in _choose_algorithm_class()")
 
     # noinspection PyArgumentList
-    return algo_class(data, *args, **kwargs)
+    path_finder = algo_class(data, *args, **kwargs)
+    if observer is not None:
+        path_finder.observer = observer
+    if cache is None:
+        return path_finder
+    edge_cost = _edge_cost_function(path_finder, data) if cache.reuse_subpaths else None
+    return CachingPathFinder(path_finder, cache, edge_cost)
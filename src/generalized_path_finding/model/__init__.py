@@ -2,9 +2,15 @@ from auto_all import start_all, end_all
 
 start_all()
 from .path import Path
+from .profiling import Profiler, Span, span
 from .pathfinder import PathFinder
+from .query_stats import QueryStats, QueryObserver, QueryStatsCollector
 from .ch_data import ChData
 from .osm_ch_data import OsmChData
 from .networkx_data import NetworkxData
+from .graph_overlay import GraphOverlay
+from .artifact_cache import Artifact, ArtifactCache
+from .prepared_layout import PreparedLayout
+from .time_profile import TimeProfile
 from .data_provider import DataProvider, OsmChDataProvider, ChDataProvider, NetworkxDataProvider
 end_all()
@@ -0,0 +1,224 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from collections.abc import Callable, Iterable
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+from auto_all import public
+
+from generalized_path_finding.model.profiling import span
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+LOCK_POLL_INTERVAL = 0.1
+"""The interval in seconds in which a process waiting for an artifact checks whether the lock was released."""
+
+
+@public
+@dataclass(frozen=True)
+class Artifact:
+    """
+    One or more cache files that are built together, e.g. a .graph file and its .ch file.
+
+    Next to the first file, a manifest with the checksums of all files and a lock file are stored.
+    """
+
+    paths: tuple[str, ...]
+    """The paths of the files."""
+
+    source: str | None = None
+    """
+    The path of the file the artifact is built from, if any. The artifact is rebuilt when the size or modification time
+    of the source changes.
+    """
+
+    @staticmethod
+    def of(*paths: str | Path, source: str | Path | None = None) -> "Artifact":
+        return Artifact(tuple(str(path) for path in paths), str(source) if source is not None else None)
+
+    @property
+    def manifest_path(self) -> str:
+        return f"{self.paths[0]}.manifest.json"
+
+    @property
+    def lock_path(self) -> str:
+        return f"{self.paths[0]}.lock"
+
+
+@public
+class ArtifactCache:
+    def __init__(self, timeout: float | None = None):
+        """
+        Builds cache files at most once across threads and processes.
+
+        Files are written to temporary paths and moved into place once they are complete, so no one ever reads a
+        partially written file. While an artifact is built, others that need it wait for the build instead of building
+        it again. When loading, the checksums of the files are validated against the manifest, so files that were
+        modified or replaced by an older version of this library are rebuilt.
+
+        :param timeout: the maximum time in seconds to wait for an artifact that is built by someone else. Defaults to
+        waiting indefinitely.
+        """
+        self.timeout = timeout
+        # path -> (checksum, mtime, size) of files whose checksum was already computed, to avoid hashing them again
+        self._checksums: dict[str, tuple[str, int, int]] = {}
+        # the ArtifactCache is shared by threads, e.g. DEFAULT_ARTIFACT_CACHE
+        self._checksums_lock = threading.Lock()
+
+    def get(self, artifact: Artifact, build: Callable[[list[str]], None]) -> bool:
+        """
+        Make sure the artifact is built and up-to-date.
+
+        :param artifact: the artifact to get.
+        :param build: builds the artifact, writing its files to the given temporary paths in the order of
+        artifact.paths.
+        :return: whether the artifact was built, as opposed to being up-to-date or built by someone else.
+        """
+        return len(self.get_all([artifact], lambda temporary_paths: build(temporary_paths[artifact]))) > 0
+
+    def get_all(
+            self,
+            artifacts: Iterable[Artifact],
+            build: Callable[[dict[Artifact, list[str]]], None],
+    ) -> list[Artifact]:
+        """
+        Make sure several artifacts are built and up-to-date, building the missing ones together.
+
+        :param artifacts: the artifacts to get.
+        :param build: builds the given artifacts, writing their files to the temporary paths, which are in the order of
+        the artifact's paths. Only called for artifacts that are missing or outdated.
+        :return: the artifacts that were built.
+        """
+        stale = [artifact for artifact in dict.fromkeys(artifacts) if not self.is_valid(artifact)]
+        if not stale:
+            return []
+
+        with ExitStack() as stack:
+            # always lock in the same order, so processes building overlapping artifacts cannot deadlock
+            for artifact in sorted(stale, key=lambda a: a.lock_path):
+                stack.enter_context(self._lock(artifact))
+
+            # someone else may have built the artifacts while waiting for the lock
+            stale = [artifact for artifact in stale if not self.is_valid(artifact)]
+            if not stale:
+                return []
+
+            suffix = f".{uuid.uuid4().hex[:8]}.tmp"
+            temporary_paths = {artifact: [path + suffix for path in artifact.paths] for artifact in stale}
+            try:
+                build(temporary_paths)
+                for artifact in stale:
+                    self._publish(artifact, temporary_paths[artifact])
+            finally:
+                for path in (path for paths in temporary_paths.values() for path in paths):
+                    if os.path.exists(path):
+                        os.remove(path)
+        return stale
+
+    def is_valid(self, artifact: Artifact, checksums: bool = True) -> bool:
+        """
+        :param checksums: whether to validate the checksums of the files, which reads files that were not hashed by
+        this ArtifactCache before completely. Without, only their existence is checked, e.g. to quickly decide whether
+        files that are probably up-to-date can be used while they are rebuilt.
+        :return: whether all files of the artifact exist, match the checksums in the manifest and were built from the
+        current version of the source.
+        """
+        source_fingerprint = _source_fingerprint(artifact)
+        try:
+            with open(artifact.manifest_path, "r") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        if manifest.get("source") != source_fingerprint:
+            return False
+        expected = manifest.get("checksums", {})
+        return all(os.path.isfile(path) and os.path.basename(path) in expected
+                   and (not checksums or self._checksum(path) == expected[os.path.basename(path)])
+                   for path in artifact.paths)
+
+    def _checksum(self, path: str) -> str:
+        stat = os.stat(path)
+        with self._checksums_lock:
+            cached = self._checksums.get(path)
+        if cached is not None and cached[1:] == (stat.st_mtime_ns, stat.st_size):
+            return cached[0]
+
+        sha256 = hashlib.sha256()
+        with span("hash file", path=path, size=stat.st_size), open(path, "rb") as f:
+            while chunk := f.read(1 << 20):
+                sha256.update(chunk)
+        checksum = sha256.hexdigest()
+        with self._checksums_lock:
+            self._checksums[path] = (checksum, stat.st_mtime_ns, stat.st_size)
+        return checksum
+
+    def _publish(self, artifact: Artifact, temporary_paths: list[str]):
+        # remove the manifest first, so the old one is not validated against partially replaced files
+        if os.path.exists(artifact.manifest_path):
+            os.remove(artifact.manifest_path)
+        checksums = {}
+        for temporary_path, path in zip(temporary_paths, artifact.paths):
+            checksums[os.path.basename(path)] = self._checksum(temporary_path)
+            os.replace(temporary_path, path)
+            with self._checksums_lock:
+                self._checksums[path] = self._checksums.pop(temporary_path)
+
+        temporary_manifest_path = f"{artifact.manifest_path}.{uuid.uuid4().hex[:8]}.tmp"
+        with open(temporary_manifest_path, "w") as f:
+            json.dump({"source": _source_fingerprint(artifact), "checksums": checksums}, f, indent=2)
+        os.replace(temporary_manifest_path, artifact.manifest_path)
+
+    @contextmanager
+    def _lock(self, artifact: Artifact):
+        # the lock file is never removed, since removing it while someone else opens it would break the lock
+        fd = os.open(artifact.lock_path, os.O_RDWR | os.O_CREAT)
+        try:
+            deadline = time.monotonic() + self.timeout if self.timeout is not None else None
+            while not _try_lock(fd):
+                if deadline is not None and time.monotonic() > deadline:
+                    raise TimeoutError(f"Timed out waiting for {artifact.lock_path}")
+                time.sleep(LOCK_POLL_INTERVAL)
+            try:
+                yield
+            finally:
+                _unlock(fd)
+        finally:
+            os.close(fd)
+
+
+def _source_fingerprint(artifact: Artifact) -> dict[str, int] | None:
+    if artifact.source is None:
+        return None
+    stat = os.stat(artifact.source)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _try_lock(fd: int) -> bool:
+    try:
+        if os.name == "nt":
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        else:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+
+def _unlock(fd: int):
+    if os.name == "nt":
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+DEFAULT_ARTIFACT_CACHE = ArtifactCache()
+"""The ArtifactCache used by the DataProviders and intermediate formats."""
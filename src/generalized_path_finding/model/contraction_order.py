@@ -0,0 +1,55 @@
+import hashlib
+from array import array
+from pathlib import Path
+
+from pyroutingkit import CchRouter
+
+from generalized_path_finding.model.artifact_cache import Artifact, DEFAULT_ARTIFACT_CACHE
+
+CONTRACTION_ORDER_VERSION = 2
+"""
+The version of the computation of contraction orders, which is part of topology_hash, so orders cached by an earlier
+version, e.g. the order of a ContractionHierarchy of unit weights, are not reused. Increase it when the computation
+changes.
+"""
+
+
+def topology_hash(node_count: int, tail: list[int], head: list[int], *variant: int) -> str:
+    """
+    Hash the topology of a graph, ignoring its weights, and CONTRACTION_ORDER_VERSION to identify cache files that
+    only depend on the topology.
+
+    :param variant: further numbers to distinguish cache files of the same topology.
+    """
+    topology = array("I", [CONTRACTION_ORDER_VERSION, node_count, *variant, *tail, *head])
+    return hashlib.sha256(topology.tobytes()).hexdigest()[:8]
+
+
+def contraction_order(
+        node_count: int,
+        tail: list[int],
+        head: list[int],
+        order_file: str | Path,
+        coordinates: tuple[list[float], list[float]] | None = None,
+) -> list[int]:
+    """
+    Load a contraction order of the graph from order_file, after computing it if it is missing. The order only depends
+    on the topology of the graph, so it can be reused when weights change, see CchRouter.computeOrder.
+
+    :param coordinates: the x and y coordinates of the nodes, if available.
+    """
+
+    def build(paths: list[str]):
+        if coordinates is not None:
+            x, y = coordinates
+            order = CchRouter.computeOrder(node_count, tail, head, y, x)
+        else:
+            order = CchRouter.computeOrder(node_count, tail, head)
+        with open(paths[0], "wb") as f:
+            array("I", order).tofile(f)
+
+    DEFAULT_ARTIFACT_CACHE.get(Artifact.of(order_file), build)
+    order = array("I")
+    with open(order_file, "rb") as f:
+        order.fromfile(f, node_count)
+    return order.tolist()
@@ -12,6 +12,10 @@ from generalized_path_finding.nodes import GeoCoords
 class DataProvider[V](ABC):
     @abstractmethod
     def number_of_nodes(self) -> int:
+        """
+        The number of nodes of the graph, e.g. to choose an algorithm. Implementations should avoid converting the
+        whole file for it, e.g. by only counting the nodes of the file or reading them from a cached snapshot.
+        """
         pass
 
 
@@ -31,8 +35,19 @@ class NetworkxDataProvider[V](DataProvider[V]):
         pass  # pragma: no cover
 
     def number_of_nodes(self) -> int:
+        # converts the file, override if it can be counted more cheaply
         return self.get_networkx_data().graph.number_of_nodes()
 
+    def cache_key(self) -> tuple[str, str] | None:
+        """
+        Identifies the graph, e.g. to cache measurements of it: the file it is read from, whose changes invalidate
+        them, and a string of the options the graph depends on besides the file.
+
+        :return: the file and the options, or None if the graph is not read from a file or the options cannot be
+        represented, so nothing derived from it is cached.
+        """
+        return None
+
 
 @public
 class ChDataProvider(DataProvider[int]):
@@ -69,4 +84,4 @@ class OsmChDataProvider(DataProvider[GeoCoords]):
         pass  # pragma: no cover
 
     def number_of_nodes(self) -> int:
-        raise NotImplementedError  # FEATURE: implement (not necessary in current system)
+        return self.get_osm_ch_data().number_of_nodes
@@ -0,0 +1,147 @@
+import threading
+from collections.abc import Callable, Hashable
+from typing import Any
+
+from auto_all import public
+
+from generalized_path_finding.model.networkx_data import NetworkxData
+from generalized_path_finding.model.path import Path
+
+
+@public
+class GraphOverlay[V]:
+    def __init__(self):
+        """
+        Temporary changes to a graph, e.g. closed aisles, edges blocked by broken-down vehicles or congestion
+        penalties, without modifying the graph itself.
+
+        All changes take O(1) time and may be made from other threads while paths are searched. Each change increments
+        version, so results computed with an older version can be recognized as outdated.
+
+        An edge is identified by (u, v, key) as in a NetworkX MultiDiGraph. If key is None, the change applies to all
+        parallel edges from u to v.
+        """
+        self._blocked_nodes: set[V] = set()
+        self._blocked_edges: set[tuple[V, V, Hashable]] = set()
+        self._multipliers: dict[tuple[V, V, Hashable], float] = {}
+        self._version = 0
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> int:
+        """The number of changes made so far."""
+        return self._version
+
+    @property
+    def is_empty(self) -> bool:
+        """Whether the overlay does not change the graph at all."""
+        return not self._blocked_nodes and not self._blocked_edges and not self._multipliers
+
+    def block_node(self, node: V):
+        """Block a node, so no path can start, end or pass through it."""
+        self._change(self._blocked_nodes.add, node)
+
+    def unblock_node(self, node: V):
+        self._change(self._blocked_nodes.discard, node)
+
+    def block_edge(self, u: V, v: V, key: Hashable = None):
+        """Block an edge, so no path can use it."""
+        self._change(self._blocked_edges.add, (u, v, key))
+
+    def unblock_edge(self, u: V, v: V, key: Hashable = None):
+        """Unblock an edge blocked with the same u, v and key."""
+        self._change(self._blocked_edges.discard, (u, v, key))
+
+    def set_multiplier(self, u: V, v: V, multiplier: float, key: Hashable = None):
+        """
+        Multiply the weight of an edge, e.g. to penalize congestion. If both a multiplier for the edge key and for all
+        edges from u to v are set, the one for the key is used.
+
+        :param multiplier: the factor to multiply the weight with. Must be at least 1, so heuristics remain lower
+        bounds of the cost.
+        """
+        if not multiplier >= 1:
+            raise ValueError(f"multiplier={multiplier} must be at least 1, so heuristics remain admissible")
+        self._change(self._multipliers.__setitem__, (u, v, key), multiplier)
+
+    def clear_multiplier(self, u: V, v: V, key: Hashable = None):
+        self._change(self._multipliers.pop, (u, v, key), None)
+
+    def clear(self):
+        """Undo all changes."""
+        with self._lock:
+            self._blocked_nodes.clear()
+            self._blocked_edges.clear()
+            self._multipliers.clear()
+            self._version += 1
+
+    def snapshot(self) -> "GraphOverlay[V]":
+        """
+        :return: a copy of the overlay's current state, which is not affected by later changes. Takes time linear in
+        the number of changes, not in the size of the graph.
+        """
+        snapshot = GraphOverlay()
+        with self._lock:
+            snapshot._blocked_nodes = set(self._blocked_nodes)
+            snapshot._blocked_edges = set(self._blocked_edges)
+            snapshot._multipliers = dict(self._multipliers)
+            snapshot._version = self._version
+        return snapshot
+
+    def is_node_blocked(self, node: V) -> bool:
+        return node in self._blocked_nodes
+
+    def edge_weight(self, u: V, v: V, key: Hashable, weight: float) -> float | None:
+        """
+        :param weight: the weight of the edge in the graph.
+        :return: the weight of the edge with the overlay applied, or None if the edge is blocked.
+        """
+        if u in self._blocked_nodes or v in self._blocked_nodes \
+                or (u, v, key) in self._blocked_edges or (u, v, None) in self._blocked_edges:
+            return None
+        multiplier = self._multipliers.get((u, v, key))
+        if multiplier is None:
+            multiplier = self._multipliers.get((u, v, None), 1.0)
+        return weight * multiplier
+
+    def weight_function(self, data: NetworkxData[V]) -> Callable[[V, V, dict[Hashable, dict[str, Any]]], float | None]:
+        """
+        :param data: the graph and the edge attribute holding the weight. Edges ignored by data are ignored.
+        :return: a weight function for NetworkX's shortest path algorithms on a MultiDiGraph, which returns the weight
+        of the cheapest parallel edge with the overlay applied, or None if all of them are blocked.
+        """
+
+        def weight(u: V, v: V, edges: dict[Hashable, dict[str, Any]]) -> float | None:
+            weights = (self.edge_weight(u, v, key, weight) for key, attributes in edges.items()
+                       if (weight := data.edge_weight(attributes)) is not None)
+            return min((w for w in weights if w is not None), default=None)
+
+        return weight
+
+    def path_from_node_list(self, nodes: list[V], data: NetworkxData[V]) -> Path[V] | None:
+        """
+        Like NetworkxData.path_from_node_list, but with the overlay applied.
+
+        :return: the path, or None if it uses blocked nodes or edges, e.g. because they were blocked after it was found.
+        """
+        if any(node in self._blocked_nodes for node in nodes):
+            return None
+        edges = []
+        cost = 0.0
+        for u, v in zip(nodes, nodes[1:]):
+            weights = ((key, self.edge_weight(u, v, key, weight))
+                       for key, attributes in data.graph.get_edge_data(u, v).items()
+                       if (weight := data.edge_weight(attributes)) is not None)
+            edge_key, weight = min(((key, w) for key, w in weights if w is not None), key=lambda kw: kw[1],
+                                   default=(None, None))
+            if weight is None:
+                return None
+            edges.append(edge_key)
+            cost += weight
+
+        return Path(nodes, edges, cost)
+
+    def _change(self, change: Callable[..., Any], *args):
+        with self._lock:
+            change(*args)
+            self._version += 1
@@ -1,17 +1,39 @@
-import os
 import tempfile
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Callable
+from typing import Any, Callable, Hashable
 
 import networkx as nx
-from pyroutingkit import build_contraction_hierarchy
+from pyroutingkit import build_contraction_hierarchy, build_contraction_hierarchy_given_order
 
+from generalized_path_finding.model.artifact_cache import Artifact, DEFAULT_ARTIFACT_CACHE
 from generalized_path_finding.model.ch_data import ChData
+from generalized_path_finding.model.contraction_order import contraction_order, topology_hash
+from generalized_path_finding.model.path import Path as GraphPath
+from generalized_path_finding.model.profiling import span
 
 DEFAULT_SCALING_FACTOR = 1_000_000
 
 
+def cache_file_path(original_file: str | Path | None, cache_dir: str | Path | None, suffix: str) -> Path:
+    """
+    Choose the path of a cache file derived from a NetworkX graph.
+
+    :param original_file: the original file used to create the NetworkX graph. Used to name the cache file.
+    :param cache_dir: the directory to use for caching. Defaults to the directory of original_file or the operating
+    systems temporary directory.
+    :param suffix: identifies the cache file among those of the same original file, e.g. a hash and an extension.
+    """
+    if original_file is not None:
+        original_file = Path(original_file)
+        if cache_dir is None:
+            cache_dir = original_file.parent
+    if cache_dir is None:
+        cache_dir = tempfile.gettempdir()
+    basename = original_file.name if original_file is not None else "nx"
+    return Path(cache_dir) / f"{basename}.{suffix}"
+
+
 @dataclass
 class NetworkxData[V]:
     """
@@ -20,7 +42,7 @@ class NetworkxData[V]:
 
     graph: nx.MultiDiGraph
     """
-    NetworkX graph. Each edge has a float-valued attribute with the key ``"weight"``.
+    NetworkX graph. Each edge has a float-valued attribute with the key weight_key.
     """
 
     heuristic: Callable[[V, V], float]
@@ -30,6 +52,62 @@ class NetworkxData[V]:
     Should have much faster runtime than finding the shortest path between the two nodes.
     """
 
+    weight_key: str = "weight"
+    """
+    The key of the edge attribute holding the weight. Edges without it are ignored, so one graph can be shared by
+    several NetworkxData with different weights and edges, e.g. one per vehicle type.
+    """
+
+    permission_key: str | None = None
+    """
+    The key of an integer edge attribute, whose bits are the states in which the edge may be used, e.g. load states.
+    Edges sharing no bit with permission_mask are ignored. If None, all edges with a weight are used.
+    """
+
+    permission_mask: int = 0
+    """The bits of the current state, see permission_key."""
+
+    def edge_weight(self, attributes: dict[str, Any]) -> float | None:
+        """
+        :param attributes: the attributes of an edge of the graph.
+        :return: the weight of the edge, or None if it is ignored.
+        """
+        if self.permission_key is not None and not attributes.get(self.permission_key, 0) & self.permission_mask:
+            return None
+        return attributes.get(self.weight_key)
+
+    def weight_function(self) -> Callable[[V, V, dict[Hashable, dict[str, Any]]], float | None]:
+        """
+        :return: a weight function for NetworkX's shortest path algorithms, which returns the weight of the cheapest
+        parallel edge, or None if all of them are ignored.
+        """
+        weight_key, permission_key, permission_mask = self.weight_key, self.permission_key, self.permission_mask
+        if permission_key is None:
+            def weight(u: V, v: V, edges: dict[Hashable, dict[str, Any]]) -> float | None:
+                return min((attributes[weight_key] for attributes in edges.values() if weight_key in attributes),
+                           default=None)
+        else:
+            def weight(u: V, v: V, edges: dict[Hashable, dict[str, Any]]) -> float | None:
+                return min((attributes[weight_key] for attributes in edges.values()
+                            if weight_key in attributes and attributes.get(permission_key, 0) & permission_mask),
+                           default=None)
+
+        return weight
+
+    def path_from_node_list(self, nodes: list[V]) -> GraphPath[V]:
+        """
+        Like shortest_path_from_node_list, but ignoring the edges ignored by this NetworkxData.
+        """
+        edges = []
+        cost = 0.0
+        for u, v in zip(nodes, nodes[1:]):
+            weights = ((key, self.edge_weight(attributes)) for key, attributes in self.graph.get_edge_data(u, v).items())
+            edge_key, weight = min(((key, w) for key, w in weights if w is not None), key=lambda kw: kw[1])
+            edges.append(edge_key)
+            cost += weight
+
+        return GraphPath(nodes, edges, cost)
+
     def to_ch_data(
             self,
             scaling_factor: int = DEFAULT_SCALING_FACTOR,
@@ -41,6 +119,11 @@ class NetworkxData[V]:
 
         Edge weights are rounded to the nearest integer.
 
+        If only the weights changed since a previous conversion, e.g. after editing edges in a LIF file, the new .ch
+        file is derived from a contraction order of the topology, which is much faster than contracting the graph from
+        scratch. The order is computed at the first weight change and cached in a .cch_order file. Topology changes
+        require a full build.
+
         :param scaling_factor: Multiplier for the edge weights to improve the precision of rounding. Defaults to 1e6.
         :param original_file: the original file used to create the NetworkX intermediate format. Used to name cache files.
         :param cache_dir: the directory to use for caching. Defaults to the operating systems temporary directory.
@@ -48,43 +131,58 @@ class NetworkxData[V]:
         :return: A ChData object equivalent to this NetworkxData.
         """
 
-        # Convert MultiDiGraph to simple DiGraph by keeping only the least costly edge between each node pair
-        simple_graph = nx.DiGraph()
-        for u, v, w in self.graph.edges.data("weight"):
-            w = round(w * scaling_factor)
-            if simple_graph.has_edge(u, v):
-                if w < simple_graph[u][v]["weight"]:
-                    simple_graph[u][v]["weight"] = w
+        with span("simplify graph"):
+            # Convert MultiDiGraph to simple DiGraph by keeping only the least costly edge between each node pair
+            simple_graph = nx.DiGraph()
+            # nodes without edges are kept, as edges may be ignored, see edge_weight
+            simple_graph.add_nodes_from(self.graph.nodes)
+            for u, v, attributes in self.graph.edges(data=True):
+                w = self.edge_weight(attributes)
+                if w is None:
+                    continue
+                w = round(w * scaling_factor)
+                if simple_graph.has_edge(u, v):
+                    if w < simple_graph[u][v]["weight"]:
+                        simple_graph[u][v]["weight"] = w
+                else:
+                    simple_graph.add_edge(u, v, weight=w)
+
+            # map from V to ints
+            # the node list is guaranteed to be in insertion order -> no sorting needed
+            mapping = {node: idx for idx, node in enumerate(simple_graph.nodes)}
+            edges = sorted(
+                list((mapping[s], mapping[t], w) for s, t, w in simple_graph.edges.data("weight")))
+
+        with span("hash graph"):
+            for node in simple_graph.nodes:
+                simple_graph.nodes[node]['idx'] = mapping[node]
+            graph_hash = nx.weisfeiler_lehman_graph_hash(simple_graph, node_attr="idx", edge_attr='weight',
+                                                         digest_size=4)
+
+        ch_file = cache_file_path(original_file, cache_dir, f"{graph_hash}.ch")
+
+        # graphs with the same topology share a contraction order, e.g. after weights were edited in the original file
+        node_count = simple_graph.number_of_nodes()
+        tail = [s for s, _, _ in edges]
+        head = [t for _, t, _ in edges]
+        order_hash = topology_hash(node_count, tail, head)
+        order_file = cache_file_path(original_file, cache_dir, f"{order_hash}.cch_order")
+        # marks that a .ch of the topology was built, to only compute the contraction order once weights change
+        topology_file = cache_file_path(original_file, cache_dir, f"{order_hash}.topology")
+
+        def build(paths: list[str]):
+            if DEFAULT_ARTIFACT_CACHE.is_valid(Artifact.of(topology_file)):
+                # only takes a fraction of the time of the full build, and makes all further weight changes fast
+                with span("contraction order", path=str(order_file)):
+                    order = contraction_order(node_count, tail, head, order_file)
+                with span("update .ch with changed weights", path=str(ch_file)):
+                    build_contraction_hierarchy_given_order(node_count, edges, order, paths[0])
             else:
-                simple_graph.add_edge(u, v, weight=w)
-
-        # map from V to ints
-        # the node list is guaranteed to be in insertion order -> no sorting needed
-        mapping = {node: idx for idx, node in enumerate(simple_graph.nodes)}
-        edges = sorted(
-            list((mapping[s], mapping[t], w) for s, t, w in simple_graph.edges.data("weight")))
-
-        # hash graph
-        for node in simple_graph.nodes:
-            simple_graph.nodes[node]['idx'] = mapping[node]
-        graph_hash = nx.weisfeiler_lehman_graph_hash(simple_graph, node_attr="idx", edge_attr='weight', digest_size=4)
-
-        # choose ch_file location
-        if original_file is not None:
-            original_file = Path(original_file)
-            if cache_dir is None:
-                cache_dir = original_file.parent
-        if cache_dir is None:
-            cache_dir = tempfile.gettempdir()
-        cache_dir = Path(cache_dir)
-        basename = original_file.name if original_file is not None else "nx"
-        ch_file = cache_dir / f"{basename}.{graph_hash}.ch"
-
-        # check for a cached file
-        if os.path.isfile(ch_file):
-            print(".ch already up-to-date")
-        else:
-            print(f"converting networkx graph{f" ({original_file})" if original_file is not None else ""} to .ch")
-            build_contraction_hierarchy(simple_graph.number_of_nodes(), edges, str(ch_file))
+                with span("build .ch", path=str(ch_file)):
+                    build_contraction_hierarchy(node_count, edges, paths[0])
+
+        # the graph is identified by the hash in the file name, so there is no source to check for changes
+        DEFAULT_ARTIFACT_CACHE.get(Artifact.of(ch_file), build)
+        DEFAULT_ARTIFACT_CACHE.get(Artifact.of(topology_file), lambda paths: Path(paths[0]).touch())
 
         return ChData(str(ch_file), edges, simple_graph.number_of_nodes()), mapping
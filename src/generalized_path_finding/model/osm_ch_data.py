@@ -1,3 +1,4 @@
+import struct
 from dataclasses import dataclass
 
 
@@ -18,4 +19,13 @@ class OsmChData:
     ch_file: str
     """
     Path to the contraction hierarchy file in the format by RoutingKit.
-    """
\ No newline at end of file
+    """
+
+    @property
+    def number_of_nodes(self) -> int:
+        """
+        The number of nodes of the graph, read from the header of the graph file without loading the graph.
+        """
+        with open(self.graph_file, "rb") as f:
+            # the file starts with the number of nodes and of arcs as unsigned ints, see RoutingGraph::store
+            return struct.unpack("=I", f.read(struct.calcsize("=I")))[0]
@@ -29,7 +29,8 @@ def shortest_path_from_node_list[V](nodes: list[V], graph, weight_key) -> Path[V
 
     :param nodes: the list of nodes of the path
     :param graph: the graph to choose the edges from
-    :param weight_key: the key in each edge's property dictionary to use to determine the cost
+    :param weight_key: the key in each edge's property dictionary to use to determine the cost. Edges without it are
+    ignored.
     :return: a fully populated [Path] object
     """
 
@@ -39,7 +40,7 @@ def shortest_path_from_node_list[V](nodes: list[V], graph, weight_key) -> Path[V
         u, v = nodes[i], nodes[i + 1]
         # Find the edge with the minimum weight between u and v
         uv_edges = graph.get_edge_data(u, v)
-        edge_key = min(uv_edges.keys(), key=lambda e, uv=uv_edges: uv[e][weight_key])
+        edge_key = min((e for e in uv_edges if weight_key in uv_edges[e]), key=lambda e, uv=uv_edges: uv[e][weight_key])
         edges.append(edge_key)
         cost += uv_edges[edge_key][weight_key]
 
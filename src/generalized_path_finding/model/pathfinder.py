@@ -1,8 +1,10 @@
 from abc import ABC, abstractmethod
+from collections.abc import Hashable
 
 from auto_all import public
 
 from generalized_path_finding.model.path import Path
+from generalized_path_finding.model.query_stats import QueryObserver
 
 
 @public
@@ -13,6 +15,12 @@ class PathFinder[V](ABC):
     An instance of PathFinder must hold all data needed to calculate shortest paths, including a graph most likely.
     """
 
+    observer: "QueryObserver | None" = None
+    """
+    If set, receives the QueryStats of each query. Without an observer, no stats are collected, so queries pay nothing
+    for them. PathFinders that do not report stats ignore it.
+    """
+
     @abstractmethod
     def find_shortest_path(self, source: V, destination: V) -> Path[V] | None:
         """
@@ -27,3 +35,30 @@ class PathFinder[V](ABC):
         :param destination: The end node.
         """
         pass
+
+    def find_shortest_paths(self, queries: list[tuple[V, V]]) -> list[Path[V] | None]:
+        """
+        Compute the shortest paths of several (source, destination) pairs, see find_shortest_path.
+
+        PathFinders may answer a batch faster than single queries, e.g. RoutingKit answers them in one call that
+        releases the GIL, so other threads run meanwhile.
+        """
+        return [self.find_shortest_path(source, destination) for source, destination in queries]
+
+    def distance_matrix(self, sources: list[V], destinations: list[V]) -> list[list[float | None]]:
+        """
+        Compute the cost of the shortest path from each source to each destination.
+
+        :return: a list per source of the cost to each destination, None if there is no path.
+        """
+        paths = iter(self.find_shortest_paths([(source, destination) for source in sources
+                                               for destination in destinations]))
+        return [[None if (path := next(paths)) is None else path.cost for _ in destinations] for _ in sources]
+
+    @property
+    def data_version(self) -> Hashable:
+        """
+        Changes whenever the data used to find paths changes, so paths found before may not be shortest anymore.
+        PathFinders whose data can't change return a constant.
+        """
+        return 0
@@ -0,0 +1,193 @@
+import hashlib
+import json
+import math
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import networkx as nx
+import numpy as np
+from auto_all import public
+
+from generalized_path_finding.model.artifact_cache import Artifact, DEFAULT_ARTIFACT_CACHE
+from generalized_path_finding.model.profiling import span
+
+PREPARED_LAYOUT_VERSION = 1
+"""The version of the file format of PreparedLayout. Files of other versions are not loaded."""
+
+MISSING_INT = np.iinfo(np.int64).min
+"""Marks the edges without an integer attribute in PreparedLayout.ints."""
+
+
+@public
+@dataclass
+class PreparedLayout:
+    """
+    A binary snapshot of the graph a DataProvider extracted from a layout file, which can be restored much faster than
+    parsing the file again.
+
+    Nodes and edges are stored as arrays of indices and numeric attributes, which are usually memory-mapped from .npy
+    files, see PreparedLayout.load. Attributes holding objects of the file, e.g. the lif_edge of LIF graphs, are not
+    stored.
+    """
+
+    node_ids: list[Hashable]
+    """The IDs of the nodes, in the order of the nodes of the graph."""
+
+    coordinates: np.ndarray
+    """coordinates[node] is the (x, y) position of the node, e.g. for heuristics."""
+
+    edge_ids: list[Hashable]
+    """The keys of the edges, in the order of the edges of the graph."""
+
+    tails: np.ndarray
+    """tails[edge] is the index of the start node of the edge."""
+
+    heads: np.ndarray
+    """heads[edge] is the index of the end node of the edge."""
+
+    float_keys: list[str]
+    """The keys of the float-valued edge attributes, e.g. weights, in the order of the rows of floats."""
+
+    floats: np.ndarray
+    """floats[key, edge] is the value of the float attribute of the edge, or NaN if the edge does not have it."""
+
+    int_keys: list[str]
+    """The keys of the integer-valued edge attributes, e.g. permission bitsets, in the order of the rows of ints."""
+
+    ints: np.ndarray
+    """ints[key, edge] is the value of the integer attribute of the edge, or MISSING_INT if the edge does not have it."""
+
+    metadata: dict[str, Any] = field(default_factory=dict)
+    """JSON-serializable data of the DataProvider, e.g. the imputed vehicle type."""
+
+    @staticmethod
+    def of(
+            graph: nx.MultiDiGraph,
+            positions: dict[Hashable, tuple[float, float]],
+            float_keys: list[str],
+            int_keys: list[str],
+            metadata: dict[str, Any] | None = None,
+    ) -> "PreparedLayout":
+        """
+        Take a snapshot of a graph.
+
+        :param graph: the graph to take a snapshot of.
+        :param positions: the (x, y) position of each node of the graph.
+        :param float_keys: the float-valued edge attributes to store.
+        :param int_keys: the integer-valued edge attributes to store.
+        :param metadata: JSON-serializable data to store alongside the graph.
+        """
+        node_ids = list(graph.nodes)
+        node_index = {node: idx for idx, node in enumerate(node_ids)}
+        edges = list(graph.edges(keys=True, data=True))
+        floats = np.array([[attributes.get(key, math.nan) for _, _, _, attributes in edges] for key in float_keys],
+                          dtype=np.float64).reshape(len(float_keys), len(edges))
+        ints = np.array([[attributes.get(key, MISSING_INT) for _, _, _, attributes in edges] for key in int_keys],
+                        dtype=np.int64).reshape(len(int_keys), len(edges))
+        return PreparedLayout(
+            node_ids,
+            np.array([positions[node] for node in node_ids], dtype=np.float64).reshape(len(node_ids), 2),
+            [key for _, _, key, _ in edges],
+            np.array([node_index[u] for u, _, _, _ in edges], dtype=np.int32),
+            np.array([node_index[v] for _, v, _, _ in edges], dtype=np.int32),
+            float_keys,
+            floats,
+            int_keys,
+            ints,
+            metadata or {},
+        )
+
+    def to_graph(self) -> nx.MultiDiGraph:
+        """Restore the graph with the same order of nodes and edges and the stored edge attributes."""
+        with span("build graph from PreparedLayout"):
+            graph = nx.MultiDiGraph()
+            # nodes are added first, so nodes without edges keep their position in the order
+            graph.add_nodes_from(self.node_ids)
+            graph.add_edges_from(self.edges())
+        return graph
+
+    def edges(self) -> list[tuple[Hashable, Hashable, Hashable, dict[str, Any]]]:
+        """The edges as (start node, end node, key, attributes), as taken by MultiDiGraph.add_edges_from."""
+        node_ids = self.node_ids
+        float_columns = [(key, column.tolist()) for key, column in zip(self.float_keys, self.floats)]
+        int_columns = [(key, column.tolist()) for key, column in zip(self.int_keys, self.ints)]
+        edges = []
+        for idx, (tail, head, edge_id) in enumerate(zip(self.tails.tolist(), self.heads.tolist(), self.edge_ids)):
+            attributes = {key: column[idx] for key, column in float_columns if not math.isnan(column[idx])}
+            attributes.update((key, column[idx]) for key, column in int_columns if column[idx] != MISSING_INT)
+            edges.append((node_ids[tail], node_ids[head], edge_id, attributes))
+        return edges
+
+    def positions(self) -> dict[Hashable, tuple[float, float]]:
+        """The (x, y) position of each node."""
+        return {node: (x, y) for node, (x, y) in zip(self.node_ids, self.coordinates.tolist())}
+
+    def save(self, paths: list[str]):
+        """
+        Write the PreparedLayout to a .json file with the IDs and metadata, followed by one .npy file per array, see
+        artifact_paths.
+        """
+        header_path, *array_paths = paths
+        with open(header_path, "w") as f:
+            json.dump({
+                "version": PREPARED_LAYOUT_VERSION,
+                "node_ids": self.node_ids,
+                "edge_ids": self.edge_ids,
+                "float_keys": self.float_keys,
+                "int_keys": self.int_keys,
+                "metadata": self.metadata,
+            }, f)
+        for path, array in zip(array_paths, (self.coordinates, self.tails, self.heads, self.floats, self.ints)):
+            with open(path, "wb") as f:
+                np.save(f, array)
+
+    @staticmethod
+    def load(paths: list[str] | tuple[str, ...]) -> "PreparedLayout":
+        """Load a PreparedLayout written by save, memory-mapping the arrays."""
+        header_path, *array_paths = paths
+        with open(header_path) as f:
+            header = json.load(f)
+        if header.get("version") != PREPARED_LAYOUT_VERSION:
+            raise ValueError(f"{header_path} has version {header.get('version')} of the prepared layout format, "
+                             f"expected version {PREPARED_LAYOUT_VERSION}")
+        coordinates, tails, heads, floats, ints = (np.load(path, mmap_mode="r") for path in array_paths)
+        return PreparedLayout(header["node_ids"], coordinates, header["edge_ids"], tails, heads, header["float_keys"],
+                              floats, header["int_keys"], ints, header["metadata"])
+
+    @staticmethod
+    def artifact_paths(base_path: str | Path) -> list[str]:
+        """The paths of the files of a PreparedLayout cached next to base_path."""
+        return [f"{base_path}.json"] + [f"{base_path}.{name}.npy"
+                                        for name in ("coordinates", "tails", "heads", "floats", "ints")]
+
+    @staticmethod
+    def cached(
+            base_path: str | Path,
+            source: str | Path,
+            prepare: Callable[[], "PreparedLayout"],
+    ) -> "PreparedLayout":
+        """
+        Load the PreparedLayout cached next to base_path, after preparing it if it is missing or source changed.
+
+        :param base_path: identifies the PreparedLayout, so it should name the options it was prepared with.
+        :param source: the layout file the PreparedLayout is prepared from.
+        :param prepare: parses the layout file and takes a snapshot of its graph.
+        """
+        artifact = Artifact.of(*PreparedLayout.artifact_paths(base_path), source=source)
+
+        def build(paths: list[str]):
+            with span("prepare PreparedLayout", source=str(source)):
+                prepare().save(paths)
+
+        DEFAULT_ARTIFACT_CACHE.get(artifact, build)
+        with span("load PreparedLayout", path=str(base_path)):
+            return PreparedLayout.load(artifact.paths)
+
+
+def prepared_layout_hash(*options: Any) -> str:
+    """
+    Hash the options a PreparedLayout is prepared with and the version of the file format, to name its files.
+    """
+    return hashlib.sha256(repr((PREPARED_LAYOUT_VERSION, *options)).encode()).hexdigest()[:8]
@@ -0,0 +1,183 @@
+import json
+import threading
+import time
+import tracemalloc
+from collections.abc import Callable
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from auto_all import public
+
+_active_profiler: ContextVar["Profiler | None"] = ContextVar("active_profiler", default=None)
+
+_NO_SPAN = nullcontext()
+
+
+@public
+@dataclass
+class Span:
+    """A stage of preparing data, e.g. reading a file or building a graph, as recorded by a Profiler."""
+
+    name: str
+
+    start: float
+    """The start in seconds since the Profiler was created."""
+
+    seconds: float
+
+    depth: int
+    """The number of spans the span is nested in, in its thread."""
+
+    thread: str
+
+    memory_bytes: int | None = None
+    """
+    The peak of memory allocated by Python during the span above the memory allocated at its start, or None if the
+    Profiler does not trace memory.
+    """
+
+    attributes: dict[str, Any] = field(default_factory=dict)
+    """Details of the span, e.g. the file read."""
+
+
+@public
+def span(name: str, **attributes: Any) -> AbstractContextManager:
+    """
+    Mark a stage of preparing data, e.g. with span("build graph"): ..., for the active Profiler, see Profiler. Without
+    an active Profiler, this costs a lookup of a ContextVar only.
+
+    :param attributes: details of the stage, e.g. the file read.
+    """
+    profiler = _active_profiler.get()
+    if profiler is None:
+        return _NO_SPAN
+    return profiler.span(name, **attributes)
+
+
+class _OpenSpan:
+    def __init__(self, name: str, start: float, memory: int, attributes: dict[str, Any]):
+        self.name = name
+        self.start = start
+        self.memory = memory
+        self.peak = memory
+        self.attributes = attributes
+
+
+@public
+class Profiler:
+    def __init__(self, memory: bool = False, on_span: Callable[[Span], None] | None = None):
+        """
+        Records the spans of the stages of preparing data, e.g. of DataProviders, while it is active:
+
+        profiler = Profiler()
+        with profiler:
+            LifDataProvider("layout.json").get_networkx_data()
+        profiler.write_speedscope("layout.speedscope.json")
+
+        Spans of other threads are recorded if they are started in a copy of the active context, e.g. by
+        OsmDataProvider.prepare_osm_async.
+
+        :param memory: whether to trace the memory allocated by Python during each span using tracemalloc, which
+            slows down allocations considerably.
+        :param on_span: called with each span when it ends, e.g. print, from the thread of the span.
+        """
+        self.memory = memory
+        self.on_span = on_span
+        self.spans: list[Span] = []
+        """The recorded spans, in the order they ended."""
+
+        self._origin = time.perf_counter()
+        self._end: float | None = None
+        self._events: dict[str, list[tuple[str, str, float]]] = {}
+        """The (type, name, time) of the opening "O" and closing "C" of spans per thread, in order."""
+        self._stacks = threading.local()
+        self._lock = threading.Lock()
+        self._tokens = []
+        self._started_tracing = False
+
+    def __enter__(self) -> "Profiler":
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self._tokens.append(_active_profiler.set(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        _active_profiler.reset(self._tokens.pop())
+        if self._started_tracing and not self._tokens:
+            tracemalloc.stop()
+            self._started_tracing = False
+        self._end = time.perf_counter() - self._origin
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any):
+        """Record a span, even if the Profiler is not active. See the function span for use in library code."""
+        stack: list[_OpenSpan] = self._stacks.__dict__.setdefault("stack", [])
+        thread = threading.current_thread().name
+        memory = 0
+        if self.memory and tracemalloc.is_tracing():
+            memory, peak = tracemalloc.get_traced_memory()
+            # the peak is global, so keep the enclosing span's peak before resetting it for this one
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, peak)
+            tracemalloc.reset_peak()
+        opened = _OpenSpan(name, time.perf_counter() - self._origin, memory, attributes)
+        self._record(thread, "O", name, opened.start)
+        stack.append(opened)
+        try:
+            yield
+        finally:
+            stack.pop()
+            end = time.perf_counter() - self._origin
+            memory_bytes = None
+            if self.memory and tracemalloc.is_tracing():
+                opened.peak = max(opened.peak, tracemalloc.get_traced_memory()[1])
+                memory_bytes = opened.peak - opened.memory
+                if stack:
+                    stack[-1].peak = max(stack[-1].peak, opened.peak)
+            self._record(thread, "C", name, end)
+            finished = Span(name, opened.start, end - opened.start, len(stack), thread, memory_bytes, attributes)
+            with self._lock:
+                self.spans.append(finished)
+            if self.on_span is not None:
+                self.on_span(finished)
+
+    def _record(self, thread: str, event_type: str, name: str, at: float):
+        with self._lock:
+            self._events.setdefault(thread, []).append((event_type, name, at))
+
+    def to_speedscope(self, name: str = "preparation") -> dict[str, Any]:
+        """
+        The spans in the evented format of speedscope (https://www.speedscope.app), with a profile per thread, which
+        other flame graph viewers like Perfetto import as well.
+        """
+        with self._lock:
+            events = {thread: list(thread_events) for thread, thread_events in self._events.items()}
+        end = self._end if self._end is not None else time.perf_counter() - self._origin
+        frames: dict[str, int] = {}
+        profiles = []
+        for thread, thread_events in events.items():
+            profiles.append({
+                "type": "evented",
+                "name": thread,
+                "unit": "seconds",
+                "startValue": 0.0,
+                "endValue": max(end, thread_events[-1][2]),
+                "events": [{"type": event_type, "frame": frames.setdefault(frame, len(frames)), "at": at}
+                           for event_type, frame, at in thread_events],
+            })
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "generalized_path_finding",
+            "shared": {"frames": [{"name": frame} for frame in frames]},
+            "profiles": profiles,
+        }
+
+    def write_speedscope(self, path: str | Path, name: str | None = None):
+        """Write the spans to a speedscope file, see to_speedscope. Open it with https://www.speedscope.app."""
+        with open(path, "w") as f:
+            json.dump(self.to_speedscope(name if name is not None else Path(path).stem), f)
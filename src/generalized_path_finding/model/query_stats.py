@@ -0,0 +1,110 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any
+
+from auto_all import public
+
+from generalized_path_finding.model.path import Path
+
+
+@public
+@dataclass
+class QueryStats:
+    """
+    The work a PathFinder did for one query, as reported to its QueryObserver. Counters the PathFinder cannot observe
+    are None, e.g. the edges relaxed by RoutingKit's ContractionHierarchyQuery, which pyroutingkit does not expose.
+    """
+
+    path_finder: str
+    """The name of the class of the PathFinder."""
+
+    nodes_settled: int | None = None
+    """The number of nodes whose shortest distance was final and whose edges were scanned."""
+
+    edges_relaxed: int | None = None
+    """The number of edges scanned from settled nodes."""
+
+    heuristic_calls: int | None = None
+
+    seconds: dict[str, float] = field(default_factory=dict)
+    """
+    The time spent in each phase of the query, e.g. validation of the nodes, search, unpack of the arcs found and
+    conversion of them to the Path in the nodes and edges of the graph.
+    """
+
+    _lap_start: float = field(default_factory=time.perf_counter, repr=False, compare=False)
+
+    def lap(self, phase: str):
+        """Add the time since the creation of the QueryStats or the previous lap to the given phase."""
+        now = time.perf_counter()
+        self.seconds[phase] = self.seconds.get(phase, 0.0) + now - self._lap_start
+        self._lap_start = now
+
+    def move(self, seconds: float, from_phase: str, to_phase: str):
+        """
+        Move seconds from one phase to another, e.g. the part of a lap spent in a native call that both searched and
+        counted settled nodes.
+        """
+        self.seconds[from_phase] = self.seconds.get(from_phase, 0.0) - seconds
+        self.seconds[to_phase] = self.seconds.get(to_phase, 0.0) + seconds
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(self.seconds.values())
+
+    def per_query(self, queries: int, nodes_settled: int | None = None) -> "QueryStats":
+        """
+        The QueryStats of one of several queries answered together, e.g. by PathFinder.find_shortest_paths, with an
+        equal share of the time spent in each phase.
+        """
+        return QueryStats(self.path_finder, nodes_settled,
+                          seconds={phase: seconds / queries for phase, seconds in self.seconds.items()})
+
+
+@public
+class QueryObserver(ABC):
+    """
+    Receives the QueryStats of each query of the PathFinders it is the observer of, see PathFinder.observer. Implement
+    it to export them to a metrics collector, e.g. as a Prometheus histogram of the search time per PathFinder:
+
+    class PrometheusObserver(QueryObserver):
+        def on_query(self, source, destination, path, stats):
+            SEARCH_SECONDS.labels(stats.path_finder).observe(stats.seconds.get("search", 0.0))
+
+    on_query is called in the thread of the query, so it should be fast and thread-safe.
+    """
+
+    @abstractmethod
+    def on_query(self, source: Any, destination: Any, path: Path | None, stats: QueryStats):
+        """
+        :param path: the path found, or None if there is none.
+        """
+        pass  # pragma: no cover
+
+
+@public
+class QueryStatsCollector(QueryObserver):
+    def __init__(self):
+        """
+        A QueryObserver keeping the QueryStats of the last query and the sums of all queries, e.g. for tests and
+        debugging.
+        """
+        self.last: QueryStats | None = None
+        self.queries = 0
+        self.nodes_settled = 0
+        self.edges_relaxed = 0
+        self.heuristic_calls = 0
+        self.seconds: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def on_query(self, source: Any, destination: Any, path: Path | None, stats: QueryStats):
+        with self._lock:
+            self.last = stats
+            self.queries += 1
+            self.nodes_settled += stats.nodes_settled or 0
+            self.edges_relaxed += stats.edges_relaxed or 0
+            self.heuristic_calls += stats.heuristic_calls or 0
+            for phase, seconds in stats.seconds.items():
+                self.seconds[phase] = self.seconds.get(phase, 0.0) + seconds
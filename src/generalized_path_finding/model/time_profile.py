@@ -0,0 +1,64 @@
+from bisect import bisect_right
+from dataclasses import dataclass, field
+
+from auto_all import public
+
+SECONDS_PER_DAY = 86_400.0
+
+
+@public
+@dataclass
+class TimeProfile:
+    """
+    A periodic piecewise-linear function of time, e.g. the time waiting for an elevator over the course of a day.
+
+    Between the breakpoints, values are interpolated linearly, also from the last breakpoint to the first one of the
+    next period. Profiles must satisfy the FIFO property, i.e. leaving later never arrives earlier, so that
+    time-dependent searches like TimeDependentAStar stay exact: values must not decrease faster than time passes.
+    """
+
+    times: list[float]
+    """The breakpoints in seconds since the start of the period, ascending and in [0, period)."""
+
+    values: list[float]
+    """The non-negative value at each breakpoint, e.g. a wait time in seconds."""
+
+    period: float = SECONDS_PER_DAY
+    """The length of the period in seconds, defaults to a day."""
+
+    _times: list[float] = field(init=False, repr=False, compare=False)
+    """times extended by the neighboring breakpoints of the previous and next period."""
+
+    _values: list[float] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        if len(self.times) == 0 or len(self.times) != len(self.values):
+            raise ValueError(f"TimeProfile needs as many values as times, and at least one, but has {len(self.times)} "
+                             f"times and {len(self.values)} values")
+        ascending = all(a < b for a, b in zip(self.times, self.times[1:]))
+        if not ascending or not 0 <= self.times[0] or not self.times[-1] < self.period:
+            raise ValueError(f"times of TimeProfile must be ascending and in [0, {self.period}): {self.times}")
+        if any(value < 0 for value in self.values):
+            raise ValueError(f"values of TimeProfile must be non-negative: {self.values}")
+
+        self._times = [self.times[-1] - self.period, *self.times, self.times[0] + self.period]
+        self._values = [self.values[-1], *self.values, self.values[0]]
+        for (t1, v1), (t2, v2) in zip(zip(self._times, self._values), zip(self._times[1:], self._values[1:])):
+            if t2 > t1 and (v2 - v1) / (t2 - t1) < -1:
+                raise ValueError(f"TimeProfile violates the FIFO property between {t1} and {t2}, its value must not "
+                                 f"decrease faster than time passes")
+
+    @staticmethod
+    def constant(value: float, period: float = SECONDS_PER_DAY) -> "TimeProfile":
+        return TimeProfile([0.0], [value], period)
+
+    def __call__(self, time: float) -> float:
+        """
+        :param time: seconds since the start of any period, e.g. since midnight if the period is a day.
+        :return: the value at that time, found by binary search over the breakpoints.
+        """
+        t = time % self.period
+        idx = bisect_right(self._times, t)
+        t1, t2 = self._times[idx - 1], self._times[idx]
+        v1, v2 = self._values[idx - 1], self._values[idx]
+        return v1 + (v2 - v1) * (t - t1) / (t2 - t1)
@@ -0,0 +1,397 @@
+"""
+An asyncio routing server answering shortest path queries over HTTP/JSON, on a TCP port or a Unix socket:
+
+python -m generalized_path_finding.routing_server layout.json --port 8080
+
+POST /route {"source": "N1", "destination": "N2"} returns {"path": {"nodes": [...], "edges": [...], "cost": 4.2}},
+POST /distance_matrix {"sources": [...], "destinations": [...]} returns {"distances": [[...], ...]} and GET /metrics
+returns the RoutingServerMetrics. A request may name the PathFinder to use by "path_finder".
+"""
+import argparse
+import asyncio
+import dataclasses
+import json
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from http import HTTPStatus
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from auto_all import public
+
+from generalized_path_finding.model.pathfinder import PathFinder
+
+DEFAULT_PATH_FINDER = "default"
+"""The name of the PathFinder used by requests that do not name one."""
+
+
+@public
+@dataclass(frozen=True)
+class RoutingServerOptions:
+    """Options of a RoutingServer."""
+
+    max_batch_size: int = 64
+    """The maximum number of route requests answered by one call of PathFinder.find_shortest_paths."""
+
+    max_batch_delay: float = 0.002
+    """The number of seconds to wait for more requests after the first request of a batch."""
+
+    max_queue_size: int = 1024
+    """The maximum number of pending requests per PathFinder. Further requests are rejected as Overloaded."""
+
+    workers: int | None = None
+    """The number of threads running batches. Defaults to one per PathFinder."""
+
+    latency_window: int = 10_000
+    """The number of most recent requests whose latencies are kept for the metrics."""
+
+    max_request_bytes: int = 1 << 20
+    """The maximum size of the body of an HTTP request. Larger requests are rejected with 413 Content Too Large."""
+
+
+@public
+@dataclass(frozen=True)
+class RoutingServerMetrics:
+    requests: int
+    """The number of answered requests, including failed ones."""
+
+    rejected: int
+    """The number of requests rejected because the queue of their PathFinder was full."""
+
+    errors: int
+    """The number of requests that failed, e.g. because of unknown nodes."""
+
+    batches: int
+    """The number of calls of the PathFinders."""
+
+    queued: int
+    """The number of currently pending requests."""
+
+    mean_batch_size: float | None
+    latency_p50_seconds: float | None
+    """The median time from receiving to answering a request, of the last latency_window requests."""
+
+    latency_p99_seconds: float | None
+    throughput_rps: float | None
+    """The requests answered per second, over the last latency_window requests."""
+
+
+@public
+class Overloaded(Exception):
+    """Raised if a request is rejected because the queue of its PathFinder is full."""
+    pass
+
+
+@dataclass
+class _Request:
+    args: tuple
+    """(source, destination) of a route request or (sources, destinations) of a distance matrix request."""
+
+    is_matrix: bool
+    future: asyncio.Future
+    received: float
+
+
+@public
+class RoutingServer:
+    def __init__(
+            self,
+            path_finders: dict[str, PathFinder],
+            options: RoutingServerOptions = RoutingServerOptions(),
+            node_from_json: Callable[[Any], Any] | None = None,
+    ):
+        """
+        Serves the given PathFinders, which are created once, e.g. by create_path_finder, and shared by all requests:
+
+        async with RoutingServer({DEFAULT_PATH_FINDER: create_path_finder(LifDataProvider("layout.json"))}) as server:
+            http_server = await server.serve(port=8080)
+            await http_server.serve_forever()
+
+        Concurrent route requests for the same PathFinder are collected into batches answered by one call of
+        find_shortest_paths in a thread pool, so the event loop stays responsive and PathFinders that release the GIL,
+        e.g. RoutingKit, run in parallel to it. Each PathFinder runs one batch at a time, so it needs not be
+        thread-safe. Requests wait in a bounded queue per PathFinder and are rejected as Overloaded if it is full.
+
+        :param path_finders: the PathFinders by the name requests use, DEFAULT_PATH_FINDER for requests naming none.
+        :param node_from_json: converts nodes of JSON requests to nodes of the PathFinders, e.g. lists to GeoCoords.
+        Defaults to using them as they are.
+        """
+        self.path_finders = path_finders
+        self.options = options
+        self.node_from_json = node_from_json if node_from_json is not None else lambda node: node
+
+        self._queues = {name: asyncio.Queue(options.max_queue_size) for name in path_finders}
+        self._executor = None
+        self._tasks = []
+        self._requests = 0
+        self._rejected = 0
+        self._errors = 0
+        self._batches = 0
+        self._batched_requests = 0
+        # (latency, completion time) of the most recent requests
+        self._latencies = deque(maxlen=options.latency_window)
+
+    async def __aenter__(self) -> "RoutingServer":
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def start(self):
+        """Start running batches. Called by serve, serve_unix and async with."""
+        if self._executor is not None:
+            return
+        workers = self.options.workers if self.options.workers is not None else len(self.path_finders)
+        self._executor = ThreadPoolExecutor(max(workers, 1), thread_name_prefix="RoutingServer")
+        self._tasks = [asyncio.create_task(self._run_batches(self.path_finders[name], queue))
+                       for name, queue in self._queues.items()]
+
+    async def close(self):
+        """Stop running batches, failing pending requests."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for queue in self._queues.values():
+            while not queue.empty():
+                queue.get_nowait().future.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8080) -> asyncio.Server:
+        """Answer HTTP requests on the given TCP port, or on a free one if it is 0, see asyncio.Server.sockets."""
+        self.start()
+        return await asyncio.start_server(self._handle_connection, host, port)
+
+    async def serve_unix(self, path: str | Path) -> asyncio.Server:
+        """Answer HTTP requests on the given Unix socket."""
+        self.start()
+        return await asyncio.start_unix_server(self._handle_connection, str(path))
+
+    async def route(self, source: Any, destination: Any, path_finder: str = DEFAULT_PATH_FINDER):
+        """
+        Find the shortest path from source to destination, as part of the next batch of the PathFinder.
+
+        :raises Overloaded: if the queue of the PathFinder is full.
+        """
+        return await self._submit(path_finder, (source, destination), False)
+
+    async def distance_matrix(self, sources: list, destinations: list, path_finder: str = DEFAULT_PATH_FINDER):
+        """
+        Compute the costs from each source to each destination, see PathFinder.distance_matrix.
+
+        :raises Overloaded: if the queue of the PathFinder is full.
+        """
+        return await self._submit(path_finder, (sources, destinations), True)
+
+    def metrics(self) -> RoutingServerMetrics:
+        latencies = [latency for latency, _ in self._latencies]
+        p50, p99 = np.percentile(latencies, [50, 99]).tolist() if latencies else (None, None)
+        throughput = None
+        if len(self._latencies) >= 2:
+            # the requests completed after the first one in the window, during the time since it completed
+            elapsed = self._latencies[-1][1] - self._latencies[0][1]
+            throughput = (len(self._latencies) - 1) / elapsed if elapsed > 0 else None
+        return RoutingServerMetrics(
+            requests=self._requests,
+            rejected=self._rejected,
+            errors=self._errors,
+            batches=self._batches,
+            queued=sum(queue.qsize() for queue in self._queues.values()),
+            mean_batch_size=self._batched_requests / self._batches if self._batches else None,
+            latency_p50_seconds=p50,
+            latency_p99_seconds=p99,
+            throughput_rps=throughput,
+        )
+
+    async def _submit(self, path_finder: str, args: tuple, is_matrix: bool):
+        if path_finder not in self._queues:
+            raise KeyError(f"Unknown PathFinder {path_finder}, expected one of {list(self._queues)}")
+        request = _Request(args, is_matrix, asyncio.get_running_loop().create_future(), time.perf_counter())
+        try:
+            self._queues[path_finder].put_nowait(request)
+        except asyncio.QueueFull:
+            self._rejected += 1
+            raise Overloaded(f"More than {self.options.max_queue_size} requests are pending for {path_finder}")
+        return await request.future
+
+    async def _run_batches(self, path_finder: PathFinder, queue: asyncio.Queue):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.options.max_batch_delay
+            while len(batch) < self.options.max_batch_size:
+                if not queue.empty():
+                    batch.append(queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except TimeoutError:
+                    break
+
+            routes = [request for request in batch if not request.is_matrix]
+            if routes:
+                await self._execute(routes, path_finder.find_shortest_paths, [request.args for request in routes])
+            for request in batch:
+                if request.is_matrix:
+                    await self._execute([request], lambda args: [path_finder.distance_matrix(*args)], request.args)
+
+    async def _execute(self, requests: list[_Request], function: Callable[[Any], list], argument: Any):
+        """
+        Call function(argument) in the thread pool and answer the requests with the elements of its result.
+
+        Only successful calls are counted as batches, so a failed batch that is retried request by request is not
+        counted twice.
+        """
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(self._executor, function, argument)
+        except Exception as error:
+            if len(requests) == 1:
+                self._answer(requests[0], error=error)
+                return
+            # a single invalid request fails the whole batch, so answer the requests one by one to find it
+            for request in requests:
+                await self._execute([request], function, [request.args])
+            return
+        self._batches += 1
+        self._batched_requests += len(requests)
+        for request, result in zip(requests, results):
+            self._answer(request, result)
+
+    def _answer(self, request: _Request, result: Any = None, error: Exception | None = None):
+        self._requests += 1
+        now = time.perf_counter()
+        self._latencies.append((now - request.received, now))
+        if request.future.done():
+            return  # e.g. the connection of the request was closed
+        if error is not None:
+            self._errors += 1
+            request.future.set_exception(error)
+        else:
+            request.future.set_result(result)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while request_line := await reader.readline():
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                if length > self.options.max_request_bytes:
+                    # the body is not read, so the connection cannot be used for further requests
+                    await self._write_response(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {
+                        "error": f"The request has more than {self.options.max_request_bytes} bytes"})
+                    break
+                body = await reader.readexactly(length)
+
+                status, response = await self._respond(method, target, body)
+                await self._write_response(writer, status, response)
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass  # the client closed the connection or sent a malformed request, which cannot be answered
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _write_response(writer: asyncio.StreamWriter, status: HTTPStatus, response: Any):
+        try:
+            payload = json.dumps(response, default=_to_json).encode()
+        except (TypeError, ValueError) as error:
+            # e.g. nodes of a path which are not JSON serializable
+            status = HTTPStatus.INTERNAL_SERVER_ERROR
+            payload = json.dumps({"error": str(error)}).encode()
+        writer.write(f"HTTP/1.1 {status.value} {status.phrase}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(payload)}\r\n\r\n".encode("latin-1") + payload)
+        await writer.drain()
+
+    async def _respond(self, method: str, target: str, body: bytes) -> tuple[HTTPStatus, Any]:
+        try:
+            if (method, target) == ("GET", "/metrics"):
+                return HTTPStatus.OK, dataclasses.asdict(self.metrics())
+            if method == "POST" and target in ("/route", "/distance_matrix"):
+                request = json.loads(body)
+                path_finder = request.get("path_finder", DEFAULT_PATH_FINDER)
+                if target == "/route":
+                    path = await self.route(self.node_from_json(request["source"]),
+                                            self.node_from_json(request["destination"]), path_finder)
+                    return HTTPStatus.OK, {"path": path}
+                distances = await self.distance_matrix([self.node_from_json(node) for node in request["sources"]],
+                                                       [self.node_from_json(node) for node in request["destinations"]],
+                                                       path_finder)
+                return HTTPStatus.OK, {"distances": distances}
+            return HTTPStatus.NOT_FOUND, {"error": f"{method} {target} not found"}
+        except Overloaded as error:
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"error": str(error)}
+        except (KeyError, TypeError, ValueError) as error:
+            # unknown PathFinders, missing fields, malformed JSON and invalid nodes
+            return HTTPStatus.BAD_REQUEST, {"error": str(error)}
+        except Exception as error:
+            # e.g. a failing PathFinder, which should not close the connection without a response
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(error)}
+
+
+def _to_json(value: Any) -> Any:
+    if dataclasses.is_dataclass(value):
+        return dataclasses.asdict(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def main(argv: list[str] | None = None):
+    from generalized_path_finding.helper import Algorithm, create_path_finder
+    from generalized_path_finding.nodes import GeoCoords
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="the LIF (.json), MFN (.xlsx) or OpenStreetMap (.pbf) file to route in")
+    parser.add_argument("--algorithm", choices=[algorithm.name for algorithm in Algorithm], default="AUTO")
+    parser.add_argument("--fleet", help="the fleet of an MFN file")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--unix-socket", help="serve on this Unix socket instead of a TCP port")
+    parser.add_argument("--max-batch-size", type=int, default=RoutingServerOptions.max_batch_size)
+    parser.add_argument("--max-queue-size", type=int, default=RoutingServerOptions.max_queue_size)
+    args = parser.parse_args(argv)
+
+    node_from_json = None
+    match Path(args.path).suffix:
+        case ".json":
+            from generalized_path_finding.formats.lif import LifDataProvider
+            data_provider = LifDataProvider(args.path)
+        case ".xlsx":
+            from generalized_path_finding.formats.mfn_excel import MfnDataProvider
+            data_provider = MfnDataProvider(args.path, fleet=args.fleet)
+        case ".pbf":
+            from generalized_path_finding.formats.osm import OsmDataProvider
+            data_provider = OsmDataProvider(args.path)
+            # nodes are given as [latitude, longitude]
+            node_from_json = lambda node: GeoCoords(*node)
+        case _:
+            parser.error(f"unknown format of {args.path}")
+    path_finder = create_path_finder(data_provider, Algorithm[args.algorithm])
+    options = RoutingServerOptions(max_batch_size=args.max_batch_size, max_queue_size=args.max_queue_size)
+
+    async def serve():
+        async with RoutingServer({DEFAULT_PATH_FINDER: path_finder}, options, node_from_json) as server:
+            if args.unix_socket is not None:
+                http_server = await server.serve_unix(args.unix_socket)
+            else:
+                http_server = await server.serve(args.host, args.port)
+            async with http_server:
+                await http_server.serve_forever()
+
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main()
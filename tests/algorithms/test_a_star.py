@@ -1,6 +1,9 @@
 import networkx as nx
+import pytest
 
 from generalized_path_finding.algorithms import AStar
+from generalized_path_finding.model import QueryStatsCollector
+from generalized_path_finding.model.graph_overlay import GraphOverlay
 from generalized_path_finding.model.networkx_data import NetworkxData
 
 
@@ -42,3 +45,113 @@ def test_with_heuristic_and_no_path():
     path_finder = AStar(data)
     path = path_finder.find_shortest_path(0, 2)
     assert path is None
+
+
+def test_edge_without_weight_is_ignored():
+    # nx.astar_path(weight="weight") would take the direct edge at a cost of 1
+    graph = nx.MultiDiGraph()
+    graph.add_edge(0, 2, key="unweighted")
+    graph.add_edge(0, 1, key="E1", weight=1.0)
+    graph.add_edge(1, 2, key="E2", weight=2.0)
+    path = AStar(NetworkxData(graph, lambda u, v: 0.0)).find_shortest_path(0, 2)
+    assert path.edges == ["E1", "E2"] and path.cost == 3.0
+
+
+def make_overlay_path_finder():
+    # 0 -> 1 -> 3 is shorter than 0 -> 2 -> 3, and 1 -> 3 has a slower parallel edge
+    graph = nx.MultiDiGraph()
+    graph.add_edge(0, 1, key="0-1", weight=1.0)
+    graph.add_edge(1, 3, key="1-3", weight=1.0)
+    graph.add_edge(1, 3, key="1-3 slow", weight=2.0)
+    graph.add_edge(0, 2, key="0-2", weight=2.0)
+    graph.add_edge(2, 3, key="2-3", weight=2.0)
+    overlay = GraphOverlay()
+    return AStar(NetworkxData(graph, lambda u, v: 0.0), overlay), overlay
+
+
+def test_overlay_block_edge():
+    path_finder, overlay = make_overlay_path_finder()
+
+    overlay.block_edge(1, 3, "1-3")
+    path = path_finder.find_shortest_path(0, 3)
+    assert path.edges == ["0-1", "1-3 slow"] and path.cost == 3.0
+
+    overlay.block_edge(1, 3)
+    path = path_finder.find_shortest_path(0, 3)
+    assert path.edges == ["0-2", "2-3"] and path.cost == 4.0
+
+    overlay.unblock_edge(1, 3)
+    overlay.unblock_edge(1, 3, "1-3")
+    assert path_finder.find_shortest_path(0, 3).edges == ["0-1", "1-3"]
+    # the graph itself is unchanged
+    assert path_finder.data.graph.number_of_edges() == 5
+
+
+def test_overlay_block_node():
+    path_finder, overlay = make_overlay_path_finder()
+
+    overlay.block_node(1)
+    assert path_finder.find_shortest_path(0, 3).nodes == [0, 2, 3]
+    overlay.block_node(2)
+    assert path_finder.find_shortest_path(0, 3) is None
+    assert path_finder.find_shortest_path(0, 1) is None
+
+
+def test_overlay_multiplier():
+    path_finder, overlay = make_overlay_path_finder()
+
+    overlay.set_multiplier(0, 1, 3.0)
+    path = path_finder.find_shortest_path(0, 3)
+    assert path.nodes == [0, 2, 3] and path.cost == 4.0
+
+    overlay.set_multiplier(0, 1, 1.5, key="0-1")
+    path = path_finder.find_shortest_path(0, 3)
+    assert path.nodes == [0, 1, 3] and path.cost == 2.5
+
+    with pytest.raises(ValueError):
+        overlay.set_multiplier(0, 1, 0.5)
+
+
+def test_overlay_version():
+    overlay = GraphOverlay()
+    assert overlay.version == 0 and overlay.is_empty
+
+    overlay.block_edge(0, 1)
+    overlay.set_multiplier(1, 2, 2.0)
+    assert overlay.version == 2 and not overlay.is_empty
+
+    overlay.clear()
+    assert overlay.version == 3 and overlay.is_empty
+
+
+def test_overlay_snapshot():
+    overlay = GraphOverlay()
+    overlay.block_node(1)
+    snapshot = overlay.snapshot()
+    overlay.unblock_node(1)
+    overlay.block_edge(0, 2)
+    assert snapshot.is_node_blocked(1) and snapshot.edge_weight(0, 2, "0-2", 2.0) == 2.0
+    assert snapshot.version == 1 and overlay.version == 3
+
+
+def test_query_stats():
+    graph = nx.MultiDiGraph()
+    graph.add_edge(0, 1, key="E1", weight=1.0)
+    graph.add_edge(1, 2, key="E2", weight=2.0)
+    graph.add_edge(0, 3, key="E3", weight=5.0)
+    data = NetworkxData(graph, lambda u, v: 0.0)
+    path_finder = AStar(data)
+    path_finder.observer = QueryStatsCollector()
+    path = path_finder.find_shortest_path(0, 2)
+    assert path.nodes == [0, 1, 2]
+
+    stats = path_finder.observer.last
+    assert stats.path_finder == "AStar"
+    assert stats.nodes_settled == 2
+    assert stats.edges_relaxed == 3
+    assert stats.heuristic_calls == 3
+    assert stats.seconds.keys() == {"validation", "search", "conversion"}
+
+    assert path_finder.find_shortest_path(3, 0) is None
+    assert path_finder.observer.queries == 2
+    assert path_finder.observer.edges_relaxed == 3
@@ -0,0 +1,176 @@
+import threading
+import time
+
+import networkx as nx
+import pytest
+
+from generalized_path_finding.algorithms import AStar, CachingPathFinder, PathCacheOptions
+from generalized_path_finding.model import Path, PathFinder
+from generalized_path_finding.model.graph_overlay import GraphOverlay
+from generalized_path_finding.model.networkx_data import NetworkxData
+
+
+class CountingPathFinder[V](PathFinder[V]):
+    def __init__(self, path_finder: PathFinder[V]):
+        self.path_finder = path_finder
+        self.queries = 0
+
+    @property
+    def data_version(self):
+        return self.path_finder.data_version
+
+    def find_shortest_path(self, source: V, destination: V) -> Path[V] | None:
+        self.queries += 1
+        return self.path_finder.find_shortest_path(source, destination)
+
+
+def make_line_graph(overlay: GraphOverlay | None = None) -> CountingPathFinder[int]:
+    # 0 -> 1 -> 2 -> 3 with weight 1 each, and 4 is not connected
+    graph = nx.MultiDiGraph()
+    for u in range(3):
+        graph.add_edge(u, u + 1, key=f"{u}-{u + 1}", weight=1.0)
+    graph.add_node(4)
+    return CountingPathFinder(AStar(NetworkxData(graph, lambda u, v: 0.0), overlay))
+
+
+def edge_cost(u, v, key) -> float:
+    return 1.0
+
+
+def test_repeated_query_is_cached():
+    counting = make_line_graph()
+    path_finder = CachingPathFinder(counting)
+
+    first = path_finder.find_shortest_path(0, 3)
+    second = path_finder.find_shortest_path(0, 3)
+
+    assert first == second == Path([0, 1, 2, 3], ["0-1", "1-2", "2-3"], 3.0)
+    assert counting.queries == 1
+    assert path_finder.stats.hits == 1
+    assert path_finder.stats.misses == 1
+
+
+def test_missing_path_is_cached():
+    counting = make_line_graph()
+    path_finder = CachingPathFinder(counting)
+
+    assert path_finder.find_shortest_path(0, 4) is None
+    assert path_finder.find_shortest_path(0, 4) is None
+    assert counting.queries == 1
+
+
+def test_returned_paths_are_copies():
+    path_finder = CachingPathFinder(make_line_graph())
+
+    path_finder.find_shortest_path(0, 3).nodes.clear()
+
+    assert path_finder.find_shortest_path(0, 3).nodes == [0, 1, 2, 3]
+
+
+def test_least_recently_used_is_evicted():
+    counting = make_line_graph()
+    path_finder = CachingPathFinder(counting, PathCacheOptions(max_size=2))
+
+    path_finder.find_shortest_path(0, 1)
+    path_finder.find_shortest_path(0, 2)
+    path_finder.find_shortest_path(0, 1)  # (0, 2) is now the least recently used
+    path_finder.find_shortest_path(0, 3)
+    assert counting.queries == 3
+
+    path_finder.find_shortest_path(0, 1)
+    assert counting.queries == 3
+    path_finder.find_shortest_path(0, 2)
+    assert counting.queries == 4
+    assert path_finder.stats.evictions == 2
+    assert path_finder.stats.size == 2
+
+
+def test_paths_expire():
+    counting = make_line_graph()
+    path_finder = CachingPathFinder(counting, PathCacheOptions(ttl=0.05))
+
+    path_finder.find_shortest_path(0, 3)
+    path_finder.find_shortest_path(0, 3)
+    assert counting.queries == 1
+
+    time.sleep(0.1)
+    path_finder.find_shortest_path(0, 3)
+    assert counting.queries == 2
+
+
+def test_invalidate():
+    counting = make_line_graph()
+    path_finder = CachingPathFinder(counting)
+
+    path_finder.find_shortest_path(0, 3)
+    path_finder.invalidate()
+    path_finder.find_shortest_path(0, 3)
+
+    assert counting.queries == 2
+
+
+def test_overlay_change_invalidates():
+    overlay = GraphOverlay()
+    path_finder = CachingPathFinder(make_line_graph(overlay))
+
+    assert path_finder.find_shortest_path(0, 3) is not None
+    overlay.block_node(2)
+    assert path_finder.find_shortest_path(0, 3) is None
+    overlay.unblock_node(2)
+    assert path_finder.find_shortest_path(0, 3).cost == 3.0
+
+
+def test_prefixes_are_reused():
+    counting = make_line_graph()
+    path_finder = CachingPathFinder(counting, PathCacheOptions(reuse_subpaths=True), edge_cost)
+
+    path_finder.find_shortest_path(0, 3)
+    prefix = path_finder.find_shortest_path(0, 2)
+
+    assert prefix == Path([0, 1, 2], ["0-1", "1-2"], 2.0)
+    assert counting.queries == 1
+    assert path_finder.stats.subpath_hits == 1
+
+    # suffixes are not reused
+    path_finder.find_shortest_path(1, 3)
+    assert counting.queries == 2
+
+
+def test_prefixes_are_evicted_with_their_path():
+    counting = make_line_graph()
+    path_finder = CachingPathFinder(counting, PathCacheOptions(max_size=1, reuse_subpaths=True), edge_cost)
+
+    path_finder.find_shortest_path(0, 3)
+    path_finder.find_shortest_path(1, 2)
+    path_finder.find_shortest_path(0, 2)
+
+    assert counting.queries == 3
+
+
+def test_reuse_subpaths_requires_edge_cost():
+    with pytest.raises(ValueError):
+        CachingPathFinder(make_line_graph(), PathCacheOptions(reuse_subpaths=True))
+
+
+def test_concurrent_queries():
+    counting = make_line_graph()
+    path_finder = CachingPathFinder(counting, PathCacheOptions(max_size=3, reuse_subpaths=True), edge_cost)
+    errors = []
+
+    def query():
+        try:
+            for i in range(200):
+                source, destination = i % 3, 3 - i % 2
+                assert path_finder.find_shortest_path(source, destination).nodes == list(range(source, destination + 1))
+        except AssertionError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=query) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    stats = path_finder.stats
+    assert stats.hits + stats.misses == 800
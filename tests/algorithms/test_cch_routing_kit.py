@@ -0,0 +1,96 @@
+import math
+
+import networkx as nx
+import pytest
+
+from generalized_path_finding.algorithms.cch_routing_kit import CchRoutingKit
+from generalized_path_finding.model import Path, QueryStatsCollector
+from generalized_path_finding.model.networkx_data import NetworkxData
+
+
+def make_graph():
+    # same demo graph as in test_nx_routing_kit, with a slower parallel edge
+    # 0 --2--> 1 --9--> 2 --5--> 5
+    #  \               /
+    #   3             4
+    #    \           /
+    #     3 ---1--> 4
+    return nx.MultiDiGraph([
+        (0, 1, "0 -> 1", {"weight": 2}),
+        (1, 2, "1 -> 2", {"weight": 9}),
+        (2, "5", '2 -> "5"', {"weight": 5}),
+        (0, 3, "0 -> 3", {"weight": 3}),
+        (3, 4, "3 -> 4", {"weight": 1}),
+        (3, 4, "3 -> 4 slow", {"weight": 2}),
+        (4, 2, "4 -> 2", {"weight": 4}),
+    ])
+
+
+def make_path_finder(tmp_path, coordinates=None):
+    nx_data: NetworkxData[int | str] = NetworkxData(make_graph(), lambda _a, _b: 0)
+    return CchRoutingKit(nx_data, cache_dir=tmp_path, coordinates=coordinates)
+
+
+def test_cch_routing_kit(tmp_path):
+    path_finder = make_path_finder(tmp_path)
+    path = path_finder.find_shortest_path(0, "5")
+
+    assert path == Path(nodes=[0, 3, 4, 2, '5'], edges=['0 -> 3', '3 -> 4', '4 -> 2', '2 -> "5"'], cost=13)
+    assert path_finder.find_shortest_path("5", 0) is None
+    assert path_finder.find_shortest_path(0, 0) == Path(nodes=[0], edges=[], cost=0)
+    assert len(list(tmp_path.glob("*.cch_order"))) == 1
+
+
+def test_query_stats(tmp_path):
+    path_finder = make_path_finder(tmp_path)
+    path_finder.observer = QueryStatsCollector()
+
+    path_finder.find_shortest_path(0, "5")
+
+    # at least the source and the destination, at most all nodes from both ends
+    assert 2 <= path_finder.observer.last.nodes_settled <= 2 * 6
+
+
+def test_coordinates(tmp_path):
+    positions = {0: (0, 0), 1: (1, 1), 2: (2, 1), "5": (3, 1), 3: (1, -1), 4: (2, -1)}
+    path_finder = make_path_finder(tmp_path, coordinates=positions.__getitem__)
+
+    assert path_finder.find_shortest_path(0, "5").cost == 13
+    assert len(list(tmp_path.glob("*.cch_order"))) == 1
+
+
+def test_update_weights(tmp_path):
+    path_finder = make_path_finder(tmp_path)
+    graph = path_finder.nx_data.graph
+
+    # congestion on 3 -> 4
+    graph.edges[3, 4, "3 -> 4"]["weight"] = 3
+    path_finder.update_weights()
+    assert path_finder.find_shortest_path(0, "5") == Path(
+        nodes=[0, 3, 4, 2, '5'], edges=['0 -> 3', '3 -> 4 slow', '4 -> 2', '2 -> "5"'], cost=14)
+
+    # closed edges
+    graph.edges[3, 4, "3 -> 4"]["weight"] = math.inf
+    graph.edges[3, 4, "3 -> 4 slow"]["weight"] = math.inf
+    path_finder.update_weights()
+    assert path_finder.find_shortest_path(0, "5") == Path(
+        nodes=[0, 1, 2, '5'], edges=['0 -> 1', '1 -> 2', '2 -> "5"'], cost=16)
+
+    # new NetworkxData with the original weights
+    path_finder.update_weights(NetworkxData(make_graph(), lambda _a, _b: 0))
+    assert path_finder.find_shortest_path(0, "5").cost == 13
+
+
+def test_changed_topology(tmp_path):
+    path_finder = make_path_finder(tmp_path)
+
+    path_finder.nx_data.graph.add_edge(1, 4, "1 -> 4", weight=1)
+    with pytest.raises(ValueError):
+        path_finder.update_weights()
+
+
+def test_node_out_of_bounds(tmp_path):
+    path_finder = make_path_finder(tmp_path)
+
+    with pytest.raises(ValueError):
+        path_finder.find_shortest_path(0, 7)
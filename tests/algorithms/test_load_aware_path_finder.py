@@ -0,0 +1,68 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from generalized_path_finding.algorithms import AStar, CchRoutingKit, LoadAwarePathFinder, NxRoutingKit
+from generalized_path_finding.formats.lif import LifDataProvider, LifFleetDataProvider, LoadState
+
+current_path = Path(os.path.dirname(os.path.realpath(__file__)))
+
+UNLOADED = LoadState()
+LOADED = LoadState(loaded=True)
+LOADED_EUR = LoadState(loaded=True, load_set_name="EUR")
+
+
+@pytest.fixture
+def lif_with_load_restrictions(tmp_path) -> Path:
+    with open(current_path / "../formats/lif/LIF_4_4_MAPF.json") as f:
+        lif = json.load(f)
+    restrictions = {
+        # only loaded with EUR pallets or unloaded
+        "E-1_2-2_2": {"unloaded": True, "loaded": True, "loadSetNames": ["EUR"]},
+        # only loaded
+        "E-2_2-3_2": {"unloaded": False, "loaded": True},
+    }
+    for edge in lif["layouts"][0]["edges"]:
+        if edge["edgeId"] in restrictions:
+            edge["vehicleTypeEdgeProperties"][0]["loadRestriction"] = restrictions[edge["edgeId"]]
+    path = tmp_path / "LIF_load_restrictions.json"
+    with open(path, "w") as f:
+        json.dump(lif, f)
+    return path
+
+
+@pytest.mark.parametrize("path_finder_class", [AStar, NxRoutingKit, CchRoutingKit])
+def test_load_states(lif_with_load_restrictions, path_finder_class):
+    path_finder = LoadAwarePathFinder(LifDataProvider(lif_with_load_restrictions), path_finder_class)
+
+    assert path_finder.find_shortest_path("N_0_2", "N_3_3", UNLOADED) is None
+    assert path_finder.find_shortest_path("N_0_2", "N_2_2", UNLOADED).nodes == ['N_0_2', 'N_1_2', 'N_2_2']
+    assert path_finder.find_shortest_path("N_0_2", "N_3_3", LOADED) is None
+    path = path_finder.find_shortest_path("N_0_2", "N_3_3", LOADED_EUR)
+    assert path.nodes == ['N_0_2', 'N_1_2', 'N_2_2', 'N_3_2', 'N_3_3']
+    assert path.cost == pytest.approx(4)
+
+
+def test_path_finders_are_shared(lif_with_load_restrictions):
+    path_finder = LoadAwarePathFinder(LifDataProvider(lif_with_load_restrictions), load_state=LOADED_EUR)
+
+    assert path_finder.find_shortest_path("N_0_2", "N_3_3") is not None
+    # unknown load sets may use the same edges as loaded vehicles without load set
+    assert path_finder.path_finder(LOADED) is path_finder.path_finder(LoadState(loaded=True, load_set_name="unknown"))
+    assert path_finder.path_finder(LOADED).data.graph is path_finder.path_finder(UNLOADED).data.graph
+
+
+def test_without_load_state_restrictions_are_ignored(lif_with_load_restrictions):
+    path_finder = AStar(LifDataProvider(lif_with_load_restrictions).get_networkx_data())
+
+    assert path_finder.find_shortest_path("N_0_2", "N_3_3") is not None
+
+
+def test_fleet(lif_with_load_restrictions):
+    fleet = LifFleetDataProvider(lif_with_load_restrictions)
+    path_finder = LoadAwarePathFinder(fleet.for_vehicle_type("robot"))
+
+    assert path_finder.find_shortest_path("N_0_2", "N_3_3") is None
+    assert path_finder.find_shortest_path("N_0_2", "N_3_3", LOADED_EUR) is not None
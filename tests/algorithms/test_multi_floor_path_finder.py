@@ -0,0 +1,59 @@
+import os
+import pathlib
+import random
+
+import networkx as nx
+import pytest
+
+from generalized_path_finding.algorithms import AStar, MultiFloorPathFinder
+from generalized_path_finding.formats.mfn_excel import MfnDataProvider
+from generalized_path_finding.model import NetworkxData
+
+current_path = pathlib.Path(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_find_shortest_path_mfn():
+    data_provider = MfnDataProvider(current_path / "../formats/mfn_excel/MFN_example.xlsx", fleet="Roboter")
+    data = data_provider.get_networkx_data()
+    path_finder = MultiFloorPathFinder(data, data_provider.get_floors())
+
+    path = path_finder.find_shortest_path("3-E0", "1-E1")
+    assert path.nodes == ["3-E0", "2-E0", "1-E0", "1-E1"]
+    assert path.edges == ["Path_2B", "Path_1B", "Connection1"]
+    assert path.cost == pytest.approx(AStar(data).find_shortest_path("3-E0", "1-E1").cost)
+    assert path_finder.find_shortest_path("1-E1", "1-E1").nodes == ["1-E1"]
+
+    with pytest.raises(ValueError):
+        path_finder.find_shortest_path("3-E0", "unknown")
+
+
+def test_compare_to_a_star():
+    random.seed(0)
+    graph = nx.MultiDiGraph()
+    floors = {}
+    for floor in range(3):
+        for i in range(8):
+            for j in range(8):
+                floors[f"{floor}-{i}-{j}"] = floor
+                for di, dj in ((1, 0), (0, 1), (-1, 0), (0, -1)):
+                    if 0 <= i + di < 8 and 0 <= j + dj < 8 and random.random() < 0.8:
+                        graph.add_edge(f"{floor}-{i}-{j}", f"{floor}-{i + di}-{j + dj}", f"{floor}-{i}-{j}-{di}-{dj}",
+                                       weight=random.uniform(1, 2))
+    for floor in range(2):
+        for elevator in range(2):
+            i, j = random.randrange(8), random.randrange(8)
+            graph.add_edge(f"{floor}-{i}-{j}", f"{floor + 1}-{i}-{j}", f"up-{floor}-{elevator}", weight=5)
+            graph.add_edge(f"{floor + 1}-{i}-{j}", f"{floor}-{i}-{j}", f"down-{floor}-{elevator}", weight=5)
+    data = NetworkxData(graph, lambda a, b: 0)
+    path_finder, a_star = MultiFloorPathFinder(data, floors), AStar(data)
+
+    nodes = list(graph.nodes)
+    for _ in range(200):
+        source, destination = random.choice(nodes), random.choice(nodes)
+        path = path_finder.find_shortest_path(source, destination)
+        expected = a_star.find_shortest_path(source, destination)
+        if expected is None:
+            assert path is None
+        else:
+            assert path.cost == pytest.approx(expected.cost)
+            assert path.nodes[0] == source and path.nodes[-1] == destination
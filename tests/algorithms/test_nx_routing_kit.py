@@ -6,7 +6,7 @@ import networkx as nx
 import pytest
 
 from generalized_path_finding.algorithms.nx_routing_kit import NxRoutingKit
-from generalized_path_finding.model import Path
+from generalized_path_finding.model import Path, QueryStatsCollector
 from generalized_path_finding.model.networkx_data import NetworkxData
 from tests.util import remove_cache_file_if_coverage
 
@@ -78,3 +78,28 @@ def test_nx_routing_kit_with_multigraph():
 
     path = path_finder.find_shortest_path(0, "5")
     assert path == Path(nodes=[0, 3, 4, 2, '5'], edges=['0 -> 3', '3 -> 4', '4 -> 2', '2 -> "5" (alt)'], cost=12)
+
+
+def test_batch_queries():
+    path_finder = make_path_finder()
+    queries = [(0, "5"), (3, 2), ("5", 0), (4, 4)]
+    paths = path_finder.find_shortest_paths(queries)
+    assert paths == [path_finder.find_shortest_path(source, destination) for source, destination in queries]
+    assert paths[2] is None
+    assert paths[3] == Path(nodes=[4], edges=[], cost=0)
+
+    assert path_finder.distance_matrix([0, 3], ["5", 4, 0]) == [[13, 4, 0], [10, 1, None]]
+
+
+def test_query_stats():
+    path_finder = make_path_finder()
+    path_finder.observer = QueryStatsCollector()
+
+    path_finder.find_shortest_path(0, "5")
+    assert path_finder.observer.last.nodes_settled > 0
+
+    # batches report each query
+    path_finder.find_shortest_paths([(0, "5"), (3, 2), ("5", 0)])
+    assert path_finder.observer.queries == 4
+    assert path_finder.observer.last.nodes_settled > 0
+    assert set(path_finder.observer.last.seconds) == {"validation", "search", "counting", "unpack", "conversion"}
@@ -120,3 +120,18 @@ def test_graph_conversion():
     path_finder = OsmRoutingKit(osm_data)
     path = path_finder.find_shortest_path(ORIGIN, DESTINATION)
     assert path is not None
+
+
+def test_update_data():
+    dp_car = OsmDataProvider(local_path("../formats/osm/andorra-latest.osm.pbf"))
+    dp_bike = OsmDataProvider(local_path("../formats/osm/andorra-latest.osm.pbf"), transport_mode=TransportMode.BIKE)
+    bike_data = dp_bike.get_osm_ch_data()
+
+    path_finder = OsmRoutingKit(dp_car.get_osm_ch_data())
+    path_car = path_finder.find_shortest_path(ORIGIN, DESTINATION)
+    path_finder.update_data(bike_data)
+    path_bike = path_finder.find_shortest_path(ORIGIN, DESTINATION)
+
+    assert path_finder.ch_file == bike_data.ch_file
+    assert path_bike.cost == OsmRoutingKit(bike_data).find_shortest_path(ORIGIN, DESTINATION).cost
+    assert path_bike.cost != path_car.cost
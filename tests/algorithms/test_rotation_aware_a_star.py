@@ -0,0 +1,225 @@
+import json
+import math
+from pathlib import Path
+
+import pytest
+
+from generalized_path_finding.algorithms import AStar, RotationAwareAStar, RotationAwareRoutingKit
+from generalized_path_finding.formats.lif import LifDataProvider, RotationModel, HeadingState
+
+# a square of nodes with side length 1:
+# D - C
+# |   |
+# A - B
+POSITIONS = {"A": (0.0, 0.0), "B": (1.0, 0.0), "C": (1.0, 1.0), "D": (0.0, 1.0)}
+
+
+def write_lif(tmp_path: Path, edges: dict[str, dict]) -> Path:
+    """
+    :param edges: maps "AB" to the vehicle type properties of the edge from A to B, in addition to the defaults.
+    """
+    lif = {
+        "metaInformation": {
+            "projectIdentification": "LIF Rotation Test",
+            "exportTimestamp": "2024-11-26 12:58:51.426221",
+            "lifVersion": "1.0.0",
+            "creator": "",
+        },
+        "layouts": [{
+            "layoutId": "map1",
+            "nodes": [{
+                "nodeId": node_id,
+                "mapId": "map1",
+                "nodePosition": {"x": x, "y": y},
+                "vehicleTypeNodeProperties": [{"vehicleTypeId": "robot", "actions": []}],
+            } for node_id, (x, y) in POSITIONS.items()],
+            "edges": [{
+                "edgeId": edge_id,
+                "startNodeId": edge_id[0],
+                "endNodeId": edge_id[1],
+                "vehicleTypeEdgeProperties": [{
+                    "vehicleTypeId": "robot",
+                    "rotationAllowed": False,
+                    "maxSpeed": 1.0,
+                    "maxRotationSpeed": math.pi / 2,
+                    "actions": [],
+                } | properties],
+            } for edge_id, properties in edges.items()],
+            "stations": [],
+        }],
+    }
+    path = tmp_path / "LIF_rotation.json"
+    with open(path, "w") as f:
+        json.dump(lif, f)
+    return path
+
+
+def make_model(tmp_path: Path, edges: dict[str, dict], time_cost: bool = True) -> RotationModel:
+    return RotationModel(LifDataProvider(write_lif(tmp_path, edges), time_cost=time_cost, trajectories=True))
+
+
+def test_requires_trajectories(tmp_path):
+    with pytest.raises(ValueError):
+        RotationModel(LifDataProvider(write_lif(tmp_path, {"AB": {}}), time_cost=True))
+
+
+def test_rejects_snapshot(tmp_path):
+    with pytest.raises(ValueError, match="snapshot"):
+        RotationModel(LifDataProvider(write_lif(tmp_path, {"AB": {}}), trajectories=True, snapshot=True))
+
+
+def test_rotation_costs_time(tmp_path):
+    model = make_model(tmp_path, {"AB": {}, "BC": {}, "AD": {}, "DC": {}})
+
+    path = RotationAwareAStar(model).find_shortest_path("A", "C")
+
+    # both ways turn by 90 degrees, taking 1 second at Pi/2 rad/s
+    assert path.cost == pytest.approx(3.0)
+    assert len(path.edges) == 2
+
+
+def test_rotation_restriction_forces_detour(tmp_path):
+    model = make_model(tmp_path, {
+        "AB": {"rotationAtEndNodeAllowed": "NONE"}, "BC": {},
+        "AD": {"rotationAtEndNodeAllowed": "CW"}, "DC": {},
+    })
+
+    path = RotationAwareAStar(model).find_shortest_path("A", "C")
+
+    # the vehicle cannot turn at B, and turns right at D
+    assert path.nodes == ["A", "D", "C"]
+    assert path.edges == ["AD", "DC"]
+    assert path.cost == pytest.approx(3.0)
+
+
+def test_rotation_in_restricted_direction_takes_longer(tmp_path):
+    model = make_model(tmp_path, {"AB": {}, "BC": {"rotationAtStartNodeAllowed": "CW"}})
+
+    path = RotationAwareAStar(model).find_shortest_path("A", "C")
+
+    # turning left by turning right by 270 degrees
+    assert path.cost == pytest.approx(5.0)
+
+
+def test_no_path_without_rotation(tmp_path):
+    model = make_model(tmp_path, {"AB": {"rotationAtEndNodeAllowed": "NONE"}, "BC": {}})
+
+    assert RotationAwareAStar(model).find_shortest_path("A", "C") is None
+    # the layout itself is connected
+    assert AStar(model.data).find_shortest_path("A", "C") is not None
+
+
+def test_rotation_on_edge(tmp_path):
+    model = make_model(tmp_path, {"AB": {"rotationAtEndNodeAllowed": "NONE"}, "BC": {"rotationAllowed": True}})
+
+    path = RotationAwareAStar(model).find_shortest_path("A", "C")
+
+    assert path.nodes == ["A", "B", "C"]
+    assert path.cost == pytest.approx(3.0)
+
+
+def test_curved_trajectory(tmp_path):
+    # AB bends below the line from A to B, arriving at B heading towards C
+    trajectory = {
+        "degree": 2,
+        "knotVector": [0.0, 0.0, 0.0, 1.0, 1.0, 1.0],
+        "controlPoints": [{"x": 0.0, "y": 0.0}, {"x": 1.0, "y": -1.0}, {"x": 1.0, "y": 0.0}],
+    }
+    model = make_model(tmp_path, {"AB": {"trajectory": trajectory}, "BC": {}})
+
+    path = RotationAwareAStar(model).find_shortest_path("A", "C")
+
+    # no rotation at B, unlike on a straight edge from A to B
+    assert path.nodes == ["A", "B", "C"]
+    assert path.cost == pytest.approx(2.0)
+
+
+def test_trajectory_without_direction(tmp_path):
+    # all control points are the same, so the heading is that of the line from A to B
+    trajectory = {
+        "degree": 1,
+        "knotVector": [0.0, 0.0, 1.0, 1.0],
+        "controlPoints": [{"x": 0.0, "y": 0.0}, {"x": 0.0, "y": 0.0}],
+    }
+    model = make_model(tmp_path, {"AB": {"trajectory": trajectory}, "BC": {}})
+
+    path = RotationAwareAStar(model).find_shortest_path("A", "C")
+
+    assert path.nodes == ["A", "B", "C"]
+
+
+def test_vehicle_orientation(tmp_path):
+    model = make_model(tmp_path, {
+        "AB": {}, "BC": {"vehicleOrientation": -math.pi / 2},
+        "AD": {"vehicleOrientation": math.pi}, "DC": {},
+    })
+
+    # driving sideways from B to C keeps the heading, driving backwards from A to D requires rotating at D
+    path = RotationAwareAStar(model).find_shortest_path("A", "C")
+    assert path.nodes == ["A", "B", "C"]
+    assert path.cost == pytest.approx(2.0)
+
+    successors = model.successors(model.start_state("A"))
+    assert {(state.node_id, state.heading) for state, _, _ in successors} == {("B", 0.0),
+                                                                               ("D", round(-math.pi / 2, 6))}
+
+
+def test_global_orientation(tmp_path):
+    model = make_model(tmp_path, {"AB": {}, "BC": {"vehicleOrientation": 0.0, "orientationType": "GLOBAL"}})
+
+    path = RotationAwareAStar(model).find_shortest_path("A", "C")
+
+    assert path.cost == pytest.approx(2.0)
+
+
+def test_start_heading(tmp_path):
+    model = make_model(tmp_path, {"AB": {}, "AD": {}})
+    path_finder = RotationAwareAStar(model)
+
+    assert path_finder.find_shortest_path("A", "B").cost == pytest.approx(1.0)
+    # facing backwards, the vehicle has to turn by 180 degrees
+    assert path_finder.find_shortest_path("A", "B", start_heading=math.pi).cost == pytest.approx(3.0)
+    assert path_finder.find_shortest_path("A", "D", start_heading=math.pi).cost == pytest.approx(2.0)
+
+
+def test_rotation_is_free_without_time_cost(tmp_path):
+    model = make_model(tmp_path, {
+        "AB": {"rotationAtEndNodeAllowed": "NONE"}, "BC": {},
+        "AD": {}, "DC": {},
+    }, time_cost=False)
+
+    path = RotationAwareAStar(model).find_shortest_path("A", "C")
+
+    assert path.nodes == ["A", "D", "C"]
+    assert path.cost == pytest.approx(2.0)
+
+
+def test_expanded_data(tmp_path):
+    model = make_model(tmp_path, {"AB": {}, "BC": {"rotationAtStartNodeAllowed": "CW"}})
+
+    data = model.expanded_data()
+
+    assert data is model.expanded_data()
+    assert HeadingState("C", model.start_state("C", math.pi / 2).heading) in data.graph
+    assert HeadingState("C", None, terminal=True) in data.graph
+
+
+def test_routing_kit_matches_a_star(tmp_path):
+    model = make_model(tmp_path, {
+        "AB": {"rotationAtEndNodeAllowed": "CCW"}, "BC": {}, "CD": {"rotationAllowed": True},
+        "AD": {"vehicleOrientation": math.pi}, "DC": {"rotationAtStartNodeAllowed": "CW"},
+        "DA": {}, "BA": {}, "CB": {},
+    })
+    a_star = RotationAwareAStar(model)
+    routing_kit = RotationAwareRoutingKit(model, cache_dir=tmp_path)
+
+    for source in POSITIONS:
+        for destination in POSITIONS:
+            expected = a_star.find_shortest_path(source, destination)
+            path = routing_kit.find_shortest_path(source, destination)
+            if expected is None:
+                assert path is None
+            else:
+                assert path.cost == pytest.approx(expected.cost, abs=1e-5)
+                assert path.nodes[0] == source and path.nodes[-1] == destination
+                assert len(path.edges) == len(path.nodes) - 1
@@ -0,0 +1,29 @@
+import json
+import os
+from pathlib import Path
+
+from generalized_path_finding.algorithms import StationPathFinder
+from generalized_path_finding.formats.lif import LifDataProvider
+
+current_path = Path(os.path.dirname(os.path.realpath(__file__)))
+
+
+def test_find_shortest_path(tmp_path):
+    with open(current_path / "../formats/lif/LIF_4_4_MAPF.json") as f:
+        lif = json.load(f)
+    lif["layouts"][0]["stations"] = [
+        {"stationId": "A", "interactionNodeIds": ["N_0_2"], "stationHeight": 0},
+        {"stationId": "B", "interactionNodeIds": ["N_3_3", "N_2_2"], "stationHeight": 0},
+    ]
+    lif_path = tmp_path / "LIF_stations.json"
+    with open(lif_path, "w") as f:
+        json.dump(lif, f)
+
+    data_provider = LifDataProvider(lif_path)
+    path_finder = StationPathFinder(data_provider.get_station_matrix(), data_provider.get_networkx_data())
+
+    path = path_finder.find_shortest_path("A", "B")
+    assert path.cost == 2
+    assert path.nodes == ['N_0_2', 'N_1_2', 'N_2_2']
+    assert path.edges == ['E-0_2-1_2', 'E-1_2-2_2']
+    assert path_finder.find_shortest_path("B", "A") is None
@@ -0,0 +1,70 @@
+import os
+import pathlib
+
+import networkx as nx
+import pytest
+
+from generalized_path_finding.algorithms import AStar, TimeDependentAStar
+from generalized_path_finding.formats.mfn_excel import MfnDataProvider
+from generalized_path_finding.model import NetworkxData, TimeProfile, QueryStatsCollector
+
+current_path = pathlib.Path(os.path.dirname(os.path.abspath(__file__)))
+
+
+def elevator_graph() -> NetworkxData[str]:
+    # two elevators from floor 0 to floor 1, elevator B is further away
+    graph = nx.MultiDiGraph()
+    graph.add_edge("start", "A0", "to_A", weight=10)
+    graph.add_edge("A0", "A1", "A", weight=20)
+    graph.add_edge("A1", "goal", "from_A", weight=10)
+    graph.add_edge("start", "B0", "to_B", weight=30)
+    graph.add_edge("B0", "B1", "B", weight=20)
+    graph.add_edge("B1", "goal", "from_B", weight=30)
+    return NetworkxData(graph, lambda a, b: 0)
+
+
+def test_departure_changes_route():
+    # elevator A is busy in the morning
+    profiles = {"A": TimeProfile([0, 8 * 3600, 9 * 3600, 10 * 3600], [0, 0, 120, 0])}
+    path_finder = TimeDependentAStar(elevator_graph(), profiles)
+
+    night = path_finder.find_shortest_path("start", "goal", departure=0)
+    assert night.edges == ["to_A", "A", "from_A"]
+    assert night.cost == 40
+
+    morning = path_finder.find_shortest_path("start", "goal", departure=9 * 3600 - 10)
+    assert morning.edges == ["to_B", "B", "from_B"]
+    assert morning.cost == 80
+
+    # a quarter of the wait, reached at 8:15
+    path_finder.departure = 8.25 * 3600 - 10
+    assert path_finder.find_shortest_path("start", "goal").cost == pytest.approx(40 + 30)
+    assert path_finder.find_shortest_path("goal", "start") is None
+
+
+def test_without_profiles_like_a_star():
+    data_provider = MfnDataProvider(current_path / "../formats/mfn_excel/MFN_example.xlsx", fleet="Roboter",
+                                    time_cost=True, fleet_max_speed=1.2)
+    data = data_provider.get_networkx_data()
+    path_finder = TimeDependentAStar(data, {})
+    waiting = TimeDependentAStar(data, {"Connection1": TimeProfile.constant(30)})
+
+    path, expected = path_finder.find_shortest_path("3-E0", "1-E1"), AStar(data).find_shortest_path("3-E0", "1-E1")
+    assert path.nodes == expected.nodes
+    assert path.edges == expected.edges
+    assert path.cost == pytest.approx(expected.cost)
+    assert waiting.find_shortest_path("3-E0", "1-E1").cost == pytest.approx(expected.cost + 30)
+
+
+def test_query_stats():
+    path_finder = TimeDependentAStar(elevator_graph(), {"A": TimeProfile.constant(0)})
+    path_finder.observer = QueryStatsCollector()
+    path = path_finder.find_shortest_path("start", "goal")
+    assert path.edges == ["to_A", "A", "from_A"]
+
+    stats = path_finder.observer.last
+    # start, A0, A1 and B0 are settled before goal, B1 is still in the heap
+    assert stats.nodes_settled == 4
+    assert stats.edges_relaxed == 5
+    assert stats.heuristic_calls == 6
+    assert stats.seconds.keys() == {"validation", "search", "unpack"}
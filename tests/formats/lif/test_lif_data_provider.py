@@ -172,3 +172,22 @@ def test_invalid_distance_type():
         _data_provider = LifDataProvider(current_path / "LIF_single_edge.json", distance_type=5)
 
     assert "DistanceType" in str(e)
+
+
+def test_snapshot(tmp_path):
+    parsed = LifDataProvider(current_path / "LIF_4_4_MAPF.json", distance_type=DistanceType.Manhattan)
+    snapshot = LifDataProvider(current_path / "LIF_4_4_MAPF.json", distance_type=DistanceType.Manhattan,
+                               snapshot=True, cache_dir=tmp_path)
+    snapshot.get_networkx_data()
+    assert len(list(tmp_path.glob("*.layout.json"))) == 1
+
+    restored = LifDataProvider(current_path / "LIF_4_4_MAPF.json", distance_type=DistanceType.Manhattan,
+                               snapshot=True, cache_dir=tmp_path)
+    graph, expected_graph = restored.get_networkx_data().graph, parsed.get_networkx_data().graph
+
+    assert restored._lif is None  # the file was not parsed again
+    assert restored.vehicle_type_id == parsed.vehicle_type_id
+    assert list(graph.nodes) == list(expected_graph.nodes)
+    assert list(graph.edges(keys=True, data="weight")) == list(expected_graph.edges(keys=True, data="weight"))
+    heuristic, expected_heuristic = restored.get_networkx_data().heuristic, parsed.get_networkx_data().heuristic
+    assert heuristic("N_0_2", "N_3_3") == expected_heuristic("N_0_2", "N_3_3")
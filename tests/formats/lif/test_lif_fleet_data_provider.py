@@ -0,0 +1,89 @@
+import copy
+import json
+import math
+import os
+from pathlib import Path
+
+import pytest
+
+from generalized_path_finding.algorithms import AStar, CchRoutingKit, NxRoutingKit
+from generalized_path_finding.formats.lif import LifDataProvider, LifFleetDataProvider
+
+current_path = Path(os.path.dirname(os.path.realpath(__file__)))
+
+
+def test_shared_graph():
+    fleet = LifFleetDataProvider(current_path / "LIF_multiple_vehicle_types.json")
+    robot = fleet.for_vehicle_type("robot").get_networkx_data()
+    human = fleet.for_vehicle_type("human").get_networkx_data()
+
+    assert fleet.vehicle_type_ids == ["human", "robot"]
+    assert robot.graph is human.graph
+    assert robot.weight_key != human.weight_key
+    assert set(robot.graph.edges) == {('N1', 'N2', 'E-1-2'), ('N1', 'N3', 'E-1-3')}
+
+
+def test_same_paths_as_lif_data_provider():
+    fleet = LifFleetDataProvider(current_path / "LIF_multiple_vehicle_types.json")
+    for vehicle_type_id in ["robot", "human"]:
+        expected = AStar(LifDataProvider(current_path / "LIF_multiple_vehicle_types.json",
+                                         vehicle_type_id=vehicle_type_id).get_networkx_data())
+        data = fleet.for_vehicle_type(vehicle_type_id).get_networkx_data()
+        for path_finder in [AStar(data), NxRoutingKit(data, cache_dir=current_path), CchRoutingKit(data)]:
+            for source, destination in [("N1", "N2"), ("N1", "N3"), ("N3", "N2")]:
+                path = path_finder.find_shortest_path(source, destination)
+                expected_path = expected.find_shortest_path(source, destination)
+                assert (path is None) == (expected_path is None)
+                if path is not None:
+                    assert path.nodes == expected_path.nodes
+                    assert path.edges == expected_path.edges
+                    assert math.isclose(path.cost, expected_path.cost, rel_tol=1e-6)
+
+
+def test_coinciding_vehicle_types_share_data(tmp_path):
+    with open(current_path / "LIF_4_4_MAPF.json") as f:
+        lif = json.load(f)
+    layout = lif["layouts"][0]
+    for element in layout["edges"]:
+        forklift = copy.deepcopy(element["vehicleTypeEdgeProperties"][0])
+        forklift["vehicleTypeId"] = "forklift"
+        element["vehicleTypeEdgeProperties"].append(forklift)
+    for element in layout["nodes"]:
+        forklift = copy.deepcopy(element["vehicleTypeNodeProperties"][0])
+        forklift["vehicleTypeId"] = "forklift"
+        element["vehicleTypeNodeProperties"].append(forklift)
+    path = tmp_path / "LIF_fleet.json"
+    with open(path, "w") as f:
+        json.dump(lif, f)
+
+    fleet = LifFleetDataProvider(path)
+    robot = fleet.for_vehicle_type("robot").get_networkx_data()
+    assert fleet.for_vehicle_type("forklift").get_networkx_data() is robot
+    assert AStar(robot).find_shortest_path("N_0_2", "N_3_3").cost == 4
+
+
+def test_unknown_vehicle_type():
+    fleet = LifFleetDataProvider(current_path / "LIF_multiple_vehicle_types.json")
+    with pytest.raises(ValueError):
+        fleet.for_vehicle_type("aliens")
+
+    with pytest.warns(UserWarning):
+        LifFleetDataProvider(current_path / "LIF_multiple_vehicle_types.json",
+                             vehicle_type_ids=["robot", "aliens"]).for_vehicle_type("aliens")
+
+
+def test_snapshot(tmp_path):
+    parsed = LifFleetDataProvider(current_path / "LIF_multiple_vehicle_types.json")
+    LifFleetDataProvider(current_path / "LIF_multiple_vehicle_types.json", snapshot=True,
+                         cache_dir=tmp_path).vehicle_type_ids
+    restored = LifFleetDataProvider(current_path / "LIF_multiple_vehicle_types.json", snapshot=True,
+                                    cache_dir=tmp_path)
+
+    assert restored.vehicle_type_ids == parsed.vehicle_type_ids
+    assert restored._lif is None  # the file was not parsed again
+    for vehicle_type_id in ["robot", "human"]:
+        data = restored.get_networkx_data(vehicle_type_id)
+        expected = parsed.get_networkx_data(vehicle_type_id)
+        assert data.weight_key == expected.weight_key
+        assert (list(data.graph.edges(keys=True, data=data.weight_key))
+                == list(expected.graph.edges(keys=True, data=expected.weight_key)))
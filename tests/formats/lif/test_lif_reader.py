@@ -0,0 +1,84 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from generalized_path_finding.formats.lif import LIF, LifReadOptions, read_lif
+from generalized_path_finding.formats.lif.lif_reader import _JsonReader
+
+current_path = Path(os.path.dirname(os.path.realpath(__file__)))
+
+LIF_FILES = ["LIF_4_4_MAPF.json", "LIF_multiple_vehicle_types.json", "LIF_single_edge.json", "LIF_trajectory.json"]
+
+
+def load_lif(name: str) -> LIF:
+    with open(current_path / name) as f:
+        return LIF.from_camel_dict(json.load(f))
+
+
+@pytest.mark.parametrize("name", LIF_FILES)
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 20])
+def test_same_as_loading_whole_file(name, chunk_size):
+    # tiny chunks split every token of the file
+    assert read_lif(current_path / name, chunk_size=chunk_size) == load_lif(name)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 20])
+def test_skip_trajectories_and_actions(chunk_size):
+    lif = read_lif(current_path / "LIF_trajectory.json", LifReadOptions(trajectories=False, actions=False),
+                   chunk_size=chunk_size)
+
+    edges = [edge for layout in lif.layouts for edge in layout.edges]
+    assert edges
+    assert all(props.trajectory is None and props.actions is None
+               for edge in edges for props in edge.vehicle_type_edge_properties)
+    assert [edge.edge_id for edge in edges] == [edge.edge_id for edge in load_lif("LIF_trajectory.json").layouts[0].edges]
+
+
+def test_filter_vehicle_types():
+    lif = read_lif(current_path / "LIF_multiple_vehicle_types.json", LifReadOptions(vehicle_type_ids=frozenset(["human"])))
+    expected = load_lif("LIF_multiple_vehicle_types.json")
+
+    edges = [edge for layout in lif.layouts for edge in layout.edges]
+    assert {edge.edge_id for edge in edges} == {edge.edge_id for layout in expected.layouts for edge in layout.edges
+                                                if edge.get_properties_for_vehicle_type("human") is not None}
+    assert all(props.vehicle_type_id == "human" for edge in edges for props in edge.vehicle_type_edge_properties)
+    # nodes are kept, even if the vehicle type may not use them
+    assert lif.layouts[0].nodes == expected.layouts[0].nodes
+
+
+def test_only_stations(tmp_path):
+    with open(current_path / "LIF_4_4_MAPF.json") as f:
+        lif = json.load(f)
+    lif["layouts"][0]["stations"] = [{"stationId": "S1", "interactionNodeIds": ["N_0_2"], "stationHeight": 0}]
+    path = tmp_path / "LIF_station.json"
+    with open(path, "w") as f:
+        json.dump(lif, f)
+
+    layout = read_lif(path, LifReadOptions(nodes=False, edges=False)).layouts[0]
+
+    assert layout.nodes == [] and layout.edges == []
+    assert [station.station_id for station in layout.stations] == ["S1"]
+    assert read_lif(path, LifReadOptions(stations=False)).layouts[0].stations is None
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 20])
+def test_skip_value(tmp_path, chunk_size):
+    # brackets and escaped quotes in strings do not end the skipped value
+    path = tmp_path / "values.json"
+    path.write_text('[{"a": "]}\\"[{", "b": [1.5, {"c": null}], "d": "\\\\"}, 2] {"e": true}')
+
+    with open(path) as file:
+        reader = _JsonReader(file, chunk_size)
+        reader.skip()
+        assert reader.value() == {"e": True}
+
+
+def test_truncated_file(tmp_path):
+    text = (current_path / "LIF_single_edge.json").read_text()
+    path = tmp_path / "LIF_truncated.json"
+    path.write_text(text[:len(text) // 2])
+
+    with pytest.raises(ValueError):
+        read_lif(path, chunk_size=16)
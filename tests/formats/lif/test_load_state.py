@@ -0,0 +1,29 @@
+import pytest
+
+from generalized_path_finding.formats.lif import LoadState, LoadPermissions
+from generalized_path_finding.formats.lif.edge import LoadRestriction
+
+
+def test_masks():
+    permissions = LoadPermissions(["EUR", "GITTER"])
+
+    unrestricted = permissions.edge_permissions(None)
+    unloaded_only = permissions.edge_permissions(LoadRestriction(unloaded=True, loaded=False))
+    loaded_only = permissions.edge_permissions(LoadRestriction(unloaded=False, loaded=True))
+    eur_only = permissions.edge_permissions(LoadRestriction(unloaded=False, loaded=True, load_set_names=["EUR"]))
+
+    for state, allowed in [
+        (LoadState(), [unrestricted, unloaded_only]),
+        (LoadState(loaded=True), [unrestricted, loaded_only]),
+        (LoadState(loaded=True, load_set_name="EUR"), [unrestricted, loaded_only, eur_only]),
+        (LoadState(loaded=True, load_set_name="GITTER"), [unrestricted, loaded_only]),
+        (LoadState(loaded=True, load_set_name="unknown"), [unrestricted, loaded_only]),
+    ]:
+        mask = permissions.mask(state)
+        for edge in [unrestricted, unloaded_only, loaded_only, eur_only]:
+            assert bool(edge & mask) == (edge in allowed), (state, edge)
+
+
+def test_unloaded_with_load_set():
+    with pytest.raises(ValueError):
+        LoadState(loaded=False, load_set_name="EUR")
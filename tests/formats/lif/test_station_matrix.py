@@ -0,0 +1,95 @@
+import json
+import math
+import os
+from pathlib import Path
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from generalized_path_finding.formats.lif import LifDataProvider, StationMatrix
+from generalized_path_finding.formats.lif.station import Station
+from generalized_path_finding.model import NetworkxData
+
+current_path = Path(os.path.dirname(os.path.realpath(__file__)))
+
+STATIONS = [
+    {"stationId": "A", "interactionNodeIds": ["N_0_3", "N_0_2"], "stationHeight": 0},
+    {"stationId": "B", "interactionNodeIds": ["N_3_3"], "stationHeight": 0},
+    {"stationId": "C", "interactionNodeIds": ["N_3_0"], "stationHeight": 0},
+]
+
+
+@pytest.fixture
+def lif_with_stations(tmp_path) -> Path:
+    with open(current_path / "LIF_4_4_MAPF.json") as f:
+        lif = json.load(f)
+    lif["layouts"][0]["stations"] = STATIONS
+    path = tmp_path / "LIF_stations.json"
+    with open(path, "w") as f:
+        json.dump(lif, f)
+    return path
+
+
+def test_costs(lif_with_stations):
+    matrix = LifDataProvider(lif_with_stations).get_station_matrix()
+
+    assert matrix.station_ids == ["A", "B", "C"]
+    assert matrix.cost("A", "B") == 4
+    assert matrix.cost("C", "B") == 3
+    assert matrix.cost("B", "B") == 0
+    assert math.isinf(matrix.cost("B", "A"))
+
+
+def test_node_path(lif_with_stations):
+    matrix = LifDataProvider(lif_with_stations).get_station_matrix()
+
+    # N_0_3 is not connected to B, so the path starts at the other interaction node of A
+    assert matrix.node_path("A", "B") == ['N_0_2', 'N_1_2', 'N_2_2', 'N_3_2', 'N_3_3']
+    assert matrix.node_path("B", "B") == ['N_3_3']
+    assert matrix.node_path("B", "A") is None
+
+
+def test_zero_weight_cycle():
+    # co-located nodes connected by edges of length 0 in both directions
+    graph = nx.MultiDiGraph()
+    graph.add_edge("A", "B", weight=0.0)
+    graph.add_edge("B", "A", weight=0.0)
+    graph.add_edge("B", "C", weight=1.0)
+    stations = [Station("S", ["A"]), Station("T", ["C"])]
+
+    matrix = StationMatrix.compute(NetworkxData(graph, lambda _a, _b: 0.0), stations)
+
+    assert matrix.node_path("S", "T") == ["A", "B", "C"]
+    assert matrix.node_path("S", "S") == ["A"]
+
+
+def test_unknown_station(lif_with_stations):
+    matrix = LifDataProvider(lif_with_stations).get_station_matrix()
+
+    with pytest.raises(ValueError):
+        matrix.cost("A", "D")
+
+
+def test_cached_memory_mapped(lif_with_stations):
+    LifDataProvider(lif_with_stations).get_station_matrix()
+    assert len(list(lif_with_stations.parent.glob("*.stations.costs.npy"))) == 1
+
+    matrix = LifDataProvider(lif_with_stations).get_station_matrix()
+    assert isinstance(matrix.costs, np.memmap)
+    assert matrix.cost("A", "B") == 4
+
+    # other parameters give another graph and another matrix
+    LifDataProvider(lif_with_stations, time_cost=True, vehicle_max_speed=2.0).get_station_matrix()
+    assert len(list(lif_with_stations.parent.glob("*.stations.costs.npy"))) == 2
+
+
+def test_unknown_interaction_node(lif_with_stations):
+    with open(lif_with_stations) as f:
+        lif = json.load(f)
+    lif["layouts"][0]["stations"] = [{"stationId": "X", "interactionNodeIds": ["N_9_9"], "stationHeight": 0}]
+    with open(lif_with_stations, "w") as f:
+        json.dump(lif, f)
+
+    with pytest.raises(ValueError):
+        LifDataProvider(lif_with_stations).get_station_matrix()
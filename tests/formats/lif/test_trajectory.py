@@ -3,11 +3,42 @@ import math
 import os
 from pathlib import Path
 
+import pytest
+
 from generalized_path_finding.formats.lif import LIF
 
 current_path = Path(os.path.dirname(os.path.realpath(__file__)))
 
 
+def reference_length(trajectory, samples: int = 4000) -> float:
+    """
+    The length of a polyline through densely sampled points of a NURBS, evaluated with the Cox-de Boor recursion,
+    independently of trajectory_lengths.
+    """
+    knots, degree, points = trajectory.knot_vector, trajectory.degree, trajectory.control_points
+
+    def basis(i: int, p: int, u: float) -> float:
+        if p == 0:
+            return 1.0 if knots[i] <= u < knots[i + 1] else 0.0
+        value = 0.0
+        if knots[i + p] > knots[i]:
+            value += (u - knots[i]) / (knots[i + p] - knots[i]) * basis(i, p - 1, u)
+        if knots[i + p + 1] > knots[i + 1]:
+            value += (knots[i + p + 1] - u) / (knots[i + p + 1] - knots[i + 1]) * basis(i + 1, p - 1, u)
+        return value
+
+    def point(u: float) -> tuple[float, float]:
+        if u >= knots[-1]:
+            return points[-1].x, points[-1].y  # the curve is clamped, and the last knot span is half-open
+        weights = [basis(i, degree, u) * (p.weight if p.weight is not None else 1.0) for i, p in enumerate(points)]
+        total = sum(weights)
+        return (sum(w * p.x for w, p in zip(weights, points)) / total,
+                sum(w * p.y for w, p in zip(weights, points)) / total)
+
+    polyline = [point(knots[0] + (knots[-1] - knots[0]) * k / samples) for k in range(samples + 1)]
+    return sum(math.dist(a, b) for a, b in zip(polyline, polyline[1:]))
+
+
 def test_approximate_length():
     """
     Test that the approximate length of the trajectory can be calculated with sufficient accuracy
@@ -49,3 +80,45 @@ def test_degree_1_trajectory_length():
 
     assert math.isclose(calculated_length, expected_length, rel_tol=1e-9), \
         f"Expected {expected_length}, but got {calculated_length}"
+
+
+def test_rational_trajectory_length():
+    """
+    Test that the weights of control points are respected, using a NURBS that is exactly a quarter of the unit circle.
+    """
+    from generalized_path_finding.formats.lif.trajectory import Trajectory, ControlPoint
+
+    trajectory = Trajectory(
+        knot_vector=[0.0, 0.0, 0.0, 1.0, 1.0, 1.0],
+        control_points=[ControlPoint(x=1.0, y=0.0), ControlPoint(x=1.0, y=1.0, weight=math.sqrt(0.5)),
+                        ControlPoint(x=0.0, y=1.0)],
+        degree=2
+    )
+
+    assert math.isclose(trajectory.approximate_length(tolerance=1e-6), math.pi / 2, rel_tol=1e-6)
+    with pytest.deprecated_call():
+        assert math.isclose(trajectory.approximate_length(10), math.pi / 2, rel_tol=1e-4)
+
+
+def test_trajectory_lengths():
+    """
+    Test that measuring several trajectories at once gives the lengths of a dense sampling of each of them.
+    """
+    from generalized_path_finding.formats.lif.trajectory import Trajectory, ControlPoint, trajectory_lengths
+
+    trajectories = [
+        Trajectory(knot_vector=[0.0, 0.0, 0.0, 0.5, 1.0, 1.0, 1.0],
+                   control_points=[ControlPoint(x=0.0, y=0.0), ControlPoint(x=0.0, y=height),
+                                   ControlPoint(x=3.6, y=height), ControlPoint(x=3.6, y=0.0)],
+                   degree=2)
+        for height in [1.0, 1.8, 2.5]
+    ]
+    trajectories.append(Trajectory(knot_vector=[0.0, 0.0, 1.0, 1.0],
+                                   control_points=[ControlPoint(x=0.0, y=0.0), ControlPoint(x=3.0, y=4.0)]))
+
+    lengths = trajectory_lengths(trajectories)
+
+    assert lengths[3] == 5.0
+    assert lengths[0] < lengths[1] < lengths[2]
+    for trajectory, length in zip(trajectories, lengths):
+        assert math.isclose(reference_length(trajectory), length, rel_tol=1e-4)
@@ -168,3 +168,42 @@ def test_infinite_speed():
     with pytest.raises(ValueError) as e:
         dp.get_networkx_data()
     assert "speed" in str(e)
+
+
+def test_snapshot(tmp_path):
+    def priority_factor(prio):
+        return prio * prio if prio is not None else 0.5
+
+    parsed = MfnDataProvider(current_path / "MFN_example.xlsx", fleet="Roboter", priority_factor=priority_factor)
+    MfnDataProvider(current_path / "MFN_example.xlsx", fleet="Roboter", snapshot=True,
+                    cache_dir=tmp_path).get_networkx_data()
+    # the priority factor is not part of the snapshot, so it can be changed without preparing it again
+    restored = MfnDataProvider(current_path / "MFN_example.xlsx", fleet="Roboter", priority_factor=priority_factor,
+                               snapshot=True, cache_dir=tmp_path)
+    graph, expected_graph = restored.get_networkx_data().graph, parsed.get_networkx_data().graph
+
+    assert restored._mfn is None  # the file was not read again
+    assert list(graph.nodes) == list(expected_graph.nodes)
+    assert list(graph.edges(keys=True, data="weight")) == list(expected_graph.edges(keys=True, data="weight"))
+    assert math.isclose(restored.get_networkx_data().heuristic("1-E0", "2-E0"), DIST_1_2 * 0.5, rel_tol=1e-6)
+
+
+def test_fleet_union():
+    dp = MfnDataProvider(current_path / "MFN_example.xlsx", fleet="Roboter")
+    robot = dp.for_fleet("Roboter").get_networkx_data().graph
+    pedestrian = dp.for_fleet("Besucher").get_networkx_data().graph
+    union = dp.get_networkx_data(["Roboter", "Besucher"]).graph
+
+    assert set(pedestrian.edges) == {('1-E0', '1-E1', 'Connection1'), ('1-E1', '1-E0', 'Connection1')}
+    assert set(union.edges) == set(robot.edges) | set(pedestrian.edges)
+    assert set(union.nodes) == set(robot.nodes)
+    # the file is converted once and the graph of each set of fleets is only selected once
+    assert dp.get_networkx_data("Roboter").graph is robot
+
+
+def test_floors(tmp_path):
+    parsed = MfnDataProvider(current_path / "MFN_example.xlsx", fleet="Roboter")
+    restored = MfnDataProvider(current_path / "MFN_example.xlsx", fleet="Roboter", snapshot=True, cache_dir=tmp_path)
+
+    assert parsed.get_floors() == {'1-E0': 'E0', '2-E0': 'E0', '3-E0': 'E0', '1-E1': 'E1'}
+    assert restored.get_floors() == parsed.get_floors()
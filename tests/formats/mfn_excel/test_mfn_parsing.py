@@ -4,6 +4,7 @@ import pathlib
 import pytest
 
 from generalized_path_finding.formats.mfn_excel.connection import Connection
+from generalized_path_finding.formats.mfn_excel.fleet_list import FleetTable, MAX_FLEETS
 from generalized_path_finding.formats.mfn_excel.mfn import MFN
 from generalized_path_finding.formats.mfn_excel.node import Node
 from generalized_path_finding.formats.mfn_excel.path import Path
@@ -49,3 +50,33 @@ def test_missing_sheet():
     with pytest.raises(ValueError) as e:
         mfn = MFN(current_path / "MFN_missing_sheet.xlsx")
     assert "sheet" in str(e.value)
+
+
+def test_cached_parsing(tmp_path):
+    mfn = MFN(current_path / "MFN_example.xlsx")
+    MFN(current_path / "MFN_example.xlsx", cache=True, cache_dir=tmp_path)
+    assert len(list(tmp_path.glob("*.mfn.json"))) == 1
+
+    cached = MFN(current_path / "MFN_example.xlsx", cache=True, cache_dir=tmp_path)
+
+    assert cached.nodes == mfn.nodes
+    assert cached.paths == mfn.paths
+    assert cached.connections == mfn.connections
+
+
+def test_fleet_table():
+    mfn = MFN(current_path / "MFN_example.xlsx")
+
+    assert mfn.fleet_table.fleets == ["roboter", "besucher"]
+    roboter, besucher = mfn.fleet_table.fleet_mask("Roboter"), mfn.fleet_table.fleet_mask(" besucher ")
+    assert mfn.paths[0].fleet_mask == roboter
+    assert mfn.connections[0].fleet_mask == roboter | besucher
+    assert mfn.fleet_table.fleet_mask("Fahrrad") == 0
+    assert mfn.fleet_table.fleet_list(mfn.connections[0].fleet_mask) == ["roboter", "besucher"]
+
+
+def test_too_many_fleets():
+    fleet_table = FleetTable([f"fleet {i}" for i in range(MAX_FLEETS)])
+    assert fleet_table.fleet_mask(f"fleet {MAX_FLEETS - 1}") == 1 << (MAX_FLEETS - 1)
+    with pytest.raises(ValueError):
+        fleet_table.mask("one too many")
@@ -0,0 +1,51 @@
+import os
+import struct
+from pathlib import Path
+
+import pytest
+
+from generalized_path_finding.formats.osm.clip_region import BoundingBox, clip_region_spec, clip_polygon
+from generalized_path_finding.formats.osm.osm_data_provider import OsmDataProvider
+from generalized_path_finding.nodes import GeoCoords
+
+current_path = Path(os.path.dirname(os.path.realpath(__file__)))
+def local_path(relative_path):
+    return str(current_path / relative_path)
+
+
+def read_graph_size(graph_file: str) -> tuple[int, int]:
+    with open(graph_file, "rb") as f:
+        return struct.unpack("II", f.read(8))
+
+
+def test_bounding_box():
+    with pytest.raises(ValueError):
+        BoundingBox(1.0, 0.0, 0.0, 1.0)
+
+    bbox = BoundingBox(0.0, 0.0, 1.0, 2.0)
+    assert clip_polygon(bbox) == [GeoCoords(0.0, 0.0), GeoCoords(0.0, 2.0), GeoCoords(1.0, 2.0), GeoCoords(1.0, 0.0)]
+
+
+def test_clip_region_spec():
+    polygon = [GeoCoords(0.0, 0.0), GeoCoords(0.0, 1.0), GeoCoords(1.0, 0.0)]
+    assert clip_region_spec(None) == ""
+    assert clip_region_spec(BoundingBox(0.0, 0.0, 1.0, 2.0)) == "_bbox0.0_0.0_1.0_2.0"
+    # the spec is part of the cache file names, so it must not change between runs
+    assert clip_region_spec(polygon) == "_poly33206230"
+    assert clip_region_spec(polygon[::-1]).startswith("_poly")
+    assert clip_region_spec(polygon[::-1]) != clip_region_spec(polygon)
+
+    with pytest.raises(ValueError):
+        clip_region_spec(polygon[:2])
+
+
+def test_clipped_graph_is_smaller():
+    full = OsmDataProvider(local_path("andorra-latest.osm.pbf")).get_osm_ch_data()
+    clipped = OsmDataProvider(local_path("andorra-latest.osm.pbf"),
+                              clip_region=BoundingBox(42.45, 1.45, 42.52, 1.55)).get_osm_ch_data()
+
+    assert clipped.graph_file != full.graph_file
+    full_nodes, full_arcs = read_graph_size(full.graph_file)
+    clipped_nodes, clipped_arcs = read_graph_size(clipped.graph_file)
+    assert 0 < clipped_nodes < full_nodes
+    assert 0 < clipped_arcs < full_arcs
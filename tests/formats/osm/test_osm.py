@@ -1,9 +1,14 @@
+import filecmp
 import os
+import shutil
+import threading
+from concurrent.futures import Executor, Future
 from pathlib import Path
 
 from pyroutingkit import RoutingService, Route, PointLatLon
 
-from generalized_path_finding.formats.osm.osm_data_provider import OsmDataProvider
+from generalized_path_finding.formats.osm.osm_data_provider import OsmDataProvider, TransportMode, \
+    prepare_osm_data_providers, PreparationStage
 
 current_path = Path(os.path.dirname(os.path.realpath(__file__)))
 def local_path(relative_path):
@@ -27,5 +32,85 @@ def test_preparator():
         print(arc.duration, arc.distance, arc.osmWayId, arc.startOsmNodeId, arc.endOsmNodeId)
 
 
+def test_prepare_multiple_transport_modes(tmp_path):
+    # use separate copies of the .pbf file, so the prepared files do not overwrite each other
+    single_pbf = shutil.copy(local_path("andorra-latest.osm.pbf"), tmp_path / "single.osm.pbf")
+    multi_pbf = shutil.copy(local_path("andorra-latest.osm.pbf"), tmp_path / "multi.osm.pbf")
+    transport_modes = [TransportMode.CAR, TransportMode.BIKE, TransportMode.PEDESTRIAN]
+    single_dps = [OsmDataProvider(single_pbf, transport_mode) for transport_mode in transport_modes]
+    multi_dps = [OsmDataProvider(multi_pbf, transport_mode) for transport_mode in transport_modes]
+
+    prepare_osm_data_providers(multi_dps)
+
+    for single_dp, multi_dp in zip(single_dps, multi_dps):
+        single_data = single_dp.get_osm_ch_data()
+        multi_data = multi_dp.get_osm_ch_data()
+        assert filecmp.cmp(single_data.graph_file, multi_data.graph_file, shallow=False)
+        assert filecmp.cmp(single_data.ch_file, multi_data.ch_file, shallow=False)
+
+
+def test_prepare_osm_async(tmp_path):
+    pbf_file = shutil.copy(local_path("andorra-latest.osm.pbf"), tmp_path / "async.osm.pbf")
+    dp = OsmDataProvider(pbf_file)
+    stages = []
+
+    future = dp.prepare_osm_async(stages.append)
+    data = future.result()
+
+    assert stages == [PreparationStage.PBF_DECODE, PreparationStage.SCC_FILTER, PreparationStage.CH_BUILD]
+    assert dp.get_osm_ch_data() == data
+    # a completed preparation is not reused, so a changed .pbf file is prepared again
+    again = dp.prepare_osm_async()
+    assert again is not future
+    assert again.result() == data
+    assert os.path.isfile(data.graph_file) and os.path.isfile(data.ch_file)
+    # the temporary files were renamed
+    assert not [file for file in os.listdir(tmp_path) if file.endswith(".tmp")]
+
+
+class PendingExecutor(Executor):
+    """Never runs what is submitted, like a preparation that takes forever."""
+
+    def submit(self, fn, /, *args, **kwargs):
+        return Future()
+
+
+def test_get_osm_ch_data_during_preparation(tmp_path):
+    pbf_file = shutil.copy(local_path("andorra-latest.osm.pbf"), tmp_path / "during.osm.pbf")
+    dp = OsmDataProvider(pbf_file)
+    data = dp.get_osm_ch_data()
+
+    # the last prepared data
+    dp.prepare_osm_async(executor=PendingExecutor())
+    assert dp.get_osm_ch_data() == data
+    # the existing files
+    fresh_dp = OsmDataProvider(pbf_file)
+    fresh_dp.prepare_osm_async(executor=PendingExecutor())
+    assert fresh_dp.get_osm_ch_data() == data
+
+
+def test_prepare_osm_async_while_running(tmp_path):
+    pbf_file = shutil.copy(local_path("andorra-latest.osm.pbf"), tmp_path / "running.osm.pbf")
+    dp = OsmDataProvider(pbf_file)
+    started, release = threading.Event(), threading.Event()
+    stages, later_stages = [], []
+
+    def first_progress(stage):
+        stages.append(stage)
+        if stage == PreparationStage.PBF_DECODE:
+            started.set()
+            release.wait()
+
+    future = dp.prepare_osm_async(first_progress)
+    started.wait()
+    # the running preparation is returned and reports its further stages to the new callback too
+    assert dp.prepare_osm_async(later_stages.append, executor=PendingExecutor()) is future
+    release.set()
+    future.result()
+
+    assert stages == [PreparationStage.PBF_DECODE, PreparationStage.SCC_FILTER, PreparationStage.CH_BUILD]
+    assert later_stages == [PreparationStage.SCC_FILTER, PreparationStage.CH_BUILD]
+
+
 if __name__ == "__main__":
     test_preparator()
\ No newline at end of file
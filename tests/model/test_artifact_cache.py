@@ -0,0 +1,139 @@
+import os
+import threading
+import time
+
+import pytest
+
+from generalized_path_finding.model.artifact_cache import Artifact, ArtifactCache
+
+
+def write_files(content: str):
+    def build(paths: list[str]):
+        for path in paths:
+            with open(path, "w") as f:
+                f.write(content)
+
+    return build
+
+
+def read_file(path) -> str:
+    with open(path) as f:
+        return f.read()
+
+
+def test_build_once(tmp_path):
+    artifact = Artifact.of(tmp_path / "a.graph", tmp_path / "a.ch")
+    cache = ArtifactCache()
+
+    assert not cache.is_valid(artifact)
+    assert cache.get(artifact, write_files("1"))
+    assert not ArtifactCache().get(artifact, write_files("2"))
+
+    assert cache.is_valid(artifact)
+    assert read_file(tmp_path / "a.graph") == read_file(tmp_path / "a.ch") == "1"
+    assert not [file for file in os.listdir(tmp_path) if file.endswith(".tmp")]
+
+
+def test_rebuild_invalid(tmp_path):
+    source = tmp_path / "a.pbf"
+    source.write_text("source")
+    artifact = Artifact.of(tmp_path / "a.ch", source=source)
+    cache = ArtifactCache()
+    cache.get(artifact, write_files("1"))
+
+    # corrupted file
+    (tmp_path / "a.ch").write_text("corrupted")
+    assert not ArtifactCache().is_valid(artifact)
+    # only detected by the checksums
+    assert ArtifactCache().is_valid(artifact, checksums=False)
+    assert cache.get(artifact, write_files("2"))
+    assert read_file(tmp_path / "a.ch") == "2"
+
+    # changed source
+    source.write_text("changed source")
+    assert not cache.is_valid(artifact)
+    assert cache.get(artifact, write_files("3"))
+    assert read_file(tmp_path / "a.ch") == "3"
+
+
+def test_failed_build(tmp_path):
+    artifact = Artifact.of(tmp_path / "a.ch")
+    cache = ArtifactCache()
+
+    def build(paths: list[str]):
+        write_files("partial")(paths)
+        raise RuntimeError("build failed")
+
+    with pytest.raises(RuntimeError):
+        cache.get(artifact, build)
+    assert not os.path.exists(tmp_path / "a.ch")
+    assert not [file for file in os.listdir(tmp_path) if file.endswith(".tmp")]
+
+
+def test_get_all_builds_only_stale(tmp_path):
+    a, b = Artifact.of(tmp_path / "a.ch"), Artifact.of(tmp_path / "b.ch")
+    cache = ArtifactCache()
+    cache.get(a, write_files("a"))
+    built = []
+
+    def build(temporary_paths: dict[Artifact, list[str]]):
+        built.extend(temporary_paths.keys())
+        for paths in temporary_paths.values():
+            write_files("b")(paths)
+
+    assert cache.get_all([a, b], build) == [b]
+    assert built == [b]
+    assert read_file(tmp_path / "b.ch") == "b"
+
+
+def test_concurrent_build(tmp_path):
+    artifact = Artifact.of(tmp_path / "a.ch")
+    builds = []
+
+    def build(paths: list[str]):
+        builds.append(paths)
+        time.sleep(0.3)
+        write_files("1")(paths)
+
+    # separate caches, like separate processes
+    threads = [threading.Thread(target=ArtifactCache().get, args=(artifact, build)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(builds) == 1
+    assert read_file(tmp_path / "a.ch") == "1"
+
+
+def test_shared_cache_across_threads(tmp_path):
+    artifacts = [Artifact.of(tmp_path / f"{i}.graph", tmp_path / f"{i}.ch") for i in range(16)]
+    cache = ArtifactCache()
+
+    # a single cache, like DEFAULT_ARTIFACT_CACHE, publishing and validating different artifacts at once
+    threads = [threading.Thread(target=cache.get, args=(artifact, write_files(str(i))))
+               for i, artifact in enumerate(artifacts)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(cache.is_valid(artifact) for artifact in artifacts)
+    assert read_file(tmp_path / "15.ch") == "15"
+
+
+def test_timeout(tmp_path):
+    artifact = Artifact.of(tmp_path / "a.ch")
+    started = threading.Event()
+
+    def slow_build(paths: list[str]):
+        started.set()
+        time.sleep(1)
+        write_files("1")(paths)
+
+    thread = threading.Thread(target=ArtifactCache().get, args=(artifact, slow_build))
+    thread.start()
+    started.wait()
+    with pytest.raises(TimeoutError):
+        ArtifactCache(timeout=0.2).get(artifact, write_files("2"))
+    thread.join()
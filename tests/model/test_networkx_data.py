@@ -0,0 +1,55 @@
+import networkx as nx
+
+from generalized_path_finding.algorithms import RoutingKit
+from generalized_path_finding.model import Profiler
+from generalized_path_finding.model.networkx_data import NetworkxData
+
+
+def make_nx_data(weight_0_1: float = 2.0, extra_edge: bool = False) -> NetworkxData[int]:
+    graph = nx.MultiDiGraph(nx.grid_2d_graph(10, 10).to_directed())
+    graph = nx.convert_node_labels_to_integers(graph)
+    for u, v, key in graph.edges:
+        graph.edges[u, v, key]["weight"] = 1.0 + (u * 7 + v * 3) % 5
+    graph.edges[0, 1, 0]["weight"] = weight_0_1
+    if extra_edge:
+        graph.add_edge(0, 99, weight=1.0)
+    return NetworkxData(graph, lambda _a, _b: 0.0)
+
+
+def assert_same_costs(nx_data: NetworkxData[int], ch_data):
+    routing_kit = RoutingKit(ch_data[0])
+    mapping = ch_data[1]
+    for source, target in [(0, 99), (1, 0), (45, 3), (0, 10)]:
+        expected = nx.shortest_path_length(nx_data.graph, source, target, weight="weight")
+        assert routing_kit.find_shortest_path(mapping[source], mapping[target]).cost / 1_000_000 == expected
+
+
+def span_names(profiler: Profiler) -> set[str]:
+    return {s.name for s in profiler.spans}
+
+
+def test_weight_change_reuses_order(tmp_path):
+    with Profiler() as profiler:
+        make_nx_data().to_ch_data(cache_dir=tmp_path)
+    assert "build .ch" in span_names(profiler)
+    # the contraction order is only computed once the weights change
+    assert not list(tmp_path.glob("*.cch_order"))
+
+    changed = make_nx_data(weight_0_1=20.0)
+    with Profiler() as profiler:
+        ch_data = changed.to_ch_data(cache_dir=tmp_path)
+    assert "update .ch with changed weights" in span_names(profiler)
+    assert "build .ch" not in span_names(profiler)
+    assert len(list(tmp_path.glob("*.cch_order"))) == 1
+    assert_same_costs(changed, ch_data)
+
+
+def test_topology_change_rebuilds(tmp_path):
+    make_nx_data().to_ch_data(cache_dir=tmp_path)
+
+    changed = make_nx_data(extra_edge=True)
+    with Profiler() as profiler:
+        ch_data = changed.to_ch_data(cache_dir=tmp_path)
+    assert "build .ch" in span_names(profiler)
+    assert "update .ch with changed weights" not in span_names(profiler)
+    assert_same_costs(changed, ch_data)
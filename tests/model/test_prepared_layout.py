@@ -0,0 +1,70 @@
+import json
+import math
+
+import networkx as nx
+import pytest
+
+from generalized_path_finding.model import PreparedLayout
+
+
+@pytest.fixture
+def graph() -> nx.MultiDiGraph:
+    graph = nx.MultiDiGraph()
+    graph.add_edge("A", "B", "AB", weight=1.5, permissions=3)
+    graph.add_edge("B", "A", "BA", weight=2.0)
+    graph.add_edge("A", "B", "AB2", permissions=1)
+    graph.add_node("C")
+    return graph
+
+
+POSITIONS = {"A": (0.0, 0.0), "B": (1.0, 2.0), "C": (-1.0, 0.5)}
+
+
+def test_round_trip(graph, tmp_path):
+    layout = PreparedLayout.of(graph, POSITIONS, ["weight"], ["permissions"], {"fleet": "robot"})
+    paths = PreparedLayout.artifact_paths(tmp_path / "graph")
+    layout.save(paths)
+    loaded = PreparedLayout.load(paths)
+    restored = loaded.to_graph()
+
+    assert list(restored.nodes) == ["A", "B", "C"]
+    assert list(restored.edges(keys=True, data=True)) == list(graph.edges(keys=True, data=True))
+    assert loaded.positions() == POSITIONS
+    assert loaded.metadata == {"fleet": "robot"}
+
+
+def test_missing_attributes(graph):
+    layout = PreparedLayout.of(graph, POSITIONS, ["weight"], ["permissions"])
+
+    assert math.isnan(layout.floats[0, layout.edge_ids.index("AB2")])
+    assert "weight" not in layout.to_graph().edges["A", "B", "AB2"]
+    assert "permissions" not in layout.to_graph().edges["B", "A", "BA"]
+
+
+def test_cached(graph, tmp_path):
+    source = tmp_path / "layout.json"
+    source.write_text("{}")
+    prepared = []
+
+    def prepare():
+        prepared.append(True)
+        return PreparedLayout.of(graph, POSITIONS, ["weight"], [])
+
+    PreparedLayout.cached(tmp_path / "layout", source, prepare)
+    layout = PreparedLayout.cached(tmp_path / "layout", source, prepare)
+
+    assert len(prepared) == 1
+    assert list(layout.to_graph().edges) == list(graph.edges)
+
+
+def test_other_version(graph, tmp_path):
+    paths = PreparedLayout.artifact_paths(tmp_path / "graph")
+    PreparedLayout.of(graph, POSITIONS, [], []).save(paths)
+    with open(paths[0]) as f:
+        header = json.load(f)
+    header["version"] = -1
+    with open(paths[0], "w") as f:
+        json.dump(header, f)
+
+    with pytest.raises(ValueError):
+        PreparedLayout.load(paths)
@@ -0,0 +1,65 @@
+import contextvars
+import threading
+
+from generalized_path_finding.model import Profiler, span
+
+
+def test_nested_spans():
+    profiler = Profiler()
+    with profiler:
+        with span("outer", path="layout.json"):
+            with span("inner"):
+                pass
+    # not recorded once the profiler is inactive
+    with span("after"):
+        pass
+
+    assert [s.name for s in profiler.spans] == ["inner", "outer"]
+    inner, outer = profiler.spans
+    assert (inner.depth, outer.depth) == (1, 0)
+    assert outer.start <= inner.start and inner.seconds <= outer.seconds
+    assert outer.attributes == {"path": "layout.json"}
+    assert outer.memory_bytes is None
+
+
+def test_memory():
+    with Profiler(memory=True) as profiler:
+        with span("outer"):
+            with span("allocate"):
+                data = bytearray(10 ** 6)
+            del data
+
+    allocate, outer = profiler.spans
+    assert allocate.memory_bytes >= 10 ** 6
+    # the peak of the inner span counts for the outer one
+    assert outer.memory_bytes >= 10 ** 6
+
+
+def test_speedscope():
+    spans = []
+    with Profiler(on_span=spans.append) as profiler:
+        with span("outer"):
+            with span("inner"):
+                pass
+        with span("second"):
+            pass
+        def work():
+            with span("other thread"):
+                pass
+
+        # spans of other threads are recorded if they run in a copy of the context
+        thread = threading.Thread(target=contextvars.copy_context().run, args=(work,), name="worker")
+        thread.start()
+        thread.join()
+
+    speedscope = profiler.to_speedscope("test")
+    assert spans == profiler.spans
+    assert [frame["name"] for frame in speedscope["shared"]["frames"]] == ["outer", "inner", "second",
+                                                                           "other thread"]
+    main, worker = speedscope["profiles"]
+    assert worker["name"] == "worker"
+    assert [(event["type"], event["frame"]) for event in worker["events"]] == [("O", 3), ("C", 3)]
+    assert [(event["type"], event["frame"]) for event in main["events"]] == \
+           [("O", 0), ("O", 1), ("C", 1), ("C", 0), ("O", 2), ("C", 2)]
+    times = [event["at"] for event in main["events"]]
+    assert times == sorted(times) and times[-1] <= main["endValue"]
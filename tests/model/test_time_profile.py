@@ -0,0 +1,28 @@
+import pytest
+
+from generalized_path_finding.model import TimeProfile
+
+
+def test_interpolation():
+    profile = TimeProfile([3600, 7200], [0, 60], period=10_800)
+
+    assert profile(3600) == 0
+    assert profile(5400) == pytest.approx(30)
+    assert profile(7200) == 60
+    # wrapping around from the last breakpoint to the first one of the next period
+    assert profile(9000) == pytest.approx(45)
+    assert profile(0) == pytest.approx(30)
+    assert profile(10_800 + 5400) == pytest.approx(30)
+    assert TimeProfile.constant(5)(12345) == 5
+
+
+def test_validation():
+    with pytest.raises(ValueError):
+        TimeProfile([0, 10], [0])
+    with pytest.raises(ValueError):
+        TimeProfile([10, 0], [0, 0])
+    with pytest.raises(ValueError):
+        TimeProfile([0], [-1])
+    with pytest.raises(ValueError, match="FIFO"):
+        # waiting 100 seconds less after 10 seconds, so leaving later would arrive earlier
+        TimeProfile([0, 10], [100, 0])
@@ -0,0 +1,39 @@
+import copy
+
+from benchmarks.generators import write_lif_grid
+from benchmarks.profile_preparation import profile_preparation, format_spans
+from benchmarks.run_benchmarks import run_benchmarks, compare
+
+
+def test_run_benchmarks(tmp_path):
+    algorithms = ["AStar", "Dijkstra", "OsmRoutingKit"]
+    results = run_benchmarks(["lif", "mfn", "osm"], [200], algorithms, queries=5, work_dir=tmp_path, isolate=False)
+
+    by_combination = {(r["format"], r["algorithm"]): r for r in results["results"]}
+    assert set(by_combination) == {(f, a) for f in ("lif", "mfn", "osm") for a in algorithms}
+    for format_ in ("lif", "mfn", "osm"):
+        assert by_combination[format_, "Dijkstra"]["status"] == "ok", by_combination[format_, "Dijkstra"]["error"]
+        result = by_combination[format_, "AStar"]
+        assert result["status"] == "ok", result["error"]
+        assert result["nodes"] > 0 and result["graph_edges"] > 0
+        assert result["latency_p50_seconds"] <= result["latency_p99_seconds"] <= result["latency_max_seconds"]
+        assert result["throughput_qps"] > 0
+        # OsmRoutingKit needs a .pbf file
+        assert by_combination[format_, "OsmRoutingKit"]["status"] == "skipped"
+
+    assert compare(results, results) == []
+    slower = copy.deepcopy(results)
+    for result in slower["results"]:
+        if result["status"] == "ok":
+            result["throughput_qps"] /= 2
+    assert len(compare(slower, results)) == 6
+
+
+def test_profile_preparation(tmp_path):
+    path = write_lif_grid(tmp_path / "grid.json", 200)
+    profiler = profile_preparation(path, memory=True)
+
+    assert [(s.name, s.depth) for s in profiler.spans] == [("read LIF", 1), ("build graph", 1),
+                                                           ("get_networkx_data", 0)]
+    assert all(s.memory_bytes > 0 for s in profiler.spans)
+    assert format_spans(profiler.spans).splitlines()[1].startswith("  read LIF")
@@ -1,13 +1,14 @@
 import math
 import os
+import struct
 from pathlib import Path
 
-from generalized_path_finding.algorithms import AStar, NxRoutingKit, OsmRoutingKit
+from generalized_path_finding.algorithms import AStar, NxRoutingKit, OsmRoutingKit, CachingPathFinder, PathCacheOptions
 from generalized_path_finding.formats.lif import LifDataProvider
 from generalized_path_finding.formats.mfn_excel import MfnDataProvider
 from generalized_path_finding.formats.osm.osm_data_provider import OsmDataProvider
-from generalized_path_finding.helper import create_path_finder, Algorithm
-from generalized_path_finding.model import PathFinder
+from generalized_path_finding.helper import create_path_finder, Algorithm, ChooseByBenchmark
+from generalized_path_finding.model import PathFinder, OsmChData
 from tests.constants import EXACT_ORIGIN, EXACT_DESTINATION, ORIGIN, DESTINATION, DURATION
 from tests.formats.mfn_excel.test_mfn_data_provider import DIST_1_2, DIST_2_3
 
@@ -113,3 +114,64 @@ def test_create_path_finder_with_auto():
                                     fleet="Roboter")
     algo = create_path_finder(data_provider)
     assert isinstance(algo, NxRoutingKit)
+
+
+def test_number_of_nodes_without_graph():
+    data_provider = LifDataProvider(current_path / "formats/lif/LIF_4_4_MAPF.json")
+    assert data_provider.number_of_nodes() == 10
+    assert data_provider._graph is None
+    assert data_provider.number_of_nodes() == data_provider.get_networkx_data().graph.number_of_nodes()
+
+    data_provider = MfnDataProvider(current_path / "formats/mfn_excel/MFN_example.xlsx", fleet="Roboter")
+    assert data_provider.number_of_nodes() == 4
+    assert data_provider._graphs == {}
+
+
+def test_number_of_nodes_of_osm_ch_data(tmp_path):
+    # the header of a .graph file with 3 nodes and 2 arcs, followed by the first out arc of each node
+    graph_file = tmp_path / "test.graph"
+    graph_file.write_bytes(struct.pack("=6I", 3, 2, 0, 1, 2, 2))
+    assert OsmChData(str(graph_file), str(tmp_path / "test.ch")).number_of_nodes == 3
+
+
+def test_create_path_finder_with_cost_model(tmp_path, monkeypatch):
+    data_provider = LifDataProvider(current_path / "formats/lif/LIF_4_4_MAPF.json")
+    cost_model = ChooseByBenchmark([NxRoutingKit, AStar], cache_dir=tmp_path)
+    algo = create_path_finder(data_provider, cost_model=cost_model)
+    assert isinstance(algo, (NxRoutingKit, AStar))
+    assert len(list(tmp_path.glob("*.benchmark.json"))) == 1
+
+    # the measurement is cached per file
+    def measure(data_provider):
+        raise AssertionError("measured again")
+
+    monkeypatch.setattr(cost_model, "measure", measure)
+    assert type(create_path_finder(data_provider, cost_model=cost_model)) is type(algo)
+
+    # but measured again for other options of the graph
+    monkeypatch.undo()
+    slow_data_provider = LifDataProvider(current_path / "formats/lif/LIF_4_4_MAPF.json", vehicle_max_speed=0.5)
+    create_path_finder(slow_data_provider, cost_model=cost_model)
+    assert len(list(tmp_path.glob("*.benchmark.json"))) == 2
+
+
+def test_cache_key_of_priority_factor():
+    path = current_path / "formats/mfn_excel/MFN_example.xlsx"
+    key = MfnDataProvider(path, fleet="Roboter").cache_key()
+    assert MfnDataProvider(path, fleet="Roboter", priority_factor=lambda prio: 1.0).cache_key() == key
+    assert MfnDataProvider(path, fleet="Roboter", priority_factor=lambda prio: 2.0).cache_key() != key
+    assert MfnDataProvider(path, fleet="Roboter").for_fleet("Roboter").cache_key() == key
+
+
+def test_create_path_finder_with_cache():
+    data_provider = LifDataProvider(current_path / "formats/lif/LIF_4_4_MAPF.json")
+    algo = create_path_finder(data_provider, Algorithm.A_STAR, cache=PathCacheOptions(reuse_subpaths=True))
+    assert isinstance(algo, CachingPathFinder)
+    assert isinstance(algo.path_finder, AStar)
+
+    p = algo.find_shortest_path("N_0_2", "N_3_3")
+    assert p.cost == 4
+    prefix = algo.find_shortest_path("N_0_2", "N_2_2")
+    assert prefix.cost == 2
+    assert prefix.edges == ['E-0_2-1_2', 'E-1_2-2_2']
+    assert algo.stats.subpath_hits == 1
@@ -0,0 +1,148 @@
+import asyncio
+import json
+import threading
+
+import networkx as nx
+import pytest
+
+from generalized_path_finding.algorithms import AStar
+from generalized_path_finding.model import NetworkxData
+from generalized_path_finding.routing_server import RoutingServer, RoutingServerOptions, Overloaded, \
+    DEFAULT_PATH_FINDER
+
+
+def line_path_finder() -> AStar[str]:
+    graph = nx.MultiDiGraph()
+    for i in range(4):
+        graph.add_edge(f"N{i}", f"N{i + 1}", key=f"E{i}", weight=1.0)
+    return AStar(NetworkxData(graph, lambda u, v: 0.0))
+
+
+class FailingAStar(AStar):
+    def find_shortest_paths(self, queries):
+        raise RuntimeError("out of memory")
+
+
+class UnserializableAStar(AStar):
+    def find_shortest_paths(self, queries):
+        return [object() for _ in queries]
+
+
+class BlockingAStar(AStar):
+    """An AStar whose batches wait until released, to fill the queue of the server."""
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.release = threading.Event()
+
+    def find_shortest_paths(self, queries):
+        self.release.wait()
+        return super().find_shortest_paths(queries)
+
+
+def test_batches_concurrent_requests():
+    async def run():
+        options = RoutingServerOptions(max_batch_size=8, max_batch_delay=0.05)
+        async with RoutingServer({DEFAULT_PATH_FINDER: line_path_finder()}, options) as server:
+            paths = await asyncio.gather(*(server.route("N0", f"N{i}") for i in range(1, 5)))
+            distances = await server.distance_matrix(["N0", "N4"], ["N2", "N4"])
+            return paths, distances, server.metrics()
+
+    paths, distances, metrics = asyncio.run(run())
+    assert [path.cost for path in paths] == [1.0, 2.0, 3.0, 4.0]
+    assert distances == [[2.0, 4.0], [None, 0.0]]
+    assert metrics.requests == 5
+    # the route requests are answered by a single call of find_shortest_paths
+    assert metrics.batches == 2
+    assert metrics.latency_p50_seconds <= metrics.latency_p99_seconds
+
+
+def test_invalid_request_does_not_fail_batch():
+    async def run():
+        options = RoutingServerOptions(max_batch_delay=0.05)
+        async with RoutingServer({DEFAULT_PATH_FINDER: line_path_finder()}, options) as server:
+            return await asyncio.gather(server.route("N0", "N1"), server.route("N0", "unknown"),
+                                        return_exceptions=True), server.metrics()
+
+    (path, error), metrics = asyncio.run(run())
+    assert path.nodes == ["N0", "N1"]
+    assert isinstance(error, ValueError)
+    assert metrics.errors == 1
+    # only the successful retry of the valid request is counted, not the failed batch
+    assert metrics.batches == 1
+    assert metrics.mean_batch_size == 1.0
+
+
+def test_backpressure():
+    path_finder = BlockingAStar(line_path_finder().data)
+
+    async def run():
+        options = RoutingServerOptions(max_batch_size=1, max_batch_delay=0.0, max_queue_size=1)
+        async with RoutingServer({DEFAULT_PATH_FINDER: path_finder}, options) as server:
+            running = asyncio.create_task(server.route("N0", "N1"))
+            await asyncio.sleep(0.05)  # the first request is being answered, so the queue is empty
+            queued = asyncio.create_task(server.route("N0", "N2"))
+            await asyncio.sleep(0)
+            with pytest.raises(Overloaded):
+                await server.route("N0", "N3")
+            path_finder.release.set()
+            return await running, await queued, server.metrics()
+
+    first, second, metrics = asyncio.run(run())
+    assert (first.cost, second.cost) == (1.0, 2.0)
+    assert metrics.rejected == 1
+
+
+async def request(port: int, method: str, target: str, body: dict | None = None) -> tuple[int, dict]:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    payload = json.dumps(body).encode() if body is not None else b""
+    writer.write(f"{method} {target} HTTP/1.1\r\nContent-Length: {len(payload)}\r\nConnection: close\r\n\r\n"
+                 .encode() + payload)
+    response = await reader.read()
+    writer.close()
+    head, _, content = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(content)
+
+
+def test_http():
+    async def run():
+        async with RoutingServer({DEFAULT_PATH_FINDER: line_path_finder()}) as server:
+            http_server = await server.serve(port=0)
+            port = http_server.sockets[0].getsockname()[1]
+            async with http_server:
+                return [
+                    await request(port, "POST", "/route", {"source": "N0", "destination": "N2"}),
+                    await request(port, "POST", "/route", {"source": "N4", "destination": "N0"}),
+                    await request(port, "POST", "/distance_matrix", {"sources": ["N0"], "destinations": ["N3"]}),
+                    await request(port, "POST", "/route", {"source": "N0", "destination": "N2", "path_finder": "x"}),
+                    await request(port, "GET", "/metrics"),
+                ]
+
+    route, no_route, matrix, unknown, metrics = asyncio.run(run())
+    assert route == (200, {"path": {"nodes": ["N0", "N1", "N2"], "edges": ["E0", "E1"], "cost": 2.0}})
+    assert no_route == (200, {"path": None})
+    assert matrix == (200, {"distances": [[3.0]]})
+    assert unknown[0] == 400
+    assert metrics[0] == 200 and metrics[1]["requests"] == 3
+
+
+def test_http_errors():
+    data = line_path_finder().data
+
+    async def run():
+        path_finders = {DEFAULT_PATH_FINDER: FailingAStar(data), "unserializable": UnserializableAStar(data)}
+        async with RoutingServer(path_finders, RoutingServerOptions(max_request_bytes=100)) as server:
+            http_server = await server.serve(port=0)
+            port = http_server.sockets[0].getsockname()[1]
+            async with http_server:
+                return [
+                    await request(port, "POST", "/route", {"source": "N0", "destination": "N2"}),
+                    await request(port, "POST", "/route",
+                                  {"source": "N0", "destination": "N2", "path_finder": "unserializable"}),
+                    await request(port, "POST", "/distance_matrix", {"sources": ["N0"] * 50, "destinations": []}),
+                ]
+
+    failing, unserializable, too_large = asyncio.run(run())
+    assert failing == (500, {"error": "out of memory"})
+    assert unserializable[0] == 500
+    assert too_large[0] == 413